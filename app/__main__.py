@@ -3,6 +3,10 @@ Micro Service with Ports and Adapters Architecture
 ==================================================
 The application's entry point. Loads, configures and starts the application.
 
+The application is put together by builder functions, so that the worker
+processes handling commands, if any, can build their own database, senders
+and message bus the same way.
+
 __license__ =  MIT
 __author__ = 'Lucas Góes'
 __email__ = 'lucas.rd.goes@gmail.com'
@@ -10,37 +14,56 @@ __email__ = 'lucas.rd.goes@gmail.com'
 
 import sys
 import time
+import atexit
 import logging
 import warnings
 
 import coloredlogs
 
-from . import domain, handlers, settings
+from . import domain, handlers, middleware, settings
+from .outbox import OutboxRelay
+from .adapters.cache import CachedBookView
 from .version import __version__
 
 
-def main():
-	"""The application's main function."""
-	app = settings.ApplicationConfig()
+LOGGER = logging.getLogger('sample')
 
-	# Configuring logger.
-	logger = logging.getLogger('sample')
+# Databases whose books written by a worker process are seen by the others.
+PROCESS_DATABASES = ['sqlite', 'sqlite-sharded', 'shared-memory']
+
+# Databases whose outbox written by a worker process is relayed by this one.
+PROCESS_OUTBOX_DATABASES = ['sqlite']
+
+
+def configure_logger(app: settings.ApplicationConfig):
+	"""Configures the application's logger.
+
+	Params
+	------
+	app: ApplicationConfig -- the application's configuration
+	"""
 	coloredlogs.install(
 	    fmt=app.logger_format,
 	    level_styles=coloredlogs.parse_encoded_styles(app.logger_styles),
-	    level=app.logger_level, logger=logger, milliseconds=True
+	    level=app.logger_level, logger=LOGGER, milliseconds=True
 	)
-	logger.info('Started sample book managing application v{0}' \
-				.format(__version__))
 
-	# Creates director and list of builders to make the app's adapters.
-	logger.debug('Creating director and fetching builders to create the app\'s'
-				 ' adapters')
-	director = settings.Director()
-	builders = settings.Builder.__subclasses__()
 
-	# Configuring senders.
-	logger.debug('Configuring senders ...')
+def build_senders(director: settings.Director, builders: list,
+				  app: settings.ApplicationConfig) -> list:
+	"""Builds the senders chosen for the application.
+
+	Params
+	------
+	director: Director -- the director of the builders
+	builders: list -- the builders of every adapter
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	sender_adapters: list -- the sender adapters
+	"""
+	LOGGER.debug('Configuring senders ...')
 
 	try:
 		senders = app.senders
@@ -51,24 +74,40 @@ def main():
 				b for b in builders if b.tech == sender \
 									and b.ctx == 'sender'
 			)
-			
+
 			# Retrieving adapter and configuring it.
 			director.set_builder(sender_builder())
 			sender_adapters.append(director.get_adapter())
 
 	except StopIteration as err:
-		logger.error(
+		LOGGER.error(
 			'The chosen sender \'{0}\' has no builder or adapter'
 			' implementation or one of them is not decorated with @identify' \
 			.format(sender)
 		)
 		sys.exit(1)
 
-	logger.info('Using \'{0}\' adapter(s) for the sender(s)' \
+	LOGGER.info('Using \'{0}\' adapter(s) for the sender(s)' \
 				.format([type(i).__name__ for i in sender_adapters]))
 
-	# Configuring database.
-	logger.debug('Configuring database ...')
+	return sender_adapters
+
+
+def build_database(director: settings.Director, builders: list,
+				   app: settings.ApplicationConfig):
+	"""Builds and sets up the database chosen for the application.
+
+	Params
+	------
+	director: Director -- the director of the builders
+	builders: list -- the builders of every adapter
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	database_adapter -- the database adapter
+	"""
+	LOGGER.debug('Configuring database ...')
 
 	try:
 		database = app.database
@@ -81,39 +120,213 @@ def main():
 		database_adapter.set_up()
 
 	except StopIteration as err:
-		logger.error(
+		LOGGER.error(
 			'The chosen database \'{0}\' has no builder or adapter'
 			' implementation or one of them is not decorated with @identify' \
 			.format(database)
 		)
 		sys.exit(1)
 
-	logger.info('Using \'{0}\' adapter for database' \
+	LOGGER.info('Using \'{0}\' adapter for database' \
 				.format(type(database_adapter).__name__))
 
-	"""Creates message bus for exchange of commands and events with the
-	adapters. Also creates handlers and subscribes them to their commands and
-	events.
+	return database_adapter
+
+
+def build_view(database_adapter, app: settings.ApplicationConfig):
+	"""Builds the database's view, wrapped with a cache if asked for.
+
+	Params
+	------
+	database_adapter -- the database adapter
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	view: BookView -- the view used by the interfaces
 	"""
-	bus = domain.ports.MessageBus()
+	view = database_adapter.get_view()
+	if app.view_cache != 'none':
+		view = CachedBookView(
+			view, app.view_cache_size,
+			app.view_cache_ttl if app.view_cache == 'ttl' else None
+		)
+		LOGGER.info('Caching up to {0} entries per view method with the'
+					' \'{1}\' policy'.format(app.view_cache_size,
+											  app.view_cache))
+
+	return view
+
+
+def build_bus(app: settings.ApplicationConfig) -> domain.ports.MessageBus:
+	"""Builds the message bus for exchange of commands and events with the
+	adapters, along with its dispatcher, middleware, command queue and
+	metrics as configured.
+
+	Params
+	------
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	bus: MessageBus -- the message bus without any subscriber
+	"""
+	dispatcher = None
+	if app.event_dispatch:
+		dispatcher = domain.dispatch.EventDispatcher(
+			app.event_workers, app.event_queue_size, app.event_ordering)
+		LOGGER.info('Handling events at {0} workers with the \'{1}\''
+					' ordering'.format(app.event_workers, app.event_ordering))
+
+	bus_middleware = []
+	for name in app.bus_middleware:
+		if name == 'tracing':
+			bus_middleware.append(middleware.TracingMiddleware())
+		elif name == 'timing':
+			bus_middleware.append(middleware.TimingMiddleware())
+		else:
+			bus_middleware.append(middleware.RetryMiddleware(
+				app.bus_retry_attempts, app.bus_retry_delay))
+	if bus_middleware:
+		LOGGER.info('Using {0} around the handlers' \
+					.format([type(m).__name__ for m in bus_middleware]))
+
+	commands = None
+	if app.command_queue:
+		commands = domain.dispatch.CommandQueue(
+			app.command_workers, app.command_queue_size, app.command_overflow,
+			app.command_timeout or None, app.command_retry_after)
+		LOGGER.info('Handling commands at {0} workers, queueing up to {1}'
+					' with the \'{2}\' overflow' \
+					.format(app.command_workers, app.command_queue_size,
+							app.command_overflow))
+
+	metrics = None
+	if app.metrics:
+		metrics = domain.metrics.BusMetrics(
+			app.metrics_buckets or domain.metrics.BUCKETS)
+		LOGGER.info('Measuring the message bus\' message types and handlers')
+
+	return domain.ports.MessageBus(dispatcher, bus_middleware, commands,
+								   metrics)
+
+
+def subscribe_commands(bus: domain.ports.MessageBus, database_adapter,
+					   app: settings.ApplicationConfig):
+	"""Creates the command handlers and subscribes them to their commands.
+
+	Params
+	------
+	bus: MessageBus -- the message bus
+	database_adapter -- the database adapter
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	register_book_handler -- the handler of the RegisterBookCommand
+	"""
+	if app.group_commit:
+		register_book_handler = handlers.GroupCommitRegisterBookHandler(
+			bus, database_adapter.get_uowm(), app.group_commit_size,
+			app.group_commit_delay, app.outbox
+		)
+		LOGGER.info('Committing up to {0} book registrations together' \
+					.format(app.group_commit_size))
+	else:
+		register_book_handler = handlers.RegisterBookHandler(
+			bus, database_adapter.get_uowm(), app.outbox)
 
-	# Subscribes commands.
+	bus.subscribe(domain.messages.RegisterBookCommand, register_book_handler)
 	bus.subscribe(
-		domain.messages.RegisterBookCommand,
-		handlers.RegisterBookHandler(bus, database_adapter.get_uowm())
+		domain.messages.RegisterBooksCommand,
+		handlers.RegisterBooksHandler(bus, database_adapter.get_uowm(),
+									  app.outbox)
 	)
 
-	# Subscribes events.
+	return register_book_handler
+
+
+def subscribe_events(bus: domain.ports.MessageBus, view,
+					 sender_adapters: list,
+					 app: settings.ApplicationConfig):
+	"""Creates the event handlers and subscribes them to their events,
+	invalidating the cache before anything reads it.
+
+	Params
+	------
+	bus: MessageBus -- the message bus
+	view: BookView -- the view read by the handlers
+	sender_adapters: list -- the sender adapters
+	app: ApplicationConfig -- the application's configuration
+	"""
+	if isinstance(view, CachedBookView):
+		invalidation_handler = handlers.ViewCacheInvalidationHandler(view)
+		bus.subscribe(domain.messages.BookRegisteredEvent,
+					  invalidation_handler, inline=True)
+		bus.subscribe(domain.messages.BooksRegisteredEvent,
+					  invalidation_handler, inline=True)
+
 	for sender_adapter in sender_adapters:
 		bus.subscribe(
 			domain.messages.BookRegisteredEvent,
-			handlers.BookRegisteredHandler(
-				database_adapter.get_view(), sender_adapter
-			)
+			handlers.BookRegisteredHandler(view, sender_adapter)
+		)
+		bus.subscribe(
+			domain.messages.BooksRegisteredEvent,
+			handlers.BooksRegisteredHandler(sender_adapter)
 		)
 
-	# Configuring interfaces.
-	logger.debug('Configuring interfaces ...')
+
+def build_relay(database_adapter, sender_adapters: list,
+				app: settings.ApplicationConfig) -> OutboxRelay:
+	"""Builds the relay delivering the events of the database's outbox to
+	the senders, through a message bus of its own.
+
+	Params
+	------
+	database_adapter -- the database adapter
+	sender_adapters: list -- the sender adapters
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	relay: OutboxRelay -- the relay, not started yet
+	"""
+	if not hasattr(database_adapter, 'get_outbox'):
+		LOGGER.error('The chosen database \'{0}\' has no outbox' \
+					 .format(app.database))
+		sys.exit(1)
+
+	relay_bus = domain.ports.MessageBus()
+	subscribe_events(relay_bus, database_adapter.get_view(), sender_adapters,
+					 app)
+
+	LOGGER.info('Relaying events from the outbox in batches of up to {0}' \
+				.format(app.outbox_batch_size))
+
+	return OutboxRelay(database_adapter.get_outbox(), relay_bus.handle,
+					   app.outbox_batch_size, app.outbox_interval,
+					   app.outbox_retry_delay, app.outbox_max_delay)
+
+
+def build_interfaces(director: settings.Director, builders: list,
+					 bus: domain.ports.MessageBus, view,
+					 app: settings.ApplicationConfig) -> list:
+	"""Builds the interfaces chosen for the application.
+
+	Params
+	------
+	director: Director -- the director of the builders
+	builders: list -- the builders of every adapter
+	bus: MessageBus -- the message bus handling the interfaces' commands
+	view: BookView -- the view queried by the interfaces
+	app: ApplicationConfig -- the application's configuration
+
+	Returns
+	-------
+	interface_adapters: list -- the interface adapters
+	"""
+	LOGGER.debug('Configuring interfaces ...')
 
 	try:
 		interfaces = app.interfaces
@@ -124,39 +337,181 @@ def main():
 				b for b in builders if b.tech == interface \
 									and b.ctx == 'interface'
 			)
-			
+
 			# Retrieving adapter and configuring it.
 			director.set_builder(interface_builder())
 			interface_adapter = director.get_adapter()
 			interface_adapter.set_message_bus(bus)
-			interface_adapter.set_view(database_adapter.get_view())
+			interface_adapter.set_view(view)
 
 			interface_adapters.append(interface_adapter)
 
 	except StopIteration as err:
-		logger.error(
+		LOGGER.error(
 			'The chosen interface \'{0}\' has no builder or adapter'
 			' implementation or one of them is not decorated with @identify' \
 			.format(interface)
 		)
 		sys.exit(1)
 
-	logger.info('Using \'{0}\' adapter(s) for the interface(s)' \
+	LOGGER.info('Using \'{0}\' adapter(s) for the interface(s)' \
 				.format([type(i).__name__ for i in interface_adapters]))
 
+	return interface_adapters
+
+
+def build_worker() -> domain.ports.MessageBus:
+	"""Builds the message bus of a worker process handling commands, with
+	its own database, senders and handlers. Called at the worker process by
+	the ProcessCommandPool.
+
+	Returns
+	-------
+	bus: MessageBus -- the worker's message bus
+	"""
+	app = settings.ApplicationConfig()
+	configure_logger(app)
+
+	director = settings.Director()
+	builders = settings.Builder.__subclasses__()
+
+	# The outbox is relayed to the senders by the calling process.
+	sender_adapters = []
+	if not app.outbox:
+		sender_adapters = build_senders(director, builders, app)
+
+	database_adapter = build_database(director, builders, app)
+
+	bus = domain.ports.MessageBus()
+	register_book_handler = subscribe_commands(bus, database_adapter, app)
+	subscribe_events(bus, database_adapter.get_view(), sender_adapters, app)
+
+	# Flushing pending commits before the database goes away at exit.
+	atexit.register(database_adapter.tear_down)
+	if app.group_commit:
+		atexit.register(register_book_handler.stop)
+
+	return bus
+
+
+def main():
+	"""The application's main function."""
+	app = settings.ApplicationConfig()
+
+	# Configuring logger.
+	configure_logger(app)
+	LOGGER.info('Started sample book managing application v{0}' \
+				.format(__version__))
+
+	# Creates director and list of builders to make the app's adapters.
+	LOGGER.debug('Creating director and fetching builders to create the app\'s'
+				 ' adapters')
+	director = settings.Director()
+	builders = settings.Builder.__subclasses__()
+
+	# Worker processes own the units of work and senders if there are any.
+	if app.command_processes and app.database not in PROCESS_DATABASES:
+		LOGGER.error('The chosen database \'{0}\' can not be written by'
+					 ' worker processes, choose one of {1}' \
+					 .format(app.database, PROCESS_DATABASES))
+		sys.exit(1)
+
+	if app.command_processes and app.outbox \
+	   and app.database not in PROCESS_OUTBOX_DATABASES:
+		LOGGER.error('The outbox of the chosen database \'{0}\' can not be'
+					 ' written by worker processes, choose one of {1}' \
+					 .format(app.database, PROCESS_OUTBOX_DATABASES))
+		sys.exit(1)
+
+	sender_adapters = []
+	if not app.command_processes or app.outbox:
+		sender_adapters = build_senders(director, builders, app)
+
+	database_adapter = build_database(director, builders, app)
+	view = build_view(database_adapter, app)
+
+	# Senders are subscribed to the relay instead of the bus if outboxed.
+	relay = None
+	if app.outbox:
+		relay = build_relay(database_adapter, sender_adapters, app)
+		sender_adapters = []
+
+	"""Creates message bus for exchange of commands and events with the
+	adapters. Also creates handlers and subscribes them to their commands and
+	events.
+	"""
+	bus = build_bus(app)
+
+	pool = None
+	register_book_handler = None
+	if app.command_processes:
+		pool = domain.dispatch.ProcessCommandPool(build_worker,
+												  app.command_processes)
+		partitioned_handler = handlers.PartitionedCommandHandler(bus, pool)
+		bus.subscribe(domain.messages.RegisterBookCommand,
+					  partitioned_handler)
+		bus.subscribe(domain.messages.RegisterBooksCommand,
+					  partitioned_handler)
+		LOGGER.info('Handling commands at {0} worker processes partitioned'
+					' by ISBN'.format(app.command_processes))
+	else:
+		register_book_handler = subscribe_commands(bus, database_adapter, app)
+
+	subscribe_events(bus, view, sender_adapters, app)
+
+	if relay is not None:
+		notification_handler = handlers.OutboxNotificationHandler(relay)
+		bus.subscribe(domain.messages.BookRegisteredEvent,
+					  notification_handler, inline=True)
+		bus.subscribe(domain.messages.BooksRegisteredEvent,
+					  notification_handler, inline=True)
+
+	# Configuring interfaces.
+	interface_adapters = build_interfaces(director, builders, bus, view, app)
+
 	# Starting application.
-	logger.debug('Starting application ...')
+	LOGGER.debug('Starting application ...')
+	if relay is not None:
+		relay.start()
 	for interface_adapter in interface_adapters:
 		interface_adapter.run()
 
-	# Waiting until the application is stopped.
+	# Waiting until the application is stopped, logging the event queues.
+	dispatcher = bus.dispatcher
+	log_stats = dispatcher is not None and app.event_metrics_interval > 0
 	try:
 		while(True):
-			time.sleep(10)
+			time.sleep(app.event_metrics_interval if log_stats else 10)
+			if log_stats:
+				LOGGER.info('Event dispatch statistics: {0}' \
+							.format(dispatcher.stats()))
 	except KeyboardInterrupt:
 		for interface_adapter in interface_adapters:
 			interface_adapter.stop()
-		logger.info('Ending application')
+		if bus.commands is not None:
+			bus.commands.stop()
+			LOGGER.info('Command queue statistics: {0}' \
+						.format(bus.commands.stats()))
+		if pool is not None:
+			pool.stop()
+			LOGGER.info('Worker process statistics: {0}' \
+						.format(pool.stats()))
+		if app.group_commit and register_book_handler is not None:
+			register_book_handler.stop()
+		if dispatcher is not None:
+			dispatcher.stop()
+			LOGGER.info('Event dispatch statistics: {0}' \
+						.format(dispatcher.stats()))
+		if relay is not None:
+			relay.stop()
+			LOGGER.info('Outbox relay statistics: {0}'.format(relay.stats()))
+		for used in bus.middleware:
+			if isinstance(used, middleware.TimingMiddleware):
+				LOGGER.info('Handler timings: {0}'.format(used.stats()))
+		if app.view_cache != 'none':
+			LOGGER.info('View cache statistics: {0}'.format(view.stats()))
+		database_adapter.tear_down()
+		LOGGER.info('Ending application')
 
 
 if __name__ == '__main__':
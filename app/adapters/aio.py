@@ -0,0 +1,142 @@
+"""Adapters running the synchronous database and sender adapters for the
+asyncio ports at an executor."""
+
+import asyncio
+
+from ..domain.model import Book
+from ..domain.ports import UnitOfWorkManager, QueueSender, \
+						   AsyncBookRepository, AsyncUnitOfWork, \
+						   AsyncUnitOfWorkManager, AsyncQueueSender
+
+
+class ExecutorBookRepository(AsyncBookRepository):
+	"""An implementation of an AsyncBookRepository staging the books saved
+	until their unit of work commits.
+
+	Methods: save, save_many
+	"""
+	def __init__(self, staged: list):
+		"""ExecutorBookRepository's constructor.
+
+		Params
+		------
+		staged: list -- the books staged at the unit of work
+		"""
+		self.staged = staged
+
+	async def save(self, book: Book):
+		"""View @app.domain.ports.AsyncBookRepository."""
+		self.staged.append(book)
+
+	async def save_many(self, books: list):
+		"""View @app.domain.ports.AsyncBookRepository."""
+		self.staged.extend(books)
+
+
+class ExecutorUnitOfWork(AsyncUnitOfWork):
+	"""An implementation of an AsyncUnitOfWork over a synchronous unit of
+	work manager.
+
+	The books are staged at the event loop and the whole synchronous unit of
+	work runs at the executor when committing, within a single call. No
+	connection or lock of the database is then held while other coroutines
+	run, and adapters expecting a unit of work to stay on one thread keep
+	working.
+
+	Methods: __aenter__, __aexit__, commit, rollback, books
+	"""
+	def __init__(self, uowm: UnitOfWorkManager, executor):
+		"""ExecutorUnitOfWork's constructor.
+
+		Params
+		------
+		uowm: UnitOfWorkManager -- the synchronous unit of work manager
+		executor -- the executor running the commits
+		"""
+		self.uowm = uowm
+		self.executor = executor
+		self.staged = []
+
+	async def __aenter__(self):
+		"""View @app.domain.ports.AsyncUnitOfWork."""
+		return self
+
+	async def __aexit__(self, type, value, traceback):
+		"""View @app.domain.ports.AsyncUnitOfWork."""
+		self.staged.clear()
+
+	async def commit(self):
+		"""View @app.domain.ports.AsyncUnitOfWork."""
+		staged, self.staged = self.staged, []
+		if not staged:
+			return
+
+		await asyncio.get_running_loop() \
+			.run_in_executor(self.executor, self.__commit, staged)
+
+	async def rollback(self):
+		"""View @app.domain.ports.AsyncUnitOfWork."""
+		self.staged.clear()
+
+	@property
+	def books(self) -> ExecutorBookRepository:
+		"""View @app.domain.ports.AsyncUnitOfWork."""
+		return ExecutorBookRepository(self.staged)
+
+	def __commit(self, books: list):
+		"""Saves the staged books with a synchronous unit of work.
+
+		Params
+		------
+		books: list -- the books to be saved
+		"""
+		with self.uowm.start() as uow:
+			uow.books.save_many(books)
+			uow.commit()
+
+
+class ExecutorUnitOfWorkManager(AsyncUnitOfWorkManager):
+	"""An implementation of an AsyncUnitOfWorkManager over the unit of work
+	manager of any database adapter.
+
+	Methods: start
+	"""
+	def __init__(self, uowm: UnitOfWorkManager, executor=None):
+		"""ExecutorUnitOfWorkManager's constructor.
+
+		Params
+		------
+		uowm: UnitOfWorkManager -- the synchronous unit of work manager
+		executor -- the executor running the commits, the event loop's
+		default one if None
+		"""
+		self.uowm = uowm
+		self.executor = executor
+
+	def start(self) -> ExecutorUnitOfWork:
+		"""View @app.domain.ports.AsyncUnitOfWorkManager."""
+		return ExecutorUnitOfWork(self.uowm, self.executor)
+
+
+class ExecutorQueueSender(AsyncQueueSender):
+	"""An implementation of an AsyncQueueSender over the sender of any
+	sender adapter.
+
+	Methods: send
+	"""
+	def __init__(self, sender: QueueSender, executor=None):
+		"""ExecutorQueueSender's constructor.
+
+		Params
+		------
+		sender: QueueSender -- the synchronous sender
+		executor -- the executor running the sends, the event loop's default
+		one if None
+		"""
+		self.sender = sender
+		self.executor = executor
+
+	async def send(self, msg):
+		"""View @app.domain.ports.AsyncQueueSender."""
+		await asyncio.get_running_loop() \
+			.run_in_executor(self.executor, self.sender.send, msg)
@@ -0,0 +1,225 @@
+"""A caching decorator for the views built by the database adapters."""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from ..domain.model import Book
+from ..domain.ports import BookView
+
+
+LOGGER = logging.getLogger('sample')
+
+
+class LruCache(object):
+	"""A bounded and thread safe least recently used cache whose entries can
+	also expire after a time to live.
+
+	Invalidations bump the cache's generation. Values read from the database
+	before an invalidation are then refused, so a slow reader never caches
+	data that has already been invalidated.
+
+	Methods: get, put, discard, clear
+	"""
+	def __init__(self, maxsize: int, ttl: float = None):
+		"""LruCache's constructor.
+
+		Params
+		------
+		maxsize: int -- the maximum number of entries
+		ttl: float -- seconds after which an entry expires, None for never
+		"""
+		self.maxsize = maxsize
+		self.ttl = ttl
+
+		self.hits = 0
+		self.misses = 0
+		self.generation = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+
+	def get(self, key) -> tuple:
+		"""Looks a key up.
+
+		Params
+		------
+		key -- the key of the entry
+
+		Returns
+		-------
+		found: bool -- whether a fresh entry has been found
+		value -- the entry's value if found, else the generation to be passed
+		on to put
+		"""
+		with self.lock:
+			entry = self.entries.get(key)
+
+			if entry is not None \
+			   and (self.ttl is None or entry[1] > time.monotonic()):
+				self.entries.move_to_end(key)
+				self.hits += 1
+				return True, entry[0]
+
+			self.misses += 1
+			return False, self.generation
+
+	def put(self, key, value, generation: int):
+		"""Stores an entry evicting the least recently used one if full.
+
+		Params
+		------
+		key -- the key of the entry
+		value -- the value of the entry
+		generation: int -- the generation returned by the missed get
+		"""
+		with self.lock:
+			if generation != self.generation:
+				return
+
+			expires = time.monotonic() + self.ttl if self.ttl is not None \
+					  else None
+
+			self.entries[key] = (value, expires)
+			self.entries.move_to_end(key)
+
+			if len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def discard(self, key):
+		"""Removes an entry if present.
+
+		Params
+		------
+		key -- the key of the entry
+		"""
+		with self.lock:
+			self.generation += 1
+			self.entries.pop(key, None)
+
+	def clear(self):
+		"""Removes every entry."""
+		with self.lock:
+			self.generation += 1
+			self.entries.clear()
+
+
+class CachedBookView(BookView):
+	"""Decorates any BookView with a read-through cache per method.
+
+	Books are cached by ISBN until a registration of the same ISBN is
+	announced through invalidate. Since any registration may change the
+	result of a list query or a search, their caches are cleared on every
+	invalidation.
+
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search, invalidate, stats
+	"""
+	BOOK_METHODS = ('get_by_isbn', 'get_content', 'get_digest')
+	LIST_METHODS = ('get_all', 'get_by_name', 'get_by_author',
+					'get_all_summaries', 'get_summaries_by_name',
+					'get_summaries_by_author', 'search')
+
+	def __init__(self, view: BookView, maxsize: int = 1024,
+				 ttl: float = None):
+		"""CachedBookView's constructor.
+
+		Params
+		------
+		view: BookView -- the decorated view
+		maxsize: int -- the maximum number of entries per method
+		ttl: float -- seconds after which an entry expires, None for never
+		"""
+		self.view = view
+		self.caches = {m: LruCache(maxsize, ttl) \
+					   for m in self.BOOK_METHODS + self.LIST_METHODS}
+
+	def get_all(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(self.__read('get_all', (after, limit)))
+
+	def get_by_isbn(self, isbn: str) -> Book:
+		"""View @app.domain.ports.BookView."""
+		return self.__read('get_by_isbn', (isbn,))
+
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(self.__read('get_by_name', (name, after, limit)))
+
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(self.__read('get_by_author', (author, after, limit)))
+
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(self.__read('get_all_summaries', (after, limit)))
+
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(
+			self.__read('get_summaries_by_name', (name, after, limit)))
+
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(
+			self.__read('get_summaries_by_author', (author, after, limit)))
+
+	def get_content(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		return self.__read('get_content', (isbn,))
+
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		return self.__read('get_digest', (isbn,))
+
+	def search(self, query: str, limit: int = 10) -> list:
+		"""View @app.domain.ports.BookView."""
+		return list(self.__read('search', (query, limit)))
+
+	def invalidate(self, isbns: tuple):
+		"""Drops every cached entry that may be stale after books have been
+		registered.
+
+		Params
+		------
+		isbns: tuple -- the ISBNs of the registered books
+		"""
+		for method in self.BOOK_METHODS:
+			for isbn in isbns:
+				self.caches[method].discard((isbn,))
+
+		for method in self.LIST_METHODS:
+			self.caches[method].clear()
+
+	def stats(self) -> dict:
+		"""Returns the hit and miss counters of each method's cache."""
+		return {m: {'hits': c.hits, 'misses': c.misses} \
+				for m, c in self.caches.items()}
+
+	def __read(self, method: str, args: tuple):
+		"""Reads through a method's cache, calling the decorated view on a
+		miss. Lists are cached as tuples so callers cannot change them.
+
+		Params
+		------
+		method: str -- the name of the view's method
+		args: tuple -- the arguments of the call, also used as key
+		"""
+		cache = self.caches[method]
+
+		found, value = cache.get(args)
+		if found:
+			return value
+
+		result = getattr(self.view, method)(*args)
+		if isinstance(result, list):
+			result = tuple(result)
+
+		cache.put(args, result, value)
+
+		return result
@@ -0,0 +1,130 @@
+"""Codecs used by the database adapters to compress book content at rest."""
+
+import abc
+import zlib
+
+
+class Codec(abc.ABC):
+	"""Abstract base class for the compression algorithms that can be used to
+	store book content.
+
+	Methods: encode, decode
+	"""
+	@abc.abstractmethod
+	def encode(self, data: bytes) -> bytes:
+		"""Compresses raw data.
+
+		Params
+		------
+		data: bytes -- the data to be compressed
+		"""
+		pass
+
+	@abc.abstractmethod
+	def decode(self, data: bytes) -> bytes:
+		"""Decompresses data previously compressed by encode.
+
+		Params
+		------
+		data: bytes -- the data to be decompressed
+		"""
+		pass
+
+
+class ZlibCodec(Codec):
+	"""A codec backed by the standard library's zlib.
+
+	Methods: encode, decode
+	"""
+	def __init__(self, level: int = 6):
+		"""ZlibCodec's constructor.
+
+		Params
+		------
+		level: int -- the zlib compression level, from 0 to 9
+		"""
+		self.level = level
+
+	def encode(self, data: bytes) -> bytes:
+		"""View @app.adapters.codecs.Codec."""
+		return zlib.compress(data, self.level)
+
+	def decode(self, data: bytes) -> bytes:
+		"""View @app.adapters.codecs.Codec."""
+		return zlib.decompress(data)
+
+
+CODECS = {'zlib': ZlibCodec()}
+
+# Content smaller than this is not worth compressing, by default.
+THRESHOLD = 1024
+
+
+def register_codec(name: str, codec: Codec):
+	"""Makes a codec available to the database adapters under a name.
+
+	Params
+	------
+	name: str -- the name used to choose the codec at configuration
+	codec: Codec -- the codec instance
+	"""
+	if ':' in name:
+		raise ValueError('Codec names cannot contain \':\'')
+
+	CODECS[name] = codec
+
+
+class ContentCodec(object):
+	"""Encodes book content for storage and decodes it back.
+
+	Content smaller than the threshold, or any content when no codec is
+	chosen, is kept as a plain string. Otherwise it is compressed into bytes
+	prefixed by the codec's name, so stored content stays readable if the
+	chosen codec changes later on.
+
+	Methods: encode, decode
+	"""
+	def __init__(self, name: str = None, threshold: int = THRESHOLD):
+		"""ContentCodec's constructor.
+
+		Params
+		------
+		name: str -- the name of a registered codec, None to store raw
+		threshold: int -- the minimum size in bytes of compressed content
+		"""
+		if name is not None and name not in CODECS:
+			raise ValueError('Unknown codec \'{0}\''.format(name))
+
+		self.name = name
+		self.threshold = threshold
+
+	def encode(self, content: str):
+		"""Returns the content as it should be stored, either a plain string
+		or compressed bytes.
+
+		Params
+		------
+		content: str -- the book's content
+		"""
+		if self.name is None:
+			return content
+
+		data = content.encode('utf8')
+		if len(data) < self.threshold:
+			return content
+
+		return self.name.encode('utf8') + b':' \
+			   + CODECS[self.name].encode(data)
+
+	def decode(self, stored) -> str:
+		"""Returns the book's content from its stored form.
+
+		Params
+		------
+		stored -- a plain string or bytes returned by encode
+		"""
+		if not isinstance(stored, bytes):
+			return stored
+
+		name, _, data = stored.partition(b':')
+		return CODECS[name.decode('utf8')].decode(data).decode('utf8')
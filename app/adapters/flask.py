@@ -1,19 +1,69 @@
 """A Flask REST adapter to use as an interface for the application."""
 
+import math
 import logging
 import threading
 
-from flask import Flask
+from flask import Flask, Response, request
 from gevent.pywsgi import WSGIServer
-from flask_restful import Resource, Api, reqparse
+from flask_restful import Resource, Api, reqparse, inputs
 
 from ..settings import identify
-from ..domain.messages import RegisterBookCommand
+from ..domain.errors import MessageBusBusyError
+from ..domain.messages import RegisterBookCommand, RegisterBooksCommand
 
 
 LOGGER = logging.getLogger('sample')
 
 
+def list_arguments() -> tuple:
+	"""Parses the optional keyset pagination and projection arguments of a
+	list request.
+
+	Returns
+	-------
+	after: str -- the last ISBN of the previous page, if any
+	limit: int -- the maximum number of books in the page, if any
+	content: bool -- whether the books' content was asked for
+	"""
+	parser = reqparse.RequestParser()
+
+	parser.add_argument(
+		'after', type=str, location='args',
+		help='the last ISBN of the previous page'
+	)
+	parser.add_argument(
+		'limit', type=int, location='args',
+		help='the maximum number of books in the page'
+	)
+	parser.add_argument(
+		'content', type=inputs.boolean, location='args', default=False,
+		help='whether to include the content of each book'
+	)
+
+	args = parser.parse_args()
+
+	if args['limit'] is not None and args['limit'] < 1:
+		raise Exception('The page limit must be a positive number')
+
+	return args['after'], args['limit'], args['content']
+
+
+def busy(err: MessageBusBusyError) -> tuple:
+	"""Returns the response to a command shed by a busy message bus.
+
+	Params
+	------
+	err: MessageBusBusyError -- the error raised by the message bus
+
+	Returns
+	-------
+	response: tuple -- the body, the 503 status and the Retry-After header
+	"""
+	return {'error': err.__str__()}, 503, \
+		   {'Retry-After': str(max(1, math.ceil(err.retry_after)))}
+
+
 class BookResource(Resource):
 	"""Class to handle incoming REST requests concerning books.
 
@@ -33,9 +83,14 @@ class BookResource(Resource):
 		self.view = view
 
 	def get(self) -> list:
-		"""Returns list of all registered books at database."""
+		"""Returns list of all registered books at database, or a page of it
+		when the 'after' or 'limit' arguments are given. Books are summarized
+		without their content unless the 'content' argument is true."""
 		try:
-			books = [b.__dict__ for b in self.view.get_all()]
+			after, limit, content = list_arguments()
+			query = self.view.get_all if content \
+					else self.view.get_all_summaries
+			books = [b.asdict() for b in query(after, limit)]
 
 			if len(books) == 0:
 				raise Exception('No books found')
@@ -71,10 +126,100 @@ class BookResource(Resource):
 		try:
 			self.bus.handle(cmd)
 			return {'message': 'New book registered'}
+		except MessageBusBusyError as err:
+			return busy(err)
+		except:
+			return {'error': 'ISBN already registered to another book'}, 400
+
+
+class BookBatchResource(Resource):
+	"""Class to handle incoming REST requests concerning the registration of
+	several books at once.
+
+	Extends: Resource
+
+	Methods: post
+	"""
+	def __init__(self, bus):
+		"""BookBatchResource's constructor.
+
+		Params
+		------
+		bus -- the message bus to dispatch commands
+		"""
+		self.bus = bus
+
+	def post(self) -> dict:
+		"""Registers a list of new books at database in a single batch."""
+		try:
+			cmd = RegisterBooksCommand([
+				RegisterBookCommand(
+					b['isbn'], b['name'], b['author'], b['content'])
+				for b in request.get_json(force=True)
+			])
+		except:
+			return {'error': 'Expected a list of books with isbn, name, author'
+							 ' and content'}, 400
+
+		try:
+			self.bus.handle(cmd)
+			return {'message': '{0} new books registered' \
+							   .format(len(cmd.books))}
+		except MessageBusBusyError as err:
+			return busy(err)
 		except:
 			return {'error': 'ISBN already registered to another book'}, 400
 
 
+class BookSearchResource(Resource):
+	"""Class to handle incoming REST requests concerning the full-text search
+	of books.
+
+	Extends: Resource
+
+	Methods: get
+	"""
+	def __init__(self, view):
+		"""BookSearchResource's constructor.
+
+		Params
+		------
+		view -- the database view to access data
+		"""
+		self.view = view
+
+	def get(self) -> list:
+		"""Returns summaries of the books matching every word of the 'q'
+		argument, ranked by relevance."""
+		parser = reqparse.RequestParser()
+
+		parser.add_argument(
+			'q', type=str, location='args', required=True,
+			help='the words to be searched'
+		)
+		parser.add_argument(
+			'limit', type=int, location='args', default=10,
+			help='the maximum number of books to be found'
+		)
+
+		try:
+			args = parser.parse_args()
+
+			if args['limit'] < 1:
+				raise Exception('The search limit must be a positive number')
+
+			books = [b.asdict() for b \
+					 in self.view.search(args['q'], args['limit'])]
+
+			if len(books) == 0:
+				raise Exception('No book matching the search found')
+
+			return books
+
+		except Exception as err:
+			return {'error': err.__str__()}, 400
+
+
 class BookIsbnResource(Resource):
 	"""Class to handle incoming REST requests concerning book visualization by
 	ISBN.
@@ -95,11 +240,49 @@ class BookIsbnResource(Resource):
 	def get(self, isbn: str) -> dict:
 		"""Returns a book chosen by its ISBN."""
 		try:
-			return self.view.get_by_isbn(isbn).__dict__
+			return self.view.get_by_isbn(isbn).asdict()
 		except:
 			return {'error': 'No book with the chosen ISBN found'}, 400
 
 
+class BookContentResource(Resource):
+	"""Class to handle incoming REST requests concerning the reading of a
+	book's content by ISBN.
+
+	Extends: Resource
+
+	Methods: get
+	"""
+	def __init__(self, view):
+		"""BookContentResource's constructor.
+
+		Params
+		------
+		view -- the database view to access data
+		"""
+		self.view = view
+
+	def get(self, isbn: str) -> dict:
+		"""Returns the content of a book chosen by its ISBN, tagged with its
+		digest. The content is not read again if the client already holds
+		the one tagged."""
+		try:
+			digest = self.view.get_digest(isbn)
+
+			if digest is None:
+				raise Exception('No book with the chosen ISBN found')
+
+			headers = {'ETag': '"{0}"'.format(digest)}
+			if digest in request.if_none_match:
+				return Response(status=304, headers=headers)
+
+			content = self.view.get_content(isbn)
+			return {'isbn': isbn, 'content': content}, 200, headers
+
+		except Exception as err:
+			return {'error': err.__str__()}, 400
+
+
 class BookAuthorResource(Resource):
 	"""Class to handle incoming REST requests concerning book visualization by
 	author.
@@ -120,7 +303,10 @@ class BookAuthorResource(Resource):
 	def get(self, author: str) -> dict:
 		"""Returns a book chosen by its author."""
 		try:
-			books = [b.__dict__ for b in self.view.get_by_author(author)]
+			after, limit, content = list_arguments()
+			query = self.view.get_by_author if content \
+					else self.view.get_summaries_by_author
+			books = [b.asdict() for b in query(author, after, limit)]
 
 			if len(books) == 0:
 				raise Exception('No book of the chosen author found')
@@ -151,7 +337,10 @@ class BookNameResource(Resource):
 	def get(self, name: str) -> dict:
 		"""Returns a book chosen by its name."""
 		try:
-			books = [b.__dict__ for b in self.view.get_by_name(name)]
+			after, limit, content = list_arguments()
+			query = self.view.get_by_name if content \
+					else self.view.get_summaries_by_name
+			books = [b.asdict() for b in query(name, after, limit)]
 
 			if len(books) == 0:
 				raise Exception('No book with the chosen name found')
@@ -162,6 +351,29 @@ class BookNameResource(Resource):
 			return {'error': err.__str__()}, 400
 
 
+class MetricsResource(Resource):
+	"""Class to handle incoming REST requests concerning the metrics of the
+	message bus.
+
+	Extends: Resource
+
+	Methods: get
+	"""
+	def __init__(self, metrics):
+		"""MetricsResource's constructor.
+
+		Params
+		------
+		metrics -- the metrics of the message bus
+		"""
+		self.metrics = metrics
+
+	def get(self) -> Response:
+		"""Returns the metrics in the Prometheus text exposition format."""
+		return Response(self.metrics.to_prometheus(),
+						mimetype='text/plain; version=0.0.4')
+
+
 @identify('flask', 'interface')
 class FlaskInterface(object):
 	"""Listens to incoming HTTP packages and executes the associated commands.
@@ -207,10 +419,22 @@ class FlaskInterface(object):
 			BookResource, '/books',
 			resource_class_kwargs={'bus': self.bus, 'view': self.view}
 		)
+		self.api.add_resource(
+			BookBatchResource, '/books/batch',
+			resource_class_kwargs={'bus': self.bus}
+		)
+		self.api.add_resource(
+			BookSearchResource, '/books/search',
+			resource_class_kwargs={'view': self.view}
+		)
 		self.api.add_resource(
 			BookIsbnResource, '/books/isbn/<string:isbn>',
 			resource_class_kwargs={'view': self.view}
 		)
+		self.api.add_resource(
+			BookContentResource, '/books/isbn/<string:isbn>/content',
+			resource_class_kwargs={'view': self.view}
+		)
 		self.api.add_resource(
 			BookAuthorResource, '/books/author/<string:author>',
 			resource_class_kwargs={'view': self.view}
@@ -220,6 +444,14 @@ class FlaskInterface(object):
 			resource_class_kwargs={'view': self.view}
 		)
 
+		# Exposes the bus' metrics when it measures itself.
+		metrics = getattr(self.bus, 'metrics', None)
+		if metrics is not None:
+			self.api.add_resource(
+				MetricsResource, '/metrics',
+				resource_class_kwargs={'metrics': metrics}
+			)
+
 		LOGGER.info('Starting HTTP server')
 		self.thread_server.start()
 
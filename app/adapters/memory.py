@@ -1,90 +1,947 @@
 """A memory database adapter."""
 
+import gc
+import os
+import re
+import json
+import math
+import time
+import zlib
+import heapq
+import bisect
+import shutil
+import struct
 import logging
+import itertools
+import threading
 
 from ..settings import identify
-from ..domain.model import Book
+from .codecs import ContentCodec, THRESHOLD
+from ..domain.model import Book, BookSummary, content_digest
+from ..domain.messages import EVENTS
 from ..domain.ports import BookRepository, BookView, UnitOfWork, \
-						   UnitOfWorkManager
+						   UnitOfWorkManager, Outbox, OutboxView
 
 
 LOGGER = logging.getLogger('sample')
 
+# Positions of the fields at the (isbn, name, author, content, digest) tuples
+# the books are stored as.
+ISBN, NAME, AUTHOR, CONTENT, DIGEST = range(5)
+
+# Matches on the name weigh more than on the author, and those more than on
+# the content.
+SEARCH_WEIGHTS = ((NAME, 10), (AUTHOR, 5), (CONTENT, 1))
+
+WORD = re.compile(r'\w+')
+
+# The event classes journaled along with the books, by name.
+EVENT_CLASSES = {e.__name__: e for e in EVENTS}
+
+
+def tokenize(text: str) -> list:
+	"""Splits a text into the lower case words used by the search index.
+
+	Params
+	------
+	text: str -- the text to be split
+	"""
+	return WORD.findall(text.lower())
+
+
+def weigh(book: tuple) -> dict:
+	"""Returns the weight of each word of a book at the search index.
+
+	Params
+	------
+	book: tuple -- the book's (isbn, name, author, content) with its content
+	decoded
+	"""
+	terms = {}
+	for field, weight in SEARCH_WEIGHTS:
+		for term in tokenize(book[field]):
+			terms[term] = terms.get(term, 0) + weight
+
+	return terms
+
+
+class MemoryStripe(object):
+	"""One of the stripes a MemoryStore is split into by ISBN. It holds its
+	books as tuples, a sorted index of their ISBNs, hash indexes of their
+	names and authors and an inverted index of their words for searching.
+
+	A published stripe is never changed again, so it can be read without
+	locks. Writes build a changed copy of it instead.
+
+	Methods: apply
+	"""
+	def __init__(self, books: dict = None, isbns: list = None,
+				 names: dict = None, authors: dict = None,
+				 postings: dict = None, terms: dict = None):
+		"""MemoryStripe's constructor.
+
+		Params
+		------
+		books: dict -- the stored book tuples by ISBN
+		isbns: list -- the sorted ISBNs of the books
+		names: dict -- the set of ISBNs of each name
+		authors: dict -- the set of ISBNs of each author
+		postings: dict -- the weight of each word on the books containing it
+		terms: dict -- the words of each book
+		"""
+		self.books = books if books is not None else {}
+		self.isbns = isbns if isbns is not None else []
+		self.names = names if names is not None else {}
+		self.authors = authors if authors is not None else {}
+		self.postings = postings if postings is not None else {}
+		self.terms = terms if terms is not None else {}
+
+	def apply(self, staged: list) -> 'MemoryStripe':
+		"""Returns a copy of the stripe with books saved to it, leaving the
+		stripe itself untouched. Only the containers that change are copied,
+		each of them once.
+
+		Params
+		------
+		staged: list -- the (book, stored content, digest) triples to be saved
+		"""
+		stripe = MemoryStripe(dict(self.books), self.isbns, dict(self.names),
+							  dict(self.authors), dict(self.postings),
+							  dict(self.terms))
+		owned = set()
+		new = []
+
+		def own(index: dict, kind: str, key, factory):
+			"""Returns a private copy of an index's entry to be changed."""
+			value = index.get(key)
+			if (kind, key) not in owned or value is None:
+				value = factory(value if value is not None else ())
+				index[key] = value
+				owned.add((kind, key))
+
+			return value
+
+		for book, content, digest in staged:
+			old = stripe.books.get(book.isbn)
+			if old is None:
+				new.append(book.isbn)
+
+			# Entries that stay the same are left alone, sparing their copy.
+			fields = book.astuple()
+			for field, index in ((NAME, stripe.names),
+								 (AUTHOR, stripe.authors)):
+				value = fields[field]
+				if old is not None and old[field] == value:
+					continue
+
+				if old is not None:
+					isbns = own(index, field, old[field], set)
+					isbns.discard(book.isbn)
+					if len(isbns) == 0:
+						del index[old[field]]
+
+				own(index, field, value, set).add(book.isbn)
+
+			terms = weigh(fields)
+
+			for term in stripe.terms.pop(book.isbn, ()):
+				if term not in terms:
+					postings = own(stripe.postings, 'term', term, dict)
+					del postings[book.isbn]
+					if len(postings) == 0:
+						del stripe.postings[term]
+
+			for term, frequency in terms.items():
+				if stripe.postings.get(term, {}).get(book.isbn) != frequency:
+					own(stripe.postings, 'term', term, dict)[book.isbn] = \
+						frequency
+
+			stripe.terms[book.isbn] = tuple(terms)
+			stripe.books[book.isbn] = (book.isbn, book.name, book.author,
+									   content, digest)
+
+		# Merging and sorting once is cheaper than inserting one by one.
+		if len(new) > 0:
+			stripe.isbns = sorted(self.isbns + new)
+
+		return stripe
+
+	@classmethod
+	def build(cls, books: list) -> 'MemoryStripe':
+		"""Builds a stripe out of book tuples at once, indexing them without
+		the copies and checks apply needs.
+
+		Params
+		------
+		books: list -- the (stored book tuple, decoded content) pairs, one
+		per ISBN
+		"""
+		stripe = cls({b[ISBN]: b for b, _ in books},
+					 sorted(b[ISBN] for b, _ in books))
+
+		for book, content in books:
+			isbn = book[ISBN]
+			stripe.names.setdefault(book[NAME], set()).add(isbn)
+			stripe.authors.setdefault(book[AUTHOR], set()).add(isbn)
+
+			terms = weigh((isbn, book[NAME], book[AUTHOR], content))
+			for term, frequency in terms.items():
+				stripe.postings.setdefault(term, {})[isbn] = frequency
+
+			stripe.terms[isbn] = tuple(terms)
+
+		return stripe
+
+
+class MemoryJournal(object):
+	"""Persists a memory store through an append-only log of its commits and
+	a periodic compact snapshot of all of its books, both binary.
+
+	Both files are made of frames, each with its payload's length and CRC32
+	followed by the payload: a commit's books and events or acknowledged
+	event ids at the log, a chunk of books or pending events at the snapshot.
+	A frame cut short by a crash is ignored and truncated away.
+
+	Taking a snapshot first rotates the log to '.old', then writes the
+	snapshot to a temporary file that replaces the previous one, and only
+	then removes the old log. Loading replays the snapshot, the old log if
+	a snapshot was interrupted and the log, in that order.
+
+	Methods: load, append, acknowledge, snapshot, close
+	"""
+	FRAME = struct.Struct('<II')
+	RECORD = struct.Struct('<IIIIB')
+	CHUNK = 4096
+
+	# The kinds of record: a book with a text or an encoded content, an
+	# event added to the outbox and the id of an acknowledged one.
+	TEXT, ENCODED, EVENT, ACK = range(4)
+
+	def __init__(self, path: str, sync: bool = False):
+		"""MemoryJournal's constructor.
+
+		Params
+		------
+		path: str -- the path of the files, suffixed by .snapshot and .log
+		sync: bool -- whether every commit is flushed to disk with fsync
+		"""
+		self.snapshot_path = path + '.snapshot'
+		self.log_path = path + '.log'
+		self.old_path = path + '.log.old'
+		self.sync = sync
+
+		self.log = None
+		self.replayed = 0
+		self.outbox = {}
+		self.last_id = 0
+		self.lock = threading.Lock()
+		self.snapshotting = threading.Lock()
+
+	def load(self):
+		"""Streams the persisted books, oldest first, as (isbn, name, author,
+		encoded content) tuples, then opens the log for appending. The same
+		ISBN may be streamed more than once, the last one being current.
+
+		Counts how many records are replayed from the logs at replayed, and
+		keeps the events still pending by id at outbox and the highest event
+		id ever journaled at last_id."""
+		self.replayed = 0
+		self.outbox = {}
+		self.last_id = 0
+		acknowledged = set()
+
+		for path in (self.snapshot_path, self.old_path, self.log_path):
+			end = yield from self.__replay(self.__read(path), acknowledged,
+										   path != self.snapshot_path)
+
+			# Drops a torn frame so new commits are not appended after it.
+			if path == self.log_path and end is not None:
+				os.truncate(path, end)
+
+		self.log = open(self.log_path, 'ab')
+
+	def append(self, staged: list, events: list = ()):
+		"""Appends a commit's books and events to the log as a single frame.
+
+		Params
+		------
+		staged: list -- the (book, stored content, digest) triples committed
+		events: list -- the (id, event) pairs added to the outbox
+		"""
+		frame = self.__frame(
+			[(b.isbn, b.name, b.author, c) for b, c, _ in staged], events)
+
+		self.__write(frame)
+
+	def acknowledge(self, ids: list):
+		"""Appends the ids of acknowledged events to the log as a single
+		frame.
+
+		Params
+		------
+		ids: list -- the ids of the events acknowledged
+		"""
+		self.__write(self.__frame([], [], ids))
+
+	def snapshot(self, store: 'MemoryStore'):
+		"""Writes every book and pending event of a store to a new snapshot
+		and discards the log written before it.
+
+		Params
+		------
+		store: MemoryStore -- the store to take the snapshot of
+		"""
+		with self.snapshotting:
+			# Every commit at the rotated log is at this root and outbox, as
+			# commits are published before being appended.
+			with self.lock:
+				root = store.snapshot()
+				with store.outboxing:
+					events = list(store.outbox.items())
+				self.log.close()
+
+				if os.path.exists(self.old_path):
+					with open(self.old_path, 'ab') as old, \
+						 open(self.log_path, 'rb') as log:
+						shutil.copyfileobj(log, old)
+					os.remove(self.log_path)
+				else:
+					os.replace(self.log_path, self.old_path)
+
+				self.log = open(self.log_path, 'ab')
+
+			books = (b[:DIGEST] for stripe in root \
+					 for b in stripe.books.values())
+			temporary = self.snapshot_path + '.tmp'
+
+			with open(temporary, 'wb') as snapshot:
+				while True:
+					chunk = list(itertools.islice(books, self.CHUNK))
+					if len(chunk) == 0:
+						break
+					snapshot.write(self.__frame(chunk))
+
+				for i in range(0, len(events), self.CHUNK):
+					snapshot.write(
+						self.__frame([], events[i:i + self.CHUNK]))
+
+				snapshot.flush()
+				os.fsync(snapshot.fileno())
+
+			os.replace(temporary, self.snapshot_path)
+			os.remove(self.old_path)
+
+	def close(self):
+		"""Closes the log."""
+		with self.lock:
+			if self.log is not None:
+				self.log.close()
+				self.log = None
+
+	def __write(self, frame: bytes):
+		"""Appends a frame to the log, flushing it to disk if synchronous.
+
+		Params
+		------
+		frame: bytes -- the frame to be appended
+		"""
+		with self.lock:
+			self.log.write(frame)
+			self.log.flush()
+			if self.sync:
+				os.fsync(self.log.fileno())
+
+	def __replay(self, records, acknowledged: set, logged: bool):
+		"""Streams the books of records, applying their events and
+		acknowledgements to the outbox, returning what their stream returns.
+
+		An event is acknowledged once its commit is published, which may be
+		before the commit is logged, so an acknowledgement found before its
+		event drops the event as it comes.
+
+		Params
+		------
+		records -- a stream of (kind, fields) records
+		acknowledged: set -- the ids of the events acknowledged so far
+		logged: bool -- whether the records are counted at replayed
+		"""
+		while True:
+			try:
+				kind, fields = next(records)
+			except StopIteration as stop:
+				return stop.value
+
+			if logged:
+				self.replayed += 1
+
+			if kind == self.EVENT:
+				self.last_id = max(self.last_id, fields[0])
+				if fields[0] not in acknowledged:
+					self.outbox[fields[0]] = fields[1]
+			elif kind == self.ACK:
+				self.last_id = max(self.last_id, fields[0])
+				acknowledged.add(fields[0])
+				self.outbox.pop(fields[0], None)
+			else:
+				yield fields
+
+	def __frame(self, books: list, events: list = (),
+				ids: list = ()) -> bytes:
+		"""Packs books, events and acknowledged event ids into a frame.
+
+		Params
+		------
+		books: list -- the (isbn, name, author, encoded content) tuples
+		events: list -- the (id, event) pairs added to the outbox
+		ids: list -- the ids of the events acknowledged
+		"""
+		records = []
+		for isbn, name, author, content in books:
+			raw = isinstance(content, str)
+			records.append(((isbn.encode('utf8'), name.encode('utf8'),
+							 author.encode('utf8'),
+							 content.encode('utf8') if raw else content),
+							self.TEXT if raw else self.ENCODED))
+
+		for i, event in events:
+			records.append(((str(i).encode('utf8'),
+							 type(event).__name__.encode('utf8'),
+							 json.dumps(list(event)).encode('utf8'), b''),
+							self.EVENT))
+
+		for i in ids:
+			records.append(((str(i).encode('utf8'), b'', b'', b''),
+							self.ACK))
+
+		parts = []
+		for fields, kind in records:
+			parts.append(self.RECORD.pack(*(len(f) for f in fields), kind))
+			parts.extend(fields)
+
+		payload = b''.join(parts)
+
+		return self.FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+	def __read(self, path: str):
+		"""Streams the books of a file frame by frame, returning the offset
+		where its last whole frame ends or None if there is no such file.
+
+		Params
+		------
+		path: str -- the path of the file to be read
+		"""
+		if not os.path.exists(path):
+			return None
+
+		end = 0
+		with open(path, 'rb') as stream:
+			while True:
+				header = stream.read(self.FRAME.size)
+				if len(header) < self.FRAME.size:
+					break
+
+				length, crc = self.FRAME.unpack(header)
+				payload = stream.read(length)
+				if len(payload) < length or zlib.crc32(payload) != crc:
+					LOGGER.warning('Ignoring a torn frame at {0}'.format(path))
+					break
+
+				end += self.FRAME.size + length
+				yield from self.__unpack(payload)
+
+		return end
+
+	def __unpack(self, payload: bytes):
+		"""Streams the records packed into a frame's payload as (kind,
+		fields) pairs: the (isbn, name, author, encoded content) of a book,
+		the (id, event) of an event or the (id,) of an acknowledgement.
+
+		Params
+		------
+		payload: bytes -- the frame's payload
+		"""
+		view = memoryview(payload)
+		offset = 0
+
+		while offset < len(payload):
+			*lengths, kind = self.RECORD.unpack_from(view, offset)
+			offset += self.RECORD.size
+
+			fields = []
+			for length in lengths:
+				fields.append(view[offset:offset + length].tobytes())
+				offset += length
+
+			if kind == self.EVENT:
+				# Arrays are read back as lists, while events hold tuples.
+				yield kind, (int(fields[0]), EVENT_CLASSES[
+					fields[1].decode('utf8')](*[
+						tuple(f) if isinstance(f, list) else f \
+						for f in json.loads(fields[2])]))
+				continue
+			elif kind == self.ACK:
+				yield kind, (int(fields[0]),)
+				continue
+
+			isbn, name, author, content = fields
+			if kind == self.TEXT:
+				content = content.decode('utf8')
+
+			yield kind, (isbn.decode('utf8'), name.decode('utf8'),
+						 author.decode('utf8'), content)
+
+
+class MemoryStore(object):
+	"""A transactional memory store split into stripes by ISBN.
+
+	Readers take the current root, an immutable tuple of stripes, and never
+	lock. Commits lock only the stripes they write to, build changed copies
+	of them and publish a new root at once, so readers see either all or none
+	of a commit and commits on different stripes do not wait for each other.
+
+	Equal contents are stored once: the store keeps each content by digest
+	along with the number of books referencing it, and books saved with a
+	content already stored reference that one instead of their own.
+
+	Events committed along with books are kept at the store's outbox, by
+	id and in commit order, until acknowledged. They are journaled along
+	with the books, as are their acknowledgements.
+
+	Methods: snapshot, commit, load
+	"""
+	def __init__(self, stripes: int = 16, journal: MemoryJournal = None):
+		"""MemoryStore's constructor.
+
+		Params
+		------
+		stripes: int -- the number of stripes
+		journal: MemoryJournal -- an optional journal to log commits to
+		"""
+		self.root = tuple(MemoryStripe() for _ in range(stripes))
+		self.locks = tuple(threading.Lock() for _ in range(stripes))
+		self.publish = threading.Lock()
+		self.journal = journal
+
+		self.blobs = {}
+		self.interning = threading.Lock()
+
+		self.outbox = {}
+		self.outbox_ids = itertools.count(1)
+		self.outboxing = threading.Lock()
+
+	def snapshot(self) -> tuple:
+		"""Returns the stripes as of the last commit."""
+		return self.root
+
+	def commit(self, staged: list, events: list = ()):
+		"""Saves books to their stripes atomically, along with the events to
+		be relayed.
+
+		Params
+		------
+		staged: list -- the (book, encoded content, digest) triples to be
+		saved
+		events: list -- the events added to the unit of work's outbox
+		"""
+		# Only the last of the books staged with the same ISBN is kept.
+		by_stripe = {}
+		for item in {item[0].isbn: item for item in staged}.values():
+			by_stripe.setdefault(self.stripe_of(item[0].isbn), []).append(item)
+
+		# Stripes are always locked in the same order to avoid deadlocks.
+		indexes = sorted(by_stripe)
+		for i in indexes:
+			self.locks[i].acquire()
+
+		try:
+			# No other commit may replace these stripes while they are locked.
+			replaced = [self.root[i].books.get(item[0].isbn) \
+						for i in indexes for item in by_stripe[i]]
+
+			with self.interning:
+				for i in indexes:
+					by_stripe[i] = [(b, self.__intern(c, d), d) \
+									for b, c, d in by_stripe[i]]
+
+			try:
+				stripes = {i: self.root[i].apply(by_stripe[i]) \
+						   for i in indexes}
+
+				with self.publish:
+					root = list(self.root)
+					for i, stripe in stripes.items():
+						root[i] = stripe
+					self.root = tuple(root)
+			except:
+				self.__release([item[2] for i in indexes \
+								for item in by_stripe[i]])
+				raise
+
+			self.__release([b[DIGEST] for b in replaced if b is not None])
+
+			added = []
+			if events:
+				with self.outboxing:
+					for event in events:
+						added.append((next(self.outbox_ids), event))
+						self.outbox[added[-1][0]] = event
+
+			# Logged while the stripes are still locked, so commits to the
+			# same books are logged in the order they were published.
+			if self.journal is not None:
+				self.journal.append(staged, added)
+		finally:
+			for i in reversed(indexes):
+				self.locks[i].release()
+
+	def load(self, books, decode):
+		"""Replaces every stripe with ones built out of book tuples, for
+		filling the store as it is set up.
+
+		Params
+		------
+		books -- the (isbn, name, author, encoded content) tuples, one per
+		ISBN
+		decode -- a function decoding the books' encoded content
+		"""
+		by_stripe = [[] for _ in self.locks]
+		for book in books:
+			by_stripe[self.stripe_of(book[ISBN])].append(book)
+
+		# Stripes are built one at a time, so only the contents of one of
+		# them are held decoded at once.
+		stripes = []
+		with self.interning:
+			self.blobs = {}
+			for books in by_stripe:
+				built = []
+				for isbn, name, author, encoded in books:
+					content = decode(encoded)
+					digest = content_digest(content)
+					built.append(((isbn, name, author,
+								   self.__intern(encoded, digest), digest),
+								  content))
+
+				stripes.append(MemoryStripe.build(built))
+
+		with self.publish:
+			self.root = tuple(stripes)
+
+	def stripe_of(self, isbn: str) -> int:
+		"""Returns the index of the stripe holding a book.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book
+		"""
+		return hash(isbn) % len(self.locks)
+
+	def __intern(self, content, digest: str):
+		"""Returns the stored content equal to a content, storing it if there
+		is none, and counts a reference to it. The interning lock must be
+		held.
+
+		Params
+		------
+		content -- the encoded content
+		digest: str -- the digest of the content
+		"""
+		blob = self.blobs.get(digest)
+		if blob is None:
+			blob = self.blobs[digest] = [content, 0]
+
+		blob[1] += 1
+		return blob[0]
+
+	def __release(self, digests: list):
+		"""Drops a reference to stored contents, forgetting those no longer
+		referenced. Snapshots still holding them keep them alive.
+
+		Params
+		------
+		digests: list -- the digests of the contents
+		"""
+		with self.interning:
+			for digest in digests:
+				blob = self.blobs[digest]
+				blob[1] -= 1
+				if blob[1] == 0:
+					del self.blobs[digest]
+
 
 class MemoryBookRepository(BookRepository):
 	"""An implementation of a BookRepository utilizing memory storage as a
-	database for the application.
+	database for the application. Books are staged at their unit of work until
+	it is committed.
 
-	Methods: save
+	Methods: save, save_many
 	"""
-	def __init__(self):
-		"""MemoryBookRepository's constructor."""
-		global book_storage 
-		self.book_storage = book_storage
+	def __init__(self, staged: list, codec: ContentCodec):
+		"""MemoryBookRepository's constructor.
+
+		Params
+		------
+		staged: list -- the unit of work's (book, encoded content, digest)
+		triples
+		codec: ContentCodec -- the codec used to store the books' content
+		"""
+		self.staged = staged
+		self.codec = codec
 
 	def save(self, book: Book):
 		"""View @app.domain.ports.BookRepository."""
 		LOGGER.debug('Saving book: {0} ...'.format(book.__repr__()))
-		self.book_storage[book.isbn] = {'name': book.name,
-										'author': book.author,
-										'content': book.content}
+		self.staged.append((book, self.codec.encode(book.content),
+							book.digest()))
+
+	def save_many(self, books: list):
+		"""View @app.domain.ports.BookRepository."""
+		LOGGER.debug('Saving {0} books ...'.format(len(books)))
+		self.staged.extend((b, self.codec.encode(b.content), b.digest()) \
+						   for b in books)
+
+
+class MemoryOutbox(Outbox):
+	"""An implementation of an Outbox staging events at its unit of work
+	until it is committed.
+
+	Methods: add
+	"""
+	def __init__(self, events: list):
+		"""MemoryOutbox's constructor.
+
+		Params
+		------
+		events: list -- the unit of work's staged events
+		"""
+		self.events = events
+
+	def add(self, event):
+		"""View @app.domain.ports.Outbox."""
+		self.events.append(event)
+
+
+class MemoryOutboxView(OutboxView):
+	"""An implementation of an OutboxView over the outbox of a MemoryStore.
+
+	Methods: pending, acknowledge
+	"""
+	def __init__(self, store: MemoryStore):
+		"""MemoryOutboxView's constructor.
+
+		Params
+		------
+		store: MemoryStore -- the store whose outbox is read
+		"""
+		self.store = store
+
+	def pending(self, limit: int = 100) -> list:
+		"""View @app.domain.ports.OutboxView."""
+		with self.store.outboxing:
+			return list(itertools.islice(self.store.outbox.items(), limit))
+
+	def acknowledge(self, ids: list):
+		"""View @app.domain.ports.OutboxView."""
+		with self.store.outboxing:
+			for i in ids:
+				self.store.outbox.pop(i, None)
+
+		journal = self.store.journal
+		if journal is not None:
+			journal.acknowledge(ids)
 
 
 class MemoryBookView(BookView):
-	"""An implementation of a BookView reading from a memory storage.
+	"""An implementation of a BookView reading from a memory storage. Every
+	query reads from a single snapshot of the store.
 
-	Methods: get_all, get_by_isbn, get_by_name, get_by_author
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search
 	"""
-	def __init__(self):
-		"""MemoryBookView's constructor."""
-		global book_storage 
-		self.book_storage = book_storage
+	def __init__(self, store: MemoryStore, codec: ContentCodec):
+		"""MemoryBookView's constructor.
+
+		Params
+		------
+		store: MemoryStore -- the store to read snapshots from
+		codec: ContentCodec -- the codec used to read the books' content
+		"""
+		self.store = store
+		self.codec = codec
 
-	def get_all(self) -> list:
+	def get_all(self, after: str = None, limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		return [Book(key, value['name'], value['author'], value['content']) \
-				for key, value in self.book_storage.items()]
+		return self.__page(None, None, after, limit, self.__book)
 
 	def get_by_isbn(self, isbn: str) -> Book:
 		"""View @app.domain.ports.BookView."""
-		book = self.book_storage.get(isbn)
+		book = self.__stripe(isbn).books.get(isbn)
 
-		if book is not None:
-			return Book(isbn, book['name'], book['author'], book['content'])
-		else:
-			return None
+		return self.__book(book) if book is not None else None
 
-	def get_by_name(self, name: str) -> list:
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		books = []
-		for key, value in self.book_storage.items():
-			if value['name'] == name:
-				books.append(
-					Book(key, value['name'], value['author'], value['content'])
-				)
+		return self.__page('names', name, after, limit, self.__book)
 
-		return books
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__page('authors', author, after, limit, self.__book)
 
-	def get_by_author(self, author: str) -> list:
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		books = []
-		for key, value in self.book_storage.items():
-			if value['author'] == author:
-				books.append(
-					Book(key, value['name'], value['author'], value['content'])
-				)
+		return self.__page(None, None, after, limit, self.__summary)
 
-		return books
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__page('names', name, after, limit, self.__summary)
+
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__page('authors', author, after, limit, self.__summary)
+
+	def get_content(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		book = self.__stripe(isbn).books.get(isbn)
+
+		return self.codec.decode(book[CONTENT]) if book is not None \
+			   else None
+
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		book = self.__stripe(isbn).books.get(isbn)
+
+		return book[DIGEST] if book is not None else None
+
+	def search(self, query: str, limit: int = 10) -> list:
+		"""View @app.domain.ports.BookView."""
+		snapshot = self.store.snapshot()
+
+		terms = set(tokenize(query))
+		frequencies = {t: sum(len(s.postings.get(t, ())) for s in snapshot) \
+					   for t in terms}
+		if len(terms) == 0 or 0 in frequencies.values():
+			return []
+
+		# Ranks matches by their weighted term frequency times the terms'
+		# inverse document frequency.
+		total = sum(len(s.books) for s in snapshot)
+		idfs = {t: math.log(1 + total / f) for t, f in frequencies.items()}
+
+		scores = {}
+		for stripe in snapshot:
+			postings = [(stripe.postings.get(t), idfs[t]) for t in terms]
+			if any(p is None for p, _ in postings):
+				continue
+
+			# Intersects starting from the rarest term to keep the sets small.
+			postings.sort(key=lambda p: len(p[0]))
+			matches = set(postings[0][0]).intersection(
+				*(p for p, _ in postings[1:]))
+
+			for isbn in matches:
+				scores[isbn] = (sum(p[isbn] * idf for p, idf in postings),
+								stripe.books[isbn])
+
+		ranked = heapq.nsmallest(limit, scores,
+								 key=lambda i: (-scores[i][0], i))
+
+		return [self.__summary(scores[i][1]) for i in ranked]
+
+	def __stripe(self, isbn: str) -> MemoryStripe:
+		"""Returns the current stripe holding a book.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book
+		"""
+		return self.store.snapshot()[self.store.stripe_of(isbn)]
+
+	def __page(self, index: str, value: str, after: str, limit: int,
+			   rebuild) -> list:
+		"""Fetches a page of books ordered by ISBN. Without a filter the
+		sorted ISBN indexes of the stripes are merged from the cursor on,
+		otherwise only the ISBNs of the matching books are read from the
+		stripes' name or author indexes.
+
+		Params
+		------
+		index: str -- the optional index to filter books by, names or authors
+		value: str -- the value to be looked up at the index
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
+		rebuild -- the function rebuilding a Book or BookSummary from a
+		stored tuple
+		"""
+		snapshot = self.store.snapshot()
+
+		if index is None:
+			def walk(isbns):
+				start = 0
+				if after is not None:
+					start = bisect.bisect_right(isbns, after)
+
+				return (isbns[i] for i in range(start, len(isbns)))
+
+			merged = heapq.merge(*(walk(s.isbns) for s in snapshot))
+			isbns = list(itertools.islice(merged, limit))
+		else:
+			isbns = []
+			for stripe in snapshot:
+				isbns.extend(getattr(stripe, index).get(value, ()))
+
+			if after is not None:
+				isbns = [i for i in isbns if i > after]
+
+			isbns = sorted(isbns) if limit is None \
+					else heapq.nsmallest(limit, isbns)
+
+		return [rebuild(snapshot[self.store.stripe_of(i)].books[i]) \
+				for i in isbns]
+
+	def __book(self, book: tuple) -> Book:
+		"""Rebuilds a Book from its stored tuple.
+
+		Params
+		------
+		book: tuple -- the stored (isbn, name, author, content) tuple
+		"""
+		return Book(book[ISBN], book[NAME], book[AUTHOR],
+					self.codec.decode(book[CONTENT]))
+
+	def __summary(self, book: tuple) -> BookSummary:
+		"""Rebuilds a BookSummary from a book's stored tuple.
+
+		Params
+		------
+		book: tuple -- the stored (isbn, name, author, content) tuple
+		"""
+		return BookSummary(book[ISBN], book[NAME], book[AUTHOR])
 
 
 class MemoryUnitOfWork(UnitOfWork):
-	"""An implementation of a UnitOfWork for a memory storage database.
+	"""An implementation of a UnitOfWork for a memory storage database. Books
+	saved through it and events added to its outbox are only written to the
+	store once it is committed.
 
-	Methods: __enter__, __exit__, commit, rollback, books
+	Methods: __enter__, __exit__, commit, rollback, books, outbox
 	"""
-	def __init__(self):
-		"""MemoryUnitOfWork's constructor."""
-		pass
+	def __init__(self, store: MemoryStore, codec: ContentCodec):
+		"""MemoryUnitOfWork's constructor.
+
+		Params
+		------
+		store: MemoryStore -- the store to commit to
+		codec: ContentCodec -- the codec used to store the books' content
+		"""
+		self.store = store
+		self.codec = codec
+		self.staged = []
+		self.events = []
 
 	def __enter__(self):
 		"""View @app.domain.ports.UnitOfWork."""
@@ -92,20 +949,30 @@ class MemoryUnitOfWork(UnitOfWork):
 
 	def __exit__(self, type, value, traceback):
 		"""View @app.domain.ports.UnitOfWork."""
-		pass
+		self.staged.clear()
+		self.events.clear()
 
 	def commit(self):
 		"""View @app.domain.ports.UnitOfWork."""
-		pass
+		staged, self.staged = self.staged, []
+		events, self.events = self.events, []
+		if len(staged) > 0 or len(events) > 0:
+			self.store.commit(staged, events)
 
 	def rollback(self):
 		"""View @app.domain.ports.UnitOfWork."""
-		pass
+		self.staged.clear()
+		self.events.clear()
 
 	@property
 	def books(self) -> MemoryBookRepository:
 		"""View @app.domain.ports.UnitOfWork."""
-		return MemoryBookRepository()
+		return MemoryBookRepository(self.staged, self.codec)
+
+	@property
+	def outbox(self) -> MemoryOutbox:
+		"""View @app.domain.ports.UnitOfWork."""
+		return MemoryOutbox(self.events)
 
 
 class MemoryUnitOfWorkManager(UnitOfWorkManager):
@@ -113,13 +980,20 @@ class MemoryUnitOfWorkManager(UnitOfWorkManager):
 
 	Methods: start
 	"""
-	def __init__(self):
-		"""MemoryUnitOfWorkManager's constructor."""
-		pass
+	def __init__(self, store: MemoryStore, codec: ContentCodec):
+		"""MemoryUnitOfWorkManager's constructor.
+
+		Params
+		------
+		store: MemoryStore -- the store shared by the units of work
+		codec: ContentCodec -- the codec used to store the books' content
+		"""
+		self.store = store
+		self.codec = codec
 
 	def start(self) -> MemoryUnitOfWork:
 		"""View @app.domain.ports.UnitOfWorkManager."""
-		return MemoryUnitOfWork()
+		return MemoryUnitOfWork(self.store, self.codec)
 
 
 @identify('memory', 'database')
@@ -127,25 +1001,100 @@ class MemoryDatabase(object):
 	"""This adapter gives access to each of the memory database classes that
 	are to be used by the app for data mutation an querying.
 
-	Methods: set_up, get_uowm, get_view
+	When given a path its books and pending events survive restarts through
+	a MemoryJournal, snapshotted periodically and when torn down.
+
+	Methods: set_up, tear_down, get_uowm, get_view, get_outbox
 	"""
 	def __init__(self, cfg: dict):
 		"""MemoryDatabase's constructor.
 
 		cfg: dict -- The memory database adapter's configuration
 		"""
-		pass
+		self.stripes = cfg.get('stripes', 16)
+		self.codec = ContentCodec(cfg.get('codec'),
+								  cfg.get('codec_threshold', THRESHOLD))
+		self.path = cfg.get('path')
+		self.sync = cfg.get('sync', False)
+		self.snapshot_interval = cfg.get('snapshot_interval', 300.0)
+
+		self.store = None
+		self.journal = None
+		self.stopped = threading.Event()
+		self.snapshots = None
 
 	def set_up(self):
-		"""Configures the memory database by creating a shared dictionary to
-		hold the data."""
-		global book_storage
-		book_storage = {}
+		"""Configures the memory database by creating a store shared by its
+		units of work and views, loading it from its journal if any."""
+		self.store = MemoryStore(self.stripes)
+		if self.path is None:
+			return
+
+		start = time.perf_counter()
+		self.journal = MemoryJournal(self.path, self.sync)
+
+		# Later records of an ISBN replace earlier ones, so each stripe is
+		# built once out of the current books. The collector is paused as it
+		# would otherwise keep scanning the growing heap.
+		gc.disable()
+		try:
+			books = {r[ISBN]: r for r in self.journal.load()}
+			self.store.load(books.values(), self.codec.decode)
+		finally:
+			gc.enable()
+
+		# Ids go on from the last one journaled, so acknowledgements still
+		# at the log never match new events.
+		self.store.outbox = dict(sorted(self.journal.outbox.items()))
+		self.store.outbox_ids = itertools.count(self.journal.last_id + 1)
+
+		LOGGER.info('Loaded {0} books and {1} pending events from {2} in'
+					' {3:.1f}s'.format(len(books), len(self.store.outbox),
+									   self.path,
+									   time.perf_counter() - start))
+
+		# Compacts whatever was logged since the last snapshot.
+		self.store.journal = self.journal
+		if self.journal.replayed > 0:
+			self.journal.snapshot(self.store)
+
+		if self.snapshot_interval > 0:
+			self.stopped.clear()
+			self.snapshots = threading.Thread(target=self.__snapshot,
+											  daemon=True)
+			self.snapshots.start()
+
+	def tear_down(self):
+		"""Takes a last snapshot of a journaled memory database and closes its
+		journal."""
+		if self.journal is None:
+			return
+
+		self.stopped.set()
+		if self.snapshots is not None:
+			self.snapshots.join()
+
+		self.journal.snapshot(self.store)
+		self.journal.close()
+		self.store.journal = None
+		self.journal = None
+
+	def __snapshot(self):
+		"""Takes a snapshot every interval until stopped."""
+		while not self.stopped.wait(self.snapshot_interval):
+			try:
+				self.journal.snapshot(self.store)
+			except Exception as err:
+				LOGGER.error('Could not take a snapshot: {0}'.format(err))
 
 	def get_uowm(self) -> MemoryUnitOfWorkManager:
 		"""Returns an instance of a MemoryUnitOfWorkManager."""
-		return MemoryUnitOfWorkManager()
+		return MemoryUnitOfWorkManager(self.store, self.codec)
 
 	def get_view(self) -> MemoryBookView:
 		"""Returns an instance of a MemoryBookView."""
-		return MemoryBookView()
+		return MemoryBookView(self.store, self.codec)
+
+	def get_outbox(self) -> MemoryOutboxView:
+		"""Returns an instance of a MemoryOutboxView."""
+		return MemoryOutboxView(self.store)
@@ -2,13 +2,15 @@
 
 import json
 import logging
+import threading
 
 import paho.mqtt.client as mqtt
 import paho.mqtt.publish as publish
 
 from ..settings import identify
 from ..domain.ports import QueueSender
-from ..domain.messages import RegisterBookCommand
+from ..domain.errors import MessageBusBusyError
+from ..domain.messages import RegisterBookCommand, RegisterBooksCommand
 
 
 LOGGER = logging.getLogger('sample')
@@ -18,7 +20,7 @@ LOGGER = logging.getLogger('sample')
 class MqttInterface(object):
 	"""Listens to incoming MQTT packages and executes the associated commands.
 
-	Methods: set_message_bus, set_view, start, stop
+	Methods: set_message_bus, set_view, start, stop, publish_metrics
 	"""
 	def __init__(self, cfg: dict):
 		"""MqttInterface's constructor.
@@ -32,6 +34,14 @@ class MqttInterface(object):
 		self.port = cfg['port']
 		self.username = cfg['username']
 		self.password = cfg['password']
+		self.metrics_topic = cfg.get('metrics_topic', 'app/metrics')
+		self.metrics_interval = cfg.get('metrics_interval', 0)
+
+		# Commands shed by a busy message bus.
+		self.rejected = 0
+
+		self.stopping = threading.Event()
+		self.publisher = None
 
 		self.client = mqtt.Client()
 		self.client.username_pw_set(self.username, password=self.password)
@@ -65,12 +75,40 @@ class MqttInterface(object):
 		self.client.connect(self.host, self.port)
 		self.client.loop_start()
 
+		# Publishes the bus' metrics periodically when it measures itself.
+		if getattr(self.bus, 'metrics', None) is not None \
+		   and self.metrics_interval > 0:
+			self.stopping.clear()
+			self.publisher = threading.Thread(target=self.__publish,
+											  daemon=True)
+			self.publisher.start()
+
 	def stop(self):
 		"""Method to stop the adapter."""
-		LOGGER.info('Stopping MQTT client')
+		LOGGER.info('Stopping MQTT client, {0} commands have been rejected'
+					' by a busy message bus'.format(self.rejected))
+		if self.publisher is not None:
+			self.stopping.set()
+			self.publisher.join()
+			self.publisher = None
 		self.client.loop_stop(force=False)
 		self.client.disconnect()
 
+	def publish_metrics(self):
+		"""Publishes a snapshot of the bus' metrics as JSON to the metrics
+		topic."""
+		self.client.publish(self.metrics_topic,
+							json.dumps(self.bus.metrics.snapshot()))
+
+	def __publish(self):
+		"""The publisher's loop, publishing the metrics at every interval."""
+		while not self.stopping.wait(self.metrics_interval):
+			try:
+				self.publish_metrics()
+			except Exception as err:
+				LOGGER.warning('Could not publish the metrics: {0}' \
+							   .format(err))
+
 	def __on_connect(self):
 		"""Creates MQTT callback for estabilished connections."""
 		def on_connect(client, userdata, flags, rc):
@@ -114,7 +152,18 @@ class MqttInterface(object):
 				LOGGER.info('Message arrived | topic: {0} | payload: {1}' \
 							.format(topic, payload))
 
-				if 'register' in topic:
+				if 'register/batch' in topic:
+					cmd = RegisterBooksCommand([
+						RegisterBookCommand(b['isbn'], b['name'], b['author'],
+											b['content'])
+						for b in payload
+					])
+
+					self.bus.handle(cmd)
+					LOGGER.info('{0} new books have been registered' \
+								.format(len(cmd.books)))
+
+				elif 'register' in topic:
 					cmd = RegisterBookCommand(payload['isbn'],
 											  payload['name'],
 											  payload['author'],
@@ -124,25 +173,44 @@ class MqttInterface(object):
 					LOGGER.info('A new book has been registered')
 
 				elif 'read' in topic:
-					book = self.view.get_by_isbn(payload['isbn'])
-					LOGGER.info('Reading book: {0}'.format(book.content))
+					content = self.view.get_content(payload['isbn'])
+					LOGGER.info('Reading book: {0}'.format(content))
 
 				elif 'view/isbn' in topic:
 					book = self.view.get_by_isbn(payload['isbn'])
 					LOGGER.info('Found book: {0}'.format(book))
 
 				elif 'view/name' in topic:
-					books = self.view.get_by_name(payload['name'])
+					books = self.view.get_by_name(
+						payload['name'], payload.get('after'),
+						payload.get('limit'), not payload.get('content')
+					)
+					LOGGER.info('Found books: {0}'.format(books))
+
+				elif 'view/search' in topic:
+					books = self.view.search(
+						payload['query'], payload.get('limit', 10))
 					LOGGER.info('Found books: {0}'.format(books))
 
 				elif 'view/author' in topic:
-					books = self.view.get_by_author(payload['author'])
+					books = self.view.get_by_author(
+						payload['author'], payload.get('after'),
+						payload.get('limit'), not payload.get('content')
+					)
 					LOGGER.info('Found books: {0}'.format(books))
 
 				elif 'view' in topic:
-					books = self.view.get_all()
+					books = self.view.get_all(
+						payload.get('after'), payload.get('limit'),
+						not payload.get('content')
+					)
 					LOGGER.info('Found books: {0}'.format(books))
 
+			except MessageBusBusyError as err:
+				self.rejected += 1
+				LOGGER.warning('Command rejected at {0}, {1} so far: {2}' \
+							   .format(msg.topic, self.rejected, err))
+
 			except Exception as err:
 				LOGGER.error(
 					'Error at application execution: {0}'.format(err))
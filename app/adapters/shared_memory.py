@@ -0,0 +1,749 @@
+"""A memory database adapter sharing its books between processes through a
+memory mapped file."""
+
+import os
+import mmap
+import math
+import time
+import heapq
+import fcntl
+import pickle
+import socket
+import struct
+import logging
+import threading
+from multiprocessing.connection import answer_challenge, deliver_challenge
+
+from ..settings import identify
+from .codecs import ContentCodec, THRESHOLD
+from ..domain.model import BookSummary, content_digest
+from .memory import ISBN, NAME, AUTHOR, CONTENT, MemoryStripe, MemoryStore, \
+					MemoryBookView, MemoryUnitOfWorkManager, \
+					MemoryOutboxView, tokenize, weigh
+
+
+LOGGER = logging.getLogger('sample')
+
+
+class SharedMemoryFile(object):
+	"""An append-only file of book records mapped into memory.
+
+	The file starts with a header holding a magic number and the offset at
+	which its records end. Records past that offset are not committed yet and
+	are ignored by readers. Each record is a header with the lengths of the
+	book's fields followed by their bytes, the content being stored encoded.
+
+	Methods: remap, end, records, read_content, append, close
+	"""
+	MAGIC = b'BOOKSHM1'
+	HEADER = struct.Struct('<8sQ')
+	RECORD = struct.Struct('<IIIIB')
+	GROWTH = 1 << 20
+
+	def __init__(self, path: str, writable: bool = False):
+		"""SharedMemoryFile's constructor. Only the owner of the file opens it
+		for writing, creating it if needed.
+
+		Params
+		------
+		path: str -- the path of the file, /dev/shm keeping it in memory
+		writable: bool -- whether the file is opened for writing
+		"""
+		self.path = path
+		self.writable = writable
+		flags = (os.O_RDWR | os.O_CREAT) if writable else os.O_RDONLY
+		self.fd = os.open(path, flags, 0o644)
+
+		if writable and os.fstat(self.fd).st_size < self.HEADER.size:
+			os.ftruncate(self.fd, self.GROWTH)
+			os.pwrite(self.fd, self.HEADER.pack(self.MAGIC,
+												self.HEADER.size), 0)
+
+		self.map = None
+		self.remap()
+
+		magic, _ = self.HEADER.unpack_from(self.map)
+		if magic != self.MAGIC:
+			os.close(self.fd)
+			raise ValueError('{0} is not a book file'.format(path))
+
+	def remap(self):
+		"""Maps the whole file into memory again after it has grown. The
+		previous map is left to be released once no longer used."""
+		self.map = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+
+	def end(self) -> int:
+		"""Returns the offset at which the committed records end."""
+		return self.HEADER.unpack_from(self.map)[1]
+
+	def records(self, start: int, end: int):
+		"""Streams the committed records between two offsets as (isbn, name,
+		author, offset) tuples, the offset locating the record's content.
+
+		Params
+		------
+		start: int -- the offset of the first record
+		end: int -- the offset at which the records end
+		"""
+		if end > len(self.map):
+			self.remap()
+
+		view = memoryview(self.map)
+		try:
+			offset = start
+			while offset < end:
+				lengths = self.RECORD.unpack_from(view, offset)
+				fields = []
+				position = offset + self.RECORD.size
+				for length in lengths[:3]:
+					fields.append(str(view[position:position + length],
+									  'utf8'))
+					position += length
+
+				yield fields[0], fields[1], fields[2], offset
+				offset = position + lengths[3]
+		finally:
+			view.release()
+
+	def read_content(self, offset: int):
+		"""Returns the encoded content of the record at an offset, as a plain
+		string or compressed bytes.
+
+		Params
+		------
+		offset: int -- the offset of the record
+		"""
+		current = self.map
+		*lengths, compressed = self.RECORD.unpack_from(current, offset)
+		start = offset + self.RECORD.size + sum(lengths[:3])
+		data = current[start:start + lengths[3]]
+
+		return data if compressed else data.decode('utf8')
+
+	def append(self, books: list, sync: bool = False) -> int:
+		"""Writes book records after the committed ones and then commits them
+		all at once by moving the end offset, returning it.
+
+		Params
+		------
+		books: list -- the (isbn, name, author, encoded content) tuples
+		sync: bool -- whether the records are flushed to disk with fsync
+		"""
+		chunks = []
+		for isbn, name, author, content in books:
+			compressed = isinstance(content, bytes)
+			fields = [isbn.encode('utf8'), name.encode('utf8'),
+					  author.encode('utf8'),
+					  content if compressed else content.encode('utf8')]
+			chunks.append(self.RECORD.pack(*map(len, fields), compressed))
+			chunks.extend(fields)
+
+		data = b''.join(chunks)
+		start = self.end()
+		end = start + len(data)
+
+		size = os.fstat(self.fd).st_size
+		if end > size:
+			while size < end:
+				size += max(size, self.GROWTH)
+			os.ftruncate(self.fd, size)
+			self.remap()
+
+		os.pwrite(self.fd, data, start)
+		if sync:
+			os.fsync(self.fd)
+
+		os.pwrite(self.fd, self.HEADER.pack(self.MAGIC, end), 0)
+		if sync:
+			os.fsync(self.fd)
+
+		return end
+
+	def close(self):
+		"""Closes the file, its map being released once no longer used."""
+		os.close(self.fd)
+
+
+class SharedMemoryCodec(object):
+	"""Reads the books' content out of a SharedMemoryFile by the offset of
+	their records, decoding it with the codec it has been stored with.
+
+	Methods: encode, decode
+	"""
+	def __init__(self, file: SharedMemoryFile, codec: ContentCodec):
+		"""SharedMemoryCodec's constructor.
+
+		Params
+		------
+		file: SharedMemoryFile -- the file holding the books
+		codec: ContentCodec -- the codec the content has been stored with
+		"""
+		self.file = file
+		self.codec = codec
+		self.name = codec.name
+
+	def encode(self, content: str):
+		"""Encodes a content to be stored.
+
+		Params
+		------
+		content: str -- the content to be encoded
+		"""
+		return self.codec.encode(content)
+
+	def decode(self, offset: int) -> str:
+		"""Returns the content of the book stored at an offset.
+
+		Params
+		------
+		offset: int -- the offset of the book's record
+		"""
+		return self.codec.decode(self.file.read_content(offset))
+
+
+class SharedMemoryStore(MemoryStore):
+	"""A MemoryStore indexing the books of a SharedMemoryFile. Its stripes
+	keep only the books' ISBNs, names, authors and the offsets of their
+	records, the content being read from the file when asked for, so every
+	process shares a single copy of it and none decodes it to index it.
+
+	Readers catch up with the file before taking a snapshot, and commits are
+	handed to a writer, either the file's owner or a client of it.
+
+	Methods: snapshot, commit, refresh
+	"""
+	def __init__(self, stripes: int, file: SharedMemoryFile):
+		"""SharedMemoryStore's constructor.
+
+		Params
+		------
+		stripes: int -- the number of stripes
+		file: SharedMemoryFile -- the file holding the books
+		"""
+		super().__init__(stripes)
+		self.file = file
+		self.writer = None
+		self.end = SharedMemoryFile.HEADER.size
+		self.refreshing = threading.Lock()
+
+	def snapshot(self) -> tuple:
+		"""View @app.adapters.memory.MemoryStore."""
+		self.refresh()
+		return self.root
+
+	def commit(self, staged: list, events: list = ()):
+		"""Saves books through the writer, waiting for them to be indexed.
+		Events are kept at this process' outbox once the books are written.
+
+		Params
+		------
+		staged: list -- the (book, encoded content, digest) triples to be
+		saved
+		events: list -- the events added to the unit of work's outbox
+		"""
+		if staged:
+			self.writer.write(
+				[(b.isbn, b.name, b.author, c) for b, c, _ in staged])
+			self.refresh()
+
+		if events:
+			super().commit([], events)
+
+	def refresh(self):
+		"""Indexes the books committed to the file since the last refresh."""
+		if self.file.end() <= self.end:
+			return
+
+		with self.refreshing:
+			end = self.file.end()
+			if end <= self.end:
+				return
+
+			# Only the last record of an ISBN is current.
+			by_stripe = {}
+			for record in {r[ISBN]: r for r in \
+						   self.file.records(self.end, end)}.values():
+				by_stripe.setdefault(self.stripe_of(record[ISBN]), []) \
+						 .append(record)
+
+			with self.publish:
+				root = list(self.root)
+				for i, records in by_stripe.items():
+					root[i] = self.__apply(root[i], records)
+				self.root = tuple(root)
+
+			self.end = end
+
+	def __apply(self, stripe: MemoryStripe, records: list) -> MemoryStripe:
+		"""Returns a copy of a stripe indexing records, leaving the stripe
+		itself untouched. Each entry of its indexes that changes is copied
+		once.
+
+		Params
+		------
+		stripe: MemoryStripe -- the stripe to be copied
+		records: list -- the (isbn, name, author, offset) records, one per
+		ISBN
+		"""
+		books = dict(stripe.books)
+		indexes = {NAME: dict(stripe.names), AUTHOR: dict(stripe.authors)}
+		owned = set()
+		new = []
+
+		for isbn, name, author, offset in records:
+			old = books.get(isbn)
+			if old is None:
+				new.append(isbn)
+
+			for field, value in ((NAME, name), (AUTHOR, author)):
+				index = indexes[field]
+				if old is not None:
+					isbns = index[old[field]] - {isbn}
+					if len(isbns) > 0:
+						index[old[field]] = isbns
+						owned.add((field, old[field]))
+					else:
+						del index[old[field]]
+						owned.discard((field, old[field]))
+
+				if (field, value) not in owned:
+					index[value] = set(index.get(value, ()))
+					owned.add((field, value))
+				index[value].add(isbn)
+
+			books[isbn] = (isbn, name, author, offset, None)
+
+		isbns = sorted(stripe.isbns + new) if len(new) > 0 else stripe.isbns
+
+		return MemoryStripe(books, isbns, indexes[NAME], indexes[AUTHOR])
+
+
+class SharedMemoryBookView(MemoryBookView):
+	"""A MemoryBookView reading the content of the books out of a
+	SharedMemoryFile. As no process keeps an inverted index of the content,
+	searches scan it at the file instead, and digests are computed from it.
+
+	Methods: get_digest, search
+	"""
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		book = self.store.snapshot()[self.store.stripe_of(isbn)] \
+				   .books.get(isbn)
+
+		return content_digest(self.codec.decode(book[CONTENT])) \
+			   if book is not None else None
+
+	def search(self, query: str, limit: int = 10) -> list:
+		"""View @app.domain.ports.BookView."""
+		terms = set(tokenize(query))
+		if len(terms) == 0:
+			return []
+
+		total = 0
+		frequencies = dict.fromkeys(terms, 0)
+		matches = []
+		for stripe in self.store.snapshot():
+			for book in stripe.books.values():
+				weights = weigh((book[ISBN], book[NAME], book[AUTHOR],
+								 self.codec.decode(book[CONTENT])))
+				found = terms.intersection(weights)
+				for term in found:
+					frequencies[term] += 1
+
+				if len(found) == len(terms):
+					matches.append((book, weights))
+				total += 1
+
+		if len(matches) == 0:
+			return []
+
+		# Ranks matches as MemoryBookView does, by their weighted term
+		# frequency times the terms' inverse document frequency.
+		idfs = {t: math.log(1 + total / f) for t, f in frequencies.items()}
+		ranked = heapq.nsmallest(
+			limit, matches,
+			key=lambda m: (-sum(m[1][t] * idfs[t] for t in terms),
+						   m[0][ISBN]))
+
+		return [BookSummary(b[ISBN], b[NAME], b[AUTHOR]) for b, _ in ranked]
+
+
+class SocketConnection(object):
+	"""Sends and receives pickled objects through a Unix socket, each one
+	prefixed by its length. Unlike multiprocessing's connections, which read
+	and write the socket's file descriptor, it goes through the socket
+	itself, so a socket monkey patched by gevent only blocks the calling
+	greenlet.
+
+	Methods: send, recv, send_bytes, recv_bytes, close
+	"""
+	LENGTH = struct.Struct('!I')
+
+	def __init__(self, sock: socket.socket):
+		"""SocketConnection's constructor.
+
+		Params
+		------
+		sock: socket.socket -- the connected socket
+		"""
+		self.socket = sock
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def send(self, obj):
+		"""Sends an object.
+
+		Params
+		------
+		obj -- the picklable object to be sent
+		"""
+		self.send_bytes(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+	def recv(self):
+		"""Receives an object, raising EOFError if the peer has closed."""
+		return pickle.loads(self.recv_bytes())
+
+	def send_bytes(self, data: bytes):
+		"""Sends a message of bytes.
+
+		Params
+		------
+		data: bytes -- the message
+		"""
+		self.socket.sendall(self.LENGTH.pack(len(data)) + data)
+
+	def recv_bytes(self, maxlength: int = None) -> bytes:
+		"""Receives a message of bytes.
+
+		Params
+		------
+		maxlength: int -- the longest message accepted, None for any
+		"""
+		length, = self.LENGTH.unpack(self.__read(self.LENGTH.size))
+		if maxlength is not None and length > maxlength:
+			raise OSError('Received a message of {0} bytes, longer than {1}' \
+						  .format(length, maxlength))
+
+		return self.__read(length)
+
+	def close(self):
+		"""Closes the socket."""
+		self.socket.close()
+
+	def __read(self, size: int) -> bytes:
+		"""Reads an exact number of bytes.
+
+		Params
+		------
+		size: int -- the number of bytes
+		"""
+		data = bytearray()
+		while len(data) < size:
+			chunk = self.socket.recv(size - len(data))
+			if not chunk:
+				raise EOFError('The connection has been closed')
+			data += chunk
+
+		return bytes(data)
+
+
+def connect(address: str, authkey: bytes = None) -> SocketConnection:
+	"""Connects to the Unix socket of a SharedMemoryOwner, authenticating
+	with its key if any.
+
+	Params
+	------
+	address: str -- the path of the owner's Unix socket
+	authkey: bytes -- an optional key to authenticate with
+	"""
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		sock.connect(address)
+	except OSError:
+		sock.close()
+		raise
+
+	connection = SocketConnection(sock)
+	if authkey is not None:
+		try:
+			answer_challenge(connection, authkey)
+			deliver_challenge(connection, authkey)
+		except Exception:
+			connection.close()
+			raise
+
+	return connection
+
+
+class SharedMemoryOwner(object):
+	"""Writes to a SharedMemoryFile on behalf of every process, appending
+	books from its own process directly and from the others as they are
+	received through a listener.
+
+	Methods: write, close
+	"""
+	def __init__(self, file: SharedMemoryFile, address: str,
+				 authkey: bytes = None, sync: bool = False):
+		"""SharedMemoryOwner's constructor.
+
+		Params
+		------
+		file: SharedMemoryFile -- the file opened for writing
+		address: str -- the path of the Unix socket to listen at
+		authkey: bytes -- an optional key clients must authenticate with
+		sync: bool -- whether every write is flushed to disk with fsync
+		"""
+		self.file = file
+		self.address = address
+		self.authkey = authkey
+		self.sync = sync
+		self.lock = threading.Lock()
+		self.stopped = threading.Event()
+
+		# The owner holds the file's lock, so a left over socket is stale.
+		if os.path.exists(address):
+			os.remove(address)
+
+		self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.listener.bind(address)
+		self.listener.listen()
+
+		self.thread = threading.Thread(target=self.__accept, daemon=True)
+		self.thread.start()
+
+	def write(self, books: list) -> int:
+		"""Appends books to the file, returning the offset they end at.
+
+		Params
+		------
+		books: list -- the (isbn, name, author, encoded content) tuples
+		"""
+		with self.lock:
+			return self.file.append(books, self.sync)
+
+	def close(self):
+		"""Stops listening, waking the listener up with a last connection."""
+		self.stopped.set()
+		try:
+			with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+				sock.connect(self.address)
+		except OSError:
+			pass
+
+		self.thread.join()
+		self.listener.close()
+		os.remove(self.address)
+
+	def __accept(self):
+		"""Accepts clients until closed, serving each at its own thread."""
+		while not self.stopped.is_set():
+			try:
+				sock, _ = self.listener.accept()
+			except Exception as error:
+				if not self.stopped.is_set():
+					LOGGER.warning('Could not accept a client: {0}' \
+								   .format(error))
+				continue
+
+			if self.stopped.is_set():
+				sock.close()
+				return
+
+			threading.Thread(target=self.__serve,
+							 args=(SocketConnection(sock),),
+							 daemon=True).start()
+
+	def __serve(self, connection):
+		"""Writes the books sent by a client until it disconnects, answering
+		with the offset they end at or the error raised.
+
+		Params
+		------
+		connection: SocketConnection -- the client's connection
+		"""
+		with connection:
+			if self.authkey is not None:
+				try:
+					deliver_challenge(connection, self.authkey)
+					answer_challenge(connection, self.authkey)
+				except Exception as error:
+					LOGGER.warning('Could not authenticate a client: {0}' \
+								   .format(error))
+					return
+
+			while True:
+				try:
+					books = connection.recv()
+				except (EOFError, OSError):
+					return
+
+				try:
+					outcome = (True, self.write(books))
+				except Exception as error:
+					outcome = (False, error)
+
+				try:
+					connection.send(outcome)
+				except OSError:
+					return
+
+
+class SharedMemoryClient(object):
+	"""Sends books to be written to the owner of a SharedMemoryFile, one
+	write at a time.
+
+	Methods: write, close
+	"""
+	def __init__(self, address: str, authkey: bytes = None,
+				 timeout: float = 5.0):
+		"""SharedMemoryClient's constructor, waiting for the owner to listen.
+
+		Params
+		------
+		address: str -- the path of the owner's Unix socket
+		authkey: bytes -- an optional key to authenticate with
+		timeout: float -- the seconds to wait for the owner
+		"""
+		self.address = address
+		self.authkey = authkey
+		self.lock = threading.Lock()
+
+		deadline = time.monotonic() + timeout
+		while True:
+			try:
+				self.connection = connect(address, authkey)
+				break
+			except OSError:
+				if time.monotonic() > deadline:
+					raise
+				time.sleep(0.05)
+
+	def write(self, books: list) -> int:
+		"""Sends books to the owner, returning the offset they end at.
+
+		Params
+		------
+		books: list -- the (isbn, name, author, encoded content) tuples
+		"""
+		with self.lock:
+			# A connection lost to an owner that went away is replaced once.
+			if self.connection is None:
+				self.connection = connect(self.address, self.authkey)
+
+			try:
+				self.connection.send(books)
+				ok, result = self.connection.recv()
+			except (EOFError, OSError):
+				self.connection.close()
+				self.connection = None
+				raise ConnectionError('Lost the connection to the owner')
+
+		if not ok:
+			raise result
+
+		return result
+
+	def close(self):
+		"""Closes the connection to the owner."""
+		if self.connection is not None:
+			self.connection.close()
+
+
+@identify('shared-memory', 'database')
+class SharedMemoryDatabase(object):
+	"""This adapter lets several processes on a host share the same books.
+
+	Books are kept at a memory mapped file, whose pages are shared by every
+	process mapping it, while each process indexes their offsets at its own
+	SharedMemoryStore. The first process to lock the file becomes its owner
+	and writes on behalf of the others, which send it their commits through a
+	Unix socket. Readers of other processes see a commit as soon as the owner
+	has written it.
+
+	If the owner stops the other processes can still read but not write,
+	until a process is started again to take its place.
+
+	Methods: set_up, tear_down, get_uowm, get_view, get_outbox
+	"""
+	def __init__(self, cfg: dict):
+		"""SharedMemoryDatabase's constructor.
+
+		cfg: dict -- The shared memory database adapter's configuration
+		"""
+		self.path = cfg['path']
+		self.stripes = cfg.get('stripes', 16)
+		self.codec = ContentCodec(cfg.get('codec'),
+								  cfg.get('codec_threshold', THRESHOLD))
+		self.sync = cfg.get('sync', False)
+		self.timeout = cfg.get('timeout', 5.0)
+		authkey = cfg.get('authkey')
+		self.authkey = authkey.encode('utf8') if authkey else None
+
+		self.lock = None
+		self.file = None
+		self.store = None
+		self.reader = None
+
+	@property
+	def owner(self) -> bool:
+		"""Whether this process owns the file."""
+		return isinstance(self.store.writer, SharedMemoryOwner)
+
+	def set_up(self):
+		"""Becomes the file's owner if no other process is, or connects to
+		it otherwise, and indexes the books already stored."""
+		self.lock = open(self.path + '.lock', 'w')
+		try:
+			fcntl.flock(self.lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			owner = True
+		except BlockingIOError:
+			owner = False
+
+		address = self.path + '.sock'
+		if owner:
+			self.file = SharedMemoryFile(self.path, writable=True)
+			writer = SharedMemoryOwner(self.file, address, self.authkey,
+									   self.sync)
+		else:
+			# The owner creates the file before listening.
+			try:
+				writer = SharedMemoryClient(address, self.authkey,
+											self.timeout)
+			except Exception:
+				self.lock.close()
+				raise
+
+			self.file = SharedMemoryFile(self.path)
+
+		self.store = SharedMemoryStore(self.stripes, self.file)
+		self.store.writer = writer
+		self.reader = SharedMemoryCodec(self.file, self.codec)
+
+		start = time.perf_counter()
+		self.store.refresh()
+		LOGGER.info('Indexed the books at {0} as its {1} in {2:.1f}s' \
+					.format(self.path, 'owner' if owner else 'client',
+							time.perf_counter() - start))
+
+	def tear_down(self):
+		"""Stops writing, closes the file and releases its lock."""
+		self.store.writer.close()
+		self.file.close()
+		self.lock.close()
+
+	def get_uowm(self) -> MemoryUnitOfWorkManager:
+		"""Returns an instance of a MemoryUnitOfWorkManager."""
+		return MemoryUnitOfWorkManager(self.store, self.codec)
+
+	def get_view(self) -> SharedMemoryBookView:
+		"""Returns an instance of a SharedMemoryBookView."""
+		return SharedMemoryBookView(self.store, self.reader)
+
+	def get_outbox(self) -> MemoryOutboxView:
+		"""Returns an instance of a MemoryOutboxView over this process'
+		outbox."""
+		return MemoryOutboxView(self.store)
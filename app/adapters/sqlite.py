@@ -1,111 +1,543 @@
 """A SQLite database adapter."""
 
+import re
+import json
+import time
 import logging
 import sqlite3
+import threading
+from os.path import abspath
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from greenlet import getcurrent
 
 from ..settings import identify
-from ..domain.model import Book
+from .codecs import ContentCodec, THRESHOLD
+from ..domain.messages import EVENTS
+from ..domain.model import Book, BookSummary, content_digest
 from ..domain.ports import BookRepository, BookView, UnitOfWork, \
-						   UnitOfWorkManager
+						   UnitOfWorkManager, Outbox, OutboxView
 
 
 LOGGER = logging.getLogger('sample')
 
+# The event classes stored at the outbox, by name.
+EVENT_CLASSES = {e.__name__: e for e in EVENTS}
+
+
+class ConnectionPoolTimeoutError(Exception):
+	"""To be raised when no connection of a SqliteConnectionPool becomes
+	available before the checkout timeout expires.
+
+	Extends: Exception
+	"""
+	pass
+
+
+class ConnectionPoolClosedError(Exception):
+	"""To be raised when a connection is requested from a SqliteConnectionPool
+	that has already been closed.
+
+	Extends: Exception
+	"""
+	pass
+
+
+class SqliteConnectionPool(object):
+	"""A bounded pool of long-lived SQLite connections shared by the threads
+	and greenlets of the application.
+
+	Connections are opened lazily, up to the pool's size, and are handed out
+	to one owner at a time. The owner is the current greenlet, which is also
+	unique per thread when gevent is not in use. An owner that already holds
+	a connection gets the same one back on nested checkouts so it never waits
+	on itself.
+
+	Methods: acquire, release, connection, close
+	"""
+	def __init__(self, location: str, size: int = 5, timeout: float = 5.0,
+				 read_only: bool = False, pragmas: dict = None):
+		"""SqliteConnectionPool's constructor.
+
+		Params
+		------
+		location: str -- the location of the SQLite database
+		size: int -- the maximum number of open connections
+		timeout: float -- seconds to wait for a free connection on checkout
+		read_only: bool -- whether connections are opened in read-only mode
+		pragmas: dict -- PRAGMA names and values set on every new connection
+		"""
+		self.location = location
+		self.size = size
+		self.timeout = timeout
+		self.read_only = read_only
+		self.pragmas = pragmas or {}
+
+		self.idle = []
+		self.owners = {}
+		self.opened = 0
+		self.closed = False
+		self.condition = threading.Condition()
+
+	def acquire(self) -> sqlite3.Connection:
+		"""Checks out a connection, waiting up to the pool's timeout for one
+		to be released if all of them are in use.
+
+		Returns
+		-------
+		conn: sqlite3.Connection -- a connection owned by the caller until it
+		is released
+		"""
+		owner = getcurrent()
+
+		with self.condition:
+			if self.closed:
+				raise ConnectionPoolClosedError(
+					'The connection pool of \'{0}\' is closed' \
+					.format(self.location))
+
+			# Nested checkouts reuse the connection the owner already holds.
+			if owner in self.owners:
+				conn, depth = self.owners[owner]
+				self.owners[owner] = (conn, depth + 1)
+				return conn
+
+			deadline = time.monotonic() + self.timeout
+			while len(self.idle) == 0 and self.opened >= self.size:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					raise ConnectionPoolTimeoutError(
+						'No connection to \'{0}\' available after {1}s' \
+						.format(self.location, self.timeout))
+
+				self.condition.wait(remaining)
+
+				if self.closed:
+					raise ConnectionPoolClosedError(
+						'The connection pool of \'{0}\' is closed' \
+						.format(self.location))
+
+			if len(self.idle) > 0:
+				conn = self.idle.pop()
+			else:
+				conn = self._connect()
+				self.opened += 1
+
+			self.owners[owner] = (conn, 1)
+			return conn
+
+	def release(self, conn: sqlite3.Connection):
+		"""Gives a connection back to the pool. Uncommitted changes are rolled
+		back before it can be checked out by another owner.
+
+		Params
+		------
+		conn: sqlite3.Connection -- the connection previously acquired
+		"""
+		owner = getcurrent()
+
+		with self.condition:
+			_, depth = self.owners[owner]
+			if depth > 1:
+				self.owners[owner] = (conn, depth - 1)
+				return
+
+			del self.owners[owner]
+
+			if conn.in_transaction:
+				conn.rollback()
+
+			if self.closed:
+				conn.close()
+				self.opened -= 1
+			else:
+				self.idle.append(conn)
+
+			self.condition.notify()
+
+	@contextmanager
+	def connection(self):
+		"""Context manager that acquires a connection and releases it on
+		exit."""
+		conn = self.acquire()
+		try:
+			yield conn
+		finally:
+			self.release(conn)
+
+	def close(self):
+		"""Closes every idle connection and makes the pool close the busy
+		ones as soon as they are released."""
+		with self.condition:
+			self.closed = True
+
+			for conn in self.idle:
+				conn.close()
+
+			self.opened -= len(self.idle)
+			self.idle = []
+			self.condition.notify_all()
+
+	def _connect(self) -> sqlite3.Connection:
+		"""Opens a new connection that may be used by any thread and applies
+		the pool's PRAGMAs to it."""
+		if self.read_only:
+			path = pathname2url(abspath(self.location))
+			uri = 'file:{0}?mode=ro'.format(path)
+			conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+		else:
+			conn = sqlite3.connect(self.location, check_same_thread=False)
+
+		for pragma, value in self.pragmas.items():
+			conn.execute('PRAGMA {0}={1};'.format(pragma, value))
+
+		return conn
+
 
 class SqliteBookRepository(BookRepository):
 	"""An implementation of a BookRepository utilizing SQLite as a database
 	for the application.
 
-	Methods: save
+	Content is stored once at the blobs table under its digest, each book
+	referencing it. Only contents that are not stored yet are encoded. Every
+	save is undone as a whole if it fails, so a unit of work committed after
+	a failed save does not keep blobs no book references.
+
+	Methods: save, save_many
 	"""
-	def __init__(self, cursor):
-		"""SqliteBookRepository's constructor."""
+	# Digests looked up per query, below SQLite's limit of parameters.
+	CHUNK = 500
+
+	def __init__(self, cursor, codec: ContentCodec):
+		"""SqliteBookRepository's constructor.
+
+		Params
+		------
+		cursor -- the cursor of the unit of work's connection
+		codec: ContentCodec -- the codec used to store the books' content
+		"""
 		self.cursor = cursor
+		self.codec = codec
 
 	def save(self, book: Book):
 		"""View @app.domain.ports.BookRepository."""
 		LOGGER.debug('Saving book: {0} ...'.format(book.__repr__()))
-		self.cursor.execute("""
-			INSERT INTO books (isbn, name, author, content)
-			VALUES (?, ?, ?, ?);
-		""", (book.isbn, book.name, book.author, book.content))
+		digest = book.digest()
+		with self.__savepoint():
+			self.__store({digest: book.content})
+			self.cursor.execute("""
+				INSERT INTO books (isbn, name, author, digest)
+				VALUES (?, ?, ?, ?);
+			""", (book.isbn, book.name, book.author, digest))
+			self.cursor.execute("""
+				INSERT INTO books_search (rowid, name, author, content)
+				VALUES (?, ?, ?, ?);
+			""", (self.cursor.lastrowid, book.name, book.author,
+				  book.content))
+
+	def save_many(self, books: list):
+		"""View @app.domain.ports.BookRepository."""
+		LOGGER.debug('Saving {0} books ...'.format(len(books)))
+		digests = [b.digest() for b in books]
+		with self.__savepoint():
+			self.__store({d: b.content for d, b in zip(digests, books)})
+			self.cursor.executemany("""
+				INSERT INTO books (isbn, name, author, digest)
+				VALUES (?, ?, ?, ?);
+			""", [(b.isbn, b.name, b.author, d) \
+				  for d, b in zip(digests, books)])
+			self.cursor.executemany("""
+				INSERT INTO books_search (rowid, name, author, content)
+				SELECT rowid, ?, ?, ? FROM books WHERE isbn=?;
+			""", [(b.name, b.author, b.content, b.isbn) for b in books])
+
+	@contextmanager
+	def __savepoint(self):
+		"""Context manager that rolls the statements run inside of it back
+		if any of them fails, keeping the rest of the unit of work. The
+		transaction is begun first, since releasing the savepoint that began
+		it would commit it, and as a writer, since a reader could not become
+		one once another connection has committed.
+		"""
+		if not self.cursor.connection.in_transaction:
+			self.cursor.execute('BEGIN IMMEDIATE;')
+
+		self.cursor.execute('SAVEPOINT save;')
+		try:
+			yield
+		except:
+			self.cursor.execute('ROLLBACK TO save;')
+			raise
+		finally:
+			self.cursor.execute('RELEASE save;')
+
+	def __store(self, contents: dict):
+		"""Stores the contents missing from the blobs table. References to
+		them are counted by triggers as books are written.
+
+		Params
+		------
+		contents: dict -- the contents to be stored by digest
+		"""
+		digests = list(contents)
+		stored = set()
+		for i in range(0, len(digests), self.CHUNK):
+			chunk = digests[i:i + self.CHUNK]
+			stored.update(row[0] for row in self.cursor.execute("""
+				SELECT digest FROM blobs WHERE digest IN ({0});
+			""".format(', '.join('?' * len(chunk))), chunk))
+
+		self.cursor.executemany("""
+			INSERT INTO blobs (digest, content) VALUES (?, ?);
+		""", [(d, self.codec.encode(c)) for d, c in contents.items() \
+			  if d not in stored])
 
 
 class SqliteBookView(BookView):
 	"""An implementation of a BookView reading from a SQLite storage.
 
-	Methods: get_all, get_by_isbn, get_by_name, get_by_author
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search, scored_search
 	"""
-	def __init__(self, location):
-		"""SqliteBookView's constructor."""
-		self.location = location
+	def __init__(self, pool: SqliteConnectionPool, codec: ContentCodec):
+		"""SqliteBookView's constructor.
 
-	def get_all(self) -> list:
+		Params
+		------
+		pool: SqliteConnectionPool -- the pool to borrow connections from
+		codec: ContentCodec -- the codec used to read the books' content
+		"""
+		self.pool = pool
+		self.codec = codec
+
+	def get_all(self, after: str = None, limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		conn = sqlite3.connect(self.location)
-		cursor = conn.cursor()
+		return self.__select(None, (), after, limit, False)
 
-		books = cursor.execute('SELECT * FROM books;').fetchall()
+	def get_by_isbn(self, isbn: str) -> Book:
+		"""View @app.domain.ports.BookView."""
+		with self.pool.connection() as conn:
+			book = conn.execute("""
+				SELECT isbn, name, author, content
+				FROM books JOIN blobs USING (digest) WHERE isbn=?;
+			""", (isbn,)).fetchone()
 
-		conn.close()
+		if book is None:
+			return None
 
-		return [Book(i[0], i[1], i[2], i[3]) for i in books]
+		return Book(book[0], book[1], book[2], self.codec.decode(book[3]))
 
-	def get_by_isbn(self, isbn: str) -> Book:
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		conn = sqlite3.connect(self.location)
-		cursor = conn.cursor()
+		return self.__select('name=?', (name,), after, limit, False)
 
-		book = cursor.execute(
-			'SELECT * FROM books WHERE isbn=\'{0}\';'.format(isbn)).fetchone()
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__select('author=?', (author,), after, limit, False)
 
-		conn.close()
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__select(None, (), after, limit, True)
 
-		return Book(book[0], book[1], book[2], book[3])
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__select('name=?', (name,), after, limit, True)
 
-	def get_by_name(self, name: str) -> list:
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
 		"""View @app.domain.ports.BookView."""
-		conn = sqlite3.connect(self.location)
-		cursor = conn.cursor()
+		return self.__select('author=?', (author,), after, limit, True)
 
-		books = cursor.execute(
-			'SELECT * FROM books WHERE name=\'{0}\';'.format(name)).fetchall()
+	def get_content(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		with self.pool.connection() as conn:
+			row = conn.execute("""
+				SELECT content
+				FROM books JOIN blobs USING (digest) WHERE isbn=?;
+			""", (isbn,)).fetchone()
 
-		conn.close()
+		return self.codec.decode(row[0]) if row is not None else None
 
-		return [Book(i[0], i[1], i[2], i[3]) for i in books]
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		with self.pool.connection() as conn:
+			row = conn.execute("""
+				SELECT digest FROM books WHERE isbn=?;
+			""", (isbn,)).fetchone()
 
-	def get_by_author(self, author: str) -> list:
+		return row[0] if row is not None else None
+
+	def search(self, query: str, limit: int = 10) -> list:
 		"""View @app.domain.ports.BookView."""
-		conn = sqlite3.connect(self.location)
-		cursor = conn.cursor()
+		return [summary for _, summary in self.scored_search(query, limit)]
+
+	def scored_search(self, query: str, limit: int = 10) -> list:
+		"""Searches like search but pairs each BookSummary with its bm25
+		score, lower being more relevant, so results of several databases can
+		be merged.
+
+		Params
+		------
+		query: str -- the words to be searched
+		limit: int -- the maximum number of books to be fetched
+
+		Returns
+		-------
+		books: list -- a list of (score, BookSummary) ranked by relevance
+		"""
+		# Every word is quoted so FTS5 operators in the query are ignored.
+		words = re.findall(r'\w+', query)
+		if len(words) == 0:
+			return []
+
+		match = ' '.join('"{0}"'.format(w) for w in words)
+
+		# Matches on the name weigh more than on the author, and those more
+		# than on the content.
+		with self.pool.connection() as conn:
+			books = conn.execute("""
+				SELECT bm25(books_search, 10.0, 5.0, 1.0) AS score,
+					   books.isbn, books.name, books.author
+				FROM books_search JOIN books ON books.rowid=books_search.rowid
+				WHERE books_search MATCH ?
+				ORDER BY score LIMIT ?;
+			""", (match, limit)).fetchall()
+
+		return [(i[0], BookSummary(i[1], i[2], i[3])) for i in books]
+
+	def __select(self, where: str, params: tuple, after: str, limit: int,
+				 summary: bool) -> list:
+		"""Fetches a page of books ordered by ISBN, seeking straight to the
+		first ISBN after the cursor through the books' indexes. Summaries are
+		read from the covering indexes alone, never touching the content.
+
+		Params
+		------
+		where: str -- an optional filter with placeholders for the params
+		params: tuple -- the values bound to the filter's placeholders
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
+		summary: bool -- whether to fetch BookSummary instances instead
+		"""
+		clauses = [where] if where is not None else []
+
+		if after is not None:
+			clauses.append('isbn>?')
+			params += (after,)
+
+		if summary:
+			query = 'SELECT isbn, name, author FROM books'
+		else:
+			query = 'SELECT isbn, name, author, content ' \
+					'FROM books JOIN blobs USING (digest)'
+
+		if len(clauses) > 0:
+			query += ' WHERE ' + ' AND '.join(clauses)
+		query += ' ORDER BY isbn LIMIT ?;'
+
+		# A negative limit means no limit to SQLite.
+		params += (limit if limit is not None else -1,)
+
+		with self.pool.connection() as conn:
+			books = conn.execute(query, params).fetchall()
+
+		if summary:
+			return [BookSummary(i[0], i[1], i[2]) for i in books]
+		else:
+			return [Book(i[0], i[1], i[2], self.codec.decode(i[3])) \
+					for i in books]
+
+
+class SqliteOutbox(Outbox):
+	"""An implementation of an Outbox storing events at the outbox table,
+	within the transaction of its unit of work. Events are stored as the
+	name of their class and a JSON array of their fields.
+
+	Methods: add
+	"""
+	def __init__(self, cursor):
+		"""SqliteOutbox's constructor.
+
+		Params
+		------
+		cursor -- the cursor of the unit of work's connection
+		"""
+		self.cursor = cursor
+
+	def add(self, event):
+		"""View @app.domain.ports.Outbox."""
+		self.cursor.execute("""
+			INSERT INTO outbox (event, payload) VALUES (?, ?);
+		""", (type(event).__name__, json.dumps(list(event))))
 
-		books = cursor.execute(
-			'SELECT * FROM books WHERE author=\'{0}\';'.format(author)
-		).fetchall()
 
-		conn.close()
+class SqliteOutboxView(OutboxView):
+	"""An implementation of an OutboxView reading the outbox table through
+	the readers and deleting delivered events through the writer.
 
-		return [Book(i[0], i[1], i[2], i[3]) for i in books]
+	Methods: pending, acknowledge
+	"""
+	def __init__(self, readers: SqliteConnectionPool,
+				 writer: SqliteConnectionPool):
+		"""SqliteOutboxView's constructor.
+
+		Params
+		------
+		readers: SqliteConnectionPool -- the pool of read-only connections
+		writer: SqliteConnectionPool -- the pool of the writer connection
+		"""
+		self.readers = readers
+		self.writer = writer
+
+	def pending(self, limit: int = 100) -> list:
+		"""View @app.domain.ports.OutboxView."""
+		with self.readers.connection() as conn:
+			rows = conn.execute("""
+				SELECT id, event, payload FROM outbox ORDER BY id LIMIT ?;
+			""", (limit,)).fetchall()
+
+		# Arrays are read back as lists, while events hold tuples.
+		return [(i, EVENT_CLASSES[e](*[tuple(f) if isinstance(f, list) \
+									   else f for f in json.loads(p)])) \
+				for i, e, p in rows]
+
+	def acknowledge(self, ids: list):
+		"""View @app.domain.ports.OutboxView."""
+		with self.writer.connection() as conn:
+			conn.executemany('DELETE FROM outbox WHERE id=?;',
+							 [(i,) for i in ids])
+			conn.commit()
 
 
 class SqliteUnitOfWork(UnitOfWork):
 	"""An implementation of a UnitOfWork for a SQLite storage database.
 
-	Methods: __enter__, __exit__, commit, rollback, books
+	Methods: __enter__, __exit__, commit, rollback, books, outbox
 	"""
-	def __init__(self, location):
-		"""SqliteUnitOfWork's constructor."""
-		self.location = location
+	def __init__(self, pool: SqliteConnectionPool, codec: ContentCodec):
+		"""SqliteUnitOfWork's constructor.
+
+		Params
+		------
+		pool: SqliteConnectionPool -- the pool to borrow a connection from
+		codec: ContentCodec -- the codec used to store the books' content
+		"""
+		self.pool = pool
+		self.codec = codec
 
 	def __enter__(self):
 		"""View @app.domain.ports.UnitOfWork."""
-		self.conn = sqlite3.connect(self.location)
+		self.conn = self.pool.acquire()
 		return self
 
 	def __exit__(self, type, value, traceback):
 		"""View @app.domain.ports.UnitOfWork."""
-		self.conn.close()
+		self.pool.release(self.conn)
 
 	def commit(self):
 		"""View @app.domain.ports.UnitOfWork."""
@@ -118,7 +550,12 @@ class SqliteUnitOfWork(UnitOfWork):
 	@property
 	def books(self) -> SqliteBookRepository:
 		"""View @app.domain.ports.UnitOfWork."""
-		return SqliteBookRepository(self.conn.cursor())
+		return SqliteBookRepository(self.conn.cursor(), self.codec)
+
+	@property
+	def outbox(self) -> SqliteOutbox:
+		"""View @app.domain.ports.UnitOfWork."""
+		return SqliteOutbox(self.conn.cursor())
 
 
 class SqliteUnitOfWorkManager(UnitOfWorkManager):
@@ -126,19 +563,20 @@ class SqliteUnitOfWorkManager(UnitOfWorkManager):
 
 	Methods: start
 	"""
-	def __init__(self, location: str):
+	def __init__(self, pool: SqliteConnectionPool, codec: ContentCodec):
 		"""SqliteUnitOfWorkManager's constructor.
 
 		Params
 		------
-		location: str -- the location where the adapter should store the
-		SQLite database
+		pool: SqliteConnectionPool -- the pool shared by the units of work
+		codec: ContentCodec -- the codec used to store the books' content
 		"""
-		self.location = location
+		self.pool = pool
+		self.codec = codec
 
 	def start(self) -> SqliteUnitOfWork:
 		"""View @app.domain.ports.UnitOfWorkManager."""
-		return SqliteUnitOfWork(self.location)
+		return SqliteUnitOfWork(self.pool, self.codec)
 
 
 @identify('sqlite', 'database')
@@ -146,7 +584,12 @@ class SqliteDatabase(object):
 	"""This adapter gives access to each of the SQLite database classes that
 	are to be used by the app for data mutation an querying.
 
-	Methods: set_up, get_uowm, get_view
+	Writes go through a single dedicated writer connection while queries are
+	served by a pool of read-only reader connections. Combined with the WAL
+	journal mode this lets readers keep going while a write is committed.
+	An in-memory database is served by the writer's connection alone.
+
+	Methods: set_up, tear_down, get_uowm, get_view, get_outbox
 	"""
 	def __init__(self, cfg: dict):
 		"""SqliteDatabase's constructor.
@@ -154,27 +597,180 @@ class SqliteDatabase(object):
 		cfg: dict -- The SQLite database adapter's configuration
 		"""
 		self.location = cfg['location']
+		self.journal_mode = cfg.get('journal_mode', 'wal')
+		self.codec = ContentCodec(cfg.get('codec'),
+								  cfg.get('codec_threshold', THRESHOLD))
+
+		pragmas = {
+			'synchronous': cfg.get('synchronous', 'normal'),
+			'cache_size': cfg.get('cache_size', -2000),
+			'mmap_size': cfg.get('mmap_size', 0),
+			'busy_timeout': cfg.get('busy_timeout', 5000)
+		}
+
+		self.writer = SqliteConnectionPool(
+			self.location, size=1, timeout=cfg.get('pool_timeout', 5.0),
+			pragmas=pragmas
+		)
+
+		# In-memory and temporary databases only exist at the connection that
+		# opened them, so their queries go through the writer's connection.
+		if self.location in (':memory:', ''):
+			self.readers = self.writer
+		else:
+			self.readers = SqliteConnectionPool(
+				self.location, size=cfg.get('pool_size', 5),
+				timeout=cfg.get('pool_timeout', 5.0), read_only=True,
+				pragmas=pragmas
+			)
 
 	def set_up(self):
-		"""Configures the database creating its tables if necessary."""
-		conn = sqlite3.connect(self.location)
-		cursor = conn.cursor()
-
-		books = cursor.execute("""
-			CREATE TABLE IF NOT EXISTS 'books' (
-				isbn TEXT PRIMARY KEY,
-				name TEXT NOT NULL,
-				author TEXT NOT NULL,
-				content TEXT NOT NULL
-			);
-		""")
+		"""Configures the database setting its journal mode and creating its
+		tables and indexes if necessary. The full-text search index is only
+		stored once, as a contentless FTS5 table keyed by the books' rowid.
+
+		Books reference their content at the blobs table by digest, triggers
+		counting the references to each content. Books stored with their
+		content inline by earlier versions are moved to this layout."""
+		with self.writer.connection() as conn:
+			conn.execute('PRAGMA journal_mode={0};'.format(self.journal_mode))
+
+			# The references are stored ahead of the content, so counting
+			# them does not read the content's pages.
+			conn.execute("""
+				CREATE TABLE IF NOT EXISTS 'blobs' (
+					digest TEXT PRIMARY KEY,
+					refs INTEGER NOT NULL DEFAULT 0,
+					content TEXT NOT NULL
+				);
+			""")
+
+			columns = [c[1] for c in conn.execute(
+				"PRAGMA table_info('books');")]
+			if 'content' in columns:
+				conn.execute('ALTER TABLE books RENAME TO books_inline;')
+
+			conn.execute("""
+				CREATE TABLE IF NOT EXISTS 'books' (
+					isbn TEXT PRIMARY KEY,
+					name TEXT NOT NULL,
+					author TEXT NOT NULL,
+					digest TEXT NOT NULL
+				);
+			""")
+			conn.execute("""
+				CREATE TRIGGER IF NOT EXISTS 'books_blob_insert'
+				AFTER INSERT ON books BEGIN
+					UPDATE blobs SET refs=refs+1 WHERE digest=NEW.digest;
+				END;
+			""")
+			conn.execute("""
+				CREATE TRIGGER IF NOT EXISTS 'books_blob_update'
+				AFTER UPDATE OF digest ON books BEGIN
+					UPDATE blobs SET refs=refs+1 WHERE digest=NEW.digest;
+					UPDATE blobs SET refs=refs-1 WHERE digest=OLD.digest;
+					DELETE FROM blobs WHERE digest=OLD.digest AND refs=0;
+				END;
+			""")
+			conn.execute("""
+				CREATE TRIGGER IF NOT EXISTS 'books_blob_delete'
+				AFTER DELETE ON books BEGIN
+					UPDATE blobs SET refs=refs-1 WHERE digest=OLD.digest;
+					DELETE FROM blobs WHERE digest=OLD.digest AND refs=0;
+				END;
+			""")
+
+			if 'content' in columns:
+				self.__move_inline(conn)
+
+			# Events committed along with the books, waiting for delivery.
+			conn.execute("""
+				CREATE TABLE IF NOT EXISTS 'outbox' (
+					id INTEGER PRIMARY KEY AUTOINCREMENT,
+					event TEXT NOT NULL,
+					payload TEXT NOT NULL
+				);
+			""")
+
+			# Contents left behind by books that failed to be saved.
+			conn.execute('DELETE FROM blobs WHERE refs=0;')
+			conn.commit()
+			conn.execute("""
+				CREATE INDEX IF NOT EXISTS 'books_name_summary'
+				ON books (name, isbn, author);
+			""")
+			conn.execute("""
+				CREATE INDEX IF NOT EXISTS 'books_author_summary'
+				ON books (author, isbn, name);
+			""")
+
+			# Superseded by the covering indexes above, which also serve
+			# pagination and summaries.
+			for index in ('books_name', 'books_author', 'books_name_isbn',
+						  'books_author_isbn'):
+				conn.execute("DROP INDEX IF EXISTS '{0}';".format(index))
+
+			conn.execute("""
+				CREATE VIRTUAL TABLE IF NOT EXISTS 'books_search'
+				USING fts5(name, author, content, content='');
+			""")
+
+			# Books saved before the search index existed are indexed now.
+			indexed = conn.execute(
+				'SELECT COUNT(*) FROM books_search_docsize;').fetchone()[0]
+			if indexed == 0:
+				books = conn.execute("""
+					SELECT books.rowid, name, author, content
+					FROM books JOIN blobs USING (digest);
+				""").fetchall()
+
+				conn.executemany("""
+					INSERT INTO books_search (rowid, name, author, content)
+					VALUES (?, ?, ?, ?);
+				""", [(i[0], i[1], i[2], self.codec.decode(i[3])) \
+					  for i in books])
+				conn.commit()
+
+	def __move_inline(self, conn: sqlite3.Connection):
+		"""Moves the books stored with their content inline to the books and
+		blobs tables, keeping their rowid, which the search index is keyed
+		by.
 
-		conn.close()
+		Params
+		------
+		conn: sqlite3.Connection -- the writer connection
+		"""
+		books = conn.execute("""
+			SELECT rowid, isbn, name, author, content FROM books_inline;
+		""").fetchall()
+
+		digests = [content_digest(self.codec.decode(i[4])) for i in books]
+		conn.executemany("""
+			INSERT OR IGNORE INTO blobs (digest, content) VALUES (?, ?);
+		""", [(d, i[4]) for d, i in zip(digests, books)])
+		conn.executemany("""
+			INSERT INTO books (rowid, isbn, name, author, digest)
+			VALUES (?, ?, ?, ?, ?);
+		""", [(i[0], i[1], i[2], i[3], d) for d, i in zip(digests, books)])
+
+		# Its indexes are dropped along with it.
+		conn.execute('DROP TABLE books_inline;')
+		LOGGER.info('Moved the content of {0} books to the blobs table' \
+					.format(len(books)))
+
+	def tear_down(self):
+		"""Closes the connections held by the database's pools."""
+		self.readers.close()
+		self.writer.close()
 
 	def get_uowm(self) -> SqliteUnitOfWorkManager:
 		"""Returns an instance of a SqliteUnitOfWorkManager."""
-		return SqliteUnitOfWorkManager(self.location)
+		return SqliteUnitOfWorkManager(self.writer, self.codec)
 
 	def get_view(self) -> SqliteBookView:
 		"""Returns an instance of a SqliteBookView."""
-		return SqliteBookView(self.location)
+		return SqliteBookView(self.readers, self.codec)
+
+	def get_outbox(self) -> SqliteOutboxView:
+		"""Returns an instance of a SqliteOutboxView."""
+		return SqliteOutboxView(self.readers, self.writer)
@@ -0,0 +1,307 @@
+"""A SQLite database adapter spreading books across several SQLite files."""
+
+import zlib
+import heapq
+import logging
+import itertools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from ..settings import identify
+from ..domain.model import Book
+from ..domain.dispatch import native_executor
+from ..domain.ports import BookRepository, BookView, UnitOfWork, \
+						   UnitOfWorkManager
+from .sqlite import SqliteDatabase
+
+
+LOGGER = logging.getLogger('sample')
+
+
+def shard_of(isbn: str, shards: int) -> int:
+	"""Returns the index of the shard storing a book. CRC32 is used instead of
+	Python's hash, which changes between processes.
+
+	Params
+	------
+	isbn: str -- the ISBN of the book
+	shards: int -- the number of shards
+	"""
+	return zlib.crc32(isbn.encode('utf8')) % shards
+
+
+class ShardedBookRepository(BookRepository):
+	"""An implementation of a BookRepository staging books by shard until
+	their unit of work is committed.
+
+	Methods: save, save_many
+	"""
+	def __init__(self, staged: defaultdict, shards: int):
+		"""ShardedBookRepository's constructor.
+
+		Params
+		------
+		staged: defaultdict -- the unit of work's books grouped by shard
+		shards: int -- the number of shards
+		"""
+		self.staged = staged
+		self.shards = shards
+
+	def save(self, book: Book):
+		"""View @app.domain.ports.BookRepository."""
+		self.staged[shard_of(book.isbn, self.shards)].append(book)
+
+	def save_many(self, books: list):
+		"""View @app.domain.ports.BookRepository."""
+		for book in books:
+			self.save(book)
+
+
+class ShardedBookView(BookView):
+	"""An implementation of a BookView reading from every shard. Lookups by
+	ISBN go straight to the book's shard, while the other queries run on every
+	shard in parallel and have their results merged.
+
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search
+	"""
+	def __init__(self, views: list, executor: ThreadPoolExecutor):
+		"""ShardedBookView's constructor.
+
+		Params
+		------
+		views: list -- the SqliteBookView of each shard
+		executor: ThreadPoolExecutor -- the executor running the queries
+		"""
+		self.views = views
+		self.executor = executor
+
+	def get_all(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(lambda v: v.get_all(after, limit), limit)
+
+	def get_by_isbn(self, isbn: str) -> Book:
+		"""View @app.domain.ports.BookView."""
+		return self.views[shard_of(isbn, len(self.views))].get_by_isbn(isbn)
+
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(
+			lambda v: v.get_by_name(name, after, limit), limit)
+
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(
+			lambda v: v.get_by_author(author, after, limit), limit)
+
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(
+			lambda v: v.get_all_summaries(after, limit), limit)
+
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(
+			lambda v: v.get_summaries_by_name(name, after, limit), limit)
+
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.__merge(
+			lambda v: v.get_summaries_by_author(author, after, limit), limit)
+
+	def get_content(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		return self.views[shard_of(isbn, len(self.views))].get_content(isbn)
+
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		return self.views[shard_of(isbn, len(self.views))].get_digest(isbn)
+
+	def search(self, query: str, limit: int = 10) -> list:
+		"""View @app.domain.ports.BookView."""
+		results = self.executor.map(
+			lambda v: v.scored_search(query, limit), self.views)
+
+		# Each shard ranks its books with its own statistics, close enough
+		# to each other's when books are spread evenly.
+		merged = heapq.merge(*results, key=lambda i: i[0])
+
+		return [summary for _, summary in itertools.islice(merged, limit)]
+
+	def __merge(self, query, limit: int) -> list:
+		"""Runs a query on every shard and merges their pages by ISBN. Every
+		shard is asked for a whole page, since any of them may hold all of its
+		books.
+
+		Params
+		------
+		query -- a function querying a shard's view
+		limit: int -- the maximum number of books to be fetched
+		"""
+		results = self.executor.map(query, self.views)
+		merged = heapq.merge(*results, key=lambda b: b.isbn)
+
+		return list(itertools.islice(merged, limit))
+
+
+class ShardedUnitOfWork(UnitOfWork):
+	"""An implementation of a UnitOfWork for sharded SQLite storage.
+
+	Books are staged by shard and only written at commit, each shard through
+	its own writer and in parallel. Shards that are not touched are not
+	locked, so units of work writing to different shards run concurrently.
+	Each shard commits on its own: if one of them fails the others may still
+	have been committed.
+
+	Methods: __enter__, __exit__, commit, rollback, books
+	"""
+	def __init__(self, databases: list, executor: ThreadPoolExecutor):
+		"""ShardedUnitOfWork's constructor.
+
+		Params
+		------
+		databases: list -- the SqliteDatabase of each shard
+		executor: ThreadPoolExecutor -- the executor running the writes
+		"""
+		self.databases = databases
+		self.executor = executor
+		self.staged = defaultdict(list)
+
+	def __enter__(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		return self
+
+	def __exit__(self, type, value, traceback):
+		"""View @app.domain.ports.UnitOfWork."""
+		self.staged.clear()
+
+	def commit(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		staged = sorted(self.staged.items())
+		self.staged.clear()
+
+		# A single shard is written right away, sparing a thread hop.
+		if len(staged) == 1:
+			self.__write(*staged[0])
+			return
+
+		futures = [self.executor.submit(self.__write, shard, books) \
+				   for shard, books in staged]
+
+		# Waits for every shard before raising the first failure.
+		errors = [f.exception() for f in futures]
+		for error in errors:
+			if error is not None:
+				raise error
+
+	def rollback(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		self.staged.clear()
+
+	@property
+	def books(self) -> ShardedBookRepository:
+		"""View @app.domain.ports.UnitOfWork."""
+		return ShardedBookRepository(self.staged, len(self.databases))
+
+	def __write(self, shard: int, books: list):
+		"""Writes and commits the books staged for a shard.
+
+		Params
+		------
+		shard: int -- the index of the shard
+		books: list -- the books staged for the shard
+		"""
+		LOGGER.debug('Saving {0} books at shard {1} ...' \
+					 .format(len(books), shard))
+		with self.databases[shard].get_uowm().start() as uow:
+			if len(books) == 1:
+				uow.books.save(books[0])
+			else:
+				uow.books.save_many(books)
+			uow.commit()
+
+
+class ShardedUnitOfWorkManager(UnitOfWorkManager):
+	"""An implementation of a UnitOfWorkManager for sharded SQLite storage.
+
+	Methods: start, atomic
+	"""
+	def __init__(self, databases: list, executor: ThreadPoolExecutor):
+		"""ShardedUnitOfWorkManager's constructor.
+
+		Params
+		------
+		databases: list -- the SqliteDatabase of each shard
+		executor: ThreadPoolExecutor -- the executor running the writes
+		"""
+		self.databases = databases
+		self.executor = executor
+
+	def start(self) -> ShardedUnitOfWork:
+		"""View @app.domain.ports.UnitOfWorkManager."""
+		return ShardedUnitOfWork(self.databases, self.executor)
+
+	@property
+	def atomic(self) -> bool:
+		"""View @app.domain.ports.UnitOfWorkManager."""
+		return False
+
+
+@identify('sqlite-sharded', 'database')
+class SqliteShardedDatabase(object):
+	"""This adapter spreads books across several SQLite databases by a hash
+	of their ISBN, each with its own writer, so writes to different shards
+	are not serialized behind each other.
+
+	The number of shards must not change once books have been stored, since
+	the books would then be looked for at the wrong shards.
+
+	Methods: set_up, tear_down, get_uowm, get_view
+	"""
+	def __init__(self, cfg: dict):
+		"""SqliteShardedDatabase's constructor.
+
+		cfg: dict -- The sharded SQLite database adapter's configuration, the
+		location holding a '{0}' placeholder for the shard's index
+		"""
+		location = cfg['location']
+		if '{0}' not in location:
+			location += '.{0}'
+
+		self.shards = cfg.get('shards', 4)
+		self.databases = [
+			SqliteDatabase(dict(cfg, location=location.format(i))) \
+			for i in range(self.shards)
+		]
+
+		# A thread per shard for writes and another one for reads, native
+		# ones even under gevent, so shards are written and read in parallel
+		# and a slow commit does not hold the queries back.
+		self.writers = native_executor(self.shards)
+		self.readers = native_executor(self.shards)
+
+	def set_up(self):
+		"""Configures every shard's database."""
+		for database in self.databases:
+			database.set_up()
+
+	def tear_down(self):
+		"""Stops the executors and closes every shard's connections."""
+		self.writers.shutdown()
+		self.readers.shutdown()
+		for database in self.databases:
+			database.tear_down()
+
+	def get_uowm(self) -> ShardedUnitOfWorkManager:
+		"""Returns an instance of a ShardedUnitOfWorkManager."""
+		return ShardedUnitOfWorkManager(self.databases, self.writers)
+
+	def get_view(self) -> ShardedBookView:
+		"""Returns an instance of a ShardedBookView."""
+		return ShardedBookView([d.get_view() for d in self.databases],
+							   self.readers)
@@ -0,0 +1,481 @@
+"""A database adapter serving the hot books from memory over SQLite."""
+
+import sys
+import logging
+import threading
+from collections import OrderedDict
+
+from ..settings import identify
+from ..domain.model import Book
+from ..domain.ports import BookRepository, BookView, UnitOfWork, \
+						   UnitOfWorkManager, Outbox, OutboxView
+from .sqlite import SqliteDatabase
+
+
+LOGGER = logging.getLogger('sample')
+
+
+class LruEviction(object):
+	"""Evicts the least recently used key.
+
+	Methods: add, touch, remove, victim
+	"""
+	def __init__(self):
+		"""LruEviction's constructor."""
+		self.keys = OrderedDict()
+
+	def add(self, key):
+		"""Tracks a new key.
+
+		Params
+		------
+		key -- the key added
+		"""
+		self.keys[key] = None
+
+	def touch(self, key):
+		"""Records a use of a key.
+
+		Params
+		------
+		key -- the key used
+		"""
+		self.keys.move_to_end(key)
+
+	def remove(self, key):
+		"""Stops tracking a key.
+
+		Params
+		------
+		key -- the key removed
+		"""
+		del self.keys[key]
+
+	def victim(self):
+		"""Returns the key to be evicted next."""
+		return next(iter(self.keys))
+
+
+class LfuEviction(object):
+	"""Evicts the least frequently used key, the least recently used one
+	among equally used keys. Keys are grouped by use count, so the key to be
+	evicted is found without going through every key.
+
+	Methods: add, touch, remove, victim
+	"""
+	def __init__(self):
+		"""LfuEviction's constructor."""
+		self.counts = {}
+		self.buckets = {}
+		self.minimum = 0
+
+	def add(self, key):
+		"""View @app.adapters.tiered.LruEviction."""
+		self.counts[key] = 1
+		self.buckets.setdefault(1, OrderedDict())[key] = None
+		self.minimum = 1
+
+	def touch(self, key):
+		"""View @app.adapters.tiered.LruEviction."""
+		count = self.__pop(key)
+		self.counts[key] = count + 1
+		self.buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+		if self.minimum == count and count not in self.buckets:
+			self.minimum = count + 1
+
+	def remove(self, key):
+		"""View @app.adapters.tiered.LruEviction."""
+		self.__pop(key)
+		del self.counts[key]
+
+		if self.minimum not in self.buckets and len(self.buckets) > 0:
+			self.minimum = min(self.buckets)
+
+	def victim(self):
+		"""View @app.adapters.tiered.LruEviction."""
+		return next(iter(self.buckets[self.minimum]))
+
+	def __pop(self, key) -> int:
+		"""Removes a key from its bucket, returning its use count.
+
+		Params
+		------
+		key -- the key
+		"""
+		count = self.counts[key]
+		bucket = self.buckets[count]
+		del bucket[key]
+		if len(bucket) == 0:
+			del self.buckets[count]
+
+		return count
+
+
+EVICTIONS = {'lru': LruEviction, 'lfu': LfuEviction}
+
+
+def size_of(book: tuple) -> int:
+	"""Returns the bytes of memory taken by a book tuple and its fields.
+
+	Params
+	------
+	book: tuple -- the book tuple
+	"""
+	return sys.getsizeof(book) + sum(sys.getsizeof(f) for f in book)
+
+
+class HotTier(object):
+	"""A thread safe memory tier holding books within a budget of bytes,
+	evicting them as chosen by its eviction policy to make room.
+
+	Like the LruCache, discarding a book bumps the tier's generation and
+	books read from the cold tier before that are refused.
+
+	Methods: get, put, discard, stats
+	"""
+	def __init__(self, budget: int, eviction: str = 'lru'):
+		"""HotTier's constructor.
+
+		Params
+		------
+		budget: int -- the maximum bytes taken by the books
+		eviction: str -- the eviction policy, lru or lfu
+		"""
+		if eviction not in EVICTIONS:
+			raise ValueError('Unknown eviction \'{0}\''.format(eviction))
+
+		self.budget = budget
+		self.eviction = EVICTIONS[eviction]()
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.size = 0
+		self.generation = 0
+		self.books = {}
+		self.lock = threading.Lock()
+
+	def get(self, isbn: str) -> tuple:
+		"""Looks a book up.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book
+
+		Returns
+		-------
+		found: bool -- whether the book has been found
+		book -- the (isbn, name, author, content, digest) tuple if found,
+		else the generation to be passed on to put
+		"""
+		with self.lock:
+			entry = self.books.get(isbn)
+			if entry is None:
+				self.misses += 1
+				return False, self.generation
+
+			self.eviction.touch(isbn)
+			self.hits += 1
+			return True, entry[0]
+
+	def put(self, book: tuple, generation: int):
+		"""Stores a book read from the cold tier, evicting others until it
+		fits. Books larger than the whole budget are not stored.
+
+		Params
+		------
+		book: tuple -- the (isbn, name, author, content, digest) tuple
+		generation: int -- the generation returned by the missed get
+		"""
+		size = size_of(book)
+
+		with self.lock:
+			if generation != self.generation or size > self.budget \
+			   or book[0] in self.books:
+				return
+
+			while self.size + size > self.budget:
+				self.__remove(self.eviction.victim())
+				self.evictions += 1
+
+			self.books[book[0]] = (book, size)
+			self.eviction.add(book[0])
+			self.size += size
+
+	def discard(self, isbns: list):
+		"""Removes books if present.
+
+		Params
+		------
+		isbns: list -- the ISBNs of the books
+		"""
+		with self.lock:
+			self.generation += 1
+			for isbn in isbns:
+				if isbn in self.books:
+					self.__remove(isbn)
+
+	def stats(self) -> dict:
+		"""Returns the tier's counters, its hit rate and its size."""
+		with self.lock:
+			reads = self.hits + self.misses
+			return {
+				'hits': self.hits,
+				'misses': self.misses,
+				'hit_rate': self.hits / reads if reads > 0 else 0.0,
+				'evictions': self.evictions,
+				'books': len(self.books),
+				'bytes': self.size
+			}
+
+	def __remove(self, isbn: str):
+		"""Removes a book. The lock must be held.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book
+		"""
+		_, size = self.books.pop(isbn)
+		self.eviction.remove(isbn)
+		self.size -= size
+
+
+class TieredBookRepository(BookRepository):
+	"""An implementation of a BookRepository writing through to the cold
+	tier's repository, noting the ISBNs saved.
+
+	Methods: save, save_many
+	"""
+	def __init__(self, repository: BookRepository, saved: list):
+		"""TieredBookRepository's constructor.
+
+		Params
+		------
+		repository: BookRepository -- the cold tier's repository
+		saved: list -- the ISBNs saved at the unit of work
+		"""
+		self.repository = repository
+		self.saved = saved
+
+	def save(self, book: Book):
+		"""View @app.domain.ports.BookRepository."""
+		self.repository.save(book)
+		self.saved.append(book.isbn)
+
+	def save_many(self, books: list):
+		"""View @app.domain.ports.BookRepository."""
+		self.repository.save_many(books)
+		self.saved.extend(b.isbn for b in books)
+
+
+class TieredBookView(BookView):
+	"""An implementation of a BookView reading books by ISBN from the hot
+	tier, filling it from the cold tier on misses. The other queries go to
+	the cold tier, whose indexes hold every book.
+
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search
+	"""
+	def __init__(self, hot: HotTier, cold: BookView):
+		"""TieredBookView's constructor.
+
+		Params
+		------
+		hot: HotTier -- the hot tier
+		cold: BookView -- the cold tier's view
+		"""
+		self.hot = hot
+		self.cold = cold
+
+	def get_all(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_all(after, limit)
+
+	def get_by_isbn(self, isbn: str) -> Book:
+		"""View @app.domain.ports.BookView."""
+		book = self.__read(isbn)
+
+		return Book(*book[:4]) if book is not None else None
+
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_by_name(name, after, limit)
+
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_by_author(author, after, limit)
+
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_all_summaries(after, limit)
+
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_summaries_by_name(name, after, limit)
+
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.get_summaries_by_author(author, after, limit)
+
+	def get_content(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		book = self.__read(isbn)
+
+		return book[3] if book is not None else None
+
+	def get_digest(self, isbn: str) -> str:
+		"""View @app.domain.ports.BookView."""
+		book = self.__read(isbn)
+
+		return book[4] if book is not None else None
+
+	def search(self, query: str, limit: int = 10) -> list:
+		"""View @app.domain.ports.BookView."""
+		return self.cold.search(query, limit)
+
+	def __read(self, isbn: str) -> tuple:
+		"""Returns a book as a (isbn, name, author, content, digest) tuple,
+		from the hot tier if it is there or else from the cold tier.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book
+		"""
+		found, book = self.hot.get(isbn)
+		if found:
+			return book
+
+		generation = book
+		book = self.cold.get_by_isbn(isbn)
+		if book is None:
+			return None
+
+		book = book.astuple() + (book.digest(),)
+		self.hot.put(book, generation)
+
+		return book
+
+
+class TieredUnitOfWork(UnitOfWork):
+	"""An implementation of a UnitOfWork writing through to the cold tier and
+	dropping the books it saved from the hot tier once committed.
+
+	Methods: __enter__, __exit__, commit, rollback, books, outbox
+	"""
+	def __init__(self, uow: UnitOfWork, hot: HotTier):
+		"""TieredUnitOfWork's constructor.
+
+		Params
+		------
+		uow: UnitOfWork -- the cold tier's unit of work
+		hot: HotTier -- the hot tier
+		"""
+		self.uow = uow
+		self.hot = hot
+		self.saved = []
+
+	def __enter__(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		self.uow.__enter__()
+		return self
+
+	def __exit__(self, type, value, traceback):
+		"""View @app.domain.ports.UnitOfWork."""
+		self.saved.clear()
+		return self.uow.__exit__(type, value, traceback)
+
+	def commit(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		saved, self.saved = self.saved, []
+		self.uow.commit()
+		self.hot.discard(saved)
+
+	def rollback(self):
+		"""View @app.domain.ports.UnitOfWork."""
+		self.saved.clear()
+		self.uow.rollback()
+
+	@property
+	def books(self) -> TieredBookRepository:
+		"""View @app.domain.ports.UnitOfWork."""
+		return TieredBookRepository(self.uow.books, self.saved)
+
+	@property
+	def outbox(self) -> Outbox:
+		"""View @app.domain.ports.UnitOfWork."""
+		return self.uow.outbox
+
+
+class TieredUnitOfWorkManager(UnitOfWorkManager):
+	"""An implementation of a UnitOfWorkManager for tiered storage.
+
+	Methods: start
+	"""
+	def __init__(self, uowm: UnitOfWorkManager, hot: HotTier):
+		"""TieredUnitOfWorkManager's constructor.
+
+		Params
+		------
+		uowm: UnitOfWorkManager -- the cold tier's unit of work manager
+		hot: HotTier -- the hot tier
+		"""
+		self.uowm = uowm
+		self.hot = hot
+
+	def start(self) -> TieredUnitOfWork:
+		"""View @app.domain.ports.UnitOfWorkManager."""
+		return TieredUnitOfWork(self.uowm.start(), self.hot)
+
+
+@identify('tiered', 'database')
+class TieredDatabase(object):
+	"""This adapter keeps every book at a SQLite database, the cold tier,
+	and the books last read by ISBN at a memory hot tier bounded in bytes.
+
+	Writes go through to SQLite and drop the books written from the hot
+	tier once committed. Reads by ISBN are served by the hot tier, while
+	listings and searches are served by SQLite's indexes.
+
+	Methods: set_up, tear_down, get_uowm, get_view, get_outbox, stats
+	"""
+	def __init__(self, cfg: dict):
+		"""TieredDatabase's constructor.
+
+		cfg: dict -- The SQLite database adapter's configuration along with
+		the hot tier's budget and eviction
+		"""
+		self.cold = SqliteDatabase(cfg)
+		self.hot = HotTier(cfg.get('budget', 64 * 2 ** 20),
+						   cfg.get('eviction', 'lru'))
+
+	def set_up(self):
+		"""Configures the cold tier's database."""
+		self.cold.set_up()
+
+	def tear_down(self):
+		"""Reports the hot tier's statistics and closes the cold tier's
+		connections."""
+		LOGGER.info('Hot tier statistics: {0}'.format(self.stats()))
+		self.cold.tear_down()
+
+	def get_uowm(self) -> TieredUnitOfWorkManager:
+		"""Returns an instance of a TieredUnitOfWorkManager."""
+		return TieredUnitOfWorkManager(self.cold.get_uowm(), self.hot)
+
+	def get_view(self) -> TieredBookView:
+		"""Returns an instance of a TieredBookView."""
+		return TieredBookView(self.hot, self.cold.get_view())
+
+	def get_outbox(self) -> OutboxView:
+		"""Returns the cold tier's OutboxView."""
+		return self.cold.get_outbox()
+
+	def stats(self) -> dict:
+		"""Returns the hot tier's hit rate, counters and size."""
+		return self.hot.stats()
@@ -0,0 +1,733 @@
+"""
+Dispatch
+========
+	Events don't need to be handled before the caller that published them
+goes on. The dispatcher takes them off the caller's path, handling them at a
+bounded pool of workers, which are greenlets when the application is monkey
+patched by gevent.
+
+	Jobs are kept at serial lanes, each one handled by at most one worker at a
+time and in the order its jobs were submitted. How jobs are spread over lanes
+is the dispatcher's ordering:
+
+	* isbn -- one lane per event type and book, so the events of a book are
+	handled in the order they were published while different books are
+	handled at once, events of many books sharing their type's lane;
+	* event -- one lane per event type, so events of a type are handled in
+	the order they were published and their subscribers in the order they
+	subscribed;
+	* subscriber -- one lane per subscriber of an event type, so a slow
+	subscriber does not hold the others back while each one still sees the
+	events in order;
+	* none -- one lane per job, without any ordering.
+
+	Commands are handled for their callers, who wait for the outcome, but
+the command queue bounds how many of them are handled at once and how many
+wait. Once it is full, new commands either block until there is room, are
+rejected or push the oldest waiting one out, as its overflow says.
+
+	Commands can also be handled at worker processes, out of reach of the
+caller's GIL. Each process owns a message bus of its own, with its own units
+of work and senders, and the commands of a book are always handled by the
+same process, picked by a hash of its ISBN. The pipes to the processes are
+waited on at native threads, even when threading is monkey patched, so the
+other greenlets go on meanwhile.
+
+Classes: Subscription, EventDispatcher, CommandQueue, EventCollector,
+WorkerProcess, ProcessCommandPool
+
+Functions: name_of, partition_of, native_executor, start_worker, serve_worker,
+run_worker
+"""
+
+import zlib
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from gevent import monkey, threadpool
+
+from .errors import MessageBusBusyError
+from .messages import EVENTS, RegisterBooksCommand
+
+
+LOGGER = logging.getLogger('sample')
+
+ORDERINGS = ['isbn', 'event', 'subscriber', 'none']
+OVERFLOWS = ['block', 'reject', 'drop_oldest']
+
+# The message bus of a worker process and the events its handlers publish.
+WORKER = {}
+
+
+class Subscription(object):
+	"""A handler along with the callable handling messages for it, such as
+	one wrapped by middleware. Submitted in place of the handler, it is named
+	after it.
+
+	Methods: handle
+	"""
+	__slots__ = ('handler', 'handle', 'name')
+
+	def __init__(self, handler, handle):
+		"""Subscription's constructor.
+
+		Params
+		------
+		handler -- the subscribed handler
+		handle -- the callable handling messages for the handler
+		"""
+		self.handler = handler
+		self.handle = handle
+		self.name = type(handler).__name__
+
+
+class EventDispatcher(object):
+	"""Handles events at a bounded pool of workers. Submitting blocks while
+	the queue is full, slowing publishers down to the workers' pace.
+
+	Events published by the workers themselves, such as by a handler, are
+	handled right away when the queue is full so that it can not deadlock
+	them.
+
+	Methods: submit, stats, stop
+	"""
+	def __init__(self, workers: int = 4, queue_size: int = 1024,
+				 ordering: str = 'isbn'):
+		"""EventDispatcher's constructor. Starts the workers.
+
+		Params
+		------
+		workers: int -- the number of workers
+		queue_size: int -- the maximum number of jobs waiting to be handled
+		ordering: str -- how jobs are ordered: isbn, event, subscriber or
+		none
+		"""
+		if ordering not in ORDERINGS:
+			raise ValueError('Unknown ordering \'{0}\''.format(ordering))
+
+		self.ordering = ordering
+		self.queue_size = queue_size
+
+		self.lanes = {}
+		self.ready = deque()
+		self.cond = threading.Condition()
+		self.space = threading.Semaphore(queue_size)
+		self.local = threading.local()
+		self.stopping = False
+
+		self.depth = 0
+		self.max_depth = 0
+		self.handled = 0
+		self.errors = 0
+
+		self.workers = [
+			threading.Thread(target=self.__work, daemon=True,
+							 name='dispatch-{0}'.format(i)) \
+			for i in range(workers)
+		]
+		for worker in self.workers:
+			worker.start()
+
+	def submit(self, subscribers: list, msg):
+		"""Queues an event to be handled by its subscribers. Once stopped,
+		the event is handled at the caller instead.
+
+		Params
+		------
+		subscribers: list -- the handlers of the event, in order
+		msg -- the event to be handled
+		"""
+		name = type(msg).__name__
+
+		if self.ordering == 'isbn':
+			jobs = [((name, getattr(msg, 'isbn', None)), name, subscribers)]
+		elif self.ordering == 'event':
+			jobs = [(name, name, subscribers)]
+		elif self.ordering == 'subscriber':
+			jobs = [((name, id(s)), '{0}/{1}'.format(name, name_of(s)), [s]) \
+					for s in subscribers]
+		else:
+			jobs = [(object(), name, subscribers)]
+
+		worker = getattr(self.local, 'worker', False)
+
+		for key, label, handlers in jobs:
+			if not self.space.acquire(blocking=not worker):
+				# A worker waiting for room would wait for itself.
+				self.__handle(handlers, msg)
+				continue
+
+			with self.cond:
+				stopping = self.stopping
+
+				if not stopping:
+					lane = self.lanes.get(key)
+					if lane is None:
+						lane = self.lanes[key] = (label, deque())
+						self.ready.append(key)
+						self.cond.notify()
+
+					lane[1].append((handlers, msg))
+					self.depth += 1
+					self.max_depth = max(self.max_depth, self.depth)
+
+			if stopping:
+				self.space.release()
+				self.__handle(handlers, msg)
+
+	def stats(self) -> dict:
+		"""Returns the dispatcher's queue depth, its highest depth so far,
+		the depth of each lane by label and the number of jobs handled and
+		of handler errors."""
+		with self.cond:
+			lanes = {}
+			for label, jobs in self.lanes.values():
+				lanes[label] = lanes.get(label, 0) + len(jobs)
+
+			return {'depth': self.depth, 'max_depth': self.max_depth,
+					'lanes': lanes, 'handled': self.handled,
+					'errors': self.errors}
+
+	def stop(self):
+		"""Handles the jobs already queued and stops the workers."""
+		with self.cond:
+			self.stopping = True
+			self.cond.notify_all()
+
+		for worker in self.workers:
+			worker.join()
+
+	def __work(self):
+		"""The worker's loop, handling the oldest job of a ready lane and
+		putting the lane back at the end of the ready ones."""
+		self.local.worker = True
+
+		while True:
+			with self.cond:
+				while not self.ready and not self.stopping:
+					self.cond.wait()
+
+				if not self.ready:
+					return
+
+				key = self.ready.popleft()
+
+				# The job stays at its lane, marking it as busy.
+				handlers, msg = self.lanes[key][1][0]
+
+			errors = self.__run(handlers, msg)
+
+			with self.cond:
+				jobs = self.lanes[key][1]
+				jobs.popleft()
+
+				if jobs:
+					self.ready.append(key)
+					self.cond.notify()
+				else:
+					del self.lanes[key]
+
+				self.depth -= 1
+				self.handled += 1
+				self.errors += errors
+
+			self.space.release()
+
+	def __handle(self, handlers: list, msg):
+		"""Handles an event at the caller, counting it as handled.
+
+		Params
+		------
+		handlers: list -- the handlers of the event, in order
+		msg -- the event to be handled
+		"""
+		errors = self.__run(handlers, msg)
+
+		with self.cond:
+			self.handled += 1
+			self.errors += errors
+
+	def __run(self, handlers: list, msg) -> int:
+		"""Handles an event, going on with the next handlers when one of them
+		fails.
+
+		Params
+		------
+		handlers: list -- the handlers of the event, in order
+		msg -- the event to be handled
+
+		Returns
+		-------
+		errors: int -- the number of handlers that have failed
+		"""
+		errors = 0
+
+		for handler in handlers:
+			try:
+				handler.handle(msg)
+			except Exception as err:
+				errors += 1
+				LOGGER.error('{0} could not handle {1}: {2}' \
+							 .format(name_of(handler), msg, err))
+
+		return errors
+
+
+class CommandQueue(object):
+	"""Handles commands at a bounded pool of workers on behalf of callers
+	waiting for them, keeping a bounded queue of the commands not started
+	yet.
+
+	Commands submitted by the workers themselves, such as by a handler, are
+	handled right away so that a full queue can not deadlock them.
+
+	Methods: submit, stats, stop
+	"""
+	def __init__(self, workers: int = 4, queue_size: int = 256,
+				 overflow: str = 'block', timeout: float = None,
+				 retry_after: float = 1.0):
+		"""CommandQueue's constructor. Starts the workers.
+
+		Params
+		------
+		workers: int -- the number of workers
+		queue_size: int -- the maximum number of commands waiting
+		overflow: str -- what a full queue does with a new command: block
+		it, reject it or drop the oldest one waiting
+		timeout: float -- seconds a blocked command waits for room before
+		being rejected, None for as long as needed
+		retry_after: float -- seconds suggested to the callers of shed
+		commands before sending them again
+		"""
+		if overflow not in OVERFLOWS:
+			raise ValueError('Unknown overflow \'{0}\''.format(overflow))
+
+		self.queue_size = queue_size
+		self.overflow = overflow
+		self.timeout = timeout
+		self.retry_after = retry_after
+
+		self.jobs = deque()
+		self.lock = threading.Lock()
+		self.not_empty = threading.Condition(self.lock)
+		self.not_full = threading.Condition(self.lock)
+		self.local = threading.local()
+		self.stopping = False
+
+		self.max_depth = 0
+		self.handled = 0
+		self.rejected = 0
+		self.dropped = 0
+
+		self.workers = [
+			threading.Thread(target=self.__work, daemon=True,
+							 name='command-{0}'.format(i)) \
+			for i in range(workers)
+		]
+		for worker in self.workers:
+			worker.start()
+
+	def submit(self, call, msg):
+		"""Queues a command and waits for it to be handled. Once stopped, the
+		command is handled at the caller instead.
+
+		Params
+		------
+		call -- the callable handling the command
+		msg -- the command to be handled
+
+		Returns
+		-------
+		result -- whatever the callable has returned, raising its error if
+		it has failed
+		"""
+		if getattr(self.local, 'worker', False):
+			return call(msg)
+
+		future = Future()
+
+		with self.lock:
+			queued = self.__put((call, msg, future))
+
+		if not queued:
+			return call(msg)
+
+		return future.result()
+
+	def stats(self) -> dict:
+		"""Returns the queue's depth, its highest depth so far and the number
+		of commands handled, rejected and dropped."""
+		with self.lock:
+			return {'depth': len(self.jobs), 'max_depth': self.max_depth,
+					'handled': self.handled, 'rejected': self.rejected,
+					'dropped': self.dropped}
+
+	def stop(self):
+		"""Handles the commands already queued and stops the workers."""
+		with self.lock:
+			self.stopping = True
+			self.not_empty.notify_all()
+			self.not_full.notify_all()
+
+		for worker in self.workers:
+			worker.join()
+
+	def __put(self, job: tuple) -> bool:
+		"""Adds a job to the queue, applying the overflow when it is full.
+		Must be called with the lock held.
+
+		Params
+		------
+		job: tuple -- the callable, the command and the caller's future
+
+		Returns
+		-------
+		queued: bool -- False if the queue has been stopped instead
+		"""
+		if self.stopping:
+			return False
+
+		if len(self.jobs) >= self.queue_size:
+			if self.overflow == 'reject':
+				self.rejected += 1
+				raise self.__busy()
+
+			if self.overflow == 'drop_oldest':
+				_, _, oldest = self.jobs.popleft()
+				oldest.set_exception(self.__busy())
+				self.dropped += 1
+
+			else:
+				deadline = None if self.timeout is None \
+						   else time.monotonic() + self.timeout
+
+				while len(self.jobs) >= self.queue_size \
+					  and not self.stopping:
+					remaining = None if deadline is None \
+								else deadline - time.monotonic()
+
+					if remaining is not None and remaining <= 0:
+						self.rejected += 1
+						raise self.__busy()
+
+					self.not_full.wait(remaining)
+
+				if self.stopping:
+					return False
+
+		self.jobs.append(job)
+		self.max_depth = max(self.max_depth, len(self.jobs))
+		self.not_empty.notify()
+
+		return True
+
+	def __busy(self) -> MessageBusBusyError:
+		"""Returns the error given to the callers of shed commands."""
+		return MessageBusBusyError(
+			'The command queue is full, try again later', self.retry_after)
+
+	def __work(self):
+		"""The worker's loop, handling the oldest command waiting."""
+		self.local.worker = True
+
+		while True:
+			with self.lock:
+				while not self.jobs and not self.stopping:
+					self.not_empty.wait()
+
+				if not self.jobs:
+					return
+
+				call, msg, future = self.jobs.popleft()
+				self.not_full.notify()
+
+			if future.set_running_or_notify_cancel():
+				try:
+					future.set_result(call(msg))
+				except Exception as err:
+					future.set_exception(err)
+
+			with self.lock:
+				self.handled += 1
+
+
+class EventCollector(object):
+	"""Collects the events published at the message bus of a worker process,
+	to be sent back to the caller along with the outcome of its command.
+
+	Methods: handle
+	"""
+	def __init__(self):
+		"""EventCollector's constructor."""
+		self.events = []
+
+	def handle(self, event):
+		"""Collects an event.
+
+		Params
+		------
+		event -- the published event
+		"""
+		self.events.append(event)
+
+
+class WorkerProcess(object):
+	"""A spawned process handling the commands sent through its pipe one at
+	a time, in the order they were submitted, and answering each one with
+	the events it published and its error.
+
+	Methods: submit, stop
+	"""
+	def __init__(self, context, setup):
+		"""WorkerProcess' constructor, starting the process.
+
+		Params
+		------
+		context -- the multiprocessing context spawning the process
+		setup -- the function returning the process' message bus
+		"""
+		commands, self.commands = context.Pipe(duplex=False)
+		self.outcomes, outcomes = context.Pipe(duplex=False)
+
+		self.process = context.Process(target=serve_worker,
+									   args=(setup, commands, outcomes),
+									   daemon=True)
+		self.process.start()
+
+		commands.close()
+		outcomes.close()
+
+		self.executor = native_executor()
+
+	def submit(self, msg) -> Future:
+		"""Sends a command to the process, returning the future of its
+		outcome.
+
+		Params
+		------
+		msg -- the command to be handled
+		"""
+		return self.executor.submit(self.__call, msg)
+
+	def stop(self):
+		"""Waits for the commands submitted so far and stops the process."""
+		self.executor.submit(self.__close).result()
+		self.executor.shutdown(wait=True)
+
+	def __call(self, msg) -> tuple:
+		"""Sends a command and waits for its outcome.
+
+		Params
+		------
+		msg -- the command to be handled
+		"""
+		self.commands.send(msg)
+
+		try:
+			return self.outcomes.recv()
+		except EOFError:
+			raise ChildProcessError('The worker process {0} has exited' \
+									.format(self.process.pid))
+
+	def __close(self):
+		"""Closes the pipe of commands, which the process takes as its cue
+		to exit, and waits for it."""
+		self.commands.close()
+		self.process.join()
+		self.outcomes.close()
+
+
+class ProcessCommandPool(object):
+	"""Handles commands at worker processes on behalf of callers waiting for
+	them. Every process builds its own message bus with a setup function, so
+	it owns its units of work and senders, and handles the commands of its
+	partition one at a time, in the order they were submitted.
+
+	A command is routed to a partition by a hash of its ISBN, and a batch by
+	the hash of its first book's ISBN. A batch is never split, so it is still
+	committed by a single unit of work, every book or none of them. The
+	events published by the processes are handed back to the caller, and so
+	are their errors.
+
+	Methods: execute, stats, stop
+	"""
+	def __init__(self, setup, processes: int = 4):
+		"""ProcessCommandPool's constructor. Starts the processes, which are
+		spawned instead of forked so that no lock or thread of the caller is
+		inherited.
+
+		Params
+		------
+		setup -- a function importable by the processes, taking no arguments
+		and returning the message bus of a process with every command
+		subscribed
+		processes: int -- the number of processes and partitions
+		"""
+		context = multiprocessing.get_context('spawn')
+
+		self.partitions = [WorkerProcess(context, setup) \
+						   for _ in range(processes)]
+
+		self.lock = threading.Lock()
+		self.handled = [0] * processes
+		self.errors = 0
+
+	def execute(self, msg, publish=None):
+		"""Handles a command at the process of its partition and waits for
+		the outcome. The events it published are handed to publish and then
+		its error, if any, is raised.
+
+		Params
+		------
+		msg -- the command to be handled
+		publish -- the callable handling the events published by the
+		processes, such as the caller's message bus, None to drop them
+		"""
+		if isinstance(msg, RegisterBooksCommand) and msg.books:
+			isbn = msg.books[0].isbn
+		else:
+			isbn = getattr(msg, 'isbn', '')
+
+		partition = partition_of(isbn, len(self.partitions))
+
+		try:
+			events, err = self.partitions[partition].submit(msg).result()
+		except Exception as failure:
+			events, err = [], failure
+
+		with self.lock:
+			self.handled[partition] += 1
+			self.errors += err is not None
+
+		if publish is not None:
+			for event in events:
+				publish(event)
+
+		if err is not None:
+			raise err
+
+	def stats(self) -> dict:
+		"""Returns the commands handled by each partition and the errors so
+		far."""
+		with self.lock:
+			return {'handled': list(self.handled), 'errors': self.errors}
+
+	def stop(self):
+		"""Waits for the commands submitted so far and stops the
+		processes."""
+		for partition in self.partitions:
+			partition.stop()
+
+
+def name_of(handler) -> str:
+	"""Returns the class name of a handler, or of the handler a Subscription
+	stands for.
+
+	Params
+	------
+	handler -- the handler or subscription
+	"""
+	if isinstance(handler, Subscription):
+		return handler.name
+
+	return type(handler).__name__
+
+
+def partition_of(isbn: str, partitions: int) -> int:
+	"""Returns the partition handling the commands of a book. CRC32 is used
+	instead of Python's hash, which changes between processes.
+
+	Params
+	------
+	isbn: str -- the ISBN of the book
+	partitions: int -- the number of partitions
+	"""
+	return zlib.crc32(isbn.encode('utf8')) % partitions
+
+
+def native_executor(workers: int = 1) -> ThreadPoolExecutor:
+	"""Returns an executor whose threads are native threads even when gevent
+	has monkey patched threading. Its futures are then waited on by a
+	greenlet without blocking the others.
+
+	Params
+	------
+	workers: int -- the number of threads
+	"""
+	if monkey.is_module_patched('threading'):
+		return threadpool.ThreadPoolExecutor(workers)
+
+	return ThreadPoolExecutor(workers)
+
+
+def start_worker(setup):
+	"""Builds the message bus of a worker process, collecting the events its
+	handlers publish.
+
+	Params
+	------
+	setup -- the function returning the process' message bus
+	"""
+	bus = setup()
+	collector = EventCollector()
+
+	for event in EVENTS:
+		bus.subscribe(event, collector, inline=True)
+
+	WORKER.update(bus=bus, collector=collector)
+
+
+def serve_worker(setup, commands, outcomes):
+	"""The loop of a worker process, handling the commands received until
+	their pipe is closed.
+
+	Params
+	------
+	setup -- the function returning the process' message bus
+	commands -- the connection the commands are received from
+	outcomes -- the connection their outcomes are sent back through
+	"""
+	start_worker(setup)
+
+	while True:
+		try:
+			msg = commands.recv()
+		except EOFError:
+			return
+
+		events, err = run_worker(msg)
+
+		try:
+			outcomes.send((events, err))
+		except Exception as failure:
+			outcomes.send(([], RuntimeError(
+				'Could not send the outcome back: {0}'.format(failure))))
+
+
+def run_worker(msg) -> tuple:
+	"""Handles a command at the message bus of a worker process. Its error
+	is returned instead of raised, so that the events published before it,
+	such as by a commit followed by a failing sender, are not lost.
+
+	Params
+	------
+	msg -- the command to be handled
+
+	Returns
+	-------
+	events: list -- the events published while handling the command
+	error: Exception -- the error raised by the handler, None for none
+	"""
+	collector = WORKER['collector']
+	collector.events = []
+
+	try:
+		WORKER['bus'].handle(msg)
+	except Exception as err:
+		return collector.events, err
+
+	return collector.events, None
@@ -3,7 +3,7 @@ Errors
 ======
 	The application's source of exception classes.
 
-Classes: CommandAlreadySubscribedError
+Classes: CommandAlreadySubscribedError, MessageBusBusyError
 """
 
 class CommandAlreadySubscribedError(Exception):
@@ -13,3 +13,22 @@ class CommandAlreadySubscribedError(Exception):
 	Extends: Exception
 	"""
 	pass
+
+
+class MessageBusBusyError(Exception):
+	"""To be raised when a message bus sheds a command because its queue is
+	full. The command has not been handled and may be sent again later.
+
+	Extends: Exception
+	"""
+	def __init__(self, message: str, retry_after: float = 1.0):
+		"""MessageBusBusyError's constructor.
+
+		Params
+		------
+		message: str -- the error's message
+		retry_after: float -- seconds the caller should wait before sending
+		the command again
+		"""
+		super().__init__(message)
+		self.retry_after = retry_after
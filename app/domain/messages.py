@@ -5,16 +5,13 @@ Messages
 adapters to talk to the application and for the application to talk with driven
 adapters in a technology agnostic way.
 
-Classes: RegisterBookCommand, BookRegisteredEvent
+Classes: RegisterBookCommand, RegisterBooksCommand, BookRegisteredEvent,
+BooksRegisteredEvent
 """
 
 from collections import namedtuple
 
 
-COMMANDS = ['RegisterBookCommand']
-EVENTS = ['BookRegisteredEvent']
-
-
 """
 	These are the application's commands, or its API (Application Programming
 Interface). Simple objects that holds the necessary information for the
@@ -27,9 +24,20 @@ use cases of the application.
 RegisterBookCommand = namedtuple(
 	'RegisterBookCommand', ['isbn', 'name', 'author', 'content'])
 
+# Holds a list of RegisterBookCommand to be registered all at once.
+RegisterBooksCommand = namedtuple('RegisterBooksCommand', ['books'])
+
 
 """These are the application's events. They are used to give feedback over
 conclusion of certain events to driven adapters like event queues, logging
 services, etc...
 """
 BookRegisteredEvent = namedtuple('BookRegisteredEvent', ['isbn'])
+
+# Holds the ISBNs of every book registered by a RegisterBooksCommand.
+BooksRegisteredEvent = namedtuple('BooksRegisteredEvent', ['isbns'])
+
+
+# The classes of every command and event, looked up by message buses.
+COMMANDS = frozenset([RegisterBookCommand, RegisterBooksCommand])
+EVENTS = frozenset([BookRegisteredEvent, BooksRegisteredEvent])
@@ -0,0 +1,241 @@
+"""
+Metrics
+=======
+	The message bus measures how long each message type and each handler
+takes, counting their errors as well. Latencies are kept at histograms with
+fixed buckets, so measuring costs a bisection and a few increments, and they
+can be rendered in the Prometheus text format or taken as a dictionary to be
+published elsewhere.
+
+	A message type's latency spans its whole handling at the caller,
+including the wait at a command queue, while a handler's latency spans only
+its own handling, wherever it runs.
+
+Classes: Histogram, BusMetrics
+
+Functions: render
+"""
+
+import time
+import bisect
+import threading
+
+
+# Seconds, from a memory commit to a slow broker.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+		   1.0, 2.5, 5.0)
+
+
+class Histogram(object):
+	"""A histogram of latencies with fixed upper bounds, counting errors.
+
+	Methods: observe, error, snapshot
+	"""
+	__slots__ = ('bounds', 'counts', 'sum', 'errors', 'lock')
+
+	def __init__(self, bounds: tuple = BUCKETS):
+		"""Histogram's constructor.
+
+		Params
+		------
+		bounds: tuple -- the buckets' upper bounds in seconds, ascending
+		"""
+		self.bounds = tuple(bounds)
+		self.counts = [0] * (len(self.bounds) + 1)
+		self.sum = 0.0
+		self.errors = 0
+		self.lock = threading.Lock()
+
+	def observe(self, value: float):
+		"""Counts a latency at the first bucket whose bound holds it.
+
+		Params
+		------
+		value: float -- the latency in seconds
+		"""
+		i = bisect.bisect_left(self.bounds, value)
+
+		with self.lock:
+			self.counts[i] += 1
+			self.sum += value
+
+	def error(self):
+		"""Counts an error."""
+		with self.lock:
+			self.errors += 1
+
+	def snapshot(self) -> dict:
+		"""Returns the histogram's cumulative bucket counts, keyed by their
+		bound with '+Inf' last, along with its count, sum and errors."""
+		with self.lock:
+			counts = list(self.counts)
+			total, errors = self.sum, self.errors
+
+		buckets = {}
+		cumulative = 0
+		for bound, count in zip(self.bounds + ('+Inf',), counts):
+			cumulative += count
+			buckets[str(bound)] = cumulative
+
+		return {'buckets': buckets, 'count': cumulative, 'sum': total,
+				'errors': errors}
+
+
+class BusMetrics(object):
+	"""The metrics of a message bus, with a histogram per message type and
+	another per handler class of each message type.
+
+	Methods: instrument, gauge, snapshot, to_prometheus
+	"""
+	def __init__(self, bounds: tuple = BUCKETS, prefix: str = 'sample'):
+		"""BusMetrics' constructor.
+
+		Params
+		------
+		bounds: tuple -- the buckets' upper bounds in seconds, ascending
+		prefix: str -- the prefix of the Prometheus metrics' names
+		"""
+		self.bounds = tuple(sorted(bounds))
+		self.prefix = prefix
+
+		self.messages = {}
+		self.handlers = {}
+		self.gauges = []
+		self.lock = threading.Lock()
+
+	def instrument(self, msg: type, handler, call):
+		"""Wraps the callable handling a message to measure it, at the
+		histogram of its handler or, without one, of its message type.
+
+		Params
+		------
+		msg: type -- the command or event class being handled
+		handler -- the handler subscribed to the message, None to measure
+		the message type
+		call -- the callable handling the message, taking the message only
+
+		Returns
+		-------
+		call -- the callable measuring the handling
+		"""
+		with self.lock:
+			if handler is None:
+				key = msg.__name__
+				histogram = self.messages.get(key)
+				if histogram is None:
+					histogram = self.messages[key] = Histogram(self.bounds)
+			else:
+				key = (msg.__name__, type(handler).__name__)
+				histogram = self.handlers.get(key)
+				if histogram is None:
+					histogram = self.handlers[key] = Histogram(self.bounds)
+
+		clock = time.perf_counter
+		observe = histogram.observe
+		error = histogram.error
+
+		def measured(message):
+			start = clock()
+			try:
+				result = call(message)
+			except Exception:
+				observe(clock() - start)
+				error()
+				raise
+
+			observe(clock() - start)
+			return result
+
+		return measured
+
+	def gauge(self, name: str, description: str, read):
+		"""Adds a gauge read as the metrics are taken, such as the depth of
+		a queue.
+
+		Params
+		------
+		name: str -- the gauge's name, without the prefix
+		description: str -- what the gauge measures
+		read -- a callable returning the gauge's value
+		"""
+		with self.lock:
+			self.gauges.append((name, description, read))
+
+	def snapshot(self) -> dict:
+		"""Returns the histograms of every message type and handler, along
+		with the gauges' values."""
+		with self.lock:
+			messages = dict(self.messages)
+			handlers = dict(self.handlers)
+			gauges = list(self.gauges)
+
+		return {
+			'messages': {k: h.snapshot() for k, h in messages.items()},
+			'handlers': {'{0}/{1}'.format(*k): h.snapshot() \
+						 for k, h in handlers.items()},
+			'gauges': {name: read() for name, _, read in gauges}
+		}
+
+	def to_prometheus(self) -> str:
+		"""Returns the metrics in the Prometheus text exposition format."""
+		with self.lock:
+			messages = sorted(self.messages.items())
+			handlers = sorted(self.handlers.items())
+			gauges = list(self.gauges)
+
+		lines = []
+
+		for kind, series in (('message', [({'message': k}, h) \
+										   for k, h in messages]),
+							 ('handler', [({'message': k[0],
+											'handler': k[1]}, h) \
+										  for k, h in handlers])):
+			name = '{0}_bus_{1}'.format(self.prefix, kind)
+			snapshots = [(labels, h.snapshot()) for labels, h in series]
+
+			lines.append('# HELP {0}_handled_total Messages handled per {1}.' \
+						 .format(name, kind))
+			lines.append('# TYPE {0}_handled_total counter'.format(name))
+			for labels, snapshot in snapshots:
+				lines.append('{0}_handled_total{1} {2}'.format(
+					name, render(labels), snapshot['count']))
+
+			lines.append('# HELP {0}_errors_total Messages failed per {1}.' \
+						 .format(name, kind))
+			lines.append('# TYPE {0}_errors_total counter'.format(name))
+			for labels, snapshot in snapshots:
+				lines.append('{0}_errors_total{1} {2}'.format(
+					name, render(labels), snapshot['errors']))
+
+			lines.append('# HELP {0}_duration_seconds Seconds taken per {1}.' \
+						 .format(name, kind))
+			lines.append('# TYPE {0}_duration_seconds histogram'.format(name))
+			for labels, snapshot in snapshots:
+				for bound, count in snapshot['buckets'].items():
+					lines.append('{0}_duration_seconds_bucket{1} {2}'.format(
+						name, render(dict(labels, le=bound)), count))
+				lines.append('{0}_duration_seconds_sum{1} {2!r}'.format(
+					name, render(labels), snapshot['sum']))
+				lines.append('{0}_duration_seconds_count{1} {2}'.format(
+					name, render(labels), snapshot['count']))
+
+		for name, description, read in gauges:
+			name = '{0}_{1}'.format(self.prefix, name)
+			lines.append('# HELP {0} {1}'.format(name, description))
+			lines.append('# TYPE {0} gauge'.format(name))
+			lines.append('{0} {1}'.format(name, read()))
+
+		return '\n'.join(lines) + '\n'
+
+
+def render(labels: dict) -> str:
+	"""Renders the labels of a Prometheus sample.
+
+	Params
+	------
+	labels: dict -- the labels' values by name
+	"""
+	values = ((k, str(v).replace('\\', '\\\\').replace('"', '\\"')) \
+			  for k, v in labels.items())
+
+	return '{' + ','.join('{0}="{1}"'.format(k, v) for k, v in values) + '}'
@@ -4,13 +4,35 @@ Model
 	These are the models of the application. They should hold important data
 and methods concerning the business logic.
 
-Classes: Book
+Functions: content_digest
+
+Classes: Book, BookSummary
 """
 
+import hashlib
+
+
+def content_digest(content: str) -> str:
+	"""Returns the digest of a book's content, the same for equal contents
+	and, in practice, different for different ones.
+
+	Params
+	------
+	content: str -- the book's content
+	"""
+	return hashlib.blake2b(content.encode('utf8'), digest_size=16).hexdigest()
+
+
 class Book(object):
 	"""Model class to represent the main business aspect of this sample
 	application: books.
+
+	Its fields are kept in slots instead of a per-instance dictionary, which
+	makes books smaller and faster to build. Books are hashable, so they
+	should not be changed once used as keys.
 	"""
+	__slots__ = ('isbn', 'name', 'author', 'content')
+
 	def __init__(self, isbn: str, name: str, author: str, content: str):
 		"""Book's constructor.
 
@@ -33,10 +55,28 @@ class Book(object):
 		------
 		other -- another book for comparison
 		"""
-		return self.isbn == other.isbn \
-			   and self.name == other.name \
-			   and self.author == other.author \
-			   and self.content == other.content
+		if not isinstance(other, Book):
+			return NotImplemented
+
+		return self.astuple() == other.astuple()
+
+	def __hash__(self) -> int:
+		"""Python's magic method for hashing, consistent with equality."""
+		return hash(self.astuple())
+
+	def astuple(self) -> tuple:
+		"""Returns the book's fields as a tuple, in the order of its
+		constructor's parameters."""
+		return (self.isbn, self.name, self.author, self.content)
+
+	def asdict(self) -> dict:
+		"""Returns the book's fields as a dictionary, for serialization."""
+		return dict(zip(self.__slots__, self.astuple()))
+
+	def digest(self) -> str:
+		"""Returns the digest of the book's content, which changes whenever
+		its content does."""
+		return content_digest(self.content)
 
 	def __str__(self) -> str:
 		"""End user's representation."""
@@ -48,3 +88,59 @@ class Book(object):
 		"""Programmer's representation."""
 		return 'Book(isbn={0}, name={1}, author={2}, content={3})' \
 			   .format(self.isbn, self.name, self.author, self.content)
+
+
+class BookSummary(object):
+	"""Model class to represent a book without its content, for listings
+	where the full text of every book is not needed. Slotted and hashable like
+	Book.
+	"""
+	__slots__ = ('isbn', 'name', 'author')
+
+	def __init__(self, isbn: str, name: str, author: str):
+		"""BookSummary's constructor.
+
+		Params
+		------
+		isbn: str -- book's unique identification
+		name: str -- book's title
+		author: str -- the name of the person who wrote the book
+		"""
+		self.isbn = isbn
+		self.name = name
+		self.author = author
+
+	def __eq__(self, other) -> bool:
+		"""Python's magic method for object comparison.
+
+		Params
+		------
+		other -- another book summary for comparison
+		"""
+		if not isinstance(other, BookSummary):
+			return NotImplemented
+
+		return self.astuple() == other.astuple()
+
+	def __hash__(self) -> int:
+		"""Python's magic method for hashing, consistent with equality."""
+		return hash(self.astuple())
+
+	def astuple(self) -> tuple:
+		"""Returns the summary's fields as a tuple, in the order of its
+		constructor's parameters."""
+		return (self.isbn, self.name, self.author)
+
+	def asdict(self) -> dict:
+		"""Returns the summary's fields as a dictionary, for serialization."""
+		return dict(zip(self.__slots__, self.astuple()))
+
+	def __str__(self) -> str:
+		"""End user's representation."""
+		return ('My name is {0}, a book written by {1} with ISBN: {2}.' \
+				.format(self.name, self.author, self.isbn))
+
+	def __repr__(self) -> str:
+		"""Programmer's representation."""
+		return 'BookSummary(isbn={0}, name={1}, author={2})' \
+			   .format(self.isbn, self.name, self.author)
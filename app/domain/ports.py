@@ -7,16 +7,21 @@ the exchange of commands with driver adapters and events with driven adapters.
 It also offers interfaces for repositories to implement for database storage
 and querying.
 
-ABCs: BookRepository, BookView, UnitOfWork, UnitOfWorkManager, Sender
+ABCs: BookRepository, BookView, UnitOfWork, UnitOfWorkManager, Outbox,
+OutboxView, Sender, AsyncBookRepository, AsyncUnitOfWork,
+AsyncUnitOfWorkManager, AsyncQueueSender, Middleware
 
-Classes: MessageBus
+Classes: MessageBus, AsyncMessageBus
 """
 
 import abc
-from collections import defaultdict
+import asyncio
+import inspect
 
 from . import messages
 from .model import Book
+from .metrics import BusMetrics
+from .dispatch import EventDispatcher, CommandQueue, Subscription
 from .errors import CommandAlreadySubscribedError
 
 
@@ -33,7 +38,7 @@ class BookRepository(abc.ABC):
 	"""BookRepository is an abstract base class for repositories concerning
 	data mutation methods.
 
-	Methods: save
+	Methods: save, save_many
 	"""
 	@abc.abstractmethod
 	def save(self, book: Book):
@@ -45,16 +50,40 @@ class BookRepository(abc.ABC):
 		"""
 		pass
 
+	@abc.abstractmethod
+	def save_many(self, books: list):
+		"""Method to be implemented to save several books to the database at
+		once.
+
+		Params
+		------
+		books: list -- the books to be inserted on the application's database
+		"""
+		pass
+
 
 class BookView(abc.ABC):
 	"""BookView is an abstract base class for repositories concerning data
 	querying methods.
 
-	Methods: get_all, get_by_isbn, get_by_name, get_by_author
+	The list queries return Book instances, while their summary projections
+	return BookSummary instances without the books' content, which can then
+	be fetched separately by ISBN.
+
+	Methods: get_all, get_by_isbn, get_by_name, get_by_author,
+	get_all_summaries, get_summaries_by_name, get_summaries_by_author,
+	get_content, get_digest, search
 	"""
 	@abc.abstractmethod
-	def get_all(self) -> list:
-		"""Fetches all books from the database.
+	def get_all(self, after: str = None, limit: int = None) -> list:
+		"""Fetches all books from the database ordered by ISBN. A page of
+		them can be fetched by passing the last ISBN of the previous page and
+		the page's size.
+
+		Params
+		------
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
 
 		Returns
 		-------
@@ -77,12 +106,16 @@ class BookView(abc.ABC):
 		pass
 
 	@abc.abstractmethod
-	def get_by_name(self, name: str) -> list:
-		"""Fetches all books with a certain name from the database.
+	def get_by_name(self, name: str, after: str = None,
+					limit: int = None) -> list:
+		"""Fetches all books with a certain name from the database ordered by
+		ISBN.
 
 		Params
 		------
 		name: str -- the name of the books to be fetched
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
 
 		Returns
 		-------
@@ -91,12 +124,16 @@ class BookView(abc.ABC):
 		pass
 
 	@abc.abstractmethod
-	def get_by_author(self, author: str) -> list:
-		"""Fetches all books of a certain author from the database.
+	def get_by_author(self, author: str, after: str = None,
+					  limit: int = None) -> list:
+		"""Fetches all books of a certain author from the database ordered by
+		ISBN.
 
 		Params
 		------
 		author: str -- the name of the author from the books to be fetched
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
 
 		Returns
 		-------
@@ -104,13 +141,113 @@ class BookView(abc.ABC):
 		"""
 		pass
 
+	@abc.abstractmethod
+	def get_all_summaries(self, after: str = None, limit: int = None) -> list:
+		"""Fetches the summaries of all books like get_all, without their
+		content.
+
+		Params
+		------
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
+
+		Returns
+		-------
+		books: list -- a list of BookSummary instances of all books
+		"""
+		pass
+
+	@abc.abstractmethod
+	def get_summaries_by_name(self, name: str, after: str = None,
+							  limit: int = None) -> list:
+		"""Fetches the summaries of all books with a certain name like
+		get_by_name, without their content.
+
+		Params
+		------
+		name: str -- the name of the books to be fetched
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
+
+		Returns
+		-------
+		books: list -- a list of BookSummary instances with the chosen name
+		"""
+		pass
+
+	@abc.abstractmethod
+	def get_summaries_by_author(self, author: str, after: str = None,
+								limit: int = None) -> list:
+		"""Fetches the summaries of all books of a certain author like
+		get_by_author, without their content.
+
+		Params
+		------
+		author: str -- the name of the author from the books to be fetched
+		after: str -- only books with an ISBN greater than this are fetched
+		limit: int -- the maximum number of books to be fetched
+
+		Returns
+		-------
+		books: list -- a list of BookSummary instances written by the author
+		"""
+		pass
+
+	@abc.abstractmethod
+	def get_content(self, isbn: str) -> str:
+		"""Fetches only the content of a book by its ISBN from the database.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book whose content is to be fetched
+
+		Returns
+		-------
+		content: str -- the content of the book, None if there is no book
+		with the chosen ISBN
+		"""
+		pass
+
+	@abc.abstractmethod
+	def get_digest(self, isbn: str) -> str:
+		"""Fetches the digest of a book's content by its ISBN, without its
+		content. Books with equal contents share the same digest, which
+		changes whenever a book's content does.
+
+		Params
+		------
+		isbn: str -- the ISBN of the book whose digest is to be fetched
+
+		Returns
+		-------
+		digest: str -- the digest of the book's content, None if there is no
+		book with the chosen ISBN
+		"""
+		pass
+
+	@abc.abstractmethod
+	def search(self, query: str, limit: int = 10) -> list:
+		"""Searches the books' name, author and content for the words of a
+		query. Only books containing every word are fetched.
+
+		Params
+		------
+		query: str -- the words to be searched
+		limit: int -- the maximum number of books to be fetched
+
+		Returns
+		-------
+		books: list -- a list of BookSummary instances ranked by relevance
+		"""
+		pass
+
 
 class UnitOfWork(abc.ABC):
 	"""The unit of work is an abstract base class for the usage of the Unit of
 	Work design pattern. Used to represent a bunch of commands that are to be
 	executed together.
 
-	Methods: __enter__, __exit__, commit, rollback, books
+	Methods: __enter__, __exit__, commit, rollback, books, outbox
 	"""
 	@abc.abstractmethod
 	def __enter__(self):
@@ -148,12 +285,24 @@ class UnitOfWork(abc.ABC):
 		"""
 		pass
 
+	@property
+	def outbox(self) -> 'Outbox':
+		"""A convenient access for the outbox of the unit of work, whose
+		events are committed along with its books. Databases without an
+		outbox return None.
+
+		Returns
+		-------
+		outbox: Outbox -- an instance of an Outbox or None
+		"""
+		return None
+
 
 class UnitOfWorkManager(abc.ABC):
 	"""The unit of work manager is an abstract base class for the usage of the
 	Unit of Work design pattern. Used to instantiate new units of work.
 
-	Methods: start
+	Methods: start, atomic
 	"""
 	@abc.abstractmethod
 	def start(self) -> UnitOfWork:
@@ -165,6 +314,158 @@ class UnitOfWorkManager(abc.ABC):
 		"""
 		pass
 
+	@property
+	def atomic(self) -> bool:
+		"""Whether a commit of its units of work either stores every book or
+		none of them. Units of work spread over databases committing on
+		their own may fail after some of them have been committed.
+
+		Returns
+		-------
+		atomic: bool -- True unless a commit may be partial
+		"""
+		return True
+
+
+class Outbox(abc.ABC):
+	"""The outbox is an abstract base class for the usage of the
+	Transactional Outbox design pattern. Events added to it are stored by
+	its unit of work, committed or rolled back along with the books, until a
+	relay delivers them.
+
+	Methods: add
+	"""
+	@abc.abstractmethod
+	def add(self, event):
+		"""Stores an event to be delivered once the unit of work commits.
+
+		Params
+		------
+		event -- the event to be delivered
+		"""
+		pass
+
+
+class OutboxView(abc.ABC):
+	"""The outbox view is an abstract base class for relaying the events
+	committed to an outbox. Events stay at the outbox until acknowledged, so
+	they are delivered at least once.
+
+	Methods: pending, acknowledge
+	"""
+	@abc.abstractmethod
+	def pending(self, limit: int = 100) -> list:
+		"""Fetches the oldest events not acknowledged yet, in the order they
+		were committed.
+
+		Params
+		------
+		limit: int -- the maximum number of events to be fetched
+
+		Returns
+		-------
+		events: list -- (id, event) pairs
+		"""
+		pass
+
+	@abc.abstractmethod
+	def acknowledge(self, ids: list):
+		"""Removes delivered events from the outbox.
+
+		Params
+		------
+		ids: list -- the ids of the delivered events
+		"""
+		pass
+
+
+class AsyncBookRepository(abc.ABC):
+	"""AsyncBookRepository is the asyncio counterpart of the BookRepository.
+
+	Methods: save, save_many
+	"""
+	@abc.abstractmethod
+	async def save(self, book: Book):
+		"""Method to be implemented to save books to the database.
+
+		Params
+		------
+		book: Book -- the book to be inserted on the application's database
+		"""
+		pass
+
+	@abc.abstractmethod
+	async def save_many(self, books: list):
+		"""Method to be implemented to save several books to the database at
+		once.
+
+		Params
+		------
+		books: list -- the books to be inserted on the application's database
+		"""
+		pass
+
+
+class AsyncUnitOfWork(abc.ABC):
+	"""AsyncUnitOfWork is the asyncio counterpart of the UnitOfWork, used
+	through 'async with'. Its methods must not block the event loop.
+
+	Methods: __aenter__, __aexit__, commit, rollback, books
+	"""
+	@abc.abstractmethod
+	async def __aenter__(self):
+		"""Magic method for Python's 'async with' usage. This command is
+		executed whenever a new async with is created for a unit of work.
+		"""
+		pass
+
+	@abc.abstractmethod
+	async def __aexit__(self, type, value, traceback):
+		"""Magic method for Python's 'async with' usage. This command is
+		executed whenever an async with ends from a unit of work.
+		"""
+		pass
+
+	@abc.abstractmethod
+	async def commit(self):
+		"""Used to store all changed data at database."""
+		pass
+
+	@abc.abstractmethod
+	async def rollback(self):
+		"""Used to clear uncommited data."""
+		pass
+
+	@property
+	@abc.abstractmethod
+	def books(self) -> AsyncBookRepository:
+		"""A convenient access for an instance of an AsyncBookRepository.
+
+		Returns
+		-------
+		books: AsyncBookRepository -- an instance of an AsyncBookRepository
+		for data mutation
+		"""
+		pass
+
+
+class AsyncUnitOfWorkManager(abc.ABC):
+	"""AsyncUnitOfWorkManager is the asyncio counterpart of the
+	UnitOfWorkManager.
+
+	Methods: start
+	"""
+	@abc.abstractmethod
+	def start(self) -> AsyncUnitOfWork:
+		"""The manager creates an instance of an AsyncUnitOfWork for database
+		usage.
+
+		Returns
+		-------
+		unit_of_work: AsyncUnitOfWork -- a unit of work for database usage
+		"""
+		pass
+
 
 """
 	These are the abstract base class for senders to implement, or you could
@@ -192,44 +493,283 @@ class QueueSender(abc.ABC):
 		pass
 
 
+class AsyncQueueSender(abc.ABC):
+	"""AsyncQueueSender is the asyncio counterpart of the QueueSender.
+
+	Methods: send
+	"""
+	@abc.abstractmethod
+	async def send(self, msg):
+		"""The sender builds a message based on the event and sends it to its
+		queue.
+
+		Params
+		------
+		msg -- the msg to be sent
+		"""
+		pass
+
+
+class Middleware(abc.ABC):
+	"""Middleware wraps the handling of messages by handlers, such as to time,
+	retry or trace it. Message buses compile it into their dispatch table
+	when handlers subscribe, so dispatching costs only the middleware's own
+	calls.
+
+	Methods: wrap
+	"""
+	@abc.abstractmethod
+	def wrap(self, msg: type, handler, call):
+		"""Wraps the callable handling a message for a handler.
+
+		Params
+		------
+		msg: type -- the command or event class being handled
+		handler -- the handler subscribed to the message
+		call -- the callable handling the message, taking the message only
+
+		Returns
+		-------
+		call -- the callable handling the message in its place, or the one
+		given when there is nothing to wrap
+		"""
+		pass
+
+
 class MessageBus(object):
 	"""The message bus was developed following the Message Bus design pattern.
 	It is responsible for the execution of handlers subscribed to commands or
 	events. When a message concerning these commands and events arrives the
 	subscribed handlers are executed.
 
-	Methods: handle, subscribe
+	The handlers of each message class are compiled into a single callable
+	as they subscribe, along with the middleware around each one of them,
+	and handling a message is a lookup of its class at the dispatch table.
+
+	Commands are handled at the caller, or at a CommandQueue bounding how
+	many are handled at once if given one, the caller still waiting for
+	them. Given an EventDispatcher, events are handed over to it instead,
+	except for the handlers subscribed inline, which still run at the caller
+	before the event is handed over.
+
+	Methods: handle, subscribe, use
 	"""
-	def __init__(self):
-		"""MessageBus' constructor. Creates a list of subscribers."""
-		self.subscribers = defaultdict(list)
+	def __init__(self, dispatcher: EventDispatcher = None,
+				 middleware: list = None, commands: CommandQueue = None,
+				 metrics: BusMetrics = None):
+		"""MessageBus' constructor. Creates a list of subscribers.
+
+		Params
+		------
+		dispatcher: EventDispatcher -- the dispatcher handling events in the
+		background, None to handle them at the caller
+		middleware: list -- the middleware around every handler, the first
+		one being the outermost
+		commands: CommandQueue -- the queue handling commands, None to
+		handle them at the caller
+		metrics: BusMetrics -- the metrics measuring every message type and
+		handler, None for none
+		"""
+		self.subscribers = {}
+		self.inline = set()
+		self.table = {}
+		self.dispatcher = dispatcher
+		self.middleware = list(middleware or [])
+		self.commands = commands
+		self.metrics = metrics
+
+		if metrics is not None and dispatcher is not None:
+			metrics.gauge('event_queue_depth', 'Events waiting for workers.',
+						  lambda: dispatcher.stats()['depth'])
+		if metrics is not None and commands is not None:
+			metrics.gauge('command_queue_depth',
+						  'Commands waiting for workers.',
+						  lambda: commands.stats()['depth'])
+			def shed():
+				stats = commands.stats()
+				return stats['rejected'] + stats['dropped']
+
+			metrics.gauge('command_queue_shed',
+						  'Commands rejected or dropped so far.', shed)
 
 	def handle(self, msg):
 		"""Handles the incoming message by executing the handlers associated
-		with it.
+		with it. Messages without any handler are ignored, and commands shed
+		by a full command queue raise a MessageBusBusyError.
 
 		Params
 		------
 		msg -- a command or event instance that needs to be handled
 		"""
-		subscribers = self.subscribers[type(msg).__name__]
-		for subscriber in subscribers:
-			subscriber.handle(msg)
+		call = self.table.get(type(msg))
+		if call is not None:
+			call(msg)
 
-	def subscribe(self, msg, handler):
+	def subscribe(self, msg, handler, inline: bool = False):
 		"""Subscribes a handler to a command or event.
 
 		Params
 		------
 		msg -- the command or event class that the handler wants to subscribe
 		handler -- the handler that wants to subscribe
+		inline: bool -- whether the handler of an event runs at the caller
+		even with a dispatcher, like the invalidations of a cache that must
+		precede the caller's next read
 		"""
-		subscribers = self.subscribers[msg.__name__]
+		subscribers = self.subscribers.setdefault(msg, [])
 
 		# Commands should have a 1:1 relationship with handlers.
-		if msg.__name__ in messages.COMMANDS and len(subscribers) > 0:
+		if msg in messages.COMMANDS and len(subscribers) > 0:
 			raise CommandAlreadySubscribedError(
 				'The command \'{0}\' already has a handler subscribed to it.' \
 				.format(msg.__name__))
 
 		subscribers.append(handler)
+		if inline:
+			self.inline.add(id(handler))
+
+		self.table[msg] = self.__compile(msg)
+
+	def use(self, middleware: Middleware):
+		"""Adds middleware around every handler, inside the middleware
+		already in use, and compiles the dispatch table again.
+
+		Params
+		------
+		middleware: Middleware -- the middleware to be added
+		"""
+		self.middleware.append(middleware)
+
+		for msg in self.subscribers:
+			self.table[msg] = self.__compile(msg)
+
+	def __compile(self, msg: type):
+		"""Compiles the handlers of a message class into a single callable,
+		measured by the metrics if any.
+
+		Params
+		------
+		msg: type -- the command or event class
+
+		Returns
+		-------
+		call -- the callable handling the message
+		"""
+		call = self.__compose(msg)
+
+		if self.metrics is not None:
+			call = self.metrics.instrument(msg, None, call)
+
+		return call
+
+	def __compose(self, msg: type):
+		"""Composes the handlers of a message class, along with their
+		middleware, into a single callable.
+
+		Params
+		------
+		msg: type -- the command or event class
+
+		Returns
+		-------
+		call -- the callable handling the message
+		"""
+		background = self.dispatcher is not None \
+					 and msg not in messages.COMMANDS
+		calls = []
+		deferred = []
+
+		for handler in self.subscribers[msg]:
+			call = handler.handle
+			for middleware in reversed(self.middleware):
+				call = middleware.wrap(msg, handler, call)
+
+			if self.metrics is not None:
+				call = self.metrics.instrument(msg, handler, call)
+
+			if background and id(handler) not in self.inline:
+				deferred.append(Subscription(handler, call))
+			else:
+				calls.append(call)
+
+		if self.commands is not None and msg in messages.COMMANDS:
+			call = calls[0]
+			submit = self.commands.submit
+
+			def queue(message):
+				return submit(call, message)
+
+			return queue
+
+		if not deferred:
+			if len(calls) == 1:
+				return calls[0]
+
+			calls = tuple(calls)
+
+			def dispatch(message):
+				for call in calls:
+					call(message)
+
+			return dispatch
+
+		calls = tuple(calls)
+		submit = self.dispatcher.submit
+
+		def dispatch(message):
+			for call in calls:
+				call(message)
+			submit(deferred, message)
+
+		return dispatch
+
+
+class AsyncMessageBus(MessageBus):
+	"""The asyncio counterpart of the MessageBus, subscribing handlers the
+	same way. Handlers whose handle method is a coroutine are awaited at the
+	event loop, while the others are run at an executor so they do not block
+	it. The subscribers of a message are still executed one after the other
+	and in the order they have subscribed.
+
+	Handlers publishing events must be coroutines awaiting this bus, since
+	its handle method is a coroutine as well. Middleware is not supported.
+
+	Methods: handle, subscribe, use
+	"""
+	def __init__(self, executor=None):
+		"""AsyncMessageBus' constructor.
+
+		Params
+		------
+		executor -- the executor of synchronous handlers, the event loop's
+		default one if None
+		"""
+		super().__init__()
+		self.executor = executor
+
+	async def handle(self, msg):
+		"""Handles the incoming message by executing the handlers associated
+		with it.
+
+		Params
+		------
+		msg -- a command or event instance that needs to be handled
+		"""
+		subscribers = self.subscribers.get(type(msg), ())
+		for subscriber in subscribers:
+			if inspect.iscoroutinefunction(subscriber.handle):
+				await subscriber.handle(msg)
+			else:
+				await asyncio.get_running_loop() \
+					.run_in_executor(self.executor, subscriber.handle, msg)
+
+	def use(self, middleware: Middleware):
+		"""Refuses middleware, which wraps synchronous calls and so can not
+		wrap the handlers this bus awaits.
+
+		Params
+		------
+		middleware: Middleware -- the middleware to be added
+		"""
+		raise NotImplementedError(
+			'{0} does not support middleware'.format(type(self).__name__))
@@ -4,14 +4,28 @@ Handlers
 	The handlers are the "glue" code of the application. They are the ones
 that are associated to commands and events and know how to handle them.
 
-Classes: RegisterBookHandler, ReadBookHandler, ViewBooksHandler,
-ViewBookByIsbnHandler, ViewBooksByNameHandler, ViewBooksByAuthorHandler,
-BookRegisteredHandler
+Classes: RegisterBookHandler, GroupCommitRegisterBookHandler,
+RegisterBooksHandler, ReadBookHandler, ViewBooksHandler, ViewBookByIsbnHandler,
+ViewBooksByNameHandler, ViewBooksByAuthorHandler, BookRegisteredHandler,
+BooksRegisteredHandler, ViewCacheInvalidationHandler,
+OutboxNotificationHandler, PartitionedCommandHandler, AsyncRegisterBookHandler,
+AsyncRegisterBooksHandler, AsyncBookRegisteredHandler,
+AsyncBooksRegisteredHandler
 """
 
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+
 from .domain.model import Book
-from .domain.ports import BookView, UnitOfWorkManager, QueueSender, MessageBus
-from .domain.messages import RegisterBookCommand, BookRegisteredEvent
+from .domain.ports import BookView, UnitOfWorkManager, QueueSender, \
+						 MessageBus, AsyncUnitOfWorkManager, \
+						 AsyncQueueSender, AsyncMessageBus
+from .domain.dispatch import ProcessCommandPool
+from .domain.messages import RegisterBookCommand, RegisterBooksCommand, \
+							 BookRegisteredEvent, BooksRegisteredEvent
 
 
 class RegisterBookHandler(object):
@@ -19,16 +33,20 @@ class RegisterBookHandler(object):
 
 	Methods: handle
 	"""
-	def __init__(self, bus: MessageBus, uowm: UnitOfWorkManager):
+	def __init__(self, bus: MessageBus, uowm: UnitOfWorkManager,
+				 outbox: bool = False):
 		"""RegisterBookHandler's constructor.
 
 		Params
 		------
 		bus: MessageBus -- the message bus that can handle generated events
 		uowm: UnitOfWorkManager -- the manager used to create new units of work
+		outbox: bool -- whether the generated events are also committed to
+		the unit of work's outbox, to be relayed to the senders
 		"""
 		self.bus = bus
 		self.uowm = uowm
+		self.outbox = outbox
 
 	def handle(self, cmd: RegisterBookCommand):
 		"""Handles the registering of a new book.
@@ -38,13 +56,189 @@ class RegisterBookHandler(object):
 		cmd: RegisterBookCommand -- the expected register book command
 		"""
 		book = Book(cmd.isbn, cmd.name, cmd.author, cmd.content)
+		event = BookRegisteredEvent(book.isbn)
 
 		with self.uowm.start() as uow:
 			uow.books.save(book)
+			if self.outbox:
+				uow.outbox.add(event)
 			uow.commit()
 
+		self.bus.handle(event)
+
+
+class GroupCommitRegisterBookHandler(object):
+	"""Created to handle the command RegisterBookCommand like the
+	RegisterBookHandler, but committing the registrations of concurrent
+	callers together.
+
+	Registrations coming from every thread or greenlet are queued and a
+	single writer saves them in one unit of work, committing once the batch
+	is full or its oldest registration has waited for the maximum delay.
+	Each caller then gets its own outcome, so a duplicated ISBN only fails
+	the registration it belongs to. Units of work that are not atomic are
+	refused, since a book failing at their commit could not be told apart
+	from the books committed along with it.
+
+	Methods: handle, stop
+	"""
+	def __init__(self, bus: MessageBus, uowm: UnitOfWorkManager,
+				 batch_size: int = 64, max_delay: float = 0.001,
+				 outbox: bool = False):
+		"""GroupCommitRegisterBookHandler's constructor. Starts the writer.
+
+		Params
+		------
+		bus: MessageBus -- the message bus that can handle generated events
+		uowm: UnitOfWorkManager -- the manager used to create new units of work
+		batch_size: int -- the maximum number of registrations per commit
+		max_delay: float -- seconds a registration may wait for its commit
+		outbox: bool -- whether the generated events are also committed to
+		the unit of work's outbox, to be relayed to the senders
+		"""
+		if not uowm.atomic:
+			raise ValueError('Group commit needs units of work whose commits '
+							 'are atomic')
+
+		self.bus = bus
+		self.uowm = uowm
+		self.batch_size = batch_size
+		self.max_delay = max_delay
+		self.outbox = outbox
+
+		self.queue = queue.Queue()
+		self.writer = threading.Thread(target=self.__write, daemon=True)
+		self.writer.start()
+
+	def handle(self, cmd: RegisterBookCommand):
+		"""Handles the registering of a new book, waiting for the commit of
+		the batch it has been added to.
+
+		Params
+		------
+		cmd: RegisterBookCommand -- the expected register book command
+		"""
+		book = Book(cmd.isbn, cmd.name, cmd.author, cmd.content)
+
+		future = Future()
+		self.queue.put((book, future))
+
+		# Raises the error of this registration, if any.
+		future.result()
+
 		self.bus.handle(BookRegisteredEvent(book.isbn))
 
+	def stop(self):
+		"""Commits the registrations already queued and stops the writer."""
+		self.queue.put(None)
+		self.writer.join()
+
+	def __write(self):
+		"""The writer's loop gathering registrations into batches."""
+		while True:
+			item = self.queue.get()
+			if item is None:
+				return
+
+			batch = [item]
+			stopping = False
+			deadline = time.monotonic() + self.max_delay
+
+			# Past the deadline only the registrations already queued join.
+			while len(batch) < self.batch_size:
+				remaining = deadline - time.monotonic()
+
+				try:
+					if remaining > 0:
+						item = self.queue.get(timeout=remaining)
+					else:
+						item = self.queue.get_nowait()
+				except queue.Empty:
+					break
+
+				if item is None:
+					stopping = True
+					break
+
+				batch.append(item)
+
+			self.__commit(batch)
+
+			if stopping:
+				return
+
+	def __commit(self, batch: list):
+		"""Saves a batch of registrations in a single unit of work and
+		completes the future of each one of them.
+
+		Params
+		------
+		batch: list -- tuples of the book to be saved and its caller's future
+		"""
+		saved = []
+
+		try:
+			with self.uowm.start() as uow:
+				for book, future in batch:
+					try:
+						uow.books.save(book)
+						if self.outbox:
+							uow.outbox.add(BookRegisteredEvent(book.isbn))
+						saved.append(future)
+					except Exception as err:
+						future.set_exception(err)
+
+				uow.commit()
+
+		except Exception as err:
+			for _, future in batch:
+				if not future.done():
+					future.set_exception(err)
+			return
+
+		for future in saved:
+			future.set_result(None)
+
+
+class RegisterBooksHandler(object):
+	"""Created to handle the command RegisterBooksCommand.
+
+	Methods: handle
+	"""
+	def __init__(self, bus: MessageBus, uowm: UnitOfWorkManager,
+				 outbox: bool = False):
+		"""RegisterBooksHandler's constructor.
+
+		Params
+		------
+		bus: MessageBus -- the message bus that can handle generated events
+		uowm: UnitOfWorkManager -- the manager used to create new units of work
+		outbox: bool -- whether the generated events are also committed to
+		the unit of work's outbox, to be relayed to the senders
+		"""
+		self.bus = bus
+		self.uowm = uowm
+		self.outbox = outbox
+
+	def handle(self, cmd: RegisterBooksCommand):
+		"""Handles the registering of a batch of new books with a single unit
+		of work. Either every book is registered or none of them is.
+
+		Params
+		------
+		cmd: RegisterBooksCommand -- the expected register books command
+		"""
+		books = [Book(c.isbn, c.name, c.author, c.content) for c in cmd.books]
+		event = BooksRegisteredEvent(tuple(b.isbn for b in books))
+
+		with self.uowm.start() as uow:
+			uow.books.save_many(books)
+			if self.outbox:
+				uow.outbox.add(event)
+			uow.commit()
+
+		self.bus.handle(event)
+
 
 class BookRegisteredHandler(object):
 	"""Created to handle the event BookRegisteredEvent.
@@ -72,3 +266,250 @@ class BookRegisteredHandler(object):
 		book = self.view.get_by_isbn(event.isbn)
 		self.sender.send('{0} has been successfully registered.' \
 						 .format(book.__repr__()))
+
+
+class BooksRegisteredHandler(object):
+	"""Created to handle the event BooksRegisteredEvent.
+
+	Methods: handle
+	"""
+	def __init__(self, sender: QueueSender):
+		"""BooksRegisteredHandler's constructor.
+
+		Params
+		------
+		sender: QueueSender -- the sender to dispatch messages
+		"""
+		self.sender = sender
+
+	def handle(self, event: BooksRegisteredEvent):
+		"""Handles sending the books registered event with a single message
+		for the whole batch.
+
+		Params
+		------
+		event: BooksRegisteredEvent -- the expected books registered event
+		"""
+		self.sender.send('{0} books have been successfully registered: {1}.' \
+						 .format(len(event.isbns), ', '.join(event.isbns)))
+
+
+class ViewCacheInvalidationHandler(object):
+	"""Created to handle the events BookRegisteredEvent and
+	BooksRegisteredEvent by invalidating a cached view. Must be subscribed
+	before any handler that reads the registered books through that view.
+
+	Methods: handle
+	"""
+	def __init__(self, view: BookView):
+		"""ViewCacheInvalidationHandler's constructor.
+
+		Params
+		------
+		view: CachedBookView -- the cached view to invalidate
+		"""
+		self.view = view
+
+	def handle(self, event):
+		"""Handles invalidating the entries of the registered books.
+
+		Params
+		------
+		event -- the expected book or books registered event
+		"""
+		if isinstance(event, BooksRegisteredEvent):
+			self.view.invalidate(event.isbns)
+		else:
+			self.view.invalidate((event.isbn,))
+
+
+class OutboxNotificationHandler(object):
+	"""Created to handle the events BookRegisteredEvent and
+	BooksRegisteredEvent by waking an OutboxRelay up, so that the events
+	just committed to the outbox are relayed without waiting for its next
+	drain.
+
+	Methods: handle
+	"""
+	def __init__(self, relay):
+		"""OutboxNotificationHandler's constructor.
+
+		Params
+		------
+		relay: OutboxRelay -- the relay draining the outbox
+		"""
+		self.relay = relay
+
+	def handle(self, event):
+		"""Handles waking the relay up.
+
+		Params
+		------
+		event -- the expected book or books registered event
+		"""
+		self.relay.notify()
+
+
+class PartitionedCommandHandler(object):
+	"""Created to handle the commands RegisterBookCommand and
+	RegisterBooksCommand at the worker processes of a ProcessCommandPool,
+	whose own handlers register the books and send them. The events they
+	publish are handled again at this process' bus, such as by cache
+	invalidations.
+
+	Methods: handle
+	"""
+	def __init__(self, bus: MessageBus, pool: ProcessCommandPool):
+		"""PartitionedCommandHandler's constructor.
+
+		Params
+		------
+		bus: MessageBus -- the message bus that can handle published events
+		pool: ProcessCommandPool -- the pool of worker processes
+		"""
+		self.bus = bus
+		self.pool = pool
+
+	def handle(self, cmd):
+		"""Handles a command at the worker process of its partition,
+		waiting for the outcome.
+
+		Params
+		------
+		cmd -- the expected register book or books command
+		"""
+		self.pool.execute(cmd, self.bus.handle)
+
+
+class AsyncRegisterBookHandler(object):
+	"""Created to handle the command RegisterBookCommand at an
+	AsyncMessageBus.
+
+	Methods: handle
+	"""
+	def __init__(self, bus: AsyncMessageBus, uowm: AsyncUnitOfWorkManager):
+		"""AsyncRegisterBookHandler's constructor.
+
+		Params
+		------
+		bus: AsyncMessageBus -- the message bus that can handle generated
+		events
+		uowm: AsyncUnitOfWorkManager -- the manager used to create new units
+		of work
+		"""
+		self.bus = bus
+		self.uowm = uowm
+
+	async def handle(self, cmd: RegisterBookCommand):
+		"""Handles the registering of a new book.
+
+		Params
+		------
+		cmd: RegisterBookCommand -- the expected register book command
+		"""
+		book = Book(cmd.isbn, cmd.name, cmd.author, cmd.content)
+
+		async with self.uowm.start() as uow:
+			await uow.books.save(book)
+			await uow.commit()
+
+		await self.bus.handle(BookRegisteredEvent(book.isbn))
+
+
+class AsyncRegisterBooksHandler(object):
+	"""Created to handle the command RegisterBooksCommand at an
+	AsyncMessageBus.
+
+	Methods: handle
+	"""
+	def __init__(self, bus: AsyncMessageBus, uowm: AsyncUnitOfWorkManager):
+		"""AsyncRegisterBooksHandler's constructor.
+
+		Params
+		------
+		bus: AsyncMessageBus -- the message bus that can handle generated
+		events
+		uowm: AsyncUnitOfWorkManager -- the manager used to create new units
+		of work
+		"""
+		self.bus = bus
+		self.uowm = uowm
+
+	async def handle(self, cmd: RegisterBooksCommand):
+		"""Handles the registering of a batch of new books with a single unit
+		of work. Either every book is registered or none of them is.
+
+		Params
+		------
+		cmd: RegisterBooksCommand -- the expected register books command
+		"""
+		books = [Book(c.isbn, c.name, c.author, c.content) for c in cmd.books]
+
+		async with self.uowm.start() as uow:
+			await uow.books.save_many(books)
+			await uow.commit()
+
+		await self.bus.handle(
+			BooksRegisteredEvent(tuple(b.isbn for b in books)))
+
+
+class AsyncBookRegisteredHandler(object):
+	"""Created to handle the event BookRegisteredEvent at an
+	AsyncMessageBus. The book is read at an executor.
+
+	Methods: handle
+	"""
+	def __init__(self, view: BookView, sender: AsyncQueueSender,
+				 executor=None):
+		"""AsyncBookRegisteredHandler's constructor.
+
+		Params
+		------
+		view: BookView -- the view used to query the database
+		sender: AsyncQueueSender -- the sender to dispatch messages
+		executor -- the executor running the queries, the event loop's
+		default one if None
+		"""
+		self.view = view
+		self.sender = sender
+		self.executor = executor
+
+	async def handle(self, event: BookRegisteredEvent):
+		"""Handles sending the book registered event.
+
+		Params
+		------
+		event: BookRegisteredEvent -- the expected book registered event
+		"""
+		book = await asyncio.get_running_loop() \
+			.run_in_executor(self.executor, self.view.get_by_isbn, event.isbn)
+		await self.sender.send('{0} has been successfully registered.' \
+							   .format(book.__repr__()))
+
+
+class AsyncBooksRegisteredHandler(object):
+	"""Created to handle the event BooksRegisteredEvent at an
+	AsyncMessageBus.
+
+	Methods: handle
+	"""
+	def __init__(self, sender: AsyncQueueSender):
+		"""AsyncBooksRegisteredHandler's constructor.
+
+		Params
+		------
+		sender: AsyncQueueSender -- the sender to dispatch messages
+		"""
+		self.sender = sender
+
+	async def handle(self, event: BooksRegisteredEvent):
+		"""Handles sending the books registered event with a single message
+		for the whole batch.
+
+		Params
+		------
+		event: BooksRegisteredEvent -- the expected books registered event
+		"""
+		await self.sender.send(
+			'{0} books have been successfully registered: {1}.' \
+			.format(len(event.isbns), ', '.join(event.isbns)))
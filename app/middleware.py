@@ -0,0 +1,162 @@
+"""
+Middleware
+==========
+	The middleware wraps the handlers subscribed to the message bus, adding
+cross-cutting behaviour such as timing, retries and tracing without changing
+the handlers themselves.
+
+Classes: TimingMiddleware, RetryMiddleware, TracingMiddleware
+"""
+
+import time
+import logging
+import threading
+import itertools
+
+from .domain.ports import Middleware
+from .domain.messages import EVENTS
+
+
+LOGGER = logging.getLogger('sample')
+
+# Errors that may not happen again, such as lost connections and timeouts.
+TRANSIENT = (OSError,)
+
+
+class TimingMiddleware(Middleware):
+	"""Times every handling of a message by a handler, keeping the count,
+	total and maximum seconds per message class and handler.
+
+	Methods: wrap, stats
+	"""
+	def __init__(self):
+		"""TimingMiddleware's constructor."""
+		self.timings = {}
+		self.lock = threading.Lock()
+
+	def wrap(self, msg: type, handler, call):
+		"""View @app.domain.ports.Middleware."""
+		key = '{0}/{1}'.format(msg.__name__, type(handler).__name__)
+		lock = self.lock
+		timing = self.timings.setdefault(key, [0, 0.0, 0.0])
+		clock = time.perf_counter
+
+		def timed(message):
+			start = clock()
+			try:
+				call(message)
+			finally:
+				elapsed = clock() - start
+				with lock:
+					timing[0] += 1
+					timing[1] += elapsed
+					if elapsed > timing[2]:
+						timing[2] = elapsed
+
+		return timed
+
+	def stats(self) -> dict:
+		"""Returns the count, total and maximum seconds of the handlings by
+		message class and handler."""
+		with self.lock:
+			return {k: {'count': c, 'total': t, 'max': m} \
+					for k, (c, t, m) in self.timings.items()}
+
+
+class RetryMiddleware(Middleware):
+	"""Handles a message again when its handler fails with a transient
+	error, waiting a delay that doubles at every attempt. The last error is
+	raised once the attempts are over.
+
+	Only the handlers of events are retried by default, since handling a
+	command again, such as registering a book whose first attempt got as far
+	as saving it, would not do the same as handling it once.
+
+	Methods: wrap
+	"""
+	def __init__(self, attempts: int = 3, delay: float = 0.1,
+				 errors: tuple = TRANSIENT, messages: frozenset = EVENTS):
+		"""RetryMiddleware's constructor.
+
+		Params
+		------
+		attempts: int -- the maximum number of attempts per message
+		delay: float -- seconds to wait before the first retry
+		errors: tuple -- the exception classes worth a retry
+		messages: frozenset -- the message classes whose handlers are retried
+		"""
+		self.attempts = attempts
+		self.delay = delay
+		self.errors = errors
+		self.messages = messages
+
+	def wrap(self, msg: type, handler, call):
+		"""View @app.domain.ports.Middleware."""
+		if self.attempts <= 1 or msg not in self.messages:
+			return call
+
+		attempts = self.attempts
+		delay = self.delay
+		errors = self.errors
+		name = type(handler).__name__
+
+		def retry(message, err):
+			wait = delay
+			for attempt in range(2, attempts + 1):
+				LOGGER.warning('{0} failed to handle {1} ({2}), retrying in'
+							   ' {3:.3f}s'.format(name, message, err, wait))
+				time.sleep(wait)
+				wait *= 2
+
+				try:
+					return call(message)
+				except errors as error:
+					if attempt == attempts:
+						raise
+					err = error
+
+		# The first attempt takes no more than a try block.
+		def retried(message):
+			try:
+				return call(message)
+			except errors as err:
+				return retry(message, err)
+
+		return retried
+
+
+class TracingMiddleware(Middleware):
+	"""Logs every handling of a message by a handler at the debug level,
+	tagged with a trace number, along with its duration or error. Handlers
+	are left unwrapped when the logger is not at the debug level as they
+	subscribe.
+
+	Methods: wrap
+	"""
+	def __init__(self):
+		"""TracingMiddleware's constructor."""
+		self.traces = itertools.count(1)
+
+	def wrap(self, msg: type, handler, call):
+		"""View @app.domain.ports.Middleware."""
+		if not LOGGER.isEnabledFor(logging.DEBUG):
+			return call
+
+		traces = self.traces
+		name = type(handler).__name__
+
+		def traced(message):
+			trace = next(traces)
+			LOGGER.debug('[{0}] {1} handling {2}'.format(trace, name, message))
+
+			start = time.perf_counter()
+			try:
+				call(message)
+			except Exception as err:
+				LOGGER.debug('[{0}] {1} failed: {2}'.format(trace, name, err))
+				raise
+
+			LOGGER.debug('[{0}] {1} done in {2:.6f}s' \
+						 .format(trace, name, time.perf_counter() - start))
+
+		return traced
@@ -0,0 +1,142 @@
+"""
+Outbox
+======
+	Events committed to the outbox along with the books are delivered to the
+senders by a relay in the background, so a slow or unavailable broker never
+holds a registration back nor loses its event.
+
+	The relay drains the outbox in batches and in commit order, removing the
+events only once delivered. When a delivery fails the relay waits before
+trying that event again, twice as long at every failure in a row, so events
+are delivered at least once and a receiver may see one again.
+
+Classes: OutboxRelay
+"""
+
+import logging
+import threading
+
+from .domain.ports import OutboxView
+
+
+LOGGER = logging.getLogger('sample')
+
+
+class OutboxRelay(object):
+	"""Delivers the events of an outbox in the background, handing them to
+	a publish callable such as a message bus with the senders' handlers
+	subscribed.
+
+	Methods: start, drain, notify, stats, stop
+	"""
+	def __init__(self, outbox: OutboxView, publish, batch_size: int = 100,
+				 interval: float = 0.5, retry_delay: float = 1.0,
+				 max_delay: float = 30.0):
+		"""OutboxRelay's constructor.
+
+		Params
+		------
+		outbox: OutboxView -- the view of the outbox to be drained
+		publish -- the callable delivering an event, raising if it fails
+		batch_size: int -- the maximum number of events fetched at once
+		interval: float -- seconds between drains of an empty outbox
+		retry_delay: float -- seconds to wait after a first failure
+		max_delay: float -- the maximum seconds to wait between failures
+		"""
+		self.outbox = outbox
+		self.publish = publish
+		self.batch_size = batch_size
+		self.interval = interval
+		self.retry_delay = retry_delay
+		self.max_delay = max_delay
+
+		self.wake = threading.Event()
+		self.stopping = threading.Event()
+		self.lock = threading.Lock()
+		self.worker = None
+
+		self.delivered = 0
+		self.failures = 0
+
+	def start(self):
+		"""Starts draining the outbox in the background."""
+		self.stopping.clear()
+		self.worker = threading.Thread(target=self.__run, daemon=True,
+									   name='outbox-relay')
+		self.worker.start()
+
+	def drain(self) -> int:
+		"""Delivers the pending events until the outbox is empty, raising
+		the error of the first event that fails. The events delivered before
+		it are acknowledged all the same.
+
+		Returns
+		-------
+		delivered: int -- the number of events delivered
+		"""
+		delivered = 0
+
+		with self.lock:
+			while True:
+				batch = self.outbox.pending(self.batch_size)
+				done = []
+
+				try:
+					for i, event in batch:
+						self.publish(event)
+						done.append(i)
+				finally:
+					if done:
+						self.outbox.acknowledge(done)
+						delivered += len(done)
+						self.delivered += len(done)
+
+				if len(batch) < self.batch_size:
+					return delivered
+
+	def notify(self):
+		"""Wakes the relay up to drain the outbox right away, such as after
+		a commit."""
+		self.wake.set()
+
+	def stats(self) -> dict:
+		"""Returns the number of events delivered and of failed drains so
+		far."""
+		return {'delivered': self.delivered, 'failures': self.failures}
+
+	def stop(self):
+		"""Stops the relay, draining the outbox one last time. Events left
+		undelivered are relayed once a relay starts again."""
+		self.stopping.set()
+		self.wake.set()
+		if self.worker is not None:
+			self.worker.join()
+			self.worker = None
+
+	def __run(self):
+		"""The relay's loop, backing off while deliveries fail."""
+		delay = self.retry_delay
+
+		while True:
+			stopping = self.stopping.is_set()
+
+			try:
+				self.drain()
+			except Exception as err:
+				self.failures += 1
+				LOGGER.warning('Could not relay an event ({0}), retrying in'
+							   ' {1:.2f}s'.format(err, delay))
+
+				# New commits do not cut the wait short, only stopping does.
+				if not stopping:
+					self.stopping.wait(delay)
+					delay = min(delay * 2, self.max_delay)
+					continue
+			else:
+				delay = self.retry_delay
+
+			if stopping:
+				return
+
+			self.wake.wait(self.interval)
+			self.wake.clear()
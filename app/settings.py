@@ -9,7 +9,8 @@ Decorators: identify
 ABCs: Builder
 
 Classes: Director, MqttInterfaceBuilder, MemoryDatabaseBuilder,
-ApplicationConfig
+SharedMemoryDatabaseBuilder, SqliteDatabaseBuilder,
+SqliteShardedDatabaseBuilder, TieredDatabaseBuilder, ApplicationConfig
 """
 
 import os
@@ -22,6 +23,8 @@ import importlib
 from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
+from .adapters.codecs import THRESHOLD
+
 
 def identify(tech: str, ctx: str):
 	"""Adds two attributes to a class: (1) the class technology (mqtt, sqlite,
@@ -94,12 +97,12 @@ class Director(object):
 		-------
 		adapter -- the built driver adapter
 		"""
-		importlib.import_module('app.adapters.{0}'.format(self.builder.name))
+		# Technologies such as 'sqlite-sharded' live in modules such as
+		# 'sqlite_sharded'.
+		module = 'app.adapters.{0}'.format(self.builder.name.replace('-', '_'))
+		importlib.import_module(module)
 
-		classes = inspect.getmembers(
-			sys.modules['app.adapters.{0}'.format(self.builder.name)],
-			inspect.isclass
-		)
+		classes = inspect.getmembers(sys.modules[module], inspect.isclass)
 
 		adapter = next(
 			cls_ for cls_ in classes \
@@ -116,7 +119,8 @@ class Director(object):
 class MemoryDatabaseBuilder(Builder):
 	"""Builder class for setting up a memory database driven adapter.
 
-	Methods: __call__
+	Methods: __call__, __get_stripes, __get_codec, __get_codec_threshold,
+	__get_path, __get_sync, __get_snapshot_interval
 	"""
 	def __init__(self):
 		"""MemoryDatabaseBuilder's constructor."""
@@ -124,14 +128,122 @@ class MemoryDatabaseBuilder(Builder):
 
 	def __call__(self) -> dict:
 		"""View @settings.Builder"""
-		return {}
+		return {
+			'stripes': self.__get_stripes(),
+			'codec': self.__get_codec(),
+			'codec_threshold': self.__get_codec_threshold(),
+			'path': self.__get_path(),
+			'sync': self.__get_sync(),
+			'snapshot_interval': self.__get_snapshot_interval()
+		}
+
+	def __get_stripes(self) -> int:
+		"""Returns the number of stripes the memory store is split into."""
+		try:
+			return max(1, int(os.getenv('MEMORY_DRIVER_STRIPES')))
+		except:
+			return 16
+
+	def __get_codec(self) -> str:
+		"""Returns the codec used to compress book content, if any."""
+		return os.getenv('MEMORY_DRIVER_CODEC', '').lower() or None
+
+	def __get_codec_threshold(self) -> int:
+		"""Returns the size in bytes below which content is stored raw."""
+		try:
+			return max(0, int(os.getenv('MEMORY_DRIVER_CODEC_THRESHOLD')))
+		except:
+			return THRESHOLD
+
+	def __get_path(self) -> str:
+		"""Returns the path to persist books at, None keeping them in memory
+		only."""
+		return os.getenv('MEMORY_DRIVER_PATH') or None
+
+	def __get_sync(self) -> bool:
+		"""Returns whether every commit is flushed to disk with fsync."""
+		return os.getenv('MEMORY_DRIVER_SYNC', 'false').lower() == 'true'
+
+	def __get_snapshot_interval(self) -> float:
+		"""Returns the number of seconds between snapshots, 0 for none but
+		the ones at start and stop."""
+		try:
+			return max(0, float(os.getenv('MEMORY_DRIVER_SNAPSHOT_INTERVAL')))
+		except:
+			return 300.0
+
+
+@identify('shared-memory', 'database')
+class SharedMemoryDatabaseBuilder(Builder):
+	"""Builder class for setting up a shared memory database driven adapter.
+
+	Methods: __call__, __get_path, __get_stripes, __get_codec,
+	__get_codec_threshold, __get_sync, __get_authkey, __get_timeout
+	"""
+	def __init__(self):
+		"""SharedMemoryDatabaseBuilder's constructor."""
+		pass
+
+	def __call__(self) -> dict:
+		"""View @settings.Builder"""
+		return {
+			'path': self.__get_path(),
+			'stripes': self.__get_stripes(),
+			'codec': self.__get_codec(),
+			'codec_threshold': self.__get_codec_threshold(),
+			'sync': self.__get_sync(),
+			'authkey': self.__get_authkey(),
+			'timeout': self.__get_timeout()
+		}
+
+	def __get_path(self) -> str:
+		"""Returns the path of the file shared by the processes."""
+		return os.getenv('SHARED_MEMORY_DRIVER_PATH', 'books.shm')
+
+	def __get_stripes(self) -> int:
+		"""Returns the number of stripes each process' index is split into."""
+		try:
+			return max(1, int(os.getenv('SHARED_MEMORY_DRIVER_STRIPES')))
+		except:
+			return 16
+
+	def __get_codec(self) -> str:
+		"""Returns the codec used to compress book content, if any."""
+		return os.getenv('SHARED_MEMORY_DRIVER_CODEC', '').lower() or None
+
+	def __get_codec_threshold(self) -> int:
+		"""Returns the size in bytes below which content is stored raw."""
+		try:
+			return max(0, int(os.getenv(
+				'SHARED_MEMORY_DRIVER_CODEC_THRESHOLD')))
+		except:
+			return THRESHOLD
+
+	def __get_sync(self) -> bool:
+		"""Returns whether every commit is flushed to disk with fsync."""
+		return os.getenv('SHARED_MEMORY_DRIVER_SYNC', 'false') \
+				 .lower() == 'true'
+
+	def __get_authkey(self) -> str:
+		"""Returns the key processes authenticate to the owner with, if
+		any."""
+		return os.getenv('SHARED_MEMORY_DRIVER_AUTHKEY') or None
+
+	def __get_timeout(self) -> float:
+		"""Returns the seconds a process waits for the owner to listen."""
+		try:
+			return max(0, float(os.getenv('SHARED_MEMORY_DRIVER_TIMEOUT')))
+		except:
+			return 5.0
 
 
 @identify('sqlite', 'database')
 class SqliteDatabaseBuilder(Builder):
 	"""Builder class for setting up a SQLite database driven adapter.
 
-	Methods: __call__, __get_location
+	Methods: __call__, __get_location, __get_pool_size, __get_pool_timeout,
+	__get_journal_mode, __get_synchronous, __get_cache_size, __get_mmap_size,
+	__get_busy_timeout, __get_codec, __get_codec_threshold
 	"""
 	def __init__(self):
 		"""SqliteDatabaseBuilder's constructor."""
@@ -139,19 +251,163 @@ class SqliteDatabaseBuilder(Builder):
 
 	def __call__(self) -> dict:
 		"""View @settings.Builder"""
-		return {'location': self.__get_location()}
+		return {
+			'location': self.__get_location(),
+			'pool_size': self.__get_pool_size(),
+			'pool_timeout': self.__get_pool_timeout(),
+			'journal_mode': self.__get_journal_mode(),
+			'synchronous': self.__get_synchronous(),
+			'cache_size': self.__get_cache_size(),
+			'mmap_size': self.__get_mmap_size(),
+			'busy_timeout': self.__get_busy_timeout(),
+			'codec': self.__get_codec(),
+			'codec_threshold': self.__get_codec_threshold()
+		}
 
 	def __get_location(self) -> str:
 		"""Returns location to store SQLite database."""
 		return os.getenv('SQLITE_DRIVER_LOCATION', 'db.sqlite')
 
+	def __get_pool_size(self) -> int:
+		"""Returns the maximum number of pooled SQLite connections."""
+		try:
+			return max(1, int(os.getenv('SQLITE_DRIVER_POOL_SIZE')))
+		except:
+			return 5
+
+	def __get_pool_timeout(self) -> float:
+		"""Returns how many seconds to wait for a pooled connection."""
+		try:
+			return float(os.getenv('SQLITE_DRIVER_POOL_TIMEOUT'))
+		except:
+			return 5.0
+
+	def __get_journal_mode(self) -> str:
+		"""Returns the SQLite journal mode, WAL by default."""
+		journal_mode = os.getenv('SQLITE_DRIVER_JOURNAL_MODE', 'wal').lower()
+
+		if journal_mode not in ('wal', 'delete', 'truncate', 'persist'):
+			journal_mode = 'wal'
+
+		return journal_mode
+
+	def __get_synchronous(self) -> str:
+		"""Returns the SQLite synchronous PRAGMA value."""
+		synchronous = os.getenv('SQLITE_DRIVER_SYNCHRONOUS', 'normal').lower()
+
+		if synchronous not in ('off', 'normal', 'full', 'extra'):
+			synchronous = 'normal'
+
+		return synchronous
+
+	def __get_cache_size(self) -> int:
+		"""Returns the SQLite cache_size PRAGMA value, in pages when positive
+		or in KiB when negative."""
+		try:
+			return int(os.getenv('SQLITE_DRIVER_CACHE_SIZE'))
+		except:
+			return -2000
+
+	def __get_mmap_size(self) -> int:
+		"""Returns the maximum number of bytes SQLite may memory map."""
+		try:
+			return max(0, int(os.getenv('SQLITE_DRIVER_MMAP_SIZE')))
+		except:
+			return 0
+
+	def __get_busy_timeout(self) -> int:
+		"""Returns how many milliseconds SQLite waits on a locked database."""
+		try:
+			return max(0, int(os.getenv('SQLITE_DRIVER_BUSY_TIMEOUT')))
+		except:
+			return 5000
+
+	def __get_codec(self) -> str:
+		"""Returns the codec used to compress book content, if any."""
+		return os.getenv('SQLITE_DRIVER_CODEC', '').lower() or None
+
+	def __get_codec_threshold(self) -> int:
+		"""Returns the size in bytes below which content is stored raw."""
+		try:
+			return max(0, int(os.getenv('SQLITE_DRIVER_CODEC_THRESHOLD')))
+		except:
+			return THRESHOLD
+
+
+@identify('sqlite-sharded', 'database')
+class SqliteShardedDatabaseBuilder(Builder):
+	"""Builder class for setting up a sharded SQLite database driven adapter.
+	Each shard is tuned through the SQLITE_DRIVER_* settings.
+
+	Methods: __call__, __get_location, __get_shards
+	"""
+	def __init__(self):
+		"""SqliteShardedDatabaseBuilder's constructor."""
+		pass
+
+	def __call__(self) -> dict:
+		"""View @settings.Builder"""
+		cfg = SqliteDatabaseBuilder()()
+		cfg.update({
+			'location': self.__get_location(),
+			'shards': self.__get_shards()
+		})
+
+		return cfg
+
+	def __get_location(self) -> str:
+		"""Returns location to store the shards, '{0}' being replaced by each
+		shard's index."""
+		return os.getenv('SQLITE_SHARDED_DRIVER_LOCATION', 'db-{0}.sqlite')
+
+	def __get_shards(self) -> int:
+		"""Returns the number of SQLite databases to spread books across."""
+		try:
+			return max(1, int(os.getenv('SQLITE_SHARDED_DRIVER_SHARDS')))
+		except:
+			return 4
+
+
+@identify('tiered', 'database')
+class TieredDatabaseBuilder(Builder):
+	"""Builder class for setting up a tiered database driven adapter. Its
+	cold tier is tuned through the SQLITE_DRIVER_* settings.
+
+	Methods: __call__, __get_budget, __get_eviction
+	"""
+	def __init__(self):
+		"""TieredDatabaseBuilder's constructor."""
+		pass
+
+	def __call__(self) -> dict:
+		"""View @settings.Builder"""
+		cfg = SqliteDatabaseBuilder()()
+		cfg.update({
+			'budget': self.__get_budget(),
+			'eviction': self.__get_eviction()
+		})
+
+		return cfg
+
+	def __get_budget(self) -> int:
+		"""Returns the maximum bytes of memory taken by the hot tier."""
+		try:
+			return max(0, int(os.getenv('TIERED_DRIVER_BUDGET')))
+		except:
+			return 64 * 2 ** 20
+
+	def __get_eviction(self) -> str:
+		"""Returns the hot tier's eviction policy, lru or lfu."""
+		eviction = os.getenv('TIERED_DRIVER_EVICTION', 'lru').lower()
+		return eviction if eviction in ('lru', 'lfu') else 'lru'
+
 
 @identify('mqtt', 'interface')
 class MqttInterfaceBuilder(Builder):
 	"""Builder class for setting up a MQTT driver adapter.
 
 	Methods: __call__, __get_topic, __get_host, __get_port, __get_username,
-	__get_password
+	__get_password, __get_metrics_topic, __get_metrics_interval
 	"""
 	def __init__(self):
 		"""MqttInterfaceBuilder's constructor."""
@@ -164,7 +420,9 @@ class MqttInterfaceBuilder(Builder):
 			'host': self.__get_host(),
 			'port': self.__get_port(),
 			'username': self.__get_username(),
-			'password': self.__get_password()
+			'password': self.__get_password(),
+			'metrics_topic': self.__get_metrics_topic(),
+			'metrics_interval': self.__get_metrics_interval()
 		}
 
 	def __get_topic(self) -> str:
@@ -190,6 +448,18 @@ class MqttInterfaceBuilder(Builder):
 		"""Returns password to use on MQTT connection."""
 		return os.getenv('MQTT_DRIVER_PASSWORD')
 
+	def __get_metrics_topic(self) -> str:
+		"""Returns MQTT topic to publish the message bus' metrics to."""
+		return os.getenv('MQTT_DRIVER_METRICS_TOPIC', 'app/metrics')
+
+	def __get_metrics_interval(self) -> float:
+		"""Returns seconds between publishes of the message bus' metrics, 0
+		for none."""
+		try:
+			return max(0, float(os.getenv('MQTT_DRIVER_METRICS_INTERVAL')))
+		except:
+			return 60.0
+
 
 @identify('flask', 'interface')
 class FlaskInterfaceBuilder(Builder):
@@ -268,7 +538,14 @@ class MqttSenderBuilder(Builder):
 class ApplicationConfig(object):
 	"""Configuration class for setting up the application.
 	
-	Methods: logger_level, database, interfaces, senders
+	Methods: logger_level, database, interfaces, senders, group_commit,
+	group_commit_size, group_commit_delay, view_cache, view_cache_size,
+	view_cache_ttl, event_dispatch, event_workers, event_queue_size,
+	event_ordering, event_metrics_interval, bus_middleware,
+	bus_retry_attempts, bus_retry_delay, command_queue, command_workers,
+	command_queue_size, command_overflow, command_timeout,
+	command_retry_after, command_processes, metrics, metrics_buckets, outbox,
+	outbox_batch_size, outbox_interval, outbox_retry_delay, outbox_max_delay
 	"""
 	def __init__(self):
 		"""ApplicationConfig's constructor."""
@@ -326,3 +603,243 @@ class ApplicationConfig(object):
 
 		# Parses it into a list.
 		return re.sub(r'\ ', '', senders).split(',')
+
+	@property
+	def group_commit(self) -> bool:
+		"""Whether book registrations of concurrent callers are committed
+		together, which databases without atomic commits such as
+		sqlite-sharded refuse."""
+		return os.getenv('APP_GROUP_COMMIT', 'false').lower() == 'true'
+
+	@property
+	def group_commit_size(self) -> int:
+		"""The maximum number of book registrations committed together."""
+		try:
+			return max(1, int(os.getenv('APP_GROUP_COMMIT_SIZE')))
+		except:
+			return 64
+
+	@property
+	def group_commit_delay(self) -> float:
+		"""The maximum number of seconds a book registration waits for the
+		others to be committed together."""
+		try:
+			return max(0, float(os.getenv('APP_GROUP_COMMIT_DELAY')))
+		except:
+			return 0.001
+
+	@property
+	def view_cache(self) -> str:
+		"""The cache policy placed in front of the database's view: none, lru
+		or ttl."""
+		view_cache = os.getenv('APP_VIEW_CACHE', 'none').lower()
+
+		if view_cache != 'lru' and view_cache != 'ttl':
+			view_cache = 'none'
+
+		return view_cache
+
+	@property
+	def view_cache_size(self) -> int:
+		"""The maximum number of entries cached for each method of the view."""
+		try:
+			return max(1, int(os.getenv('APP_VIEW_CACHE_SIZE')))
+		except:
+			return 1024
+
+	@property
+	def view_cache_ttl(self) -> float:
+		"""The number of seconds an entry stays cached with the ttl policy."""
+		try:
+			return max(0, float(os.getenv('APP_VIEW_CACHE_TTL')))
+		except:
+			return 60.0
+
+	@property
+	def event_dispatch(self) -> bool:
+		"""Whether events are handled at a pool of workers instead of at the
+		caller that published them."""
+		return os.getenv('APP_EVENT_DISPATCH', 'false').lower() == 'true'
+
+	@property
+	def event_workers(self) -> int:
+		"""The number of workers handling events."""
+		try:
+			return max(1, int(os.getenv('APP_EVENT_WORKERS')))
+		except:
+			return 4
+
+	@property
+	def event_queue_size(self) -> int:
+		"""The maximum number of events waiting for the workers."""
+		try:
+			return max(1, int(os.getenv('APP_EVENT_QUEUE_SIZE')))
+		except:
+			return 1024
+
+	@property
+	def event_ordering(self) -> str:
+		"""How the handling of events is ordered: isbn, for a queue per
+		event type and book, event, for a queue per event type, subscriber,
+		for a queue per subscriber, or none."""
+		event_ordering = os.getenv('APP_EVENT_ORDERING', 'isbn').lower()
+
+		if event_ordering not in ('event', 'subscriber', 'none'):
+			event_ordering = 'isbn'
+
+		return event_ordering
+
+	@property
+	def event_metrics_interval(self) -> float:
+		"""The number of seconds between logs of the event queues' depth, 0
+		for none."""
+		try:
+			return max(0, float(os.getenv('APP_EVENT_METRICS_INTERVAL')))
+		except:
+			return 0.0
+
+	@property
+	def bus_middleware(self) -> list:
+		"""The middleware around the message bus' handlers, outermost first:
+		tracing, timing or retry."""
+		middleware = os.getenv('APP_BUS_MIDDLEWARE', '').lower()
+
+		# Parses it into a list of the known ones.
+		return [m for m in re.sub(r'\ ', '', middleware).split(',') \
+				if m in ('tracing', 'timing', 'retry')]
+
+	@property
+	def bus_retry_attempts(self) -> int:
+		"""The maximum number of attempts of an event handler failing with
+		a transient error, such as a lost connection, with the retry
+		middleware."""
+		try:
+			return max(1, int(os.getenv('APP_BUS_RETRY_ATTEMPTS')))
+		except:
+			return 3
+
+	@property
+	def bus_retry_delay(self) -> float:
+		"""The number of seconds before the first retry of a handler, doubled
+		at every other one."""
+		try:
+			return max(0, float(os.getenv('APP_BUS_RETRY_DELAY')))
+		except:
+			return 0.1
+
+	@property
+	def command_queue(self) -> bool:
+		"""Whether commands are handled at a bounded queue drained by a pool
+		of workers."""
+		return os.getenv('APP_COMMAND_QUEUE', 'false').lower() == 'true'
+
+	@property
+	def command_workers(self) -> int:
+		"""The number of workers handling commands."""
+		try:
+			return max(1, int(os.getenv('APP_COMMAND_WORKERS')))
+		except:
+			return 4
+
+	@property
+	def command_queue_size(self) -> int:
+		"""The maximum number of commands waiting for the workers."""
+		try:
+			return max(1, int(os.getenv('APP_COMMAND_QUEUE_SIZE')))
+		except:
+			return 256
+
+	@property
+	def command_overflow(self) -> str:
+		"""What a full command queue does with a new command: block, reject
+		or drop_oldest."""
+		command_overflow = os.getenv('APP_COMMAND_OVERFLOW', 'block').lower()
+
+		if command_overflow != 'reject' and command_overflow != 'drop_oldest':
+			command_overflow = 'block'
+
+		return command_overflow
+
+	@property
+	def command_timeout(self) -> float:
+		"""The number of seconds a blocked command waits for room before
+		being rejected, 0 for as long as needed."""
+		try:
+			return max(0, float(os.getenv('APP_COMMAND_TIMEOUT')))
+		except:
+			return 5.0
+
+	@property
+	def command_retry_after(self) -> float:
+		"""The number of seconds suggested to the senders of rejected
+		commands before sending them again."""
+		try:
+			return max(0, float(os.getenv('APP_COMMAND_RETRY_AFTER')))
+		except:
+			return 1.0
+
+	@property
+	def command_processes(self) -> int:
+		"""The number of worker processes handling commands partitioned by
+		ISBN, 0 to handle them at this process."""
+		try:
+			return max(0, int(os.getenv('APP_COMMAND_PROCESSES')))
+		except:
+			return 0
+
+	@property
+	def metrics(self) -> bool:
+		"""Whether the message bus measures its message types and
+		handlers."""
+		return os.getenv('APP_METRICS', 'false').lower() == 'true'
+
+	@property
+	def metrics_buckets(self) -> tuple:
+		"""The upper bounds in seconds of the latency histograms' buckets,
+		None for the default ones."""
+		try:
+			buckets = os.getenv('APP_METRICS_BUCKETS')
+			return tuple(sorted(float(b) for b \
+								in re.sub(r'\ ', '', buckets).split(',')))
+		except:
+			return None
+
+	@property
+	def outbox(self) -> bool:
+		"""Whether registered events are committed to the database's outbox
+		and relayed to the senders in the background."""
+		return os.getenv('APP_OUTBOX', 'false').lower() == 'true'
+
+	@property
+	def outbox_batch_size(self) -> int:
+		"""The maximum number of events relayed per batch."""
+		try:
+			return max(1, int(os.getenv('APP_OUTBOX_BATCH_SIZE')))
+		except:
+			return 100
+
+	@property
+	def outbox_interval(self) -> float:
+		"""The number of seconds between drains of an empty outbox."""
+		try:
+			return max(0.01, float(os.getenv('APP_OUTBOX_INTERVAL')))
+		except:
+			return 0.5
+
+	@property
+	def outbox_retry_delay(self) -> float:
+		"""The number of seconds the relay waits after a failed delivery,
+		doubled at every failure in a row."""
+		try:
+			return max(0.01, float(os.getenv('APP_OUTBOX_RETRY_DELAY')))
+		except:
+			return 1.0
+
+	@property
+	def outbox_max_delay(self) -> float:
+		"""The maximum number of seconds the relay waits between failed
+		deliveries."""
+		try:
+			return max(0.01, float(os.getenv('APP_OUTBOX_MAX_DELAY')))
+		except:
+			return 30.0
@@ -0,0 +1,8 @@
+"""
+Benchmarks
+==========
+	Standalone scripts measuring the performance of the application's
+adapters. Each one can be executed as a module, e.g.:
+
+	python -m benchmarks.bench_sqlite_pool
+"""
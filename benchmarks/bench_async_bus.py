@@ -0,0 +1,95 @@
+"""Measures the throughput of book registrations announced by a sender
+taking a millisecond per message, dispatched one after the other through the
+MessageBus and concurrently through the AsyncMessageBus, with the sender run
+at an executor and with a native coroutine sender."""
+
+import time
+import asyncio
+
+from app.domain.ports import MessageBus, AsyncMessageBus
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+from app.adapters.memory import MemoryDatabase
+from app.adapters.aio import ExecutorUnitOfWorkManager, ExecutorQueueSender
+from app.handlers import RegisterBookHandler, BookRegisteredHandler, \
+						 AsyncRegisterBookHandler, AsyncBookRegisteredHandler
+
+
+COMMANDS = 2000
+LATENCY = 0.001
+
+
+class SlowSender(object):
+	"""A sender waiting for its broker on every message."""
+	def send(self, msg):
+		time.sleep(LATENCY)
+
+
+class SlowAsyncSender(object):
+	"""A coroutine sender waiting for its broker on every message."""
+	async def send(self, msg):
+		await asyncio.sleep(LATENCY)
+
+
+def commands() -> list:
+	"""Returns the register book commands to be dispatched."""
+	return [RegisterBookCommand('isbn-{0:06}'.format(i), 'name', 'author',
+								'content') for i in range(COMMANDS)]
+
+
+def measure_sync() -> float:
+	"""Returns the registrations per second of the MessageBus."""
+	memory = MemoryDatabase({})
+	memory.set_up()
+
+	bus = MessageBus()
+	bus.subscribe(RegisterBookCommand,
+				  RegisterBookHandler(bus, memory.get_uowm()))
+	bus.subscribe(BookRegisteredEvent,
+				  BookRegisteredHandler(memory.get_view(), SlowSender()))
+
+	cmds = commands()
+	start = time.perf_counter()
+	for cmd in cmds:
+		bus.handle(cmd)
+
+	return COMMANDS / (time.perf_counter() - start)
+
+
+def measure_async(sender) -> float:
+	"""Returns the registrations per second of the AsyncMessageBus.
+
+	Params
+	------
+	sender -- the AsyncQueueSender announcing the registrations
+	"""
+	memory = MemoryDatabase({})
+	memory.set_up()
+
+	bus = AsyncMessageBus()
+	uowm = ExecutorUnitOfWorkManager(memory.get_uowm())
+	bus.subscribe(RegisterBookCommand, AsyncRegisterBookHandler(bus, uowm))
+	bus.subscribe(BookRegisteredEvent,
+				  AsyncBookRegisteredHandler(memory.get_view(), sender))
+
+	async def dispatch(cmds: list):
+		await asyncio.gather(*(bus.handle(cmd) for cmd in cmds))
+
+	cmds = commands()
+	start = time.perf_counter()
+	asyncio.run(dispatch(cmds))
+
+	return COMMANDS / (time.perf_counter() - start)
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	print('sync bus                   {0:>8.0f} commands/s' \
+		  .format(measure_sync()))
+	print('async bus, executor sender {0:>8.0f} commands/s' \
+		  .format(measure_async(ExecutorQueueSender(SlowSender()))))
+	print('async bus, async sender    {0:>8.0f} commands/s' \
+		  .format(measure_async(SlowAsyncSender())))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,69 @@
+"""Measures with tracemalloc the bytes per book of the Book model and of the
+memory adapter's storage, before (a plain Book class and a dictionary per
+stored book) and after (a slotted Book and a tuple per stored book)."""
+
+import gc
+import tracemalloc
+
+from app.domain.model import Book
+from app.adapters.memory import MemoryDatabase
+
+
+BOOKS = 100000
+
+
+class PlainBook(object):
+	"""The Book model as it was, with a per-instance dictionary."""
+	def __init__(self, isbn: str, name: str, author: str, content: str):
+		self.isbn = isbn
+		self.name = name
+		self.author = author
+		self.content = content
+
+
+def measure(build) -> float:
+	"""Returns the bytes allocated per book by a building function, keeping
+	its result alive until measured."""
+	fields = [('isbn-{0}'.format(i), 'name-{0}'.format(i % 1000),
+			   'author-{0}'.format(i % 100), 'content') for i in range(BOOKS)]
+
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	kept = build(fields)
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+
+	del kept
+	return (after - before) / BOOKS
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	models = (
+		('model', lambda fs: [PlainBook(*f) for f in fs],
+		 lambda fs: [Book(*f) for f in fs]),
+		('record', lambda fs: {f[0]: {'name': f[1], 'author': f[2],
+									  'content': f[3]} for f in fs},
+		 lambda fs: {f[0]: (f[0], f[1], f[2], f[3]) for f in fs})
+	)
+
+	for label, old, new in models:
+		before, after = measure(old), measure(new)
+		print('{0:<7} before={1:>6.1f} B/book after={2:>6.1f} B/book '
+			  'saved={3:.0%}'.format(label, before, after, 1 - after / before))
+
+	def adapter(fs):
+		database = MemoryDatabase({})
+		database.set_up()
+		with database.get_uowm().start() as uow:
+			uow.books.save_many([Book(*f) for f in fs])
+			uow.commit()
+		return database
+
+	print('adapter total={0:>6.1f} B/book, indexes included' \
+		  .format(measure(adapter)))
+
+
+if __name__ == '__main__':
+	main()
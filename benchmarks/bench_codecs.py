@@ -0,0 +1,92 @@
+"""Reports the storage size and the save and read latency of book content
+with and without the zlib codec, for both database adapters."""
+
+import os
+import random
+import tempfile
+import time
+
+from app.domain.model import Book
+from app.adapters.sqlite import SqliteDatabase
+from app.adapters.memory import MemoryDatabase
+
+
+BOOKS = 2000
+WORDS = ['the', 'book', 'of', 'a', 'library', 'story', 'and', 'was', 'time',
+		 'there', 'once', 'upon', 'king', 'river', 'night', 'long', 'in']
+
+
+def make_books(size: int) -> list:
+	"""Generates books with roughly size bytes of prose-like content."""
+	rnd = random.Random(size)
+	books = []
+
+	for i in range(BOOKS):
+		words, length = [], 0
+		while length < size:
+			words.append(rnd.choice(WORDS))
+			length += len(words[-1]) + 1
+
+		books.append(Book('isbn-{0}'.format(i), 'name', 'author',
+						  ' '.join(words)))
+
+	return books
+
+
+def measure(database, books: list) -> tuple:
+	"""Saves and reads back every book returning the seconds per save and per
+	read."""
+	database.set_up()
+
+	start = time.perf_counter()
+	with database.get_uowm().start() as uow:
+		for book in books:
+			uow.books.save(book)
+		uow.commit()
+	save = (time.perf_counter() - start) / len(books)
+
+	view = database.get_view()
+	start = time.perf_counter()
+	for book in books:
+		view.get_content(book.isbn)
+	read = (time.perf_counter() - start) / len(books)
+
+	return save, read
+
+
+def stored_size(database, books: list) -> int:
+	"""Returns the number of bytes of content as stored by the codec."""
+	return sum(len(database.codec.encode(b.content)) for b in books)
+
+
+def main():
+	"""Runs the benchmark for several content sizes and prints its results."""
+	for size in (512, 8 * 1024, 64 * 1024):
+		books = make_books(size)
+		raw = sum(len(b.content.encode('utf8')) for b in books)
+
+		for codec in (None, 'zlib'):
+			cfg = {'codec': codec, 'codec_threshold': 1024}
+
+			memory = MemoryDatabase(cfg)
+			m_save, m_read = measure(memory, books)
+
+			location = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+			sqlite = SqliteDatabase(dict(cfg, location=location))
+			s_save, s_read = measure(sqlite, books)
+			sqlite.tear_down()
+			s_file = os.path.getsize(location)
+			os.remove(location)
+
+			print(
+				'content={0:>6}B codec={1:<4} ratio={2:>5.2f} sqlite-file='
+				'{3:>6.1f}MiB | memory save={4:>7.1f}us read={5:>6.1f}us | '
+				'sqlite save={6:>7.1f}us read={7:>6.1f}us'.format(
+					size, codec or 'none', raw / stored_size(memory, books),
+					s_file / 2 ** 20, m_save * 1e6, m_read * 1e6,
+					s_save * 1e6, s_read * 1e6)
+			)
+
+
+if __name__ == '__main__':
+	main()
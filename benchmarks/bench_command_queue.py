@@ -0,0 +1,105 @@
+"""Floods the MessageBus with book registrations from many threads, against
+a handler taking a millisecond per commit, without a command queue and with
+each overflow of the CommandQueue. Reports the commands handled per second,
+the ones shed and the latency of the handled ones."""
+
+import time
+import threading
+
+from app.domain.ports import MessageBus
+from app.domain.dispatch import CommandQueue
+from app.domain.errors import MessageBusBusyError
+from app.domain.messages import RegisterBookCommand
+
+
+CLIENTS = 64
+COMMANDS = 50
+LATENCY = 0.001
+
+
+class SlowHandler(object):
+	"""A handler waiting for its commit, counting the ones at once."""
+	def __init__(self):
+		self.running = 0
+		self.peak = 0
+		self.lock = threading.Lock()
+
+	def handle(self, cmd):
+		with self.lock:
+			self.running += 1
+			self.peak = max(self.peak, self.running)
+
+		time.sleep(LATENCY)
+
+		with self.lock:
+			self.running -= 1
+
+
+def measure(commands: CommandQueue = None) -> dict:
+	"""Floods a bus and returns its results.
+
+	Params
+	------
+	commands: CommandQueue -- the command queue, None for none
+	"""
+	handler = SlowHandler()
+	bus = MessageBus(commands=commands)
+	bus.subscribe(RegisterBookCommand, handler)
+
+	latencies = []
+	shed = [0]
+	lock = threading.Lock()
+
+	def client(c: int):
+		for i in range(COMMANDS):
+			cmd = RegisterBookCommand('isbn-{0}-{1}'.format(c, i), 'name',
+									  'author', 'content')
+			start = time.perf_counter()
+			try:
+				bus.handle(cmd)
+			except MessageBusBusyError:
+				with lock:
+					shed[0] += 1
+				continue
+
+			with lock:
+				latencies.append(time.perf_counter() - start)
+
+	threads = [threading.Thread(target=client, args=(c,)) \
+			   for c in range(CLIENTS)]
+
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	elapsed = time.perf_counter() - start
+
+	if commands is not None:
+		commands.stop()
+
+	latencies.sort()
+	return {'handled': len(latencies) / elapsed, 'shed': shed[0],
+			'p50': latencies[len(latencies) // 2],
+			'p99': latencies[int(len(latencies) * 0.99)],
+			'peak': handler.peak}
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	cases = [('no queue', None)] + [
+		(overflow, CommandQueue(4, 16, overflow, timeout=None)) \
+		for overflow in ('block', 'reject', 'drop_oldest')
+	]
+
+	for name, commands in cases:
+		results = measure(commands)
+		print('{0:<11} handled={1:>6.0f}/s shed={2:>4} p50={3:>6.1f}ms'
+			  ' p99={4:>6.1f}ms concurrent={5:>2}' \
+			  .format(name, results['handled'], results['shed'],
+					  results['p50'] * 1e3, results['p99'] * 1e3,
+					  results['peak']))
+
+
+if __name__ == '__main__':
+	main()
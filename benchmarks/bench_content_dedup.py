@@ -0,0 +1,82 @@
+"""Reports the storage size and the save latency of books sharing their
+content between several editions, for both database adapters. One edition
+per content stands for a feed without duplicates."""
+
+import os
+import random
+import tempfile
+import time
+
+from app.domain.model import Book
+from app.adapters.sqlite import SqliteDatabase
+from app.adapters.memory import MemoryDatabase
+
+
+BOOKS = 2000
+SIZE = 8 * 1024
+WORDS = ['the', 'book', 'of', 'a', 'library', 'story', 'and', 'was', 'time',
+		 'there', 'once', 'upon', 'king', 'river', 'night', 'long', 'in']
+
+
+def make_books(editions: int) -> list:
+	"""Generates books whose content is shared by groups of editions."""
+	rnd = random.Random(editions)
+	books = []
+
+	for i in range(BOOKS):
+		if i % editions == 0:
+			words, length = [], 0
+			while length < SIZE:
+				words.append(rnd.choice(WORDS))
+				length += len(words[-1]) + 1
+			content = ' '.join(words)
+
+		books.append(Book('isbn-{0:06}'.format(i), 'name', 'author',
+						  content))
+
+	return books
+
+
+def save(database, books: list) -> float:
+	"""Saves every book in batches of a hundred, returning the seconds per
+	save."""
+	database.set_up()
+
+	start = time.perf_counter()
+	for i in range(0, len(books), 100):
+		with database.get_uowm().start() as uow:
+			uow.books.save_many(books[i:i + 100])
+			uow.commit()
+
+	return (time.perf_counter() - start) / len(books)
+
+
+def main():
+	"""Runs the benchmark for several numbers of editions per content and
+	prints its results."""
+	for editions in (1, 4, 16):
+		books = make_books(editions)
+		raw = sum(len(b.content.encode('utf8')) for b in books)
+
+		memory = MemoryDatabase({})
+		m_save = save(memory, books)
+		m_size = sum(len(c.encode('utf8')) \
+					 for c, _ in memory.store.blobs.values())
+
+		location = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+		sqlite = SqliteDatabase({'location': location})
+		s_save = save(sqlite, books)
+		sqlite.tear_down()
+		s_file = os.path.getsize(location)
+		os.remove(location)
+
+		print(
+			'editions={0:>2} content={1:>5.1f}MiB | memory stored={2:>5.1f}MiB'
+			' save={3:>6.1f}us | sqlite file={4:>5.1f}MiB save={5:>6.1f}us' \
+			.format(editions, raw / 2 ** 20, m_size / 2 ** 20, m_save * 1e6,
+					s_file / 2 ** 20, s_save * 1e6)
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,67 @@
+"""Measures the latency of book registrations announced by a sender taking a
+millisecond per message, with events handled at the caller and at the
+EventDispatcher with each of its orderings."""
+
+import time
+
+from app.domain.ports import MessageBus
+from app.domain.dispatch import EventDispatcher
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+from app.adapters.memory import MemoryDatabase
+from app.handlers import RegisterBookHandler, BookRegisteredHandler
+
+
+COMMANDS = 1000
+LATENCY = 0.001
+
+
+class SlowSender(object):
+	"""A sender waiting for its broker on every message."""
+	def send(self, msg):
+		time.sleep(LATENCY)
+
+
+def measure(dispatcher: EventDispatcher = None) -> tuple:
+	"""Returns the mean seconds per registration seen by the caller and the
+	seconds until every event has been handled.
+
+	Params
+	------
+	dispatcher: EventDispatcher -- the dispatcher, None for none
+	"""
+	memory = MemoryDatabase({})
+	memory.set_up()
+
+	bus = MessageBus(dispatcher)
+	bus.subscribe(RegisterBookCommand,
+				  RegisterBookHandler(bus, memory.get_uowm()))
+	for _ in range(2):
+		bus.subscribe(BookRegisteredEvent,
+					  BookRegisteredHandler(memory.get_view(), SlowSender()))
+
+	start = time.perf_counter()
+	for i in range(COMMANDS):
+		bus.handle(RegisterBookCommand('isbn-{0:06}'.format(i), 'name',
+									   'author', 'content'))
+	caller = time.perf_counter() - start
+
+	if dispatcher is not None:
+		dispatcher.stop()
+
+	return caller / COMMANDS, time.perf_counter() - start
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	caller, total = measure()
+	print('inline               register={0:>7.1f}us total={1:>5.2f}s' \
+		  .format(caller * 1e6, total))
+
+	for ordering in ('isbn', 'event', 'subscriber', 'none'):
+		caller, total = measure(EventDispatcher(4, 1024, ordering))
+		print('dispatch {0:<11} register={1:>7.1f}us total={2:>5.2f}s' \
+			  .format(ordering, caller * 1e6, total))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,65 @@
+"""Compares the registration throughput on SQLite of the RegisterBookHandler,
+committing once per book, against the GroupCommitRegisterBookHandler,
+committing concurrent registrations together. SQLite is set to synchronous
+FULL so every commit is flushed to disk."""
+
+import os
+import time
+import tempfile
+import threading
+
+from app.domain.ports import MessageBus
+from app.adapters.sqlite import SqliteDatabase
+from app.domain.messages import RegisterBookCommand
+from app.handlers import RegisterBookHandler, GroupCommitRegisterBookHandler
+
+
+THREADS = 16
+BOOKS = 250
+
+
+def run(make_handler) -> float:
+	"""Registers THREADS * BOOKS books concurrently returning the number of
+	registrations per second."""
+	location = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+	sqlite = SqliteDatabase({'location': location, 'synchronous': 'full',
+							 'pool_timeout': 60.0})
+	sqlite.set_up()
+
+	handler = make_handler(MessageBus(), sqlite.get_uowm())
+
+	def worker(offset):
+		for i in range(BOOKS):
+			handler.handle(RegisterBookCommand(
+				'isbn-{0}'.format(offset + i), 'name', 'author', 'content'))
+
+	workers = [threading.Thread(target=worker, args=(t * BOOKS,)) \
+			   for t in range(THREADS)]
+
+	start = time.perf_counter()
+	for w in workers:
+		w.start()
+	for w in workers:
+		w.join()
+	elapsed = time.perf_counter() - start
+
+	if hasattr(handler, 'stop'):
+		handler.stop()
+	sqlite.tear_down()
+	os.remove(location)
+
+	return THREADS * BOOKS / elapsed
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	single = run(RegisterBookHandler)
+	grouped = run(lambda bus, uowm: GroupCommitRegisterBookHandler(
+		bus, uowm, batch_size=64, max_delay=0.001))
+
+	print('threads={0} commit-per-book={1:.0f}/s group-commit={2:.0f}/s '
+		  'gain={3:.1f}x'.format(THREADS, single, grouped, grouped / single))
+
+
+if __name__ == '__main__':
+	main()
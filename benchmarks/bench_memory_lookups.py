@@ -0,0 +1,74 @@
+"""Measures name and author lookups of the memory view from 10^3 to 10^6
+books, before (a scan of the whole catalogue) and after (hash indexes from
+names and authors to ISBNs) the memory adapter got its indexes."""
+
+import sys
+import time
+
+from app.domain.model import Book, BookSummary
+from app.adapters.memory import MemoryDatabase, ISBN, NAME, AUTHOR
+
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+AUTHORS = 1000
+NAMES = 10000
+
+
+def before(store, field: str, values: list) -> float:
+	"""Returns the mean seconds per lookup scanning every book, as the view
+	did without indexes."""
+	start = time.perf_counter()
+	for value in values:
+		position = NAME if field == 'name' else AUTHOR
+		sorted((BookSummary(b[ISBN], b[NAME], b[AUTHOR]) \
+				for s in store.snapshot() for b in s.books.values() \
+				if b[position] == value), key=lambda b: b.isbn)
+
+	return (time.perf_counter() - start) / len(values)
+
+
+def after(view, field: str, values: list) -> float:
+	"""Returns the mean seconds per lookup through the indexed view."""
+	lookup = view.get_summaries_by_name if field == 'name' \
+			 else view.get_summaries_by_author
+
+	start = time.perf_counter()
+	for value in values:
+		lookup(value)
+
+	return (time.perf_counter() - start) / len(values)
+
+
+def main():
+	"""Runs the benchmark for every size and prints its results."""
+	for books in SIZES:
+		database = MemoryDatabase({})
+		database.set_up()
+
+		with database.get_uowm().start() as uow:
+			uow.books.save_many([
+				Book('isbn-{0}'.format(i), 'name-{0}'.format(i % NAMES),
+					 'author-{0}'.format(i % AUTHORS), 'content') \
+				for i in range(books)
+			])
+			uow.commit()
+
+		view = database.get_view()
+
+		for field in ('name', 'author'):
+			scans = ['{0}-{1}'.format(field, i) for i in range(10)]
+			seeks = ['{0}-{1}'.format(field, i) for i in range(1000)]
+
+			scanned = before(database.store, field, scans)
+			indexed = after(view, field, seeks)
+			print(
+				'books={0:<8} {1:<6} before={2:>9.3f} ms  after={3:>7.3f} ms  '
+				'speedup={4:.0f}x'.format(
+					books, field, scanned * 1000, indexed * 1000,
+					scanned / indexed)
+			)
+			sys.stdout.flush()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,68 @@
+"""Measures how long a persisted memory database takes to restart, loading
+its books from a snapshot or replaying them from its log, and the size of
+both files."""
+
+import os
+import time
+import shutil
+import tempfile
+
+from app.domain.model import Book
+from app.adapters.memory import MemoryDatabase
+
+
+SIZES = (10 ** 5, 10 ** 6)
+BATCH = 10000
+
+
+def restart(cfg: dict) -> float:
+	"""Returns the seconds a new database takes to set up."""
+	start = time.perf_counter()
+	database = MemoryDatabase(cfg)
+	database.set_up()
+	elapsed = time.perf_counter() - start
+
+	# Keeps the files as they were for the next restart.
+	database.store.journal = None
+	database.journal.close()
+
+	return elapsed
+
+
+def main():
+	"""Runs the benchmark for every size and prints its results."""
+	for books in SIZES:
+		directory = tempfile.mkdtemp()
+		path = os.path.join(directory, 'books')
+		cfg = {'path': path, 'snapshot_interval': 0}
+
+		database = MemoryDatabase(cfg)
+		database.set_up()
+
+		for offset in range(0, books, BATCH):
+			with database.get_uowm().start() as uow:
+				uow.books.save_many([
+					Book('isbn-{0}'.format(i), 'name-{0}'.format(i % 1000),
+						 'author-{0}'.format(i % 100), 'some content') \
+					for i in range(offset, offset + BATCH)
+				])
+				uow.commit()
+
+		# Leaves every book at the log, as after a crash.
+		database.journal.close()
+		log_size = os.path.getsize(path + '.log')
+		from_log = restart(cfg)
+
+		snapshot_size = os.path.getsize(path + '.snapshot')
+		from_snapshot = restart(cfg)
+
+		print('books={0:<8} log={1:>6.1f}MiB replay={2:>6.2f}s | '
+			  'snapshot={3:>6.1f}MiB load={4:>6.2f}s'.format(
+				  books, log_size / 2 ** 20, from_log,
+				  snapshot_size / 2 ** 20, from_snapshot))
+
+		shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,80 @@
+"""Measures the read throughput of the memory view with a growing number of
+reader threads while a writer keeps committing, and the writer's commit
+latency meanwhile. Readers never lock, so they never wait for the writer."""
+
+import time
+import threading
+
+from app.domain.model import Book
+from app.adapters.memory import MemoryDatabase
+
+
+BOOKS = 100000
+DURATION = 2.0
+THREADS = (1, 2, 4, 8)
+
+
+def run(database, readers: int) -> tuple:
+	"""Runs readers and a writer for DURATION seconds returning the reads per
+	second and the mean seconds per commit."""
+	view = database.get_view()
+	uowm = database.get_uowm()
+	stop = threading.Event()
+	reads = [0] * readers
+	commits = []
+
+	def read(slot):
+		i = 0
+		while not stop.is_set():
+			view.get_by_isbn('isbn-{0}'.format(i % BOOKS))
+			view.get_by_name('name-{0}'.format(i % 1000), limit=10)
+			reads[slot] += 2
+			i += 7919
+
+	def write():
+		i = 0
+		while not stop.is_set():
+			start = time.perf_counter()
+			with uowm.start() as uow:
+				uow.books.save(Book(
+					'isbn-{0}'.format(i % BOOKS), 'name-{0}'.format(i % 1000),
+					'author-{0}'.format(i % 100), 'content'))
+				uow.commit()
+			commits.append(time.perf_counter() - start)
+			i += 1
+
+	threads = [threading.Thread(target=read, args=(r,)) \
+			   for r in range(readers)]
+	threads.append(threading.Thread(target=write))
+
+	for t in threads:
+		t.start()
+	time.sleep(DURATION)
+	stop.set()
+	for t in threads:
+		t.join()
+
+	return sum(reads) / DURATION, sum(commits) / len(commits)
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	database = MemoryDatabase({})
+	database.set_up()
+
+	with database.get_uowm().start() as uow:
+		uow.books.save_many([
+			Book('isbn-{0}'.format(i), 'name-{0}'.format(i % 1000),
+				 'author-{0}'.format(i % 100), 'content') \
+			for i in range(BOOKS)
+		])
+		uow.commit()
+
+	for readers in THREADS:
+		throughput, latency = run(database, readers)
+		print('readers={0} reads={1:>8.0f}/s commit={2:>7.1f}us' \
+			  .format(readers, throughput, latency * 1e6))
+
+
+if __name__ == '__main__':
+	main()
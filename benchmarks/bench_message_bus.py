@@ -0,0 +1,101 @@
+"""Measures the dispatch cost per message of the MessageBus, with a handler
+doing nothing, against a direct call of the handler and the former lookup of
+subscribers by class name, with and without middleware around the handler
+and metrics on the bus."""
+
+import time
+from collections import defaultdict
+
+from app.domain.ports import MessageBus, Middleware
+from app.domain.metrics import BusMetrics
+from app.domain.messages import BookRegisteredEvent, BooksRegisteredEvent
+from app.middleware import TimingMiddleware, RetryMiddleware, \
+						   TracingMiddleware
+
+
+MESSAGES = 1000000
+
+
+class NoopHandler(object):
+	"""A handler doing nothing."""
+	def handle(self, msg):
+		pass
+
+
+class PassMiddleware(Middleware):
+	"""A middleware only calling the handler."""
+	def wrap(self, msg: type, handler, call):
+		def wrapped(message):
+			call(message)
+
+		return wrapped
+
+
+def legacy(handler) -> object:
+	"""Returns a handle function looking subscribers up by class name, like
+	the message bus used to."""
+	subscribers = defaultdict(list)
+	subscribers['BookRegisteredEvent'].append(handler)
+
+	def handle(msg):
+		for subscriber in subscribers[type(msg).__name__]:
+			subscriber.handle(msg)
+
+	return handle
+
+
+def measure(handle, msg) -> float:
+	"""Returns the mean nanoseconds per message handled.
+
+	Params
+	------
+	handle -- the function handling the message
+	msg -- the message to be handled
+	"""
+	start = time.perf_counter()
+	for _ in range(MESSAGES):
+		handle(msg)
+
+	return (time.perf_counter() - start) / MESSAGES * 1e9
+
+
+def bus(middleware: list, handlers: int = 1,
+		metrics: BusMetrics = None) -> MessageBus:
+	"""Returns a bus with handlers doing nothing subscribed to an event.
+
+	Params
+	------
+	middleware: list -- the middleware around the handlers
+	handlers: int -- the number of handlers
+	metrics: BusMetrics -- the bus' metrics, None for none
+	"""
+	bus = MessageBus(middleware=middleware, metrics=metrics)
+	for _ in range(handlers):
+		bus.subscribe(BookRegisteredEvent, NoopHandler())
+
+	return bus
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	event = BookRegisteredEvent('isbn')
+	cases = [
+		('direct call', NoopHandler().handle, event),
+		('former lookup', legacy(NoopHandler()), event),
+		('bus', bus([]).handle, event),
+		('bus, 2 handlers', bus([], 2).handle, event),
+		('bus, unknown message', bus([]).handle, BooksRegisteredEvent(())),
+		('bus, 1 pass middleware', bus([PassMiddleware()]).handle, event),
+		('bus, 3 pass middleware', bus([PassMiddleware()] * 3).handle, event),
+		('bus, tracing (off)', bus([TracingMiddleware()]).handle, event),
+		('bus, retry', bus([RetryMiddleware()]).handle, event),
+		('bus, timing', bus([TimingMiddleware()]).handle, event),
+		('bus, metrics', bus([], metrics=BusMetrics()).handle, event)
+	]
+
+	for name, handle, msg in cases:
+		print('{0:<24} {1:>6.1f}ns/message'.format(name, measure(handle, msg)))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,84 @@
+"""Registers books at SQLite against a sender taking five milliseconds per
+message, with the event sent after the commit and with it committed to the
+outbox and relayed in the background. Reports the registration latency and
+how long the relay takes to deliver every event."""
+
+import os
+import time
+
+from app.outbox import OutboxRelay
+from app.domain.ports import MessageBus
+from app.adapters.sqlite import SqliteDatabase
+from app.handlers import RegisterBookHandler, BookRegisteredHandler
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+
+
+BOOKS = 200
+LATENCY = 0.005
+LOCATION = 'bench-outbox.sqlite'
+
+
+class SlowSender(object):
+	"""A sender waiting for its broker."""
+	def send(self, msg: str):
+		time.sleep(LATENCY)
+
+
+def measure(outbox: bool) -> dict:
+	"""Registers the books and returns the results.
+
+	Params
+	------
+	outbox: bool -- whether events are relayed from the outbox
+	"""
+	sqlite = SqliteDatabase({'location': LOCATION})
+	sqlite.set_up()
+
+	senders = MessageBus()
+	senders.subscribe(BookRegisteredEvent,
+					  BookRegisteredHandler(sqlite.get_view(), SlowSender()))
+
+	bus = senders
+	relay = None
+	if outbox:
+		bus = MessageBus()
+		relay = OutboxRelay(sqlite.get_outbox(), senders.handle)
+
+	bus.subscribe(RegisterBookCommand,
+				  RegisterBookHandler(bus, sqlite.get_uowm(), outbox))
+
+	latencies = []
+	start = time.perf_counter()
+	for i in range(BOOKS):
+		begin = time.perf_counter()
+		bus.handle(RegisterBookCommand('isbn-{0}'.format(i), 'name',
+									   'author', 'content'))
+		latencies.append(time.perf_counter() - begin)
+
+	if relay is not None:
+		relay.drain()
+	delivered = time.perf_counter() - start
+
+	sqlite.tear_down()
+	for suffix in ('', '-shm', '-wal'):
+		if os.path.exists(LOCATION + suffix):
+			os.remove(LOCATION + suffix)
+
+	latencies.sort()
+	return {'p50': latencies[len(latencies) // 2],
+			'p99': latencies[int(len(latencies) * 0.99)],
+			'delivered': delivered}
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	for name, outbox in (('after commit', False), ('outbox', True)):
+		results = measure(outbox)
+		print('{0:<12} p50={1:>6.2f}ms p99={2:>6.2f}ms delivered in'
+			  ' {3:>5.2f}s'.format(name, results['p50'] * 1e3,
+								   results['p99'] * 1e3,
+								   results['delivered']))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,92 @@
+"""Registers books from many threads against a handler spending a millisecond
+of CPU per command, at the caller, at a CommandQueue of threads and at a
+ProcessCommandPool partitioned by ISBN. Reports the commands handled per
+second."""
+
+import time
+import threading
+
+from app.domain.ports import MessageBus
+from app.domain.dispatch import CommandQueue, ProcessCommandPool
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+from app.handlers import PartitionedCommandHandler
+
+
+CLIENTS = 16
+COMMANDS = 100
+PROCESSES = 4
+WORK = 20000
+
+
+class BusyHandler(object):
+	"""A handler spending CPU at the GIL before publishing its event."""
+	def __init__(self, bus: MessageBus):
+		self.bus = bus
+
+	def handle(self, cmd):
+		total = 0
+		for i in range(WORK):
+			total += i * i
+
+		self.bus.handle(BookRegisteredEvent(cmd.isbn))
+
+
+def build_bus() -> MessageBus:
+	"""Builds the message bus of the worker processes."""
+	bus = MessageBus()
+	bus.subscribe(RegisterBookCommand, BusyHandler(bus))
+
+	return bus
+
+
+def measure(bus: MessageBus) -> float:
+	"""Returns the commands handled per second.
+
+	Params
+	------
+	bus: MessageBus -- the bus with the command subscribed
+	"""
+	def client(c: int):
+		for i in range(COMMANDS):
+			bus.handle(RegisterBookCommand('isbn-{0}-{1}'.format(c, i),
+										   'name', 'author', 'content'))
+
+	threads = [threading.Thread(target=client, args=(c,)) \
+			   for c in range(CLIENTS)]
+
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	return CLIENTS * COMMANDS / (time.perf_counter() - start)
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	print('{0:<14} {1:>6.0f} commands/s'.format('caller',
+												  measure(build_bus())))
+
+	commands = CommandQueue(PROCESSES, CLIENTS)
+	bus = MessageBus(commands=commands)
+	bus.subscribe(RegisterBookCommand, BusyHandler(bus))
+	print('{0:<14} {1:>6.0f} commands/s'.format('command queue',
+												  measure(bus)))
+	commands.stop()
+
+	pool = ProcessCommandPool(build_bus, PROCESSES)
+	bus = MessageBus()
+	bus.subscribe(RegisterBookCommand, PartitionedCommandHandler(bus, pool))
+
+	# Waits for the processes to start before measuring.
+	for p in range(PROCESSES * 4):
+		bus.handle(RegisterBookCommand(str(p), 'name', 'author', 'content'))
+
+	print('{0:<14} {1:>6.0f} commands/s'.format('processes',
+												  measure(bus)))
+	pool.stop()
+
+
+if __name__ == '__main__':
+	main()
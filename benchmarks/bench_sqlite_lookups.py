@@ -0,0 +1,100 @@
+"""Measures name and author lookups of the SQLite view at 10^5 and 10^6 rows,
+before (full table scans with formatted queries) and after (secondary indexes
+with parameterized queries) the books table got its indexes."""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+from app.adapters.sqlite import SqliteDatabase
+
+
+SIZES = (10 ** 5, 10 ** 6)
+AUTHORS = 1000
+NAMES = 10000
+
+
+def populate(location: str, rows: int):
+	"""Creates the books table without indexes and fills it."""
+	conn = sqlite3.connect(location)
+	conn.execute("""
+		CREATE TABLE books (
+			isbn TEXT PRIMARY KEY,
+			name TEXT NOT NULL,
+			author TEXT NOT NULL,
+			content TEXT NOT NULL
+		);
+	""")
+	conn.executemany(
+		'INSERT INTO books VALUES (?, ?, ?, ?);',
+		(('isbn-{0}'.format(i), 'name-{0}'.format(i % NAMES),
+		  'author-{0}'.format(i % AUTHORS), 'content') for i in range(rows))
+	)
+	conn.commit()
+	conn.close()
+
+
+def before(location: str, column: str, values: list) -> float:
+	"""Returns the mean seconds per lookup using the pre-index queries."""
+	conn = sqlite3.connect(location)
+
+	start = time.perf_counter()
+	for value in values:
+		conn.execute('SELECT * FROM books WHERE {0}=\'{1}\';' \
+					 .format(column, value)).fetchall()
+	elapsed = time.perf_counter() - start
+
+	conn.close()
+	return elapsed / len(values)
+
+
+def after(view, column: str, values: list) -> float:
+	"""Returns the mean seconds per lookup through the indexed view."""
+	lookup = view.get_by_name if column == 'name' else view.get_by_author
+
+	start = time.perf_counter()
+	for value in values:
+		lookup(value)
+
+	return (time.perf_counter() - start) / len(values)
+
+
+def main():
+	"""Runs the benchmark for every size and prints its results."""
+	for rows in SIZES:
+		location = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+		populate(location, rows)
+
+		scans = {
+			'name': ['name-{0}'.format(i) for i in range(10)],
+			'author': ['author-{0}'.format(i) for i in range(10)]
+		}
+		seeks = {
+			'name': ['name-{0}'.format(i) for i in range(1000)],
+			'author': ['author-{0}'.format(i) for i in range(1000)]
+		}
+
+		results = {c: before(location, c, scans[c]) for c in scans}
+
+		sqlite = SqliteDatabase({'location': location})
+		sqlite.set_up()
+		view = sqlite.get_view()
+
+		for column in ('name', 'author'):
+			indexed = after(view, column, seeks[column])
+			print(
+				'rows={0:<8} {1:<6} before={2:>9.3f} ms  after={3:>7.3f} ms  '
+				'speedup={4:.0f}x'.format(
+					rows, column, results[column] * 1000, indexed * 1000,
+					results[column] / indexed)
+			)
+			sys.stdout.flush()
+
+		sqlite.tear_down()
+		os.remove(location)
+
+
+if __name__ == '__main__':
+	main()
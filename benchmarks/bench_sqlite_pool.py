@@ -0,0 +1,79 @@
+"""Compares the queries per second of the SQLite view when opening a new
+connection per query against borrowing long-lived connections from a pool."""
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+
+from app.domain.model import Book
+from app.adapters.sqlite import SqliteDatabase
+
+
+BOOKS = 1000
+QUERIES = 20000
+THREADS = 4
+
+
+def fresh_connection_query(location: str, isbn: str) -> Book:
+	"""Reproduces the view's behaviour before pooling: connects, queries and
+	closes on every call."""
+	conn = sqlite3.connect(location)
+	book = conn.execute(
+		'SELECT * FROM books WHERE isbn=?;', (isbn,)).fetchone()
+	conn.close()
+
+	return Book(book[0], book[1], book[2], book[3])
+
+
+def run(query, threads: int) -> float:
+	"""Executes QUERIES lookups split across threads and returns the queries
+	per second achieved."""
+	per_thread = QUERIES // threads
+
+	def worker(offset):
+		for i in range(per_thread):
+			query('isbn-{0}'.format((offset + i) % BOOKS))
+
+	workers = [threading.Thread(target=worker, args=(i * per_thread,)) \
+			   for i in range(threads)]
+
+	start = time.perf_counter()
+	for w in workers:
+		w.start()
+	for w in workers:
+		w.join()
+
+	return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+	"""Populates a temporary database and prints the benchmark results."""
+	location = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+
+	sqlite = SqliteDatabase({'location': location, 'pool_size': THREADS})
+	sqlite.set_up()
+
+	with sqlite.get_uowm().start() as uow:
+		for i in range(BOOKS):
+			uow.books.save(Book('isbn-{0}'.format(i), 'name', 'author',
+								'content'))
+		uow.commit()
+
+	view = sqlite.get_view()
+
+	for threads in (1, THREADS):
+		fresh = run(lambda isbn: fresh_connection_query(location, isbn),
+					threads)
+		pooled = run(view.get_by_isbn, threads)
+
+		print('threads={0:<2} fresh={1:>10.0f} q/s  pooled={2:>10.0f} q/s  '
+			  'gain={3:.1f}x'.format(threads, fresh, pooled, pooled / fresh))
+
+	sqlite.tear_down()
+	os.remove(location)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,68 @@
+"""Compares the registration throughput of concurrent writers on a single
+SQLite database against the sqlite-sharded database. SQLite is set to
+synchronous FULL so every commit is flushed to disk."""
+
+import os
+import glob
+import time
+import tempfile
+import threading
+
+from app.domain.ports import MessageBus
+from app.handlers import RegisterBookHandler
+from app.adapters.sqlite import SqliteDatabase
+from app.domain.messages import RegisterBookCommand
+from app.adapters.sqlite_sharded import SqliteShardedDatabase
+
+
+THREADS = 16
+BOOKS = 100
+SHARDS = 4
+
+
+def run(make_database, location: str) -> float:
+	"""Registers THREADS * BOOKS books concurrently returning the number of
+	registrations per second."""
+	database = make_database({'location': location, 'synchronous': 'full',
+							  'pool_timeout': 60.0, 'shards': SHARDS})
+	database.set_up()
+
+	handler = RegisterBookHandler(MessageBus(), database.get_uowm())
+
+	def worker(offset):
+		for i in range(BOOKS):
+			handler.handle(RegisterBookCommand(
+				'isbn-{0}'.format(offset + i), 'name', 'author', 'content'))
+
+	workers = [threading.Thread(target=worker, args=(t * BOOKS,)) \
+			   for t in range(THREADS)]
+
+	start = time.perf_counter()
+	for w in workers:
+		w.start()
+	for w in workers:
+		w.join()
+	elapsed = time.perf_counter() - start
+
+	database.tear_down()
+	for path in glob.glob(location.replace('{0}', '*') + '*'):
+		os.remove(path)
+
+	return THREADS * BOOKS / elapsed
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	directory = tempfile.mkdtemp()
+
+	single = run(SqliteDatabase, os.path.join(directory, 'bench.sqlite'))
+	sharded = run(SqliteShardedDatabase,
+				  os.path.join(directory, 'bench-{0}.sqlite'))
+
+	print('threads={0} shards={1} single={2:.0f}/s sharded={3:.0f}/s '
+		  'gain={4:.1f}x'.format(THREADS, SHARDS, single, sharded,
+								 sharded / single))
+
+
+if __name__ == '__main__':
+	main()
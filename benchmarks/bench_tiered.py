@@ -0,0 +1,91 @@
+"""Measures reads by ISBN skewed towards a hot set of books, served by the
+SQLite adapter alone and by the tiered adapter with several hot tier budgets
+and both eviction policies, along with the hot tier's hit rate."""
+
+import os
+import time
+import random
+import shutil
+import tempfile
+
+from app.domain.model import Book
+from app.adapters.sqlite import SqliteDatabase
+from app.adapters.tiered import TieredDatabase
+
+
+BOOKS = 20000
+READS = 50000
+CONTENT = 'word ' * 400
+
+
+def populate(location: str):
+	"""Stores the catalogue at a SQLite database."""
+	database = SqliteDatabase({'location': location})
+	database.set_up()
+
+	with database.get_uowm().start() as uow:
+		uow.books.save_many([
+			Book('isbn-{0:06}'.format(i), 'name', 'author',
+				 CONTENT + str(i)) for i in range(BOOKS)
+		])
+		uow.commit()
+
+	database.tear_down()
+
+
+def skewed_isbns() -> list:
+	"""Returns ISBNs following a Zipf-like distribution over the books."""
+	rnd = random.Random(0)
+	weights = [1 / (i + 1) for i in range(BOOKS)]
+	ranks = rnd.choices(range(BOOKS), weights=weights, k=READS)
+
+	# Popular books are spread over the catalogue rather than its start.
+	order = list(range(BOOKS))
+	rnd.shuffle(order)
+
+	return ['isbn-{0:06}'.format(order[r]) for r in ranks]
+
+
+def measure(database, isbns: list) -> float:
+	"""Returns the mean seconds per read of the books' content."""
+	database.set_up()
+	view = database.get_view()
+
+	start = time.perf_counter()
+	for isbn in isbns:
+		view.get_content(isbn)
+	elapsed = time.perf_counter() - start
+
+	return elapsed / len(isbns)
+
+
+def main():
+	"""Runs the benchmark and prints its results."""
+	directory = tempfile.mkdtemp()
+	location = os.path.join(directory, 'bench.sqlite')
+	populate(location)
+	isbns = skewed_isbns()
+
+	sqlite = SqliteDatabase({'location': location})
+	print('sqlite              read={0:>6.1f}us' \
+		  .format(measure(sqlite, isbns) * 1e6))
+	sqlite.tear_down()
+
+	# The budgets hold about 1%, 5% and 20% of the catalogue.
+	book = 2200
+	for share in (0.01, 0.05, 0.2):
+		for eviction in ('lru', 'lfu'):
+			tiered = TieredDatabase({'location': location,
+									 'budget': int(BOOKS * share * book),
+									 'eviction': eviction})
+			read = measure(tiered, isbns)
+			print('tiered {0:>3.0%} {1}      read={2:>6.1f}us '
+				  'hit-rate={3:.2f}'.format(share, eviction, read * 1e6,
+											tiered.stats()['hit_rate']))
+			tiered.cold.tear_down()
+
+	shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,142 @@
+"""Unit tests of the application's adapter cache.py functions."""
+
+import time
+import unittest
+
+from app.domain.model import Book, BookSummary
+from app.adapters.cache import LruCache, CachedBookView
+from app.adapters.memory import MemoryDatabase
+
+
+class TestAdaptersLruCache(unittest.TestCase):
+	"""Set of unit tests for the cache.py LruCache class and its
+	implementations.
+
+	Tests: test_eviction, test_ttl, test_stale_put
+	"""
+	def test_eviction(self):
+		"""Steps:
+		1 - Instantiates a LruCache of two entries
+		2 - Fills it, touches the oldest entry and adds a third one
+		3 - Verifies if the least recently used entry has been evicted
+		"""
+		cache = LruCache(2)
+
+		for key in ('a', 'b'):
+			found, generation = cache.get(key)
+			cache.put(key, key.upper(), generation)
+
+		self.assertEqual(cache.get('a'), (True, 'A'))
+
+		found, generation = cache.get('c')
+		cache.put('c', 'C', generation)
+
+		self.assertFalse(cache.get('b')[0])
+		self.assertEqual(cache.get('a'), (True, 'A'))
+		self.assertEqual(cache.get('c'), (True, 'C'))
+		self.assertEqual((cache.hits, cache.misses), (3, 4))
+
+	def test_ttl(self):
+		"""Steps:
+		1 - Instantiates a LruCache whose entries expire quickly
+		2 - Verifies if an entry is found before and missed after it expires
+		"""
+		cache = LruCache(2, 0.05)
+
+		found, generation = cache.get('a')
+		cache.put('a', 'A', generation)
+		self.assertEqual(cache.get('a'), (True, 'A'))
+
+		time.sleep(0.1)
+		self.assertFalse(cache.get('a')[0])
+
+	def test_stale_put(self):
+		"""Steps:
+		1 - Instantiates a LruCache and misses a key
+		2 - Invalidates the key before the missed value is stored
+		3 - Verifies if the stale value has been refused
+		"""
+		cache = LruCache(2)
+
+		found, generation = cache.get('a')
+		cache.discard('a')
+		cache.put('a', 'stale', generation)
+
+		self.assertFalse(cache.get('a')[0])
+
+
+class TestAdaptersCachedBookView(unittest.TestCase):
+	"""Set of unit tests for the cache.py CachedBookView class and its
+	implementations.
+
+	Tests: test_read_through, test_invalidate
+	"""
+	def test_read_through(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase and saves two books
+		2 - Reads them twice through a CachedBookView
+		3 - Verifies the results and the hit and miss counters
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name1', 'author2', 'content2')
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		view = CachedBookView(memory.get_view())
+
+		for _ in range(2):
+			self.assertEqual(view.get_by_isbn('isbn-1234'), book1)
+			self.assertEqual(view.get_all(), [book1, book2])
+			self.assertEqual(view.get_by_name('name1', limit=1), [book1])
+			self.assertEqual(view.get_by_author('author2'), [book2])
+			self.assertEqual(view.get_all_summaries(limit=1),
+							 [BookSummary('isbn-1234', 'name1', 'author1')])
+			self.assertEqual(view.get_summaries_by_name('name1', 'isbn-1234'),
+							 [BookSummary('isbn-2345', 'name1', 'author2')])
+			self.assertEqual(view.get_summaries_by_author('author2'),
+							 [BookSummary('isbn-2345', 'name1', 'author2')])
+			self.assertEqual(view.get_content('isbn-2345'), 'content2')
+			self.assertEqual(view.get_digest('isbn-2345'), book2.digest())
+			self.assertEqual(len(view.search('name1')), 2)
+
+		for method, stats in view.stats().items():
+			self.assertEqual(stats, {'hits': 1, 'misses': 1}, method)
+
+	def test_invalidate(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase and a CachedBookView over it
+		2 - Caches a book and a list, then overwrites the book
+		3 - Verifies if stale entries are served until invalidated
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = CachedBookView(memory.get_view())
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name', 'author', 'content'))
+			uow.commit()
+
+		self.assertEqual(view.get_by_isbn('isbn').name, 'name')
+		self.assertEqual(view.get_by_name('name')[0].isbn, 'isbn')
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'other', 'author', 'content'))
+			uow.commit()
+
+		self.assertEqual(view.get_by_isbn('isbn').name, 'name')
+
+		view.invalidate(('isbn',))
+
+		self.assertEqual(view.get_by_isbn('isbn').name, 'other')
+		self.assertEqual(view.get_by_name('name'), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
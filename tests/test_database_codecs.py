@@ -0,0 +1,81 @@
+"""Unit tests of the application's adapter codecs.py functions."""
+
+import unittest
+
+from app.adapters.codecs import Codec, ContentCodec, register_codec, \
+								THRESHOLD
+
+
+class MockCodec(Codec):
+	def encode(self, data):
+		return data[::-1]
+
+	def decode(self, data):
+		return data[::-1]
+
+
+class TestAdaptersCodecsContentCodec(unittest.TestCase):
+	"""Set of unit tests for the codecs.py ContentCodec class and its
+	implementations.
+
+	Tests: test_raw, test_threshold, test_zlib, test_register
+	"""
+	def test_raw(self):
+		"""Steps:
+		1 - Instantiates a ContentCodec without a codec
+		2 - Verifies if content is stored as it is
+		"""
+		codec = ContentCodec()
+
+		self.assertEqual(codec.encode('content'), 'content')
+		self.assertEqual(codec.decode('content'), 'content')
+
+	def test_threshold(self):
+		"""Steps:
+		1 - Instantiates a zlib ContentCodec with a threshold
+		2 - Verifies if content smaller than the threshold is stored raw
+		3 - Verifies the same for the default threshold
+		"""
+		codec = ContentCodec('zlib', 100)
+
+		self.assertEqual(codec.encode('content'), 'content')
+
+		codec = ContentCodec('zlib')
+		self.assertEqual(codec.threshold, THRESHOLD)
+		self.assertEqual(codec.encode('c' * (THRESHOLD - 1)),
+						 'c' * (THRESHOLD - 1))
+		self.assertIsInstance(codec.encode('c' * THRESHOLD), bytes)
+
+	def test_zlib(self):
+		"""Steps:
+		1 - Instantiates a zlib ContentCodec
+		2 - Encodes content and verifies if it has been compressed
+		3 - Decodes it and verifies if it is the same
+		"""
+		codec = ContentCodec('zlib', 0)
+		content = 'Once upon a time... ' * 100
+
+		stored = codec.encode(content)
+
+		self.assertIsInstance(stored, bytes)
+		self.assertLess(len(stored), len(content))
+		self.assertEqual(codec.decode(stored), content)
+
+	def test_register(self):
+		"""Steps:
+		1 - Registers a mock codec
+		2 - Verifies if content is stored and read back through it
+		3 - Verifies if an unknown codec raises the expected error
+		"""
+		register_codec('mock', MockCodec())
+		codec = ContentCodec('mock', 0)
+
+		self.assertEqual(codec.encode('content'), b'mock:tnetnoc')
+		self.assertEqual(codec.decode(b'mock:tnetnoc'), 'content')
+
+		with self.assertRaises(ValueError):
+			ContentCodec('unknown')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,16 +1,22 @@
 """Unit tests of the application's adapter memory.py functions."""
 
+import os
+import shutil
+import tempfile
 import unittest
+import threading
 
-from app.domain.model import Book
+from app.domain.model import Book, BookSummary, content_digest
 from app.adapters.memory import MemoryDatabase
+from app.domain.messages import BookRegisteredEvent, BooksRegisteredEvent
 
 
 class TestAdaptersMemoryBookRepository(unittest.TestCase):
 	"""Set of unit tests for the memory.py MemoryBookRepository class and its
 	implementations.
 
-	Tests: test_save
+	Tests: test_save, test_save_many, test_save_compressed, test_overwrite,
+	test_save_deduplicated
 	"""
 	def test_save(self):
 		"""Steps:
@@ -28,15 +34,138 @@ class TestAdaptersMemoryBookRepository(unittest.TestCase):
 
 		with uowm.start() as uow:
 			uow.books.save(book)
+			uow.commit()
 
 		self.assertEqual(book, view.get_by_isbn('isbn'))
 
+	def test_save_many(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Creates an unit of work to handle the saving of two books at once
+		3 - Verifies through view if the books have been saved
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name2', 'author2', 'content2')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		self.assertEqual(view.get_all(), [book1, book2])
+
+	def test_save_compressed(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase compressing content with zlib
+		2 - Creates an unit of work to handle the saving of a book
+		3 - Verifies through view if the book has been saved
+		"""
+		memory = MemoryDatabase({'codec': 'zlib', 'codec_threshold': 0})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book = Book('isbn', 'name', 'author', 'content' * 100)
+
+		with uowm.start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(book, view.get_by_isbn('isbn'))
+		self.assertEqual(book.content, view.get_content('isbn'))
+		self.assertEqual([book], view.get_all())
+
+	def test_overwrite(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Saves a book and overwrites its name and author, also in a batch
+		3 - Verifies if the book is only found by its latest name and author
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name1', 'author1', 'content'))
+			uow.books.save(Book('isbn', 'name2', 'author1', 'content'))
+			uow.commit()
+
+		self.assertEqual(view.get_by_name('name1'), [])
+		self.assertEqual(len(view.get_by_name('name2')), 1)
+		self.assertEqual(len(view.get_by_author('author1')), 1)
+
+		with uowm.start() as uow:
+			uow.books.save_many([
+				Book('isbn', 'name3', 'author2', 'content'),
+				Book('isbn', 'name4', 'author3', 'content')
+			])
+			uow.commit()
+
+		for name in ('name2', 'name3'):
+			self.assertEqual(view.get_by_name(name), [])
+		for author in ('author1', 'author2'):
+			self.assertEqual(view.get_by_author(author), [])
+
+		self.assertEqual(view.get_by_name('name4'),
+						 [Book('isbn', 'name4', 'author3', 'content')])
+		self.assertEqual(view.get_summaries_by_author('author3'),
+						 [BookSummary('isbn', 'name4', 'author3')])
+
+	def test_save_deduplicated(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase compressing content with zlib
+		2 - Saves two books sharing their content
+		3 - Verifies if the content is stored once and referenced twice
+		4 - Overwrites both books with other contents
+		5 - Verifies if the shared content is no longer stored
+		"""
+		memory = MemoryDatabase({'stripes': 2, 'codec': 'zlib',
+								 'codec_threshold': 0})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author', 'content')
+		book2 = Book('isbn-2345', 'name2', 'author', 'content')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		stored = [s.books[b.isbn][3] for b in (book1, book2) \
+				  for s in memory.store.snapshot() if b.isbn in s.books]
+		self.assertIs(stored[0], stored[1])
+		self.assertEqual(memory.store.blobs, {book1.digest(): [stored[0], 2]})
+		self.assertEqual(view.get_digest('isbn-2345'), book1.digest())
+		self.assertEqual(view.get_all(), [book1, book2])
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1234', 'name1', 'author', 'other'))
+			uow.commit()
+		self.assertEqual(memory.store.blobs[book1.digest()][1], 1)
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-2345', 'name2', 'author', 'other'))
+			uow.commit()
+		self.assertEqual(list(memory.store.blobs), [content_digest('other')])
+		self.assertIsNone(view.get_digest('isbn'))
+
 
 class TestAdaptersMemoryBookView(unittest.TestCase):
 	"""Set of unit tests for the memory.py MemoryBookView class and its
 	implementations.
 
-	Tests: test_get_all, test_get_by_name, test_get_by_author
+	Tests: test_get_all, test_get_by_name, test_get_by_author, test_pages,
+	test_summaries, test_search
 	"""
 	def test_get_all(self):
 		"""Steps:
@@ -58,6 +187,7 @@ class TestAdaptersMemoryBookView(unittest.TestCase):
 			uow.books.save(book1)
 			uow.books.save(book2)
 			uow.books.save(book3)
+			uow.commit()
 
 		books = view.get_all()
 		self.assertTrue(len(books) == 3)
@@ -88,6 +218,7 @@ class TestAdaptersMemoryBookView(unittest.TestCase):
 			uow.books.save(book1)
 			uow.books.save(book2)
 			uow.books.save(book3)
+			uow.commit()
 
 		books = view.get_by_name('name1')
 		self.assertEqual(len(books), 2)
@@ -123,6 +254,7 @@ class TestAdaptersMemoryBookView(unittest.TestCase):
 			uow.books.save(book1)
 			uow.books.save(book2)
 			uow.books.save(book3)
+			uow.commit()
 
 		books = view.get_by_author('author1')
 		self.assertEqual(len(books), 2)
@@ -137,6 +269,406 @@ class TestAdaptersMemoryBookView(unittest.TestCase):
 		s_book2 = books[0]
 		self.assertEqual(book2, s_book2)
 
+	def test_pages(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Creates an unit of work to handle the saving of four books
+		3 - Fetches all books page by page and verifies them
+		4 - Fetches pages of books by name and author and verifies them
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name1', 'author2', 'content2')
+		book3 = Book('isbn-3456', 'name2', 'author1', 'content3')
+		book4 = Book('isbn-4567', 'name1', 'author1', 'content4')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book4, book2, book3, book1])
+			uow.commit()
+
+		self.assertEqual(view.get_all(limit=3), [book1, book2, book3])
+		self.assertEqual(view.get_all('isbn-3456', 3), [book4])
+		self.assertEqual(view.get_all('isbn-4567', 3), [])
+
+		self.assertEqual(view.get_by_name('name1', limit=2), [book1, book2])
+		self.assertEqual(view.get_by_name('name1', 'isbn-2345', 2), [book4])
+
+		self.assertEqual(view.get_by_author('author1', 'isbn-1234', 1),
+						 [book3])
+
+	def test_summaries(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Creates an unit of work to handle the saving of two books
+		3 - Fetches summaries of the books and verifies them
+		4 - Fetches the content of a book and verifies it
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name1', 'author2', 'content2')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		summary1 = BookSummary('isbn-1234', 'name1', 'author1')
+		summary2 = BookSummary('isbn-2345', 'name1', 'author2')
+
+		self.assertEqual(view.get_all_summaries(), [summary1, summary2])
+		self.assertEqual(view.get_summaries_by_name('name1'),
+						 [summary1, summary2])
+		self.assertEqual(view.get_summaries_by_author('author2'),
+						 [summary2])
+
+		self.assertEqual(view.get_content('isbn-2345'), 'content2')
+		self.assertIsNone(view.get_content('isbn-3456'))
+
+	def test_search(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Creates an unit of work to handle the saving of three books
+		3 - Searches words and verifies the matches and their ranking
+		4 - Overwrites a book and verifies if its old words are forgotten
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		book1 = Book('isbn-1234', 'The River', 'Ann', 'a king by the river')
+		book2 = Book('isbn-2345', 'The King', 'Bob', 'once upon a time')
+		book3 = Book('isbn-3456', 'Night', 'Carl', 'the king slept')
+
+		with uowm.start() as uow:
+			uow.books.save(book1)
+			uow.books.save_many([book2, book3])
+			uow.commit()
+
+		summary1 = BookSummary('isbn-1234', 'The River', 'Ann')
+		summary2 = BookSummary('isbn-2345', 'The King', 'Bob')
+
+		self.assertEqual(view.search('KING')[0], summary2)
+		self.assertEqual(len(view.search('king')), 3)
+		self.assertEqual(len(view.search('king', 2)), 2)
+		self.assertEqual(view.search('river king'), [summary1])
+		self.assertEqual(view.search('"river" OR'), [])
+		self.assertEqual(view.search('queen'), [])
+		self.assertEqual(view.search(''), [])
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1234', 'The Sea', 'Ann', 'a queen'))
+			uow.commit()
+
+		self.assertEqual(len(view.search('river')), 0)
+		self.assertEqual(len(view.search('queen')), 1)
+
+
+class TestAdaptersMemoryUnitOfWork(unittest.TestCase):
+	"""Set of unit tests for the memory.py MemoryUnitOfWork class and its
+	implementations.
+
+	Tests: test_rollback, test_snapshot, test_atomic
+	"""
+	def test_rollback(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Saves books without committing, rolling back and committing
+		3 - Verifies if only the committed book has been stored
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-2', 'name', 'author', 'content'))
+			uow.rollback()
+			uow.books.save(Book('isbn-3', 'name', 'author', 'content'))
+			uow.commit()
+
+		self.assertEqual([b.isbn for b in view.get_all()], ['isbn-3'])
+
+	def test_snapshot(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase with a stored book
+		2 - Takes a snapshot of the store and overwrites the book
+		3 - Verifies if the snapshot still holds the old book
+		"""
+		memory = MemoryDatabase({'stripes': 1})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name1', 'author', 'content'))
+			uow.commit()
+
+		stripe, = memory.store.snapshot()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name2', 'author', 'content'))
+			uow.commit()
+
+		self.assertEqual(stripe.books['isbn'],
+						 ('isbn', 'name1', 'author', 'content',
+						  content_digest('content')))
+		self.assertEqual(stripe.names, {'name1': {'isbn'}})
+		self.assertEqual(memory.get_view().get_by_isbn('isbn').name, 'name2')
+
+	def test_atomic(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Commits batches of books sharing a name from several threads
+		3 - Verifies if readers always see whole batches
+		"""
+		memory = MemoryDatabase({'stripes': 4})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		view = memory.get_view()
+
+		def writer(thread):
+			for i in range(50):
+				name = 'name-{0}-{1}'.format(thread, i)
+				with uowm.start() as uow:
+					uow.books.save_many([
+						Book('{0}-{1}'.format(name, j), name, 'author', 'c') \
+						for j in range(8)
+					])
+					uow.commit()
+
+		partial = []
+
+		def reader():
+			for i in range(50):
+				for thread in range(4):
+					name = 'name-{0}-{1}'.format(thread, i)
+					count = len(view.get_summaries_by_name(name))
+					if count not in (0, 8):
+						partial.append(count)
+
+		threads = [threading.Thread(target=writer, args=(t,)) \
+				   for t in range(4)]
+		threads += [threading.Thread(target=reader) for _ in range(4)]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+
+		self.assertEqual(partial, [])
+		self.assertEqual(len(view.get_all()), 4 * 50 * 8)
+
+
+class TestAdaptersMemoryOutbox(unittest.TestCase):
+	"""Set of unit tests for the memory.py MemoryOutbox and MemoryOutboxView
+	classes and their implementations.
+
+	Tests: test_commit, test_rollback
+	"""
+	def test_commit(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Adds events to the outbox of a unit of work, and of another one
+		saving nothing else
+		3 - Verifies if the events are pending only once committed, in
+		order, until acknowledged
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+		outbox = memory.get_outbox()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+			uow.outbox.add(BookRegisteredEvent('isbn-1'))
+			self.assertEqual(outbox.pending(), [])
+			uow.commit()
+
+		with uowm.start() as uow:
+			uow.outbox.add(BookRegisteredEvent('isbn-2'))
+			uow.commit()
+
+		pending = outbox.pending()
+		self.assertEqual([e for _, e in pending],
+						 [BookRegisteredEvent('isbn-1'),
+						  BookRegisteredEvent('isbn-2')])
+
+		outbox.acknowledge([pending[0][0]])
+		self.assertEqual(outbox.pending(), pending[1:])
+
+	def test_rollback(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase
+		2 - Adds an event to the outbox of a unit of work rolled back and of
+		another one left uncommitted
+		3 - Verifies if no event is pending
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		uowm = memory.get_uowm()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name', 'author', 'content'))
+			uow.outbox.add(BookRegisteredEvent('isbn'))
+			uow.rollback()
+			uow.commit()
+
+		with uowm.start() as uow:
+			uow.outbox.add(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(memory.get_outbox().pending(), [])
+
+
+class TestAdaptersMemoryDatabase(unittest.TestCase):
+	"""Set of unit tests for the memory.py MemoryDatabase class and its
+	implementations.
+
+	Tests: test_restart, test_torn_log, test_outbox
+	"""
+	def test_restart(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase persisted to a temporary directory
+		2 - Commits books, tears the database down and commits again
+		3 - Verifies if a new MemoryDatabase loads the books
+		"""
+		directory = tempfile.mkdtemp()
+		cfg = {'path': os.path.join(directory, 'books'), 'codec': 'zlib',
+			   'codec_threshold': 0}
+
+		memory = MemoryDatabase(cfg)
+		memory.set_up()
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save_many([
+				Book('isbn-1', 'name1', 'author', 'a king by the river'),
+				Book('isbn-2', 'name2', 'author', 'content')
+			])
+			uow.commit()
+
+		memory.tear_down()
+		self.assertEqual(sorted(os.listdir(directory)),
+						 ['books.log', 'books.snapshot'])
+
+		memory.set_up()
+		with memory.get_uowm().start() as uow:
+			uow.books.save(Book('isbn-1', 'name3', 'author', 'the queen'))
+			uow.commit()
+
+		# Loads the snapshot and the log without tearing the first one down.
+		restarted = MemoryDatabase(cfg)
+		restarted.set_up()
+		view = restarted.get_view()
+
+		self.assertEqual(view.get_all(), [
+			Book('isbn-1', 'name3', 'author', 'the queen'),
+			Book('isbn-2', 'name2', 'author', 'content')
+		])
+		self.assertEqual(view.get_by_name('name1'), [])
+		self.assertEqual(len(view.search('queen')), 1)
+
+		memory.tear_down()
+		restarted.tear_down()
+		shutil.rmtree(directory)
+
+	def test_torn_log(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase persisted to a temporary directory
+		2 - Commits a book and appends half a frame to its log
+		3 - Verifies if the torn frame is dropped and later commits survive
+		"""
+		directory = tempfile.mkdtemp()
+		cfg = {'path': os.path.join(directory, 'books')}
+
+		memory = MemoryDatabase(cfg)
+		memory.set_up()
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+			uow.commit()
+
+		with open(cfg['path'] + '.log', 'ab') as log:
+			log.write(b'\x10\x00\x00\x00\x00')
+
+		restarted = MemoryDatabase(cfg)
+		restarted.set_up()
+		with restarted.get_uowm().start() as uow:
+			uow.books.save(Book('isbn-2', 'name', 'author', 'content'))
+			uow.commit()
+
+		reloaded = MemoryDatabase(cfg)
+		reloaded.set_up()
+
+		self.assertEqual([b.isbn for b in reloaded.get_view().get_all()],
+						 ['isbn-1', 'isbn-2'])
+
+		for database in (memory, restarted, reloaded):
+			database.tear_down()
+		shutil.rmtree(directory)
+
+
+	def test_outbox(self):
+		"""Steps:
+		1 - Instantiates a MemoryDatabase persisted to a temporary directory
+		2 - Commits events and acknowledges one of them
+		3 - Verifies if a new MemoryDatabase loads the pending events, both
+		from the log and from the snapshot, with new ids after theirs
+		"""
+		directory = tempfile.mkdtemp()
+		cfg = {'path': os.path.join(directory, 'books')}
+
+		memory = MemoryDatabase(cfg)
+		memory.set_up()
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+			uow.outbox.add(BookRegisteredEvent('isbn-1'))
+			uow.outbox.add(BooksRegisteredEvent(('isbn-1', 'isbn-2')))
+			uow.commit()
+
+		outbox = memory.get_outbox()
+		pending = outbox.pending()
+		outbox.acknowledge([pending[0][0]])
+
+		# Loads the log without tearing the first one down.
+		restarted = MemoryDatabase(cfg)
+		restarted.set_up()
+		self.assertEqual(restarted.get_outbox().pending(), pending[1:])
+
+		with restarted.get_uowm().start() as uow:
+			uow.outbox.add(BookRegisteredEvent('isbn-3'))
+			uow.commit()
+		restarted.tear_down()
+
+		reloaded = MemoryDatabase(cfg)
+		reloaded.set_up()
+		reloaded_pending = reloaded.get_outbox().pending()
+
+		self.assertEqual([e for _, e in reloaded_pending],
+						 [BooksRegisteredEvent(('isbn-1', 'isbn-2')),
+						  BookRegisteredEvent('isbn-3')])
+		self.assertGreater(reloaded_pending[1][0], pending[1][0])
+
+		for database in (memory, reloaded):
+			database.tear_down()
+		shutil.rmtree(directory)
+
 
 if __name__ == '__main__':
 	unittest.main()
@@ -0,0 +1,266 @@
+"""Unit tests of the application's adapter shared_memory.py functions."""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+import multiprocessing
+from multiprocessing import AuthenticationError
+
+from app.domain.model import Book, BookSummary, content_digest
+from app.adapters.memory import MemoryDatabase
+from app.adapters.shared_memory import SharedMemoryDatabase
+
+
+# Patches gevent after the adapter is imported, as the application does.
+GEVENT_SCRIPT = """
+import sys
+from app.domain.model import Book
+from app.adapters.shared_memory import SharedMemoryDatabase
+
+from gevent import monkey
+monkey.patch_all()
+
+cfg = {'path': sys.argv[1], 'authkey': 'key'}
+owner = SharedMemoryDatabase(cfg)
+owner.set_up()
+client = SharedMemoryDatabase(cfg)
+client.set_up()
+
+with client.get_uowm().start() as uow:
+	uow.books.save(Book('isbn', 'name', 'author', 'content'))
+	uow.commit()
+
+print(owner.get_view().get_by_isbn('isbn').name)
+client.tear_down()
+owner.tear_down()
+"""
+
+
+def register(path: str, book: Book):
+	"""Registers a book from another process.
+
+	Params
+	------
+	path: str -- the path of the shared file
+	book: Book -- the book to be registered
+	"""
+	database = SharedMemoryDatabase({'path': path})
+	database.set_up()
+
+	with database.get_uowm().start() as uow:
+		uow.books.save(book)
+		uow.commit()
+
+	database.tear_down()
+
+
+class TestAdaptersSharedMemoryDatabase(unittest.TestCase):
+	"""Set of unit tests for the shared_memory.py SharedMemoryDatabase class
+	and its implementations.
+
+	Tests: test_owner, test_client, test_process, test_compressed,
+	test_restart, test_index, test_authkey, test_gevent
+	"""
+	def setUp(self):
+		"""Creates a directory for the shared file."""
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'books.shm')
+		self.databases = []
+
+	def tearDown(self):
+		"""Tears the databases down and removes their directory."""
+		for database in reversed(self.databases):
+			database.tear_down()
+
+		shutil.rmtree(self.directory)
+
+	def start(self, **cfg) -> SharedMemoryDatabase:
+		"""Sets up a database at the shared file.
+
+		Params
+		------
+		cfg -- the database's configuration besides its path
+		"""
+		database = SharedMemoryDatabase(dict(cfg, path=self.path))
+		database.set_up()
+		self.databases.append(database)
+
+		return database
+
+	def test_owner(self):
+		"""Steps:
+		1 - Sets up two databases at the same file
+		2 - Verifies the first one owns the file
+		"""
+		owner = self.start()
+		client = self.start()
+
+		self.assertTrue(owner.owner)
+		self.assertFalse(client.owner)
+
+	def test_client(self):
+		"""Steps:
+		1 - Sets up an owner and a client database at the same file
+		2 - Saves a book through each of them
+		3 - Verifies through both views that both books have been saved
+		"""
+		owner = self.start()
+		client = self.start()
+
+		book1 = Book('isbn-1234', 'name1', 'author', 'content one')
+		book2 = Book('isbn-2345', 'name2', 'author', 'content two')
+
+		with owner.get_uowm().start() as uow:
+			uow.books.save(book1)
+			uow.commit()
+
+		with client.get_uowm().start() as uow:
+			uow.books.save(book2)
+			uow.commit()
+
+		for database in (owner, client):
+			view = database.get_view()
+			self.assertEqual(view.get_all(), [book1, book2])
+			self.assertEqual(view.get_by_author('author'), [book1, book2])
+			self.assertEqual(view.get_content('isbn-2345'), 'content two')
+			self.assertEqual(view.search('two'),
+							 [BookSummary('isbn-2345', 'name2', 'author')])
+
+	def test_process(self):
+		"""Steps:
+		1 - Sets up an owner database
+		2 - Saves a book from another process
+		3 - Verifies through the owner's view if the book has been saved
+		"""
+		owner = self.start()
+
+		book = Book('isbn', 'name', 'author', 'content')
+		process = multiprocessing.Process(target=register,
+										  args=(self.path, book))
+		process.start()
+		process.join()
+
+		self.assertEqual(process.exitcode, 0)
+		self.assertEqual(owner.get_view().get_by_isbn('isbn'), book)
+
+	def test_compressed(self):
+		"""Steps:
+		1 - Sets up an owner and a client database compressing content
+		2 - Saves a book through the client
+		3 - Verifies through both views if the book has been saved
+		"""
+		owner = self.start(codec='zlib', codec_threshold=0)
+		client = self.start(codec='zlib', codec_threshold=0)
+
+		book = Book('isbn', 'name', 'author', 'content ' * 100)
+
+		with client.get_uowm().start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(owner.get_view().get_by_isbn('isbn'), book)
+		self.assertEqual(client.get_view().get_by_isbn('isbn'), book)
+
+	def test_restart(self):
+		"""Steps:
+		1 - Sets up an owner database and saves a book twice
+		2 - Tears it down and sets another one up at the same file
+		3 - Verifies the book is found with its last name only
+		"""
+		database = self.start()
+
+		for name in ('name1', 'name2'):
+			with database.get_uowm().start() as uow:
+				uow.books.save(Book('isbn', name, 'author', 'content'))
+				uow.commit()
+
+		database.tear_down()
+		self.databases.remove(database)
+
+		view = self.start().get_view()
+		self.assertEqual(view.get_by_isbn('isbn').name, 'name2')
+		self.assertEqual(view.get_by_name('name1'), [])
+
+	def test_index(self):
+		"""Steps:
+		1 - Sets up an owner and a client database and saves books through
+		the owner, one of them twice
+		2 - Verifies if the client indexes only the records' offsets
+		3 - Verifies if the client's view reads the content, digests and
+		search results out of the file, ranked as by a MemoryDatabase
+		"""
+		owner = self.start()
+		client = self.start()
+
+		books = [Book('isbn-1', 'name1', 'author', 'a king by the river'),
+				 Book('isbn-2', 'name2', 'author', 'the king and the queen'),
+				 Book('isbn-3', 'name3', 'other', 'the queen')]
+		for book in books + [books[0]]:
+			with owner.get_uowm().start() as uow:
+				uow.books.save(book)
+				uow.commit()
+
+		view = client.get_view()
+		self.assertEqual(view.get_all(), books)
+
+		for stripe in client.store.snapshot():
+			self.assertEqual(stripe.postings, {})
+			for book in stripe.books.values():
+				self.assertIsInstance(book[3], int)
+
+		self.assertEqual(view.get_by_author('author'), books[:2])
+		self.assertEqual(view.get_digest('isbn-2'),
+						 content_digest('the king and the queen'))
+		self.assertEqual(view.search('castle'), [])
+
+		# Ranks as the memory database does.
+		memory = MemoryDatabase({})
+		memory.set_up()
+		with memory.get_uowm().start() as uow:
+			uow.books.save_many(books)
+			uow.commit()
+
+		for query in ('the queen', 'king', 'author'):
+			self.assertEqual(view.search(query),
+							 memory.get_view().search(query))
+
+	def test_authkey(self):
+		"""Steps:
+		1 - Sets up an owner database with a key
+		2 - Verifies if a client with another key is refused
+		3 - Verifies if a client with the same key can save a book
+		"""
+		owner = self.start(authkey='key')
+
+		# The owner warns at the client's thread once it has been refused.
+		with self.assertLogs('sample', 'WARNING') as logs:
+			with self.assertRaises(AuthenticationError):
+				self.start(authkey='other')
+
+			deadline = time.monotonic() + 5
+			while not logs.output and time.monotonic() < deadline:
+				time.sleep(0.01)
+
+		book = Book('isbn', 'name', 'author', 'content')
+		with self.start(authkey='key').get_uowm().start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(owner.get_view().get_by_isbn('isbn'), book)
+
+	def test_gevent(self):
+		"""Steps:
+		1 - Runs a script saving a book through a client database after
+		gevent has monkey patched its process
+		2 - Verifies if the script has exited in time with the book saved
+		"""
+		result = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT,
+								 self.path], stdout=subprocess.PIPE,
+								stderr=subprocess.PIPE, timeout=60)
+
+		self.assertEqual(result.returncode, 0, result.stderr.decode())
+		self.assertEqual(result.stdout.decode().strip(), 'name')
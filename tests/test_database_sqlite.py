@@ -1,25 +1,42 @@
 """Unit tests of the application's adapter sqlite.py functions."""
 
 import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
+import threading
 
-from app.domain.model import Book
-from app.adapters.sqlite import SqliteDatabase
+from app.domain.model import Book, BookSummary
+from app.domain.messages import BookRegisteredEvent, BooksRegisteredEvent
+from app.adapters.sqlite import SqliteDatabase, SqliteConnectionPool, \
+								ConnectionPoolTimeoutError, \
+								ConnectionPoolClosedError
 
 
 class TestAdaptersSqliteBookRepository(unittest.TestCase):
 	"""Set of unit tests for the sqlite.py SqliteBookRepository class and its
 	implementations.
 
-	Tests: test_save
+	Tests: test_save, test_save_many, test_save_many_duplicate,
+	test_save_failed, test_save_compressed, test_save_deduplicated
 	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
 	def test_save(self):
 		"""Steps:
 		1 - Instantiates a SqliteDatabase
 		2 - Creates an unit of work to handle the saving of a book
 		3 - Verifies through view if the book has been saved
 		"""
-		sqlite = SqliteDatabase({'location': 'temp.sqlite'})
+		sqlite = SqliteDatabase({'location': self.location})
 		sqlite.set_up()
 
 		uowm = sqlite.get_uowm()
@@ -33,22 +50,187 @@ class TestAdaptersSqliteBookRepository(unittest.TestCase):
 
 		self.assertEqual(book, view.get_by_isbn('isbn'))
 
-		os.remove('temp.sqlite')
+		sqlite.tear_down()
+
+	def test_save_many(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Creates an unit of work to handle the saving of two books at once
+		3 - Verifies through view if the books have been saved
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name2', 'author2', 'content2')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		self.assertEqual(view.get_all(), [book1, book2])
+
+		sqlite.tear_down()
+
+	def test_save_many_duplicate(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves a batch of books that repeats an ISBN
+		3 - Verifies if the error is raised and no book has been saved
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-1234', 'name2', 'author2', 'content2')
+
+		with self.assertRaises(sqlite3.IntegrityError):
+			with uowm.start() as uow:
+				uow.books.save_many([book1, book2])
+				uow.commit()
+
+		self.assertEqual(view.get_all(), [])
+
+		sqlite.tear_down()
+
+	def test_save_failed(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves a book, then a book repeating its ISBN with another
+		content and a new book at an unit of work committed anyway
+		3 - Verifies if only the blobs of the saved books are stored
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name2', 'author2', 'content2')
+
+		with uowm.start() as uow:
+			uow.books.save(book1)
+			uow.commit()
+
+		with uowm.start() as uow:
+			with self.assertRaises(sqlite3.IntegrityError):
+				uow.books.save(Book('isbn-1234', 'name', 'author', 'other'))
+			with self.assertRaises(sqlite3.IntegrityError):
+				uow.books.save_many([Book('isbn-1234', 'name', 'author',
+										  'another')])
+			uow.books.save(book2)
+			uow.commit()
+
+		self.assertEqual(sqlite.get_view().get_all(), [book1, book2])
+
+		conn = sqlite3.connect(self.location)
+		blobs = conn.execute('SELECT digest, refs FROM blobs;').fetchall()
+		conn.close()
+		self.assertEqual(sorted(blobs),
+						 sorted([(book1.digest(), 1), (book2.digest(), 1)]))
+
+		sqlite.tear_down()
+
+	def test_save_compressed(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase compressing content with zlib
+		2 - Creates an unit of work to handle the saving of a book
+		3 - Verifies through view if the book has been saved
+		"""
+		sqlite = SqliteDatabase({'location': self.location, 'codec': 'zlib',
+							 'codec_threshold': 0})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book = Book('isbn', 'name', 'author', 'content' * 100)
+
+		with uowm.start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(book, view.get_by_isbn('isbn'))
+		self.assertEqual(book.content, view.get_content('isbn'))
+		self.assertEqual([book], view.get_all())
+
+		sqlite.tear_down()
+
+	def test_save_deduplicated(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves three books, two of them sharing their content
+		3 - Verifies if shared content is stored once and referenced twice
+		4 - Verifies through view if the books and their digests are read
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author', 'content')
+		book2 = Book('isbn-2345', 'name2', 'author', 'content')
+		book3 = Book('isbn-3456', 'name3', 'author', 'other content')
+
+		with uowm.start() as uow:
+			uow.books.save(book1)
+			uow.books.save_many([book2, book3])
+			uow.commit()
+
+		with sqlite.readers.connection() as conn:
+			blobs = conn.execute("""
+				SELECT digest, refs FROM blobs ORDER BY refs;
+			""").fetchall()
+		self.assertEqual(blobs, [(book3.digest(), 1), (book1.digest(), 2)])
+
+		self.assertEqual(view.get_all(), [book1, book2, book3])
+		self.assertEqual(view.get_digest('isbn-1234'),
+						 view.get_digest('isbn-2345'))
+		self.assertNotEqual(view.get_digest('isbn-1234'),
+							view.get_digest('isbn-3456'))
+		self.assertIsNone(view.get_digest('isbn'))
+
+		with sqlite.writer.connection() as conn:
+			conn.execute("DELETE FROM books WHERE isbn='isbn-3456';")
+			conn.execute("""
+				UPDATE books SET digest=? WHERE isbn='isbn-2345';
+			""", (book3.digest(),))
+			refs = conn.execute('SELECT refs FROM blobs;').fetchall()
+			conn.rollback()
+		self.assertEqual(refs, [(1,)])
+
+		sqlite.tear_down()
 
 
 class TestAdaptersSqliteBookView(unittest.TestCase):
 	"""Set of unit tests for the sqlite.py SqliteBookView class and its
 	implementations.
 
-	Tests: test_get_all, test_get_by_name, test_get_by_author
+	Tests: test_get_all, test_get_by_name, test_get_by_author, test_quotes,
+	test_pages, test_summaries, test_search
 	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
 	def test_get_all(self):
 		"""Steps:
 		1 - Instantiates a SqliteDatabase
 		2 - Creates an unit of work to handle the saving of three books
 		3 - Fetches all books and verifies if they are the same
 		"""
-		sqlite = SqliteDatabase({'location': 'temp.sqlite'})
+		sqlite = SqliteDatabase({'location': self.location})
 		sqlite.set_up()
 
 		uowm = sqlite.get_uowm()
@@ -72,7 +254,7 @@ class TestAdaptersSqliteBookView(unittest.TestCase):
 		self.assertEqual(book2, s_book2)
 		self.assertEqual(book3, s_book3)
 
-		os.remove('temp.sqlite')
+		sqlite.tear_down()
 
 	def test_get_by_name(self):
 		"""Steps:
@@ -81,7 +263,7 @@ class TestAdaptersSqliteBookView(unittest.TestCase):
 		3 - Fetches books by 'name1' and verifies if they are the same
 		3 - Fetches books by 'name2' and verifies if they are the same
 		"""
-		sqlite = SqliteDatabase({'location': 'temp.sqlite'})
+		sqlite = SqliteDatabase({'location': self.location})
 		sqlite.set_up()
 
 		uowm = sqlite.get_uowm()
@@ -110,7 +292,7 @@ class TestAdaptersSqliteBookView(unittest.TestCase):
 		s_book3 = books[0]
 		self.assertEqual(book3, s_book3)
 
-		os.remove('temp.sqlite')
+		sqlite.tear_down()
 
 	def test_get_by_author(self):
 		"""Steps:
@@ -119,7 +301,7 @@ class TestAdaptersSqliteBookView(unittest.TestCase):
 		3 - Fetches books by 'author1' and verifies if they are the same
 		3 - Fetches books by 'author2' and verifies if they are the same
 		"""
-		sqlite = SqliteDatabase({'location': 'temp.sqlite'})
+		sqlite = SqliteDatabase({'location': self.location})
 		sqlite.set_up()
 
 		uowm = sqlite.get_uowm()
@@ -148,7 +330,427 @@ class TestAdaptersSqliteBookView(unittest.TestCase):
 		s_book2 = books[0]
 		self.assertEqual(book2, s_book2)
 
-		os.remove('temp.sqlite')
+		sqlite.tear_down()
+
+	def test_quotes(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves a book whose name and author contain quotes
+		3 - Fetches it by name and author and verifies if it is the same
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book = Book('isbn', 'Finnegan\'s Wake', 'James "Jim" Joyce', 'content')
+
+		with uowm.start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(view.get_by_name('Finnegan\'s Wake'), [book])
+		self.assertEqual(view.get_by_author('James "Jim" Joyce'), [book])
+
+		sqlite.tear_down()
+
+	def test_pages(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Creates an unit of work to handle the saving of four books
+		3 - Fetches all books page by page and verifies them
+		4 - Fetches pages of books by name and author and verifies them
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name1', 'author2', 'content2')
+		book3 = Book('isbn-3456', 'name2', 'author1', 'content3')
+		book4 = Book('isbn-4567', 'name1', 'author1', 'content4')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book4, book2, book3, book1])
+			uow.commit()
+
+		self.assertEqual(view.get_all(limit=3), [book1, book2, book3])
+		self.assertEqual(view.get_all('isbn-3456', 3), [book4])
+		self.assertEqual(view.get_all('isbn-4567', 3), [])
+
+		self.assertEqual(view.get_by_name('name1', limit=2), [book1, book2])
+		self.assertEqual(view.get_by_name('name1', 'isbn-2345', 2), [book4])
+
+		self.assertEqual(view.get_by_author('author1', 'isbn-1234', 1),
+						 [book3])
+
+		sqlite.tear_down()
+
+	def test_summaries(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Creates an unit of work to handle the saving of two books
+		3 - Fetches summaries of the books and verifies them
+		4 - Fetches the content of a book and verifies it
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content1')
+		book2 = Book('isbn-2345', 'name1', 'author2', 'content2')
+
+		with uowm.start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		summary1 = BookSummary('isbn-1234', 'name1', 'author1')
+		summary2 = BookSummary('isbn-2345', 'name1', 'author2')
+
+		self.assertEqual(view.get_all_summaries(), [summary1, summary2])
+		self.assertEqual(view.get_summaries_by_name('name1'),
+						 [summary1, summary2])
+		self.assertEqual(view.get_summaries_by_author('author2'),
+						 [summary2])
+
+		self.assertEqual(view.get_content('isbn-2345'), 'content2')
+		self.assertIsNone(view.get_content('isbn-3456'))
+
+		sqlite.tear_down()
+
+	def test_search(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Creates an unit of work to handle the saving of three books
+		3 - Searches words and verifies the matches and their ranking
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		book1 = Book('isbn-1234', 'The River', 'Ann', 'a king by the river')
+		book2 = Book('isbn-2345', 'The King', 'Bob', 'once upon a time')
+		book3 = Book('isbn-3456', 'Night', 'Carl', 'the king slept')
+
+		with uowm.start() as uow:
+			uow.books.save(book1)
+			uow.books.save_many([book2, book3])
+			uow.commit()
+
+		summary1 = BookSummary('isbn-1234', 'The River', 'Ann')
+		summary2 = BookSummary('isbn-2345', 'The King', 'Bob')
+
+		self.assertEqual(view.search('KING')[0], summary2)
+		self.assertEqual(len(view.search('king')), 3)
+		self.assertEqual(len(view.search('king', 2)), 2)
+		self.assertEqual(view.search('river king'), [summary1])
+		self.assertEqual(view.search('"river" OR'), [])
+		self.assertEqual(view.search('queen'), [])
+		self.assertEqual(view.search(''), [])
+
+		sqlite.tear_down()
+
+
+class TestAdaptersSqliteDatabase(unittest.TestCase):
+	"""Set of unit tests for the sqlite.py SqliteDatabase class and its
+	implementations.
+
+	Tests: test_wal, test_read_only, test_indexes, test_move_inline,
+	test_memory
+	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
+	def test_wal(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase in WAL mode
+		2 - Saves a book at an unit of work without committing it yet
+		3 - Verifies if the view keeps reading while the write is pending
+		4 - Commits and verifies if the view sees the book
+		"""
+		sqlite = SqliteDatabase({'location': self.location,
+								 'journal_mode': 'wal'})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		view = sqlite.get_view()
+
+		with sqlite.writer.connection() as conn:
+			mode = conn.execute('PRAGMA journal_mode;').fetchone()[0]
+		self.assertEqual(mode, 'wal')
+
+		book = Book('isbn', 'name', 'author', 'content')
+
+		with uowm.start() as uow:
+			uow.books.save(book)
+			self.assertEqual(view.get_all(), [])
+
+			uow.commit()
+			self.assertEqual(view.get_all(), [book])
+
+		sqlite.tear_down()
+
+	def test_read_only(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Borrows a reader connection
+		3 - Verifies if writing through it raises the expected error
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		with sqlite.readers.connection() as conn:
+			with self.assertRaises(sqlite3.OperationalError):
+				conn.execute("INSERT INTO books VALUES ('i', 'n', 'a', 'c');")
+
+		sqlite.tear_down()
+
+	def test_indexes(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase and sets it up twice
+		2 - Verifies if name and author lookups are served by an index
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+		sqlite.set_up()
+
+		with sqlite.readers.connection() as conn:
+			for column in ('name', 'author'):
+				plan = conn.execute(
+					'EXPLAIN QUERY PLAN SELECT * FROM books WHERE {0}=?;' \
+					.format(column), ('value',)
+				).fetchall()
+				self.assertIn('USING INDEX', plan[0][3])
+
+		sqlite.tear_down()
+
+	def test_memory(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase in memory
+		2 - Saves a book and verifies if the view finds it and its content
+		"""
+		sqlite = SqliteDatabase({'location': ':memory:'})
+		sqlite.set_up()
+
+		book = Book('isbn', 'name', 'author', 'content')
+		with sqlite.get_uowm().start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		view = sqlite.get_view()
+		self.assertEqual(view.get_by_isbn('isbn'), book)
+		self.assertEqual(view.search('content'),
+						 [BookSummary('isbn', 'name', 'author')])
+
+		sqlite.tear_down()
+
+	def test_move_inline(self):
+		"""Steps:
+		1 - Creates a database with the books' content stored inline
+		2 - Sets a SqliteDatabase up on it
+		3 - Verifies if the books, their search and their content are kept
+		"""
+		conn = sqlite3.connect(self.location)
+		conn.execute("""
+			CREATE TABLE books (
+				isbn TEXT PRIMARY KEY,
+				name TEXT NOT NULL,
+				author TEXT NOT NULL,
+				content TEXT NOT NULL
+			);
+		""")
+		conn.executemany('INSERT INTO books VALUES (?, ?, ?, ?);', [
+			('isbn-1234', 'name1', 'author', 'river'),
+			('isbn-2345', 'name2', 'author', 'river')
+		])
+		conn.commit()
+		conn.close()
+
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		view = sqlite.get_view()
+		self.assertEqual(view.get_all(), [
+			Book('isbn-1234', 'name1', 'author', 'river'),
+			Book('isbn-2345', 'name2', 'author', 'river')
+		])
+		self.assertEqual(len(view.search('river')), 2)
+
+		with sqlite.readers.connection() as conn:
+			refs = conn.execute('SELECT refs FROM blobs;').fetchall()
+		self.assertEqual(refs, [(2,)])
+
+		sqlite.tear_down()
+
+
+class TestAdaptersSqliteOutbox(unittest.TestCase):
+	"""Set of unit tests for the sqlite.py SqliteOutbox and SqliteOutboxView
+	classes and their implementations.
+
+	Tests: test_commit, test_rollback
+	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
+	def test_commit(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves books adding their events to the outbox of the same unit of
+		work
+		3 - Verifies if the events are pending in order until acknowledged
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+		outbox = sqlite.get_outbox()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+			uow.outbox.add(BookRegisteredEvent('isbn-1'))
+			uow.books.save(Book('isbn-2', 'name', 'author', 'content'))
+			uow.outbox.add(BooksRegisteredEvent(('isbn-2',)))
+			uow.commit()
+
+		pending = outbox.pending()
+		self.assertEqual([e for _, e in pending],
+						 [BookRegisteredEvent('isbn-1'),
+						  BooksRegisteredEvent(('isbn-2',))])
+		self.assertEqual(outbox.pending(1), pending[:1])
+
+		outbox.acknowledge([pending[0][0]])
+		self.assertEqual(outbox.pending(), pending[1:])
+
+		sqlite.tear_down()
+
+	def test_rollback(self):
+		"""Steps:
+		1 - Instantiates a SqliteDatabase
+		2 - Saves a duplicated book adding its event to the outbox
+		3 - Verifies if the event has been discarded along with the book
+		"""
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		uowm = sqlite.get_uowm()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn', 'name', 'author', 'content'))
+			uow.commit()
+
+		with self.assertRaises(sqlite3.IntegrityError):
+			with uowm.start() as uow:
+				uow.outbox.add(BookRegisteredEvent('isbn'))
+				uow.books.save(Book('isbn', 'name', 'author', 'content'))
+				uow.commit()
+
+		self.assertEqual(sqlite.get_outbox().pending(), [])
+
+		sqlite.tear_down()
+
+
+class TestAdaptersSqliteConnectionPool(unittest.TestCase):
+	"""Set of unit tests for the sqlite.py SqliteConnectionPool class and its
+	implementations.
+
+	Tests: test_reuse, test_nested, test_timeout, test_close
+	"""
+	def test_reuse(self):
+		"""Steps:
+		1 - Instantiates a SqliteConnectionPool
+		2 - Acquires and releases a connection twice
+		3 - Verifies if the same connection has been reused
+		"""
+		pool = SqliteConnectionPool(':memory:', size=2)
+
+		with pool.connection() as conn1:
+			pass
+		with pool.connection() as conn2:
+			pass
+
+		self.assertIs(conn1, conn2)
+		self.assertEqual(pool.opened, 1)
+		pool.close()
+
+	def test_nested(self):
+		"""Steps:
+		1 - Instantiates a SqliteConnectionPool of size one
+		2 - Acquires a connection inside of another acquisition
+		3 - Verifies if the owner got its own connection back
+		"""
+		pool = SqliteConnectionPool(':memory:', size=1, timeout=0.1)
+
+		with pool.connection() as conn1:
+			with pool.connection() as conn2:
+				self.assertIs(conn1, conn2)
+
+		self.assertEqual(len(pool.idle), 1)
+		pool.close()
+
+	def test_timeout(self):
+		"""Steps:
+		1 - Instantiates a SqliteConnectionPool of size one
+		2 - Holds its connection at another thread
+		3 - Verifies if a checkout raises the expected error after timeout
+		"""
+		pool = SqliteConnectionPool(':memory:', size=1, timeout=0.1)
+
+		acquired = threading.Event()
+		done = threading.Event()
+
+		def hold():
+			with pool.connection():
+				acquired.set()
+				done.wait()
+
+		t = threading.Thread(target=hold)
+		t.start()
+		acquired.wait()
+
+		with self.assertRaises(ConnectionPoolTimeoutError):
+			pool.acquire()
+
+		done.set()
+		t.join()
+
+		with pool.connection() as conn:
+			self.assertIsNotNone(conn)
+		pool.close()
+
+	def test_close(self):
+		"""Steps:
+		1 - Instantiates a SqliteConnectionPool and opens a connection
+		2 - Closes the pool
+		3 - Verifies if no connection is left open and checkouts fail
+		"""
+		pool = SqliteConnectionPool(':memory:', size=2)
+
+		with pool.connection():
+			pass
+		pool.close()
+
+		self.assertEqual(pool.opened, 0)
+		with self.assertRaises(ConnectionPoolClosedError):
+			pool.acquire()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,210 @@
+"""Unit tests of the application's adapter sqlite_sharded.py functions."""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import subprocess
+
+from app.domain.model import Book, BookSummary
+from app.adapters.sqlite_sharded import SqliteShardedDatabase, shard_of
+
+
+# Patches gevent after the adapter is imported, as the application does, and
+# prints the books stored and whether the shards were written at threads
+# other than the greenlets'.
+GEVENT_SCRIPT = """
+import sys
+from app.domain.model import Book
+from app.adapters.sqlite import SqliteDatabase
+from app.adapters.sqlite_sharded import SqliteShardedDatabase
+
+from gevent import monkey
+monkey.patch_all()
+import gevent
+
+get_ident = monkey.get_original('_thread', 'get_ident')
+threads = set()
+get_uowm = SqliteDatabase.get_uowm
+SqliteDatabase.get_uowm = lambda d: threads.add(get_ident()) or get_uowm(d)
+
+sharded = SqliteShardedDatabase({'location': sys.argv[1], 'shards': 3})
+sharded.set_up()
+
+def register(batch):
+	with sharded.get_uowm().start() as uow:
+		uow.books.save_many([Book('isbn-{0}-{1}'.format(batch, i), 'name',
+								  'author', 'content') for i in range(10)])
+		uow.commit()
+
+gevent.joinall([gevent.spawn(register, b) for b in range(5)],
+			   raise_error=True)
+
+print(len(sharded.get_view().get_all()), get_ident() not in threads)
+sharded.tear_down()
+"""
+
+
+class TestAdaptersShardedBookRepository(unittest.TestCase):
+	"""Set of unit tests for the sqlite_sharded.py ShardedBookRepository class
+	and its implementations.
+
+	Tests: test_save_many, test_rollback, test_gevent
+	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db-{0}.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
+	def test_save_many(self):
+		"""Steps:
+		1 - Instantiates a SqliteShardedDatabase of three shards
+		2 - Creates an unit of work to handle the saving of many books
+		3 - Verifies if each book has been stored at its own shard only
+		"""
+		sharded = SqliteShardedDatabase(
+			{'location': self.location, 'shards': 3})
+		sharded.set_up()
+
+		books = [Book('isbn-{0}'.format(i), 'name', 'author', 'content') \
+				 for i in range(30)]
+
+		with sharded.get_uowm().start() as uow:
+			uow.books.save_many(books)
+			uow.commit()
+
+		sharded.tear_down()
+
+		for i in range(3):
+			conn = sqlite3.connect(self.location.format(i))
+			isbns = [r[0] for r in conn.execute('SELECT isbn FROM books;')]
+			conn.close()
+
+			expected = [b.isbn for b in books if shard_of(b.isbn, 3) == i]
+			self.assertNotEqual(expected, [])
+			self.assertEqual(sorted(isbns), sorted(expected))
+
+
+	def test_rollback(self):
+		"""Steps:
+		1 - Instantiates a SqliteShardedDatabase of two shards
+		2 - Saves two books without committing and then one committed
+		3 - Verifies if only the committed book has been stored
+		"""
+		sharded = SqliteShardedDatabase(
+			{'location': self.location, 'shards': 2})
+		sharded.set_up()
+
+		uowm = sharded.get_uowm()
+		view = sharded.get_view()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-1', 'name', 'author', 'content'))
+			uow.books.save(Book('isbn-2', 'name', 'author', 'content'))
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-3', 'name', 'author', 'content'))
+			uow.commit()
+
+		self.assertEqual([b.isbn for b in view.get_all()], ['isbn-3'])
+
+		sharded.tear_down()
+
+	def test_gevent(self):
+		"""Steps:
+		1 - Runs a script registering batches from several greenlets after
+		gevent has monkey patched its process
+		2 - Verifies if the books have been stored by native threads
+		"""
+		result = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT,
+								 self.location], stdout=subprocess.PIPE,
+								stderr=subprocess.PIPE, timeout=60)
+
+		self.assertEqual(result.returncode, 0, result.stderr.decode())
+		self.assertEqual(result.stdout.decode().split(), ['50', 'True'])
+
+
+class TestAdaptersShardedBookView(unittest.TestCase):
+	"""Set of unit tests for the sqlite_sharded.py ShardedBookView class and
+	its implementations.
+
+	Tests: test_get_by_isbn, test_pages, test_search
+	"""
+	def setUp(self):
+		"""Stores books across four shards at a temporary directory."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db-{0}.sqlite')
+
+		self.sharded = SqliteShardedDatabase(
+			{'location': self.location, 'shards': 4})
+		self.sharded.set_up()
+
+		self.books = [
+			Book('isbn-{0:02d}'.format(i), 'name{0}'.format(i % 2),
+				 'author{0}'.format(i % 3), 'content {0}'.format(i)) \
+			for i in range(20)
+		]
+
+		with self.sharded.get_uowm().start() as uow:
+			uow.books.save_many(self.books)
+			uow.commit()
+
+		self.view = self.sharded.get_view()
+
+	def tearDown(self):
+		"""Removes the shards and their directory."""
+		self.sharded.tear_down()
+		shutil.rmtree(self.directory)
+
+	def test_get_by_isbn(self):
+		"""Steps:
+		1 - Fetches every book and its content by ISBN and verifies them
+		"""
+		for book in self.books:
+			self.assertEqual(self.view.get_by_isbn(book.isbn), book)
+			self.assertEqual(self.view.get_content(book.isbn), book.content)
+
+		self.assertIsNone(self.view.get_content('isbn-99'))
+
+	def test_pages(self):
+		"""Steps:
+		1 - Fetches all books page by page and verifies their order
+		2 - Fetches books by name and author and verifies them
+		"""
+		self.assertEqual(self.view.get_all(), self.books)
+		self.assertEqual(self.view.get_all(limit=3), self.books[:3])
+		self.assertEqual(self.view.get_all('isbn-02', 3), self.books[3:6])
+		self.assertEqual(self.view.get_all('isbn-19', 3), [])
+
+		self.assertEqual(self.view.get_by_name('name1', limit=2),
+						 [self.books[1], self.books[3]])
+		self.assertEqual(self.view.get_by_author('author2', 'isbn-02'),
+						 self.books[5::3])
+		self.assertEqual(
+			self.view.get_summaries_by_author('author0', limit=1),
+			[BookSummary('isbn-00', 'name0', 'author0')]
+		)
+
+	def test_search(self):
+		"""Steps:
+		1 - Searches words and verifies the matches across shards
+		"""
+		self.assertEqual(len(self.view.search('content', 100)), 20)
+		self.assertEqual(len(self.view.search('content', 5)), 5)
+		self.assertEqual(sorted(self.view.search('name1 author2'),
+								key=lambda b: b.isbn),
+						 [BookSummary('isbn-05', 'name1', 'author2'),
+						  BookSummary('isbn-11', 'name1', 'author2'),
+						  BookSummary('isbn-17', 'name1', 'author2')])
+		self.assertEqual(self.view.search('7'),
+						 [BookSummary('isbn-07', 'name1', 'author1')])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,171 @@
+"""Unit tests of the application's adapter tiered.py functions."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.domain.model import Book, BookSummary
+from app.adapters.tiered import TieredDatabase, HotTier, LruEviction, \
+								LfuEviction, size_of
+
+
+class TestAdaptersTieredEviction(unittest.TestCase):
+	"""Set of unit tests for the tiered.py LruEviction and LfuEviction
+	classes and their implementations.
+
+	Tests: test_lru, test_lfu
+	"""
+	def test_lru(self):
+		"""Steps:
+		1 - Adds three keys to a LruEviction and uses the first one
+		2 - Verifies if the victims follow the order of last use
+		"""
+		eviction = LruEviction()
+		for key in ('a', 'b', 'c'):
+			eviction.add(key)
+		eviction.touch('a')
+
+		victims = []
+		for _ in range(3):
+			victims.append(eviction.victim())
+			eviction.remove(victims[-1])
+
+		self.assertEqual(victims, ['b', 'c', 'a'])
+
+	def test_lfu(self):
+		"""Steps:
+		1 - Adds three keys to a LfuEviction and uses two of them
+		2 - Verifies if the victims follow the order of use counts
+		"""
+		eviction = LfuEviction()
+		for key in ('a', 'b', 'c'):
+			eviction.add(key)
+		for key in ('a', 'a', 'c'):
+			eviction.touch(key)
+
+		victims = []
+		for _ in range(3):
+			victims.append(eviction.victim())
+			eviction.remove(victims[-1])
+
+		self.assertEqual(victims, ['b', 'c', 'a'])
+
+
+class TestAdaptersHotTier(unittest.TestCase):
+	"""Set of unit tests for the tiered.py HotTier class and its
+	implementations.
+
+	Tests: test_budget, test_generation
+	"""
+	def test_budget(self):
+		"""Steps:
+		1 - Instantiates a HotTier with room for two books
+		2 - Puts three books and one larger than the budget
+		3 - Verifies if the least recently used one has been evicted
+		"""
+		books = [('isbn-{0}'.format(i), 'name', 'author', 'content', 'd') \
+				 for i in range(3)]
+		tier = HotTier(size_of(books[0]) * 2, 'lru')
+
+		for book in books:
+			_, generation = tier.get(book[0])
+			tier.put(book, generation)
+		tier.put(('isbn', 'name', 'author', 'content' * 100, 'd'),
+				 tier.generation)
+
+		self.assertEqual(tier.get('isbn-0'), (False, 0))
+		self.assertEqual(tier.get('isbn-2'), (True, books[2]))
+		self.assertEqual(tier.get('isbn'), (False, 0))
+		self.assertEqual(tier.stats()['evictions'], 1)
+		self.assertEqual(tier.stats()['bytes'], size_of(books[0]) * 2)
+
+	def test_generation(self):
+		"""Steps:
+		1 - Misses a book at a HotTier and discards it before putting it
+		2 - Verifies if the book read before the discard is refused
+		"""
+		tier = HotTier(2 ** 20)
+		book = ('isbn', 'name', 'author', 'content', 'd')
+
+		_, generation = tier.get('isbn')
+		tier.discard(['isbn'])
+		tier.put(book, generation)
+
+		found, _ = tier.get('isbn')
+		self.assertFalse(found)
+
+
+class TestAdaptersTieredDatabase(unittest.TestCase):
+	"""Set of unit tests for the tiered.py TieredDatabase class and its
+	implementations.
+
+	Tests: test_read_through, test_write_through, test_rollback
+	"""
+	def setUp(self):
+		"""Sets a TieredDatabase up at a temporary directory."""
+		self.directory = tempfile.mkdtemp()
+		self.database = TieredDatabase({
+			'location': os.path.join(self.directory, 'db.sqlite'),
+			'eviction': 'lfu'
+		})
+		self.database.set_up()
+
+	def tearDown(self):
+		"""Tears the database down and removes its directory."""
+		self.database.tear_down()
+		shutil.rmtree(self.directory)
+
+	def test_read_through(self):
+		"""Steps:
+		1 - Saves two books
+		2 - Reads one of them, its content and its digest, and lists them
+		3 - Verifies the results and the hot tier's statistics
+		"""
+		book1 = Book('isbn-1234', 'name1', 'author', 'content one')
+		book2 = Book('isbn-2345', 'name2', 'author', 'content two')
+
+		with self.database.get_uowm().start() as uow:
+			uow.books.save_many([book1, book2])
+			uow.commit()
+
+		view = self.database.get_view()
+		self.assertEqual(view.get_by_isbn('isbn-1234'), book1)
+		self.assertEqual(view.get_content('isbn-1234'), 'content one')
+		self.assertEqual(view.get_digest('isbn-1234'), book1.digest())
+		self.assertEqual(view.get_by_author('author'), [book1, book2])
+		self.assertEqual(view.get_summaries_by_author('author', 'isbn-1234'),
+						 [BookSummary('isbn-2345', 'name2', 'author')])
+		self.assertEqual(view.search('two'),
+						 [BookSummary('isbn-2345', 'name2', 'author')])
+
+		stats = self.database.stats()
+		self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+		self.assertEqual(stats['books'], 1)
+
+	def test_write_through(self):
+		"""Steps:
+		1 - Misses a book by ISBN and saves it afterwards
+		2 - Verifies if the saved book is read
+		"""
+		view = self.database.get_view()
+		self.assertIsNone(view.get_by_isbn('isbn'))
+
+		book = Book('isbn', 'name', 'author', 'content')
+		with self.database.get_uowm().start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		self.assertEqual(view.get_by_isbn('isbn'), book)
+		self.assertEqual(self.database.stats()['misses'], 2)
+
+	def test_rollback(self):
+		"""Steps:
+		1 - Saves a book and rolls the unit of work back
+		2 - Verifies if the book has not been saved
+		"""
+		with self.database.get_uowm().start() as uow:
+			uow.books.save(Book('isbn', 'name', 'author', 'content'))
+			uow.rollback()
+
+		self.assertIsNone(self.database.get_view().get_by_isbn('isbn'))
@@ -0,0 +1,492 @@
+"""Unit tests of the application's dispatch.py functions."""
+
+import sys
+import time
+import threading
+import unittest
+import subprocess
+
+from app.domain.ports import MessageBus
+from app.domain.errors import MessageBusBusyError
+from app.domain.dispatch import EventDispatcher, CommandQueue, \
+								ProcessCommandPool
+from app.domain.messages import RegisterBookCommand, RegisterBooksCommand, \
+								BookRegisteredEvent, BooksRegisteredEvent
+
+
+# Patches gevent after the pool is imported, as the application does.
+GEVENT_SCRIPT = """
+from app.domain.dispatch import ProcessCommandPool
+from app.domain.messages import RegisterBookCommand
+from tests.test_domain_dispatch import build_bus
+
+if __name__ == '__main__':
+	from gevent import monkey
+	monkey.patch_all()
+
+	pool = ProcessCommandPool(build_bus, 2)
+	events = []
+	pool.execute(RegisterBookCommand('isbn', 'name', 'author', 'c'),
+				 events.append)
+	pool.stop()
+	print(len(events))
+"""
+
+
+class MockHandler(object):
+	def __init__(self, delay: float = 0, fail: bool = False):
+		self.delay = delay
+		self.fail = fail
+		self.events = []
+		self.threads = set()
+
+	def handle(self, event):
+		time.sleep(self.delay)
+		self.threads.add(threading.current_thread().name)
+		if self.fail:
+			raise ValueError('mock failure')
+		self.events.append(event)
+
+
+class MockCommandHandler(object):
+	def __init__(self, bus: MessageBus):
+		self.bus = bus
+
+	def handle(self, cmd):
+		if isinstance(cmd, RegisterBooksCommand):
+			if any(c.isbn == 'fail' for c in cmd.books):
+				raise ValueError('mock failure')
+			self.bus.handle(
+				BooksRegisteredEvent(tuple(c.isbn for c in cmd.books)))
+		elif cmd.isbn == 'fail':
+			raise ValueError('mock failure')
+		else:
+			self.bus.handle(BookRegisteredEvent(cmd.isbn))
+
+
+def build_bus() -> MessageBus:
+	"""Builds the message bus of the worker processes."""
+	bus = MessageBus()
+	bus.subscribe(RegisterBookCommand, MockCommandHandler(bus))
+	bus.subscribe(RegisterBooksCommand, MockCommandHandler(bus))
+
+	return bus
+
+
+class TestDomainDispatchEventDispatcher(unittest.TestCase):
+	"""Set of unit tests for the dispatch.py EventDispatcher class and its
+	implementations.
+
+	Tests: test_isbn_ordering, test_event_ordering,
+	test_subscriber_ordering, test_bounded, test_nested, test_errors,
+	test_stop
+	"""
+	def test_isbn_ordering(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher ordered by book
+		2 - Submits many events of each of two books to a slow handler
+		3 - Verifies if the events of each book have been handled in order
+		and if the books have been handled by different workers
+		"""
+		dispatcher = EventDispatcher(4, 64)
+		handler = MockHandler(0.005)
+
+		for i in range(10):
+			for isbn in ('isbn-1', 'isbn-2'):
+				dispatcher.submit([handler], BookRegisteredEvent(isbn))
+		dispatcher.submit([handler], BooksRegisteredEvent(('isbn-3',)))
+		dispatcher.stop()
+
+		self.assertEqual(len(handler.events), 21)
+		self.assertGreater(len(handler.threads), 1)
+		self.assertEqual(dispatcher.stats()['handled'], 21)
+
+	def test_event_ordering(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher ordered by event type
+		2 - Submits events of two types to two handlers
+		3 - Verifies if each handler got the events of each type in order
+		and if the types have been handled by different workers
+		"""
+		dispatcher = EventDispatcher(4, 64, 'event')
+		handler1 = MockHandler(0.001)
+		handler2 = MockHandler(0.001)
+
+		for i in range(10):
+			dispatcher.submit([handler1, handler2],
+							  BookRegisteredEvent('isbn-{0}'.format(i)))
+			dispatcher.submit([handler1, handler2],
+							  BooksRegisteredEvent(('isbn-{0}'.format(i),)))
+		dispatcher.stop()
+
+		for handler in (handler1, handler2):
+			self.assertEqual(
+				[e for e in handler.events \
+				 if isinstance(e, BookRegisteredEvent)],
+				[BookRegisteredEvent('isbn-{0}'.format(i)) \
+				 for i in range(10)])
+			self.assertEqual(
+				[e for e in handler.events \
+				 if isinstance(e, BooksRegisteredEvent)],
+				[BooksRegisteredEvent(('isbn-{0}'.format(i),)) \
+				 for i in range(10)])
+
+		self.assertGreater(len(handler1.threads), 1)
+		self.assertEqual(dispatcher.stats()['handled'], 20)
+
+	def test_subscriber_ordering(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher ordered by subscriber
+		2 - Submits events to a slow and a fast handler
+		3 - Verifies if the fast handler is not held back by the slow one
+		and if both got the events in order
+		"""
+		dispatcher = EventDispatcher(2, 64, 'subscriber')
+		slow = MockHandler(0.05)
+		fast = MockHandler()
+
+		events = [BookRegisteredEvent('isbn-{0}'.format(i)) \
+				  for i in range(5)]
+		for event in events:
+			dispatcher.submit([slow, fast], event)
+
+		time.sleep(0.1)
+		self.assertEqual(fast.events, events)
+		self.assertLess(len(slow.events), 5)
+
+		dispatcher.stop()
+		self.assertEqual(slow.events, events)
+
+	def test_bounded(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher with room for two events
+		2 - Submits events to a slow handler
+		3 - Verifies if the queue never held more than two events and the
+		lanes' depth is reported
+		"""
+		dispatcher = EventDispatcher(1, 2, 'event')
+		handler = MockHandler(0.01)
+
+		for i in range(6):
+			dispatcher.submit([handler], BookRegisteredEvent(str(i)))
+
+		stats = dispatcher.stats()
+		self.assertLessEqual(stats['depth'], 2)
+		self.assertEqual(stats['lanes'],
+						 {'BookRegisteredEvent': stats['depth']})
+
+		dispatcher.stop()
+		self.assertEqual(dispatcher.stats()['max_depth'], 2)
+		self.assertEqual(len(handler.events), 6)
+
+	def test_nested(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher with room for one event
+		2 - Submits events to a handler that submits events itself
+		3 - Verifies if every event has been handled without deadlocking
+		"""
+		dispatcher = EventDispatcher(1, 1)
+		handler = MockHandler(0.001)
+
+		class Publisher(object):
+			def handle(self, event):
+				for i in range(3):
+					dispatcher.submit([handler], BooksRegisteredEvent(
+						('{0}-{1}'.format(event.isbn, i),)))
+
+		for i in range(3):
+			dispatcher.submit([Publisher()], BookRegisteredEvent(str(i)))
+
+		thread = threading.Thread(target=dispatcher.stop, daemon=True)
+		thread.start()
+		thread.join(5)
+
+		self.assertFalse(thread.is_alive())
+		self.assertEqual(len(handler.events), 9)
+		self.assertEqual(dispatcher.stats()['handled'], 12)
+
+	def test_errors(self):
+		"""Steps:
+		1 - Instantiates an EventDispatcher ordered by event type
+		2 - Submits an event to a failing handler followed by another one
+		3 - Verifies if the second handler still got the event and the
+		error has been counted
+		"""
+		dispatcher = EventDispatcher(1, 8, 'event')
+		failing = MockHandler(fail=True)
+		handler = MockHandler()
+
+		with self.assertLogs('sample', 'ERROR'):
+			dispatcher.submit([failing, handler], BookRegisteredEvent('isbn'))
+			dispatcher.stop()
+
+		self.assertEqual(handler.events, [BookRegisteredEvent('isbn')])
+		self.assertEqual(dispatcher.stats()['errors'], 1)
+
+	def test_stop(self):
+		"""Steps:
+		1 - Instantiates and stops an EventDispatcher
+		2 - Submits an event and verifies if it is handled at the caller
+		"""
+		dispatcher = EventDispatcher(1, 8, 'none')
+		dispatcher.stop()
+
+		handler = MockHandler()
+		dispatcher.submit([handler], BookRegisteredEvent('isbn'))
+
+		self.assertEqual(handler.events, [BookRegisteredEvent('isbn')])
+		self.assertEqual(handler.threads,
+						 {threading.current_thread().name})
+
+
+class TestDomainDispatchCommandQueue(unittest.TestCase):
+	"""Set of unit tests for the dispatch.py CommandQueue class and its
+	implementations.
+
+	Tests: test_submit, test_reject, test_drop_oldest, test_block,
+	test_nested
+	"""
+	def setUp(self):
+		"""Creates a gate holding the handling of commands back."""
+		self.gate = threading.Event()
+		self.started = threading.Semaphore(0)
+
+	def held(self, msg) -> str:
+		"""Handles a command once the gate opens."""
+		self.started.release()
+		self.gate.wait()
+		return msg
+
+	def fill(self, queue: CommandQueue, count: int) -> list:
+		"""Submits commands from as many threads, waiting until the worker
+		holds the first one and the others are queued.
+
+		Params
+		------
+		queue: CommandQueue -- a queue with a single worker
+		count: int -- the number of commands
+
+		Returns
+		-------
+		outcomes: list -- the result or error of each command, once the
+		threads are joined
+		"""
+		outcomes = [None] * count
+
+		def submit(i):
+			try:
+				outcomes[i] = queue.submit(self.held, i)
+			except Exception as err:
+				outcomes[i] = err
+
+		threads = [threading.Thread(target=submit, args=(i,)) \
+				   for i in range(count)]
+		threads[0].start()
+		self.started.acquire()
+
+		for thread in threads[1:]:
+			thread.start()
+		while queue.stats()['depth'] < min(count - 1, queue.queue_size):
+			time.sleep(0.001)
+
+		self.threads = threads
+		return outcomes
+
+	def release(self, queue: CommandQueue):
+		"""Opens the gate and waits for every command and the queue."""
+		self.gate.set()
+		for thread in self.threads:
+			thread.join()
+		queue.stop()
+
+	def test_submit(self):
+		"""Steps:
+		1 - Instantiates a CommandQueue
+		2 - Submits a command succeeding and another one failing
+		3 - Verifies if the callers get the result and the error
+		"""
+		queue = CommandQueue(2, 4)
+
+		def fail(msg):
+			raise ValueError(msg)
+
+		self.assertEqual(queue.submit(str.upper, 'cmd'), 'CMD')
+		with self.assertRaises(ValueError):
+			queue.submit(fail, 'cmd')
+
+		queue.stop()
+		self.assertEqual(queue.stats()['handled'], 2)
+
+	def test_reject(self):
+		"""Steps:
+		1 - Instantiates a CommandQueue with one worker and room for one
+		command, rejecting the others
+		2 - Submits three commands while the first one is held
+		3 - Verifies if the last one has been rejected
+		"""
+		queue = CommandQueue(1, 1, 'reject', retry_after=2.0)
+		outcomes = self.fill(queue, 2)
+
+		with self.assertRaises(MessageBusBusyError) as ctx:
+			queue.submit(self.held, 2)
+		self.assertEqual(ctx.exception.retry_after, 2.0)
+
+		self.release(queue)
+		self.assertEqual(outcomes, [0, 1])
+		self.assertEqual(queue.stats()['rejected'], 1)
+
+	def test_drop_oldest(self):
+		"""Steps:
+		1 - Instantiates a CommandQueue with one worker and room for one
+		command, dropping the oldest one
+		2 - Submits three commands while the first one is held
+		3 - Verifies if the second one has been dropped for the third
+		"""
+		queue = CommandQueue(1, 1, 'drop_oldest')
+		outcomes = self.fill(queue, 2)
+
+		thread = threading.Thread(
+			target=lambda: outcomes.append(queue.submit(self.held, 2)))
+		thread.start()
+		while queue.stats()['dropped'] == 0:
+			time.sleep(0.001)
+
+		self.threads.append(thread)
+		self.release(queue)
+
+		self.assertEqual(outcomes[0], 0)
+		self.assertIsInstance(outcomes[1], MessageBusBusyError)
+		self.assertEqual(outcomes[2], 2)
+
+	def test_block(self):
+		"""Steps:
+		1 - Instantiates a CommandQueue with one worker and room for one
+		command, blocking the others for a while
+		2 - Submits three commands while the first one is held
+		3 - Verifies if the last one has been rejected after the timeout
+		"""
+		queue = CommandQueue(1, 1, 'block', timeout=0.05)
+		outcomes = self.fill(queue, 2)
+
+		start = time.monotonic()
+		with self.assertRaises(MessageBusBusyError):
+			queue.submit(self.held, 2)
+		self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+		self.release(queue)
+		self.assertEqual(outcomes, [0, 1])
+
+	def test_nested(self):
+		"""Steps:
+		1 - Instantiates a CommandQueue with one worker
+		2 - Submits a command submitting another one
+		3 - Verifies if the inner one is handled by the same worker
+		"""
+		queue = CommandQueue(1, 1)
+
+		def outer(msg):
+			return queue.submit(lambda m: threading.current_thread().name,
+								msg)
+
+		self.assertEqual(queue.submit(outer, 'cmd'), 'command-0')
+		queue.stop()
+
+
+class TestDomainDispatchProcessCommandPool(unittest.TestCase):
+	"""Set of unit tests for the dispatch.py ProcessCommandPool class and
+	its implementations.
+
+	Tests: test_execute, test_batch, test_errors, test_gevent
+	"""
+	@classmethod
+	def setUpClass(cls):
+		"""Starts a pool of three processes, shared by the tests since they
+		take a while to start."""
+		cls.pool = ProcessCommandPool(build_bus, 3)
+
+	@classmethod
+	def tearDownClass(cls):
+		"""Stops the pool."""
+		cls.pool.stop()
+
+	def command(self, isbn: str) -> RegisterBookCommand:
+		"""Returns a command registering a book."""
+		return RegisterBookCommand(isbn, 'name', 'author', 'content')
+
+	def test_execute(self):
+		"""Steps:
+		1 - Executes the same command three times
+		2 - Verifies if its events have been published back
+		3 - Verifies if a single partition has handled them
+		"""
+		before = self.pool.stats()['handled']
+
+		events = []
+		for _ in range(3):
+			self.pool.execute(self.command('isbn'), events.append)
+
+		self.assertEqual(events, [BookRegisteredEvent('isbn')] * 3)
+
+		handled = [a - b for a, b \
+				   in zip(self.pool.stats()['handled'], before)]
+		self.assertEqual(sorted(handled), [0, 0, 3])
+
+	def test_batch(self):
+		"""Steps:
+		1 - Executes a batch of books of different partitions
+		2 - Verifies if a single partition has handled the whole batch
+		"""
+		before = self.pool.stats()['handled']
+		isbns = ['isbn-{0}'.format(i) for i in range(30)]
+
+		events = []
+		self.pool.execute(
+			RegisterBooksCommand(tuple(self.command(i) for i in isbns)),
+			events.append
+		)
+
+		self.assertEqual(events, [BooksRegisteredEvent(tuple(isbns))])
+
+		handled = [a - b for a, b \
+				   in zip(self.pool.stats()['handled'], before)]
+		self.assertEqual(sorted(handled), [0, 0, 1])
+
+	def test_errors(self):
+		"""Steps:
+		1 - Executes a failing command and a failing batch
+		2 - Verifies if the errors have been raised at the caller
+		3 - Verifies if no event of the failing batch has been published,
+		since it is handled as a whole
+		"""
+		errors = self.pool.stats()['errors']
+
+		with self.assertRaises(ValueError):
+			self.pool.execute(self.command('fail'))
+
+		events = []
+		with self.assertRaises(ValueError):
+			self.pool.execute(
+				RegisterBooksCommand((self.command('isbn-0'),
+									  self.command('fail'))),
+				events.append
+			)
+
+		self.assertEqual(events, [])
+		self.assertEqual(self.pool.stats()['errors'], errors + 2)
+
+	def test_gevent(self):
+		"""Steps:
+		1 - Runs a script executing a command and stopping a pool after
+		gevent has monkey patched its process
+		2 - Verifies if the script has exited in time with the event
+		"""
+		result = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT],
+								stdout=subprocess.PIPE,
+								stderr=subprocess.PIPE, timeout=60)
+
+		self.assertEqual(result.returncode, 0, result.stderr.decode())
+		self.assertEqual(result.stdout.decode().strip(), '1')
+
+
+if __name__ == '__main__':
+	unittest.main()
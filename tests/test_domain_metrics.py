@@ -0,0 +1,118 @@
+"""Unit tests of the application's metrics.py functions."""
+
+import unittest
+
+from app.domain.ports import MessageBus
+from app.domain.dispatch import CommandQueue
+from app.domain.metrics import Histogram, BusMetrics
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+
+
+class MockHandler(object):
+	def handle(self, msg):
+		pass
+
+
+class MockFailingHandler(object):
+	def handle(self, msg):
+		raise ValueError('mock failure')
+
+
+class TestDomainMetricsHistogram(unittest.TestCase):
+	"""Set of unit tests for the metrics.py Histogram class and its
+	implementations.
+
+	Tests: test_observe
+	"""
+	def test_observe(self):
+		"""Steps:
+		1 - Instantiates a Histogram with two buckets
+		2 - Observes a latency below, at and above each bound
+		3 - Verifies the cumulative counts, sum and errors
+		"""
+		histogram = Histogram((0.1, 1.0))
+
+		for value in (0.05, 0.1, 0.5, 1.0, 2.0):
+			histogram.observe(value)
+		histogram.error()
+
+		snapshot = histogram.snapshot()
+		self.assertEqual(snapshot['buckets'],
+						 {'0.1': 2, '1.0': 4, '+Inf': 5})
+		self.assertEqual(snapshot['count'], 5)
+		self.assertAlmostEqual(snapshot['sum'], 3.65)
+		self.assertEqual(snapshot['errors'], 1)
+
+
+class TestDomainMetricsBusMetrics(unittest.TestCase):
+	"""Set of unit tests for the metrics.py BusMetrics class and its
+	implementations.
+
+	Tests: test_snapshot, test_prometheus
+	"""
+	def setUp(self):
+		"""Subscribes a command handler, an event handler and a failing one
+		to a MessageBus measured by BusMetrics and with a CommandQueue."""
+		self.metrics = BusMetrics()
+		self.commands = CommandQueue(1, 8)
+		self.bus = MessageBus(commands=self.commands, metrics=self.metrics)
+
+		self.bus.subscribe(RegisterBookCommand, MockHandler())
+		self.bus.subscribe(BookRegisteredEvent, MockHandler())
+		self.bus.subscribe(BookRegisteredEvent, MockFailingHandler())
+
+		self.bus.handle(
+			RegisterBookCommand('isbn', 'name', 'author', 'content'))
+		with self.assertRaises(ValueError):
+			self.bus.handle(BookRegisteredEvent('isbn'))
+
+	def tearDown(self):
+		"""Stops the command queue."""
+		self.commands.stop()
+
+	def test_snapshot(self):
+		"""Steps:
+		1 - Takes a snapshot of the metrics
+		2 - Verifies the counts and errors of each message type and handler
+		and the gauges
+		"""
+		snapshot = self.metrics.snapshot()
+
+		messages = snapshot['messages']
+		self.assertEqual(messages['RegisterBookCommand']['count'], 1)
+		self.assertEqual(messages['BookRegisteredEvent']['count'], 1)
+		self.assertEqual(messages['BookRegisteredEvent']['errors'], 1)
+
+		handlers = snapshot['handlers']
+		self.assertEqual(
+			handlers['BookRegisteredEvent/MockHandler']['errors'], 0)
+		self.assertEqual(
+			handlers['BookRegisteredEvent/MockFailingHandler']['errors'], 1)
+		self.assertEqual(
+			handlers['RegisterBookCommand/MockHandler']['count'], 1)
+
+		self.assertEqual(snapshot['gauges'],
+						 {'command_queue_depth': 0, 'command_queue_shed': 0})
+
+	def test_prometheus(self):
+		"""Steps:
+		1 - Renders the metrics in the Prometheus text format
+		2 - Verifies its families and some of its samples
+		"""
+		lines = self.metrics.to_prometheus().splitlines()
+
+		self.assertIn('# TYPE sample_bus_message_duration_seconds histogram',
+					  lines)
+		self.assertIn('# TYPE sample_command_queue_depth gauge', lines)
+		self.assertIn('sample_bus_message_handled_total'
+					  '{message="RegisterBookCommand"} 1', lines)
+		self.assertIn('sample_bus_handler_errors_total'
+					  '{message="BookRegisteredEvent",'
+					  'handler="MockFailingHandler"} 1', lines)
+		self.assertIn('sample_bus_message_duration_seconds_bucket'
+					  '{message="BookRegisteredEvent",le="+Inf"} 1', lines)
+		self.assertIn('sample_command_queue_shed 0', lines)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,74 @@
+"""Unit tests of the application's model.py functions."""
+
+import unittest
+
+from app.domain.model import Book, BookSummary, content_digest
+
+
+class TestDomainModelBook(unittest.TestCase):
+	"""Set of unit tests for the model.py Book and BookSummary classes and
+	their implementations.
+
+	Tests: test_slots, test_equality, test_serialization, test_digest
+	"""
+	def test_slots(self):
+		"""Steps:
+		1 - Instantiates a Book and a BookSummary
+		2 - Verifies if they hold no per-instance dictionary
+		"""
+		book = Book('isbn', 'name', 'author', 'content')
+		summary = BookSummary('isbn', 'name', 'author')
+
+		self.assertFalse(hasattr(book, '__dict__'))
+		self.assertFalse(hasattr(summary, '__dict__'))
+
+	def test_equality(self):
+		"""Steps:
+		1 - Instantiates equal and different books
+		2 - Verifies their equality and hashes, also against summaries
+		"""
+		book1 = Book('isbn', 'name', 'author', 'content')
+		book2 = Book('isbn', 'name', 'author', 'content')
+		book3 = Book('isbn', 'name', 'author', 'other')
+
+		self.assertEqual(book1, book2)
+		self.assertNotEqual(book1, book3)
+		self.assertEqual(len({book1, book2, book3}), 2)
+
+		summary = BookSummary('isbn', 'name', 'author')
+		self.assertNotEqual(book1, summary)
+		self.assertEqual(summary, BookSummary('isbn', 'name', 'author'))
+		self.assertEqual(hash(summary),
+						 hash(BookSummary('isbn', 'name', 'author')))
+
+	def test_serialization(self):
+		"""Steps:
+		1 - Instantiates a Book and a BookSummary
+		2 - Verifies their tuple and dictionary forms
+		"""
+		book = Book('isbn', 'name', 'author', 'content')
+
+		self.assertEqual(book.astuple(), ('isbn', 'name', 'author', 'content'))
+		self.assertEqual(Book(*book.astuple()), book)
+		self.assertEqual(book.asdict(), {'isbn': 'isbn', 'name': 'name',
+										 'author': 'author',
+										 'content': 'content'})
+		self.assertEqual(BookSummary('isbn', 'name', 'author').asdict(),
+						 {'isbn': 'isbn', 'name': 'name', 'author': 'author'})
+
+	def test_digest(self):
+		"""Steps:
+		1 - Instantiates books with equal and different contents
+		2 - Verifies if only the ones with equal contents share a digest
+		"""
+		book1 = Book('isbn-1234', 'name1', 'author1', 'content')
+		book2 = Book('isbn-2345', 'name2', 'author2', 'content')
+		book3 = Book('isbn-1234', 'name1', 'author1', 'other')
+
+		self.assertEqual(book1.digest(), book2.digest())
+		self.assertNotEqual(book1.digest(), book3.digest())
+		self.assertEqual(book1.digest(), content_digest('content'))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,8 +1,11 @@
 """Unit tests of the application's ports.py functions."""
 
+import asyncio
 import unittest
+import threading
 
-from app.domain.ports import MessageBus
+from app.domain.ports import MessageBus, AsyncMessageBus, Middleware
+from app.domain.dispatch import EventDispatcher, CommandQueue
 from app.domain.errors import CommandAlreadySubscribedError
 from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
 
@@ -15,11 +18,35 @@ class MockHandler(object):
 		self.triggered = True
 
 
+class MockMiddleware(Middleware):
+	def __init__(self, calls: list, name: str):
+		self.calls = calls
+		self.name = name
+
+	def wrap(self, msg, handler, call):
+		def wrapped(message):
+			self.calls.append((self.name, msg.__name__))
+			call(message)
+
+		return wrapped
+
+
+class MockAsyncHandler(object):
+	def __init__(self, calls: list, name: str):
+		self.calls = calls
+		self.name = name
+
+	async def handle(self, msg):
+		await asyncio.sleep(0)
+		self.calls.append(self.name)
+
+
 class TestDomainPortsMessageBus(unittest.TestCase):
 	"""Set of unit tests for the ports.py MessageBus class and its
 	implementations.
 
-	Tests: test_handle, test_subscribe
+	Tests: test_handle, test_subscribe, test_dispatch, test_middleware,
+	test_unknown, test_commands
 	"""
 	def test_handle(self):
 		"""Steps:
@@ -55,25 +82,181 @@ class TestDomainPortsMessageBus(unittest.TestCase):
 		"""
 		bus = MessageBus()
 
-		bus.subscribe(RegisterBookCommand, 'MockCommandHandler1')
-		bus.subscribe(BookRegisteredEvent, 'MockEventHandler1')
-		bus.subscribe(BookRegisteredEvent, 'MockEventHandler2')
+		MockCommandHandler1 = MockHandler()
+		MockEventHandler1 = MockHandler()
+		MockEventHandler2 = MockHandler()
 
-		self.assertTrue(bus.subscribers.get('RegisterBookCommand') is not None)
-		self.assertTrue(bus.subscribers.get('BookRegisteredEvent') is not None)
+		bus.subscribe(RegisterBookCommand, MockCommandHandler1)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler1)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler2)
 
-		self.assertTrue(len(bus.subscribers.get('RegisterBookCommand')) == 1)
-		self.assertTrue(len(bus.subscribers.get('BookRegisteredEvent')) == 2)
+		self.assertTrue(bus.subscribers.get(RegisterBookCommand) is not None)
+		self.assertTrue(bus.subscribers.get(BookRegisteredEvent) is not None)
+
+		self.assertTrue(len(bus.subscribers.get(RegisterBookCommand)) == 1)
+		self.assertTrue(len(bus.subscribers.get(BookRegisteredEvent)) == 2)
 
 		self.assertIn(
-			'MockCommandHandler1', bus.subscribers['RegisterBookCommand'])
-		self.assertIn(
-			'MockEventHandler1', bus.subscribers['BookRegisteredEvent'])
-		self.assertIn(
-			'MockEventHandler2', bus.subscribers['BookRegisteredEvent'])
+			MockCommandHandler1, bus.subscribers[RegisterBookCommand])
+		self.assertIn(MockEventHandler1, bus.subscribers[BookRegisteredEvent])
+		self.assertIn(MockEventHandler2, bus.subscribers[BookRegisteredEvent])
+
+		# Handlers are compiled into one callable per message class.
+		self.assertEqual(bus.table[RegisterBookCommand],
+						 MockCommandHandler1.handle)
+		self.assertEqual(set(bus.table),
+						 {RegisterBookCommand, BookRegisteredEvent})
 
 		with self.assertRaises(CommandAlreadySubscribedError):
-			bus.subscribe(RegisterBookCommand, 'MockCommandHandler2')
+			bus.subscribe(RegisterBookCommand, MockHandler())
+
+	def test_dispatch(self):
+		"""Steps:
+		1 - Instantiates a MessageBus with an EventDispatcher
+		2 - Subscribes a command handler, an inline event handler and
+		another event handler
+		3 - Handles command and event and verifies if only the latter's
+		handler which is not inline has been deferred
+		"""
+		dispatcher = EventDispatcher(1, 8)
+		bus = MessageBus(dispatcher)
+
+		MockCommandHandler1 = MockHandler()
+		MockEventHandler1 = MockHandler()
+		MockEventHandler2 = MockHandler()
+
+		bus.subscribe(RegisterBookCommand, MockCommandHandler1)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler1, inline=True)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler2)
+
+		# Holds the worker back until the event has been handled.
+		with dispatcher.cond:
+			bus.handle(
+				RegisterBookCommand('isbn', 'name', 'author', 'content'))
+			bus.handle(BookRegisteredEvent('isbn'))
+
+			self.assertTrue(MockCommandHandler1.triggered)
+			self.assertTrue(MockEventHandler1.triggered)
+			self.assertFalse(MockEventHandler2.triggered)
+
+		dispatcher.stop()
+		self.assertTrue(MockEventHandler2.triggered)
+
+	def test_middleware(self):
+		"""Steps:
+		1 - Instantiates a MessageBus with a mock middleware
+		2 - Subscribes a mock handler and adds another mock middleware
+		3 - Handles an event and verifies the order of the calls
+		"""
+		calls = []
+		bus = MessageBus(middleware=[MockMiddleware(calls, 'outer')])
+
+		bus.subscribe(BookRegisteredEvent, MockHandler())
+		bus.use(MockMiddleware(calls, 'inner'))
+		bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(calls, [('outer', 'BookRegisteredEvent'),
+								 ('inner', 'BookRegisteredEvent')])
+
+	def test_unknown(self):
+		"""Steps:
+		1 - Instantiates a MessageBus
+		2 - Handles an event without subscribers
+		3 - Verifies if nothing has been added to the dispatch table
+		"""
+		bus = MessageBus()
+		bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(bus.subscribers, {})
+		self.assertEqual(bus.table, {})
+
+	def test_commands(self):
+		"""Steps:
+		1 - Instantiates a MessageBus with a CommandQueue
+		2 - Subscribes a command handler and an event handler
+		3 - Handles command and event and verifies if only the command has
+		been handled by a worker
+		"""
+		commands = CommandQueue(1, 8)
+		bus = MessageBus(commands=commands)
+
+		threads = []
+		class MockThreadHandler(object):
+			def handle(self, msg):
+				threads.append(threading.current_thread().name)
+
+		bus.subscribe(RegisterBookCommand, MockThreadHandler())
+		bus.subscribe(BookRegisteredEvent, MockThreadHandler())
+
+		bus.handle(RegisterBookCommand('isbn', 'name', 'author', 'content'))
+		bus.handle(BookRegisteredEvent('isbn'))
+		commands.stop()
+
+		self.assertEqual(
+			threads, ['command-0', threading.current_thread().name])
+
+
+class TestDomainPortsAsyncMessageBus(unittest.TestCase):
+	"""Set of unit tests for the ports.py AsyncMessageBus class and its
+	implementations.
+
+	Tests: test_handle, test_subscribe, test_use
+	"""
+	def test_handle(self):
+		"""Steps:
+		1 - Instantiates an AsyncMessageBus
+		2 - Subscribes a coroutine command handler, and a coroutine and a
+		synchronous event handler
+		3 - Handles command and event and verifies behavior and order
+		"""
+		bus = AsyncMessageBus()
+		calls = []
+
+		MockCommandHandler1 = MockAsyncHandler(calls, 'command')
+		MockEventHandler1 = MockAsyncHandler(calls, 'event')
+		MockEventHandler2 = MockHandler()
+
+		bus.subscribe(RegisterBookCommand, MockCommandHandler1)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler1)
+		bus.subscribe(BookRegisteredEvent, MockEventHandler2)
+
+		async def handle():
+			await bus.handle(
+				RegisterBookCommand('isbn', 'name', 'author', 'content'))
+			await bus.handle(BookRegisteredEvent('isbn'))
+
+		asyncio.run(handle())
+
+		self.assertEqual(calls, ['command', 'event'])
+		self.assertTrue(MockEventHandler2.triggered)
+
+	def test_subscribe(self):
+		"""Steps:
+		1 - Instantiates an AsyncMessageBus
+		2 - Tries to subscribe two handlers to the same command and verifies
+		if it raises the expected error
+		"""
+		bus = AsyncMessageBus()
+		bus.subscribe(RegisterBookCommand, MockHandler())
+
+		with self.assertRaises(CommandAlreadySubscribedError):
+			bus.subscribe(RegisterBookCommand, MockHandler())
+
+	def test_use(self):
+		"""Steps:
+		1 - Instantiates an AsyncMessageBus with a subscribed handler
+		2 - Tries to add middleware and verifies if it raises the expected
+		error, leaving the handler unwrapped
+		"""
+		bus = AsyncMessageBus()
+		handler = MockHandler()
+		bus.subscribe(BookRegisteredEvent, handler)
+
+		with self.assertRaises(NotImplementedError):
+			bus.use(MockMiddleware([], 'outer'))
+
+		self.assertEqual(bus.middleware, [])
+		self.assertEqual(bus.table[BookRegisteredEvent], handler.handle)
 
 
 if __name__ == '__main__':
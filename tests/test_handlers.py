@@ -1,17 +1,35 @@
 """Integration tests of the application's handlers.py functions."""
 
+import os
+import shutil
 import time
+import asyncio
+import sqlite3
+import tempfile
 import unittest
 import threading
+import functools
 
 import paho.mqtt.subscribe as subscribe
 
 from app.domain.model import Book
-from app.domain.ports import MessageBus
+from app.domain.ports import MessageBus, AsyncMessageBus
 from app.adapters.mqtt import MqttSender
+from app.adapters.sqlite import SqliteDatabase
+from app.adapters.sqlite_sharded import SqliteShardedDatabase, shard_of
+from app.adapters.cache import CachedBookView
 from app.adapters.memory import MemoryDatabase
-from app.handlers import RegisterBookHandler, BookRegisteredHandler
-from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+from app.adapters.aio import ExecutorUnitOfWorkManager
+from app.domain.dispatch import ProcessCommandPool
+from app.handlers import RegisterBookHandler, RegisterBooksHandler, \
+						 GroupCommitRegisterBookHandler, \
+						 BookRegisteredHandler, ViewCacheInvalidationHandler, \
+						 PartitionedCommandHandler, \
+						 AsyncRegisterBookHandler, AsyncRegisterBooksHandler, \
+						 AsyncBookRegisteredHandler, \
+						 AsyncBooksRegisteredHandler
+from app.domain.messages import RegisterBookCommand, RegisterBooksCommand, \
+								BookRegisteredEvent, BooksRegisteredEvent
 
 
 class MockSubscriber(object):
@@ -26,6 +44,39 @@ class MockSubscriber(object):
 		self.payload = str(msg.payload.decode('utf8'))
 
 
+class MockEventHandler(object):
+	def __init__(self):
+		self.events = []
+
+	def handle(self, event):
+		self.events.append(event)
+
+
+class MockAsyncSender(object):
+	def __init__(self):
+		self.messages = []
+
+	async def send(self, msg):
+		await asyncio.sleep(0.001)
+		self.messages.append(msg)
+
+
+def build_worker(location: str) -> MessageBus:
+	"""Builds the message bus of a worker process registering books at a
+	SQLite database."""
+	bus = MessageBus()
+
+	sqlite = SqliteDatabase({'location': location})
+	sqlite.set_up()
+
+	bus.subscribe(RegisterBookCommand,
+				  RegisterBookHandler(bus, sqlite.get_uowm()))
+	bus.subscribe(RegisterBooksCommand,
+				  RegisterBooksHandler(bus, sqlite.get_uowm()))
+
+	return bus
+
+
 class TestRegisterBookHandler(unittest.TestCase):
 	"""Set of integration tests for the handlers.py RegisterBookHandler class
 	and its implementations.
@@ -52,6 +103,252 @@ class TestRegisterBookHandler(unittest.TestCase):
 		self.assertEqual(book.content, 'content')
 
 
+class TestGroupCommitRegisterBookHandler(unittest.TestCase):
+	"""Set of integration tests for the handlers.py
+	GroupCommitRegisterBookHandler class and its implementations.
+
+	Tests: test_handle, test_sharded
+	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
+	def test_handle(self):
+		"""Steps:
+		1 - Instantiates a GroupCommitRegisterBookHandler over SQLite
+		2 - Handles commands from several threads, one of them repeating an
+		ISBN, and verifies if only that one has failed
+		3 - Verifies if the books have been registered and their events
+		dispatched
+		"""
+		bus = MessageBus()
+
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		events = MockEventHandler()
+		bus.subscribe(BookRegisteredEvent, events)
+
+		handler = GroupCommitRegisterBookHandler(
+			bus, sqlite.get_uowm(), batch_size=10, max_delay=0.05)
+
+		cmds = [RegisterBookCommand('isbn-{0}'.format(i), 'name', 'author',
+									'content') for i in range(5)]
+		cmds.append(RegisterBookCommand('isbn-0', 'name', 'author', 'content'))
+
+		errors = []
+		def register(cmd):
+			try:
+				handler.handle(cmd)
+			except Exception as err:
+				errors.append(err)
+
+		threads = [threading.Thread(target=register, args=(cmd,)) \
+				   for cmd in cmds]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+
+		handler.stop()
+
+		self.assertEqual(len(errors), 1)
+		self.assertIsInstance(errors[0], sqlite3.IntegrityError)
+
+		view = sqlite.get_view()
+		self.assertEqual(len(view.get_all()), 5)
+		self.assertEqual(sorted(e.isbn for e in events.events),
+						 ['isbn-{0}'.format(i) for i in range(5)])
+
+		sqlite.tear_down()
+
+	def test_sharded(self):
+		"""Steps:
+		1 - Commits a batch repeating an ISBN at a sharded SQLite database
+		2 - Verifies if the commit has failed once the other shard has
+		stored its books
+		3 - Verifies if a GroupCommitRegisterBookHandler refuses it
+		"""
+		sharded = SqliteShardedDatabase({
+			'location': os.path.join(self.directory, 'db-{0}.sqlite'),
+			'shards': 2
+		})
+		sharded.set_up()
+		uowm = sharded.get_uowm()
+
+		with uowm.start() as uow:
+			uow.books.save(Book('isbn-0', 'name', 'author', 'content'))
+			uow.commit()
+
+		books = [Book('isbn-{0}'.format(i), 'name', 'author', 'content') \
+				 for i in range(10)]
+		with self.assertRaises(sqlite3.IntegrityError):
+			with uowm.start() as uow:
+				uow.books.save_many(books)
+				uow.commit()
+
+		shard = shard_of('isbn-0', 2)
+		stored = [b.isbn for b in books if shard_of(b.isbn, 2) != shard]
+		self.assertNotEqual(stored, [])
+		self.assertEqual(sorted(b.isbn for b in sharded.get_view().get_all()),
+						 sorted(['isbn-0'] + stored))
+
+		with self.assertRaises(ValueError):
+			GroupCommitRegisterBookHandler(MessageBus(), uowm)
+
+		sharded.tear_down()
+
+
+class TestRegisterBooksHandler(unittest.TestCase):
+	"""Set of integration tests for the handlers.py RegisterBooksHandler class
+	and its implementations.
+
+	Tests: test_handle
+	"""
+	def test_handle(self):
+		"""Steps:
+		1 - Instantiates a RegisterBooksHandler
+		2 - Handles command and verifies if the books have been registered
+		3 - Verifies if a single event has been dispatched for the batch
+		"""
+		bus = MessageBus()
+
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		events = MockEventHandler()
+		bus.subscribe(BooksRegisteredEvent, events)
+
+		handler = RegisterBooksHandler(bus, memory.get_uowm())
+		handler.handle(RegisterBooksCommand([
+			RegisterBookCommand('isbn-1', 'name1', 'author1', 'content1'),
+			RegisterBookCommand('isbn-2', 'name2', 'author2', 'content2')
+		]))
+
+		view = memory.get_view()
+		self.assertEqual(view.get_by_isbn('isbn-1'),
+						 Book('isbn-1', 'name1', 'author1', 'content1'))
+		self.assertEqual(view.get_by_isbn('isbn-2'),
+						 Book('isbn-2', 'name2', 'author2', 'content2'))
+
+		self.assertEqual(events.events,
+						 [BooksRegisteredEvent(('isbn-1', 'isbn-2'))])
+
+
+class TestViewCacheInvalidationHandler(unittest.TestCase):
+	"""Set of integration tests for the handlers.py
+	ViewCacheInvalidationHandler class and its implementations.
+
+	Tests: test_handle
+	"""
+	def test_handle(self):
+		"""Steps:
+		1 - Instantiates a cached view and subscribes its invalidation handler
+		2 - Caches a missing book, registers it and verifies if it is read
+		3 - Caches a list, registers a batch and verifies if it is refreshed
+		"""
+		bus = MessageBus()
+
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		view = CachedBookView(memory.get_view())
+		handler = ViewCacheInvalidationHandler(view)
+		bus.subscribe(BookRegisteredEvent, handler)
+		bus.subscribe(BooksRegisteredEvent, handler)
+		bus.subscribe(RegisterBookCommand,
+					  RegisterBookHandler(bus, memory.get_uowm()))
+		bus.subscribe(RegisterBooksCommand,
+					  RegisterBooksHandler(bus, memory.get_uowm()))
+
+		self.assertIsNone(view.get_by_isbn('isbn-1'))
+		bus.handle(RegisterBookCommand('isbn-1', 'name1', 'author1', 'c1'))
+		self.assertEqual(view.get_by_isbn('isbn-1'),
+						 Book('isbn-1', 'name1', 'author1', 'c1'))
+
+		self.assertEqual(len(view.get_all()), 1)
+		bus.handle(RegisterBooksCommand([
+			RegisterBookCommand('isbn-2', 'name2', 'author2', 'c2'),
+			RegisterBookCommand('isbn-1', 'name3', 'author1', 'c3')
+		]))
+		self.assertEqual(len(view.get_all()), 2)
+		self.assertEqual(view.get_by_isbn('isbn-1').name, 'name3')
+
+
+class TestPartitionedCommandHandler(unittest.TestCase):
+	"""Set of integration tests for the handlers.py
+	PartitionedCommandHandler class and its implementations.
+
+	Tests: test_handle
+	"""
+	def setUp(self):
+		"""Creates a temporary directory for the database."""
+		self.directory = tempfile.mkdtemp()
+		self.location = os.path.join(self.directory, 'db.sqlite')
+
+	def tearDown(self):
+		"""Removes the temporary directory."""
+		shutil.rmtree(self.directory)
+
+	def test_handle(self):
+		"""Steps:
+		1 - Instantiates a PartitionedCommandHandler over two worker processes
+		registering books at SQLite, and a cached view of it
+		2 - Caches a missing book, registers it and a batch and verifies if
+		they are read
+		3 - Registers a book again and verifies if the error has been raised
+		4 - Registers a batch repeating a book and verifies if none of its
+		books has been registered
+		"""
+		bus = MessageBus()
+
+		sqlite = SqliteDatabase({'location': self.location})
+		sqlite.set_up()
+
+		pool = ProcessCommandPool(
+			functools.partial(build_worker, self.location), 2)
+		handler = PartitionedCommandHandler(bus, pool)
+		bus.subscribe(RegisterBookCommand, handler)
+		bus.subscribe(RegisterBooksCommand, handler)
+
+		view = CachedBookView(sqlite.get_view())
+		invalidation = ViewCacheInvalidationHandler(view)
+		bus.subscribe(BookRegisteredEvent, invalidation)
+		bus.subscribe(BooksRegisteredEvent, invalidation)
+
+		self.assertIsNone(view.get_by_isbn('isbn-0'))
+		bus.handle(RegisterBookCommand('isbn-0', 'name', 'author', 'c'))
+		self.assertEqual(view.get_by_isbn('isbn-0'),
+						 Book('isbn-0', 'name', 'author', 'c'))
+
+		bus.handle(RegisterBooksCommand(tuple(
+			RegisterBookCommand('isbn-{0}'.format(i), 'name', 'author', 'c') \
+			for i in range(1, 10)
+		)))
+		self.assertEqual(len(view.get_all()), 10)
+
+		with self.assertRaises(sqlite3.IntegrityError):
+			bus.handle(RegisterBookCommand('isbn-0', 'name', 'author', 'c'))
+
+		# A batch repeating a book is refused as a whole, at any partition.
+		with self.assertRaises(sqlite3.IntegrityError):
+			bus.handle(RegisterBooksCommand(tuple(
+				RegisterBookCommand('isbn-{0}'.format(i), 'name', 'author',
+									'c') for i in range(9, 20)
+			)))
+		self.assertEqual(len(view.get_all()), 10)
+
+		pool.stop()
+		self.assertEqual(sum(pool.stats()['handled']), 4)
+
+		sqlite.tear_down()
+
+
 class TestBookRegisteredHandler(unittest.TestCase):
 	"""Set of integration tests for the handlers.py BookRegisteredHandler class
 	and its implementations.
@@ -97,5 +394,69 @@ class TestBookRegisteredHandler(unittest.TestCase):
 		)
 
 
+class TestAsyncRegisterBookHandler(unittest.TestCase):
+	"""Set of integration tests for the handlers.py async handler classes
+	and their implementations.
+
+	Tests: test_handle, test_handle_many
+	"""
+	def setUp(self):
+		"""Subscribes the async handlers to an AsyncMessageBus over a memory
+		database."""
+		self.memory = MemoryDatabase({})
+		self.memory.set_up()
+
+		self.sender = MockAsyncSender()
+		self.bus = AsyncMessageBus()
+		uowm = ExecutorUnitOfWorkManager(self.memory.get_uowm())
+
+		self.bus.subscribe(RegisterBookCommand,
+						   AsyncRegisterBookHandler(self.bus, uowm))
+		self.bus.subscribe(RegisterBooksCommand,
+						   AsyncRegisterBooksHandler(self.bus, uowm))
+		self.bus.subscribe(BookRegisteredEvent, AsyncBookRegisteredHandler(
+			self.memory.get_view(), self.sender))
+		self.bus.subscribe(BooksRegisteredEvent,
+						   AsyncBooksRegisteredHandler(self.sender))
+
+	def test_handle(self):
+		"""Steps:
+		1 - Handles a thousand concurrent register book commands
+		2 - Verifies if every book has been registered and announced
+		"""
+		async def handle():
+			await asyncio.gather(*(
+				self.bus.handle(RegisterBookCommand(
+					'isbn-{0:04}'.format(i), 'name', 'author', 'content'))
+				for i in range(1000)
+			))
+
+		asyncio.run(handle())
+
+		view = self.memory.get_view()
+		self.assertEqual(len(view.get_all()), 1000)
+		self.assertEqual(len(self.sender.messages), 1000)
+		self.assertIn(
+			'{0} has been successfully registered.'.format(
+				view.get_by_isbn('isbn-0999').__repr__()),
+			self.sender.messages
+		)
+
+	def test_handle_many(self):
+		"""Steps:
+		1 - Handles a register books command
+		2 - Verifies if the books have been registered and announced once
+		"""
+		asyncio.run(self.bus.handle(RegisterBooksCommand([
+			RegisterBookCommand('isbn-1', 'name1', 'author', 'c1'),
+			RegisterBookCommand('isbn-2', 'name2', 'author', 'c2')
+		])))
+
+		self.assertEqual(len(self.memory.get_view().get_all()), 2)
+		self.assertEqual(
+			self.sender.messages,
+			['2 books have been successfully registered: isbn-1, isbn-2.'])
+
+
 if __name__ == '__main__':
 	unittest.main()
@@ -13,17 +13,30 @@ import requests
 
 from app.domain.model import Book
 from app.domain.ports import MessageBus
+from app.domain.metrics import BusMetrics
 from app.handlers import RegisterBookHandler
 from app.adapters.flask import FlaskInterface
 from app.adapters.memory import MemoryDatabase
-from app.domain.messages import RegisterBookCommand
+from app.domain.errors import MessageBusBusyError
+from app.domain.messages import RegisterBookCommand, RegisterBooksCommand
+
+
+class MockBusyHandler(object):
+	def handle(self, cmd):
+		raise MessageBusBusyError('The command queue is full', 2.5)
+
+
+class MockFailingView(object):
+	def get_digest(self, isbn):
+		raise RuntimeError('The database is unavailable')
 
 
 class TestAdaptersFlaskInterface(unittest.TestCase):
 	"""Set of integration tests for the flask.py FlaskInterface class
 	and its implementations.
 
-	Tests: test_run
+	Tests: test_run, test_pages, test_search, test_content_etag,
+	test_content_error, test_busy, test_metrics
 	"""
 	def test_run(self):
 		"""Steps:
@@ -52,6 +65,184 @@ class TestAdaptersFlaskInterface(unittest.TestCase):
 						 view.get_by_isbn('isbn'))
 		flask.stop()
 
+	def test_pages(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a database with three books
+		2 - Requests the books page by page and verifies them
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save_many([
+				Book('isbn-1', 'name', 'author', 'content'),
+				Book('isbn-2', 'name', 'author', 'content'),
+				Book('isbn-3', 'name', 'author', 'content')
+			])
+			uow.commit()
+
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(MessageBus())
+		flask.set_view(memory.get_view())
+		flask.run()
+
+		page = requests.get('http://localhost:5000/books?limit=2').json()
+		self.assertEqual([b['isbn'] for b in page], ['isbn-1', 'isbn-2'])
+		self.assertNotIn('content', page[0])
+
+		page = requests.get(
+			'http://localhost:5000/books?limit=1&content=true').json()
+		self.assertEqual(page[0]['content'], 'content')
+
+		page = requests.get(
+			'http://localhost:5000/books/name/name?after=isbn-2&limit=2'
+		).json()
+		self.assertEqual([b['isbn'] for b in page], ['isbn-3'])
+
+		response = requests.get('http://localhost:5000/books?limit=0')
+		self.assertEqual(response.status_code, 400)
+
+		flask.stop()
+
+
+	def test_search(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a database with two books
+		2 - Searches books and verifies the response
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		with memory.get_uowm().start() as uow:
+			uow.books.save_many([
+				Book('isbn-1', 'The River', 'author', 'content'),
+				Book('isbn-2', 'name', 'author', 'a river')
+			])
+			uow.commit()
+
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(MessageBus())
+		flask.set_view(memory.get_view())
+		flask.run()
+
+		books = requests.get(
+			'http://localhost:5000/books/search?q=river').json()
+		self.assertEqual([b['isbn'] for b in books], ['isbn-1', 'isbn-2'])
+
+		response = requests.get('http://localhost:5000/books/search?q=sea')
+		self.assertEqual(response.status_code, 400)
+
+		flask.stop()
+
+	def test_content_etag(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a database with a book
+		2 - Requests the book's content and verifies its ETag
+		3 - Requests it again with the ETag and verifies it is not resent
+		"""
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		book = Book('isbn', 'name', 'author', 'content')
+		with memory.get_uowm().start() as uow:
+			uow.books.save(book)
+			uow.commit()
+
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(MessageBus())
+		flask.set_view(memory.get_view())
+		flask.run()
+
+		url = 'http://localhost:5000/books/isbn/isbn/content'
+		response = requests.get(url)
+		self.assertEqual(response.json()['content'], 'content')
+		self.assertEqual(response.headers['ETag'],
+						 '"{0}"'.format(book.digest()))
+
+		response = requests.get(
+			url, headers={'If-None-Match': response.headers['ETag']})
+		self.assertEqual(response.status_code, 304)
+
+		flask.stop()
+
+	def test_content_error(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a failing view
+		2 - Requests a book's content
+		3 - Verifies if the error is answered with its JSON body
+		"""
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(MessageBus())
+		flask.set_view(MockFailingView())
+		flask.run()
+
+		response = requests.get(
+			'http://localhost:5000/books/isbn/isbn/content')
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response.json(),
+						 {'error': 'The database is unavailable'})
+
+		flask.stop()
+
+	def test_busy(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a busy message bus
+		2 - Registers a book and a batch of books
+		3 - Verifies if both are answered with 503 and a Retry-After
+		"""
+		bus = MessageBus()
+		bus.subscribe(RegisterBookCommand, MockBusyHandler())
+		bus.subscribe(RegisterBooksCommand, MockBusyHandler())
+
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(bus)
+		flask.set_view(None)
+		flask.run()
+
+		book = {'isbn': 'isbn', 'name': 'name', 'author': 'author',
+				'content': 'content'}
+		for url, body in (('http://localhost:5000/books', book),
+						  ('http://localhost:5000/books/batch', [book])):
+			response = requests.post(url, json=body)
+			self.assertEqual(response.status_code, 503)
+			self.assertEqual(response.headers['Retry-After'], '3')
+
+		flask.stop()
+
+	def test_metrics(self):
+		"""Steps:
+		1 - Instantiates a FlaskInterface over a measured message bus
+		2 - Registers a book and requests the metrics
+		3 - Verifies if the registration has been measured
+		"""
+		bus = MessageBus(metrics=BusMetrics())
+
+		memory = MemoryDatabase({})
+		memory.set_up()
+
+		bus.subscribe(RegisterBookCommand,
+					  RegisterBookHandler(bus, memory.get_uowm()))
+
+		flask = FlaskInterface({'host': '0.0.0.0', 'port': 5000})
+		flask.set_message_bus(bus)
+		flask.set_view(memory.get_view())
+		flask.run()
+
+		requests.post('http://localhost:5000/books',
+					  json={'isbn': 'isbn', 'name': 'name', 'author': 'author',
+							'content': 'content'})
+		response = requests.get('http://localhost:5000/metrics')
+
+		self.assertEqual(response.status_code, 200)
+		self.assertTrue(
+			response.headers['Content-Type'].startswith('text/plain'))
+		self.assertIn('sample_bus_handler_handled_total'
+					  '{message="RegisterBookCommand",'
+					  'handler="RegisterBookHandler"} 1',
+					  response.text.splitlines())
+
+		flask.stop()
+
 
 if __name__ == '__main__':
 	unittest.main()
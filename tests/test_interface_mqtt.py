@@ -3,22 +3,33 @@
 import json
 import time
 import unittest
+from collections import namedtuple
 
 import paho.mqtt.publish as publish
 
 from app.domain.model import Book
 from app.domain.ports import MessageBus
+from app.domain.metrics import BusMetrics
 from app.adapters.mqtt import MqttInterface
 from app.handlers import RegisterBookHandler
 from app.adapters.memory import MemoryDatabase
+from app.domain.errors import MessageBusBusyError
 from app.domain.messages import RegisterBookCommand
 
 
+MockMessage = namedtuple('MockMessage', ['topic', 'payload'])
+
+
+class MockBusyHandler(object):
+	def handle(self, cmd):
+		raise MessageBusBusyError('The command queue is full')
+
+
 class TestAdaptersMqttInterface(unittest.TestCase):
 	"""Set of integration tests for the mqtt.py MqttInterface class
 	and its implementations.
 
-	Tests: test_run
+	Tests: test_run, test_busy, test_metrics
 	"""
 	def test_run(self):
 		"""Steps:
@@ -52,6 +63,59 @@ class TestAdaptersMqttInterface(unittest.TestCase):
 						 view.get_by_isbn('isbn'))
 		mqtt.stop()
 
+	def test_busy(self):
+		"""Steps:
+		1 - Instantiates a MqttInterface over a busy message bus
+		2 - Delivers two register messages to it
+		3 - Verifies if both rejections have been logged and counted
+		"""
+		bus = MessageBus()
+		bus.subscribe(RegisterBookCommand, MockBusyHandler())
+
+		mqtt = MqttInterface(
+			{'topic': 'tests/book/#', 'host': 'localhost', 'port': 1883,
+			 'username': None, 'password': None})
+		mqtt.set_message_bus(bus)
+
+		payload = json.dumps({'isbn': 'isbn', 'name': 'name',
+							  'author': 'author', 'content': 'content'})
+		with self.assertLogs('sample', 'WARNING') as logs:
+			for _ in range(2):
+				mqtt.client.on_message(
+					mqtt.client, None,
+					MockMessage('tests/book/register', payload.encode()))
+
+		self.assertEqual(mqtt.rejected, 2)
+		self.assertIn('Command rejected', logs.output[-1])
+
+	def test_metrics(self):
+		"""Steps:
+		1 - Instantiates a MqttInterface over a measured message bus
+		2 - Handles a command and publishes the metrics
+		3 - Verifies the topic and payload published
+		"""
+		bus = MessageBus(metrics=BusMetrics())
+		bus.subscribe(RegisterBookCommand, MockBusyHandler())
+
+		mqtt = MqttInterface(
+			{'topic': 'tests/book/#', 'host': 'localhost', 'port': 1883,
+			 'username': None, 'password': None,
+			 'metrics_topic': 'tests/metrics', 'metrics_interval': 0})
+		mqtt.set_message_bus(bus)
+
+		published = []
+		mqtt.client.publish = lambda topic, payload: \
+			published.append((topic, json.loads(payload)))
+
+		with self.assertRaises(MessageBusBusyError):
+			bus.handle(RegisterBookCommand('isbn', 'name', 'author', 'c'))
+		mqtt.publish_metrics()
+
+		topic, payload = published[0]
+		self.assertEqual(topic, 'tests/metrics')
+		self.assertEqual(
+			payload['messages']['RegisterBookCommand']['errors'], 1)
+
 
 if __name__ == '__main__':
 	unittest.main()
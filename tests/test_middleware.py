@@ -0,0 +1,158 @@
+"""Unit tests of the application's middleware.py functions."""
+
+import logging
+import unittest
+
+from app.domain.ports import MessageBus
+from app.domain.messages import RegisterBookCommand, BookRegisteredEvent
+from app.middleware import TimingMiddleware, RetryMiddleware, \
+						   TracingMiddleware
+
+
+class MockHandler(object):
+	def __init__(self, failures: int = 0, error: type = ConnectionError):
+		self.failures = failures
+		self.error = error
+		self.calls = 0
+
+	def handle(self, event):
+		self.calls += 1
+		if self.calls <= self.failures:
+			raise self.error('mock failure')
+
+
+class TestMiddlewareTimingMiddleware(unittest.TestCase):
+	"""Set of unit tests for the middleware.py TimingMiddleware class and its
+	implementations.
+
+	Tests: test_stats
+	"""
+	def test_stats(self):
+		"""Steps:
+		1 - Subscribes a mock handler to a MessageBus with a TimingMiddleware
+		2 - Handles two events
+		3 - Verifies the timings of the handler
+		"""
+		timing = TimingMiddleware()
+		bus = MessageBus(middleware=[timing])
+		bus.subscribe(BookRegisteredEvent, MockHandler())
+
+		bus.handle(BookRegisteredEvent('isbn-1'))
+		bus.handle(BookRegisteredEvent('isbn-2'))
+
+		stats = timing.stats()['BookRegisteredEvent/MockHandler']
+		self.assertEqual(stats['count'], 2)
+		self.assertGreater(stats['total'], 0)
+		self.assertLessEqual(stats['max'], stats['total'])
+
+
+class TestMiddlewareRetryMiddleware(unittest.TestCase):
+	"""Set of unit tests for the middleware.py RetryMiddleware class and its
+	implementations.
+
+	Tests: test_retry, test_exhausted, test_permanent, test_commands
+	"""
+	def test_retry(self):
+		"""Steps:
+		1 - Subscribes a handler failing twice to a MessageBus with a
+		RetryMiddleware of three attempts
+		2 - Handles an event and verifies if it has been handled at last
+		"""
+		handler = MockHandler(failures=2)
+		bus = MessageBus(middleware=[RetryMiddleware(3, 0)])
+		bus.subscribe(BookRegisteredEvent, handler)
+
+		with self.assertLogs('sample', 'WARNING') as logs:
+			bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(handler.calls, 3)
+		self.assertEqual(len(logs.output), 2)
+
+	def test_exhausted(self):
+		"""Steps:
+		1 - Subscribes a handler failing thrice to a MessageBus with a
+		RetryMiddleware of three attempts
+		2 - Handles an event and verifies if the error is raised
+		"""
+		handler = MockHandler(failures=3)
+		bus = MessageBus(middleware=[RetryMiddleware(3, 0)])
+		bus.subscribe(BookRegisteredEvent, handler)
+
+		with self.assertLogs('sample', 'WARNING'), \
+			 self.assertRaises(ConnectionError):
+			bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(handler.calls, 3)
+
+	def test_permanent(self):
+		"""Steps:
+		1 - Subscribes a handler failing with an error that is not transient
+		to a MessageBus with a RetryMiddleware of three attempts
+		2 - Handles an event and verifies if the error is raised right away
+		"""
+		handler = MockHandler(failures=1, error=ValueError)
+		bus = MessageBus(middleware=[RetryMiddleware(3, 0)])
+		bus.subscribe(BookRegisteredEvent, handler)
+
+		with self.assertRaises(ValueError):
+			bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(handler.calls, 1)
+
+	def test_commands(self):
+		"""Steps:
+		1 - Subscribes a handler failing once to a command of a MessageBus
+		with a RetryMiddleware of three attempts
+		2 - Verifies if the handler has been left unwrapped
+		"""
+		handler = MockHandler(failures=1)
+		bus = MessageBus(middleware=[RetryMiddleware(3, 0)])
+		bus.subscribe(RegisterBookCommand, handler)
+
+		self.assertEqual(bus.table[RegisterBookCommand], handler.handle)
+
+
+class TestMiddlewareTracingMiddleware(unittest.TestCase):
+	"""Set of unit tests for the middleware.py TracingMiddleware class and
+	its implementations.
+
+	Tests: test_trace, test_disabled
+	"""
+	def test_trace(self):
+		"""Steps:
+		1 - Subscribes a mock handler to a MessageBus with a
+		TracingMiddleware while the logger is at the debug level
+		2 - Handles an event and verifies the traces logged
+		"""
+		bus = MessageBus(middleware=[TracingMiddleware()])
+
+		with self.assertLogs('sample', 'DEBUG') as logs:
+			bus.subscribe(BookRegisteredEvent, MockHandler())
+			bus.handle(BookRegisteredEvent('isbn'))
+
+		self.assertEqual(len(logs.output), 2)
+		self.assertIn('[1] MockHandler handling', logs.output[0])
+		self.assertIn('[1] MockHandler done', logs.output[1])
+
+	def test_disabled(self):
+		"""Steps:
+		1 - Subscribes a mock handler to a MessageBus with a
+		TracingMiddleware while the logger is above the debug level
+		2 - Verifies if the handler has been left unwrapped
+		"""
+		logger = logging.getLogger('sample')
+		level = logger.level
+		logger.setLevel(logging.INFO)
+
+		try:
+			handler = MockHandler()
+			bus = MessageBus(middleware=[TracingMiddleware()])
+			bus.subscribe(BookRegisteredEvent, handler)
+		finally:
+			logger.setLevel(level)
+
+		self.assertEqual(bus.table[BookRegisteredEvent], handler.handle)
+
+
+if __name__ == '__main__':
+	unittest.main()
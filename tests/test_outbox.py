@@ -0,0 +1,124 @@
+"""Unit tests of the application's outbox.py functions."""
+
+import time
+import unittest
+
+from app.outbox import OutboxRelay
+from app.domain.ports import MessageBus
+from app.adapters.memory import MemoryDatabase
+from app.handlers import RegisterBookHandler, RegisterBooksHandler
+from app.domain.messages import RegisterBookCommand, RegisterBooksCommand, \
+								BookRegisteredEvent, BooksRegisteredEvent
+
+
+class MockSender(object):
+	def __init__(self, failures: int = 0):
+		self.failures = failures
+		self.events = []
+
+	def publish(self, event):
+		if self.failures > 0:
+			self.failures -= 1
+			raise ConnectionError('mock failure')
+		self.events.append(event)
+
+
+class TestOutboxRelay(unittest.TestCase):
+	"""Set of unit tests for the outbox.py OutboxRelay class and its
+	implementations.
+
+	Tests: test_drain, test_retry, test_notify
+	"""
+	def setUp(self):
+		"""Subscribes handlers committing their events to the outbox of a
+		memory database."""
+		self.memory = MemoryDatabase({})
+		self.memory.set_up()
+
+		self.bus = MessageBus()
+		self.bus.subscribe(RegisterBookCommand, RegisterBookHandler(
+			self.bus, self.memory.get_uowm(), outbox=True))
+		self.bus.subscribe(RegisterBooksCommand, RegisterBooksHandler(
+			self.bus, self.memory.get_uowm(), outbox=True))
+
+	def register(self, isbn: str):
+		"""Registers a book."""
+		self.bus.handle(RegisterBookCommand(isbn, 'name', 'author', 'c'))
+
+	def test_drain(self):
+		"""Steps:
+		1 - Registers a book and a batch of books
+		2 - Drains the outbox in batches smaller than its events
+		3 - Verifies if the events have been delivered in order and removed
+		"""
+		sender = MockSender()
+		relay = OutboxRelay(self.memory.get_outbox(), sender.publish,
+							batch_size=2)
+
+		for i in range(3):
+			self.register('isbn-{0}'.format(i))
+		self.bus.handle(RegisterBooksCommand((
+			RegisterBookCommand('isbn-3', 'name', 'author', 'c'),
+		)))
+
+		self.assertEqual(relay.drain(), 4)
+		self.assertEqual(sender.events,
+						 [BookRegisteredEvent('isbn-{0}'.format(i)) \
+						  for i in range(3)] \
+						 + [BooksRegisteredEvent(('isbn-3',))])
+		self.assertEqual(self.memory.get_outbox().pending(), [])
+		self.assertEqual(relay.drain(), 0)
+
+	def test_retry(self):
+		"""Steps:
+		1 - Registers books while their sender fails twice
+		2 - Starts the relay and waits for the events to be delivered
+		3 - Verifies if every event has been delivered in order, once each
+		since the failures happen before delivering
+		"""
+		sender = MockSender(failures=2)
+		relay = OutboxRelay(self.memory.get_outbox(), sender.publish,
+							interval=0.01, retry_delay=0.01)
+
+		self.register('isbn-1')
+		self.register('isbn-2')
+
+		with self.assertLogs('sample', 'WARNING') as logs:
+			relay.start()
+			deadline = time.monotonic() + 5
+			while len(sender.events) < 2 and time.monotonic() < deadline:
+				time.sleep(0.01)
+			relay.stop()
+
+		self.assertEqual(len(logs.output), 2)
+		self.assertEqual(sender.events, [BookRegisteredEvent('isbn-1'),
+										 BookRegisteredEvent('isbn-2')])
+		self.assertEqual(relay.stats(), {'delivered': 2, 'failures': 2})
+
+	def test_notify(self):
+		"""Steps:
+		1 - Starts a relay draining an empty outbox once a minute
+		2 - Registers a book and notifies the relay
+		3 - Verifies if the event has been delivered right away
+		"""
+		sender = MockSender()
+		relay = OutboxRelay(self.memory.get_outbox(), sender.publish,
+							interval=60)
+		relay.start()
+
+		self.register('isbn')
+		relay.notify()
+
+		deadline = time.monotonic() + 5
+		while not sender.events and time.monotonic() < deadline:
+			time.sleep(0.01)
+
+		self.assertEqual(sender.events, [BookRegisteredEvent('isbn')])
+
+		start = time.monotonic()
+		relay.stop()
+		self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == '__main__':
+	unittest.main()